@@ -0,0 +1,99 @@
+"""
+Адаптивный опрос источников с предохранителями против опроса с постоянным шагом
+Моделируются часы работы (часы контроллера подменены, задача опроса шагает
+по min_interval). Источники пяти видов: быстро меняющиеся, стабильные,
+без свежих данных, мертвые (не отвечают до срока) и нестабильные (половина
+опросов с ошибкой). Печатает, сколько опросов ушло на каждый вид и какая
+доля из них принесла свежие данные.
+
+Запуск: python -m benchmarks.adaptive_polling [часов моделирования]
+"""
+
+import asyncio
+import logging
+import random
+import sys
+from collections import Counter
+
+from controllers.data_ingestion_controller import DataIngestionController, PollingPolicy, _SourceHealth
+from domain.models import ДанныеСенсора
+from domain.repositories import SensorDataRepository
+
+# Вид источника -> число источников
+KINDS = {"fast": 20, "stable": 60, "stale": 10, "dead": 5, "flapping": 5}
+NOMINAL_TIMEOUT = 5.0  # срок ответа в рабочей конфигурации, с
+
+
+class _SimulatedSources(DataIngestionController):
+    """Источники по видам; часы и измерения - модельные"""
+
+    def __init__(self, policy: PollingPolicy):
+        super().__init__(SensorDataRepository(), polling=policy)
+        self.now = 0.0
+        self.clock = lambda: self.now
+        self.активные_источники = [f"{kind}_{i}" for kind, count in KINDS.items() for i in range(count)]
+        self.values = {источник: 10.0 for источник in self.активные_источники}
+        self.polls: Counter = Counter()
+        self.fresh: Counter = Counter()
+        self.last_seen = {}
+
+    async def _запроситьДанныеСИсточника(self, источник: str):
+        kind = источник.split("_")[0]
+        self.polls[kind] += 1
+        if kind == "dead" or (kind == "flapping" and random.random() < 0.5):
+            await asyncio.sleep(3600)
+
+        # Источник выдает измерение раз в минуту; "stale" застрял на первом
+        measured = 0 if kind == "stale" else int(self.now // 60) * 60_000
+        if kind == "fast":
+            self.values[источник] += random.uniform(-5, 5)
+        if measured > self.last_seen.get(источник, -1):
+            self.fresh[kind] += 1
+            self.last_seen[источник] = measured
+        return [ДанныеСенсора(f"{источник}_{measured}", measured, self.values[источник], "temperature", источник)]
+
+
+class _FixedCadence(_SimulatedSources):
+    """Прежнее поведение: каждый источник опрашивается каждый шаг, ошибки только записываются"""
+
+    def _состояниеИсточника(self, источник: str) -> _SourceHealth:
+        return _SourceHealth(self.polling.interval)
+
+
+async def _simulate(controller: _SimulatedSources, hours: float, step: float) -> None:
+    while controller.now < hours * 3600:
+        await controller.опроситьИсточники()
+        controller.now += step
+
+
+def _report(title: str, controller: _SimulatedSources) -> None:
+    статус = asyncio.run(controller.получитьСтатусИсточников())["статусы"]
+    timeouts = sum(s["таймаутов"] for s in статус.values())
+    print(f"{title}: опросов {sum(controller.polls.values())}, таймаутов {timeouts} "
+          f"(~{timeouts * NOMINAL_TIMEOUT / 60:.0f} мин ожидания при сроке {NOMINAL_TIMEOUT:.0f} с)")
+    for kind in KINDS:
+        polls = controller.polls[kind]
+        share = controller.fresh[kind] / polls if polls else 0.0
+        print(f"  {kind:<9} опросов {polls:>6}, со свежими данными {share:6.1%}")
+
+
+def main(hours: float) -> None:
+    random.seed(1)
+    logging.disable(logging.WARNING)
+    adaptive = PollingPolicy(source_timeout=0.001, interval=300, min_interval=30, max_interval=1800)
+    fixed = PollingPolicy(source_timeout=0.001, interval=300)
+
+    print(f"Моделирование {hours:g} ч, источников {sum(KINDS.values())}")
+    controller = _FixedCadence(fixed)
+    asyncio.run(_simulate(controller, hours, fixed.interval))
+    _report("постоянный шаг 300 с", controller)
+
+    controller = _SimulatedSources(adaptive)
+    asyncio.run(_simulate(controller, hours, adaptive.min_interval))
+    _report("адаптивный опрос", controller)
+    статус = asyncio.run(controller.получитьСтатусИсточников())["статусы"]
+    print("  предохранители:", dict(Counter(s["предохранитель"] for s in статус.values())))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,109 @@
+"""
+Загрузка исторических архивов CSV (BackfillImporter)
+Генерирует архив наблюдений станций за прошлые годы, загружает его через
+DataController в репозитории в памяти и печатает скорость (строк/с) и пиковую
+память процесса для файлов растущего размера (загруженные строки остаются
+в репозиториях), затем проверяет, что сводка за весь архив строится по агрегатам
+загруженного периода. Затем загрузка
+прерывается после первой фиксации и запускается повторно: продолжение
+должно загрузить ровно оставшиеся строки.
+
+Запуск: python -m benchmarks.backfill [строк в самом большом файле] [процессов разбора]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from controllers.data_controller import DataController
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from domain.rollups import DAY_MS, RollupStore
+from infrastructure.backfill import BackfillImporter, BackfillPolicy
+
+STATIONS = 200
+HEADER = "station_id,timestamp,temperature,humidity,pressure,wind_speed,wind_direction,precipitation\n"
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _write_archive(path: str, rows: int) -> None:
+    """Архив наблюдений с шагом 10 минут, начиная за три года до текущей даты"""
+    start = datetime.now() - timedelta(days=3 * 365)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for i in range(rows):
+            moment = start + timedelta(minutes=10 * (i // STATIONS))
+            f.write(f"{26000 + i % STATIONS},{moment.isoformat(timespec='seconds')},"
+                    f"{random.uniform(-30, 35):.1f},{random.uniform(20, 100):.0f},"
+                    f"{random.uniform(720, 780):.1f},{random.uniform(0, 30):.1f},"
+                    f"{random.choice('NESW')},{random.uniform(0, 5):.1f}\n")
+
+
+def _controller() -> DataController:
+    return DataController(WeatherDataRepository(), SensorDataRepository(), rollups=RollupStore())
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _resume(path: str, rows: int, policy: BackfillPolicy) -> None:
+    commits = []
+
+    def interrupt() -> None:
+        # Сбой во время второй фиксации: зафиксирована только первая
+        commits.append(True)
+        if len(commits) == 2:
+            raise _Interrupted()
+
+    first = BackfillImporter(_controller(), policy, commit=interrupt)
+    try:
+        await first.run(path, restart=True)
+    except _Interrupted:
+        pass
+    committed = first._load_state(path, os.path.getsize(path))
+
+    result = await BackfillImporter(_controller(), policy).run(path)
+    print(f"Прерывание после первой фиксации: зафиксировано строк {committed['rows']}, "
+          f"продолжение загрузило {result['rows']}, всего {committed['rows'] + result['rows']} из {rows}")
+
+
+def main(rows: int, workers: int) -> None:
+    random.seed(1)
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        policy = BackfillPolicy(workers=workers, commit_bytes=16 * 1024 * 1024,
+                                state_dir=os.path.join(directory, "state"))
+        print(f"Процессов разбора {workers}, фрагмент {policy.chunk_bytes / 1024 / 1024:g} МБ, "
+              f"фиксация каждые {policy.commit_bytes // 1024 // 1024} МБ")
+        for size in (rows // 4, rows // 2, rows):
+            path = os.path.join(directory, f"archive_{size}.csv")
+            _write_archive(path, size)
+            controller = _controller()
+            result = asyncio.run(BackfillImporter(controller, policy).run(path, restart=True))
+            print(f"  {size:>9} строк ({os.path.getsize(path) / 1e6:6.1f} МБ): "
+                  f"{result['rows_per_second']:>7} строк/с, пиковая память процесса {_peak_mb():6.0f} МБ")
+
+        # Загруженный период покрыт агрегатами: из сырых данных читаются только края меньше минуты
+        конец = int(datetime.now().timestamp() * 1000)
+        started = time.perf_counter()
+        сводки = controller.rollups.summarize(конец - 4 * 365 * DAY_MS, конец,
+                                              controller.readings.snapshot().получитьМассивыЗаПериод)
+        print(f"Сводка архива: температура - {сводки['temperature'].количество} из {rows} наблюдений "
+              f"за {(time.perf_counter() - started) * 1000:.1f} мс")
+
+        asyncio.run(_resume(path, rows, BackfillPolicy(workers=workers, commit_bytes=4 * 1024 * 1024,
+                                                       state_dir=policy.state_dir)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1))
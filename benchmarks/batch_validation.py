@@ -0,0 +1,150 @@
+"""
+Пропускная способность проверки и нормализации пакета данных сенсоров
+Сравнивает прежнюю построчную обработку DataIngestionController (копия кода
+до validate_batch: таблицы диапазонов и точности собираются заново на каждую
+запись, на каждую принятую запись создается новый объект) с validate_batch:
+векторной (NumPy) и построчной без NumPy.
+
+Запуск: python -m benchmarks.batch_validation [размер пакета]
+"""
+
+import logging
+import random
+import sys
+import time
+
+from domain import validation
+from domain.models import ДанныеСенсора
+
+ROUNDS = 5
+
+# Тип измерения -> (типичный диапазон значений, знаков после запятой у прибора)
+_TYPES = {
+    "temperature": ((-30, 35), 1),
+    "humidity": ((20, 100), 0),
+    "pressure": ((720, 780), 1),
+    "wind_speed": ((0, 30), 1),
+    "precipitation": ((0, 20), 2)
+}
+
+
+def _batch(count: int, instrument_precision: bool) -> list:
+    """Пакет с ~2% значений вне диапазона и ~0.1% неизвестных типов"""
+    records = []
+    types = list(_TYPES)
+    for i in range(count):
+        тип = types[i % len(types)]
+        (low, high), digits = _TYPES[тип]
+        значение = random.uniform(low, high)
+        if instrument_precision:
+            значение = round(значение, digits)
+        if random.random() < 0.02:
+            значение = -999.0
+        if random.random() < 0.001:
+            тип = "visibility"
+        records.append(ДанныеСенсора(f"r{i}", 1_700_000_000_000 + i, значение, тип, f"st{i % 50}"))
+    return records
+
+
+def _copy(records: list) -> list:
+    return [ДанныеСенсора(r.идДанных, r.времяИзмерения, r.значение, r.типИзмерения, r.идСтанции)
+            for r in records]
+
+
+# Журнал прежнего пути: сообщения формируются, но никуда не выводятся
+_logger = logging.getLogger("benchmarks.batch_validation")
+_logger.addHandler(logging.NullHandler())
+_logger.propagate = False
+
+
+def _валидироватьДанные(данные: ДанныеСенсора) -> bool:
+    """Копия прежней DataIngestionController._валидироватьДанные"""
+    диапазоны = {
+        "temperature": (-60, 60),
+        "humidity": (0, 100),
+        "pressure": (600, 800),
+        "wind_speed": (0, 100),
+        "precipitation": (0, 500)
+    }
+
+    if данные.типИзмерения not in диапазоны:
+        return False
+
+    мин, макс = диапазоны[данные.типИзмерения]
+    return мин <= данные.значение <= макс
+
+
+def _нормализоватьДанные(данные: ДанныеСенсора) -> ДанныеСенсора:
+    """Копия прежней DataIngestionController._нормализоватьДанные"""
+    точность = {
+        "temperature": 1,
+        "humidity": 1,
+        "pressure": 0,
+        "wind_speed": 1,
+        "precipitation": 2
+    }
+
+    if данные.типИзмерения in точность:
+        значение = round(данные.значение, точность[данные.типИзмерения])
+    else:
+        значение = round(данные.значение, 2)
+
+    return ДанныеСенсора(
+        идДанных=данные.идДанных,
+        времяИзмерения=данные.времяИзмерения,
+        значение=значение,
+        типИзмерения=данные.типИзмерения,
+        идСтанции=данные.идСтанции
+    )
+
+
+def _per_record(данные: list) -> list:
+    """Цикл прежнего DataIngestionController.обработатьДанные до сохранения"""
+    обработанные_данные = []
+
+    for запись in данные:
+        try:
+            if _валидироватьДанные(запись):
+                нормализованная = _нормализоватьДанные(запись)
+                обработанные_данные.append(нормализованная)
+                _logger.debug(f"Созданы SensorData: {запись.идДанных}")
+            else:
+                _logger.warning(f"Невалидные данные: {запись.идДанных}")
+        except Exception as e:
+            _logger.error(f"Ошибка обработки данных {запись.идДанных}: {e}")
+
+    return обработанные_данные
+
+
+def _timed(name: str, run, records: list, baseline: float = None) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        batch = _copy(records)
+        started = time.perf_counter()
+        run(batch)
+        best = min(best, time.perf_counter() - started)
+    speedup = f"{baseline / best:>7.1f}x" if baseline else ""
+    print(f"  {name:<30}{best * 1000:>9.1f} мс  {len(records) / best / 1e6:>6.2f} млн/с {speedup}")
+    return best
+
+
+def main(count: int) -> None:
+    random.seed(1)
+    numpy = validation.np
+
+    for title, instrument_precision in (("значения с точностью прибора", True),
+                                         ("значения полной точности", False)):
+        records = _batch(count, instrument_precision)
+        print(f"Пакет {count} записей, {title}:")
+        baseline = _timed("построчно (прежний путь)", _per_record, records)
+        if numpy is not None:
+            _timed("validate_batch, NumPy", validation.validate_batch, records, baseline)
+        validation.np = None
+        try:
+            _timed("validate_batch, без NumPy", validation.validate_batch, records, baseline)
+        finally:
+            validation.np = numpy
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
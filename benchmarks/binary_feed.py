@@ -0,0 +1,172 @@
+"""
+Двоичный формат потоков сенсоров против NDJSON
+1) Размер на проводе и стоимость разбора для потока 1 Гц: каждая станция раз
+   в секунду присылает кадр из пяти показаний. Двоичные кадры разбираются до
+   записей ДанныеСенсора (records_of) и до колонок рядов (columns_of, путь приема).
+2) Прием через SensorFeedServer по TCP и UDP на локальном интерфейсе
+   с конвейером приема: показаний в секунду от отправки до записи в репозиторий.
+
+Запуск: python -m benchmarks.binary_feed [станций] [секунд потока]
+"""
+
+import asyncio
+import json
+import logging
+import random
+import socket
+import sys
+import time
+from typing import Tuple
+
+from controllers.data_ingestion_controller import DataIngestionController
+from domain.models import ДанныеСенсора
+from domain.repositories import SensorDataRepository
+from domain.rollups import RollupStore
+from services.ingestion_pipeline import PipelinePolicy
+from web import binary_protocol
+from web.sensor_feed_server import BinaryFeedPolicy, SensorFeedServer
+
+UDP_BURST = 50
+IDLE_SECONDS = 2.0
+
+_TYPES = {
+    "temperature": (-30, 35),
+    "humidity": (20, 100),
+    "pressure": (720, 780),
+    "wind_speed": (0, 30),
+    "precipitation": (0, 20)
+}
+
+
+def _feed(stations: int, seconds: int) -> list:
+    """Кадры потока: [(станция, показания за секунду)]"""
+    start = int(time.time() * 1000) - seconds * 1000
+    frames = []
+    for second in range(seconds):
+        for s in range(stations):
+            station = f"{26000 + s}"
+            frames.append((station, [
+                ДанныеСенсора("", start + second * 1000, round(random.uniform(low, high), 1), тип, station)
+                for тип, (low, high) in _TYPES.items()
+            ]))
+    return frames
+
+
+def _ndjson(frames: list) -> list:
+    return [
+        "".join(json.dumps({"station_id": r.идСтанции, "type": r.типИзмерения, "value": r.значение,
+                            "timestamp": r.времяИзмерения}) + "\n" for r in readings).encode("utf-8")
+        for _, readings in frames
+    ]
+
+
+def _parse_ndjson(payload: bytes) -> list:
+    records = []
+    for line in payload.splitlines():
+        obj = json.loads(line)
+        records.append(ДанныеСенсора(f"{obj['station_id']}_{obj['type']}_{obj['timestamp']}", obj["timestamp"],
+                                     float(obj["value"]), obj["type"], obj["station_id"]))
+    return records
+
+
+def _codec(frames: list) -> list:
+    """Кодированные двоичные кадры; печатает сравнение с NDJSON"""
+    text = _ndjson(frames)
+    binary = [binary_protocol.encode_readings(readings) for _, readings in frames]
+    readings = sum(len(r) for _, r in frames)
+    print(f"Кадров {len(frames)}, показаний {readings}")
+    print(f"  размер: NDJSON {sum(map(len, text)) / readings:5.1f} байт/показание, "
+          f"двоичный {sum(map(len, binary)) / readings:5.1f} байт/показание")
+
+    started = time.perf_counter()
+    for payload in text:
+        _parse_ndjson(payload)
+    ndjson_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for payload in binary:
+        binary_protocol.records_of(binary_protocol.decode_frames(payload))
+    binary_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for payload in binary:
+        binary_protocol.columns_of(binary_protocol.decode_frames(payload))
+    columns_seconds = time.perf_counter() - started
+
+    print(f"  разбор по кадрам: NDJSON {readings / ndjson_seconds:>10.0f} показаний/с, "
+          f"двоичный до записей {readings / binary_seconds:>10.0f} показаний/с, "
+          f"до колонок {readings / columns_seconds:>10.0f} показаний/с")
+    return binary
+
+
+def _free_port(kind: int) -> int:
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_stored(repository: SensorDataRepository, expected: int) -> Tuple[int, float]:
+    """Ожидание записи всех показаний или прекращения роста (потери UDP); число и момент последней записи"""
+    stored, changed = 0, time.perf_counter()
+    while stored < expected and time.perf_counter() - changed < IDLE_SECONDS:
+        await asyncio.sleep(0.01)
+        count = len(repository.найтиВсе())
+        if count != stored:
+            stored, changed = count, time.perf_counter()
+    return stored, changed
+
+
+async def _serve(binary: list, connections: int) -> None:
+    expected = sum(len(binary_protocol.decode_frames(payload)[0]) for payload in binary)
+    for transport in ("TCP", "UDP"):
+        repository = SensorDataRepository()
+        controller = DataIngestionController(repository, RollupStore(), pipeline=PipelinePolicy(flush_interval=0.2))
+        policy = BinaryFeedPolicy(enabled=True, host="127.0.0.1",
+                                  tcp_port=_free_port(socket.SOCK_STREAM) if transport == "TCP" else 0,
+                                  udp_port=_free_port(socket.SOCK_DGRAM) if transport == "UDP" else 0)
+        server = SensorFeedServer(controller, policy)
+        await server.start()
+
+        started = time.perf_counter()
+        if transport == "TCP":
+            async def client(part: list) -> None:
+                _, writer = await asyncio.open_connection("127.0.0.1", server.tcp_port)
+                for payload in part:
+                    writer.write(payload)
+                    await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+
+            await asyncio.gather(*(client(binary[i::connections]) for i in range(connections)))
+        else:
+            loop = asyncio.get_running_loop()
+            sender, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                            remote_addr=("127.0.0.1", server.udp_port))
+            for i, payload in enumerate(binary):
+                sender.sendto(payload)
+                if i % UDP_BURST == 0:
+                    # Темп отправки ограничен: UDP без подтверждений, при переполнении
+                    # буфера приема ядро сбрасывает датаграммы
+                    await asyncio.sleep(0.001)
+            sender.close()
+
+        stored, finished = await _wait_stored(repository, expected)
+        elapsed = finished - started
+        await server.stop()
+        await controller.конвейер.stop()
+        lost = f", потеряно датаграмм {len(binary) - server.datagrams}" if transport == "UDP" else ""
+        print(f"  {transport}: записано {stored} из {expected} за {elapsed:5.2f} с - "
+              f"{stored / elapsed:>8.0f} показаний/с, ошибок кадров {server.frame_errors}{lost}")
+
+
+def main(stations: int, seconds: int) -> None:
+    random.seed(1)
+    logging.disable(logging.WARNING)
+    binary = _codec(_feed(stations, seconds))
+    print("Прием через SensorFeedServer (локальный интерфейс, конвейер приема):")
+    asyncio.run(_serve(binary, connections=min(stations, 64)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10)
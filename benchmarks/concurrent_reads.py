@@ -0,0 +1,185 @@
+"""
+Нагрузочная проверка согласованного чтения репозиториев в памяти
+Потоки и задачи asyncio параллельно записывают пакеты и читают данные.
+Каждый пакет содержит BATCH записей, поэтому согласованное чтение всегда видит
+число записей, кратное BATCH, упорядоченные выборки и совпадающие индексы.
+
+Запуск: python -m benchmarks.concurrent_reads [секунд] [--live]
+    --live  читать живые репозитории вместо снимков (для сравнения)
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from domain.columnar_repository import ColumnarSensorDataRepository
+from domain.models import ДанныеСенсора, WeatherData, Forecast, Alert, AlertLevel
+from domain.repositories import (
+    SensorDataRepository,
+    WeatherDataRepository,
+    ForecastRepository,
+    AlertRepository
+)
+
+BATCH = 50
+STATIONS = ["26850", "26851", "radar_minsk"]
+TYPES = ["temperature", "humidity", "pressure"]
+WRITER_THREADS = 2
+READER_THREADS = 4
+
+
+def _complete(coro):
+    """Результат корутины репозитория в памяти: она не ожидает, цикл событий не нужен"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("Корутина репозитория ожидает ввода-вывода")
+
+
+class Stress:
+    def __init__(self, seconds: float, live: bool):
+        self.seconds = seconds
+        self.live = live
+        self.sensor = SensorDataRepository()
+        self.columnar = ColumnarSensorDataRepository()
+        self.weather = WeatherDataRepository()
+        self.forecasts = ForecastRepository()
+        self.alerts = AlertRepository()
+        self.stop = threading.Event()
+        self.counts = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def _next(self) -> int:
+        with self._lock:
+            self._sequence += 1
+            return self._sequence
+
+    def _view(self, repository):
+        return repository if self.live else repository.snapshot()
+
+    def _fail(self, name: str, error: str) -> None:
+        with self._lock:
+            if not self.errors[name]:
+                print(f"  {name}: {error}")
+            self.errors[name] += 1
+
+    # --- Запись ---
+
+    def write_batch(self) -> None:
+        n = self._next()
+        base = 1_700_000_000_000 + n * 60_000
+        записи = [
+            ДанныеСенсора(f"s{n}-{i}", base + i, float(i), TYPES[i % len(TYPES)], STATIONS[i % len(STATIONS)])
+            for i in range(BATCH)
+        ]
+        self.sensor.сохранитьПакет(записи)
+        self.columnar.сохранитьПакет(записи)
+        _complete(self.weather.save_many([
+            WeatherData(f"w{n}-{i}", STATIONS[i % len(STATIONS)], datetime.fromtimestamp((base + i) / 1000),
+                        20.0, 70.0, 1013.0, 3.0, "С", 0.0, "")
+            for i in range(BATCH)
+        ]))
+        moment = datetime.now()
+        self.forecasts.сохранить(Forecast(f"f{n}", "WRF-ARW", moment, moment, moment, STATIONS[n % 3], []))
+        self.alerts.сохранить(Alert(f"a{n}", AlertLevel.WARNING, "Ветер", STATIONS[n % 3], moment,
+                                    moment.replace(year=moment.year + 1), "Проверка"))
+        with self._lock:
+            self.counts["batches"] += 1
+
+    # --- Чтение ---
+
+    def check_sensor(self, name: str, repository) -> None:
+        view = self._view(repository)
+        все = view.получитьЗаПериод(0, 2 ** 62)
+        времена = [запись.времяИзмерения for запись in все]
+        if len(все) % BATCH:
+            self._fail(name, f"видна часть пакета: {len(все)} записей")
+        if времена != sorted(времена):
+            self._fail(name, "нарушен порядок по времени")
+        по_рядам = sum(len(view.получитьМассивыПоСтанции(станция, тип, 0, 2 ** 62)[0])
+                       for станция in STATIONS for тип in TYPES)
+        if по_рядам != len(все):
+            self._fail(name, f"индекс (станция, тип) расходится с выборкой: {по_рядам} != {len(все)}")
+
+    def check_weather(self) -> None:
+        view = self._view(self.weather)
+        всего = 0
+        for станция in STATIONS:
+            история = _complete(view.get_station_history(станция, hours=24 * 365 * 100))
+            всего += len(история)
+            if [wd.timestamp for wd in история] != sorted(wd.timestamp for wd in история):
+                self._fail("weather", "нарушен порядок ряда станции")
+        if всего % BATCH:
+            self._fail("weather", f"видна часть пакета: {всего} наблюдений")
+
+    def check_forecasts(self) -> None:
+        view = self._view(self.forecasts)
+        по_регионам = sum(len(_complete(view.get_all_for_region(станция))) for станция in STATIONS)
+        if по_регионам != len(view.найтиВсе()):
+            self._fail("forecast", "индекс регионов расходится с хранилищем")
+        view = self._view(self.alerts)
+        if len(view.найтиВсе()) != len(_complete(view.get_active_alerts())):
+            self._fail("alert", "активные оповещения расходятся с хранилищем")
+
+    def read_once(self) -> None:
+        for name, check in (("sensor", lambda: self.check_sensor("sensor", self.sensor)),
+                            ("columnar", lambda: self.check_sensor("columnar", self.columnar)),
+                            ("weather", self.check_weather),
+                            ("forecast", self.check_forecasts)):
+            try:
+                check()
+            except Exception as e:
+                self._fail(name, f"{type(e).__name__}: {e}")
+        with self._lock:
+            self.counts["reads"] += 1
+
+    # --- Запуск ---
+
+    def _loop(self, action) -> None:
+        while not self.stop.is_set():
+            action()
+
+    async def _task(self, action) -> None:
+        while not self.stop.is_set():
+            action()
+            await asyncio.sleep(0)
+
+    async def _tasks(self) -> None:
+        await asyncio.gather(self._task(self.write_batch), self._task(self.read_once),
+                             self._task(self.read_once))
+
+    def run(self) -> int:
+        threads = ([threading.Thread(target=self._loop, args=(self.write_batch,)) for _ in range(WRITER_THREADS)]
+                   + [threading.Thread(target=self._loop, args=(self.read_once,)) for _ in range(READER_THREADS)]
+                   + [threading.Thread(target=lambda: asyncio.run(self._tasks()))])
+        for thread in threads:
+            thread.start()
+        time.sleep(self.seconds)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+
+        # Финальная проверка после остановки писателей
+        self.read_once()
+        print(f"Пакетов записано: {self.counts['batches']}, проверок чтения: {self.counts['reads']}")
+        for name, count in sorted(self.errors.items()):
+            print(f"  ошибок {name}: {count}")
+        return sum(self.errors.values())
+
+
+def main(seconds: float, live: bool) -> None:
+    print(f"Чтение {'живых репозиториев' if live else 'снимков'}, {seconds:.0f} с")
+    errors = Stress(seconds, live).run()
+    print("Нарушений согласованности нет" if not errors else f"Нарушений: {errors}")
+    sys.exit(1 if errors and not live else 0)
+
+
+if __name__ == "__main__":
+    arguments = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(float(arguments[0]) if arguments else 10.0, "--live" in sys.argv)
@@ -0,0 +1,63 @@
+"""
+Подавление повторов при длительном приеме
+Поток пакетов показаний, в котором после "переподключений" источники
+досылают часть уже отправленных показаний с новыми идентификаторами.
+Печатает стоимость фильтра на показание, число отброшенных повторов
+и память фильтра по мере роста принятого объема.
+
+Запуск: python -m benchmarks.deduplication [пакетов] [показаний в пакете]
+"""
+
+import random
+import sys
+import time
+
+from domain.models import ДанныеСенсора
+from services.deduplication import ReadingDeduplicator
+
+RESEND_SHARE = 0.05  # доля пакета - повторы недавно отправленных показаний
+STATIONS = 2000
+
+
+def _batch(number: int, size: int, recent: list) -> list:
+    start = 1_700_000_000_000 + number * 1000
+    записи = [ДанныеСенсора(f"b{number}_{i}", start + i // STATIONS, 1.0, "temperature", f"st{i % STATIONS}")
+              for i in range(size)]
+    if recent:
+        повторы = random.sample(recent, int(size * RESEND_SHARE))
+        записи.extend(ДанныеСенсора(f"resend_{number}_{i}", r.времяИзмерения, r.значение, r.типИзмерения, r.идСтанции)
+                      for i, r in enumerate(повторы))
+    return записи
+
+
+def _footprint(dedup: ReadingDeduplicator) -> int:
+    """Размер множеств поколений и хранимых в них хешей"""
+    return sum(sys.getsizeof(generation) + sum(map(sys.getsizeof, generation))
+               for generation in (dedup._current, dedup._previous))
+
+
+def main(batches: int, size: int) -> None:
+    random.seed(1)
+    dedup = ReadingDeduplicator(capacity=500_000)
+    recent: list = []
+    elapsed = 0.0
+    total = 0
+    for number in range(batches):
+        записи = _batch(number, size, recent)
+        started = time.perf_counter()
+        dedup.filter_readings(записи)
+        elapsed += time.perf_counter() - started
+        total += len(записи)
+        recent = записи[:size]
+
+        if (number + 1) % (batches // 5) == 0:
+            memory = _footprint(dedup)
+            stats = dedup.stats()
+            print(f"показаний {total:>9}: повторов отброшено {stats['duplicates']:>7}, "
+                  f"ключей {stats['tracked_keys']:>7}, память ~{memory / 1e6:5.1f} МБ, "
+                  f"{elapsed / total * 1e9:4.0f} нс/показание")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
@@ -0,0 +1,101 @@
+"""
+Отзывчивость цикла событий при всплеске приема данных
+Источники одновременно отдают большие пакеты; параллельно задача-зонд
+каждые 10 мс измеряет, насколько цикл событий опаздывает (как запрос API).
+Сравнивается обработка внутри опроса с конвейером приема.
+
+Запуск: python -m benchmarks.ingestion_pipeline [источников] [записей на источник]
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import time
+
+from controllers.data_ingestion_controller import DataIngestionController, PollingPolicy
+from domain.models import ДанныеСенсора
+from domain.repositories import SensorDataRepository
+from domain.rollups import RollupStore
+from services.ingestion_pipeline import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, PipelinePolicy
+
+PROBE_INTERVAL = 0.01
+
+
+class _BurstIngestion(DataIngestionController):
+    """
+    Источник (шлюз сети датчиков) отдает заранее подготовленные текущие измерения
+    после короткой задержки: в цикле событий остается только работа приема
+    """
+
+    prepared: dict = {}
+
+    async def _запроситьДанныеСИсточника(self, источник: str):
+        await asyncio.sleep(random.uniform(0.01, 0.05))
+        return self.prepared[источник]
+
+
+def _prepare(sources: int, per_source: int) -> dict:
+    сейчас = int(time.time() * 1000)
+    return {
+        f"station_{s}": [
+            ДанныеСенсора(f"station_{s}_{i}", сейчас + s, round(random.uniform(-20, 30), 1), "temperature", f"station_{s}")
+            for i in range(per_source)
+        ]
+        for s in range(sources)
+    }
+
+
+async def _probe(stalls: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        stalls.append(loop.time() - expected)
+
+
+async def _run(title: str, sources: int, per_source: int, pipeline: PipelinePolicy = None) -> None:
+    repository = SensorDataRepository()
+    controller = _BurstIngestion(repository, RollupStore(), PollingPolicy(max_concurrency=64), pipeline)
+    controller.prepared = _prepare(sources, per_source)
+    controller.активные_источники = list(controller.prepared)
+
+    stalls: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stalls, stop))
+
+    started = time.perf_counter()
+    await controller.опроситьИсточники()
+    polled = time.perf_counter() - started
+    if controller.конвейер is not None:
+        await controller.конвейер.stop()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    stalls.sort()
+    p99 = stalls[int(len(stalls) * 0.99)] if stalls else 0.0
+    stored = len(repository.получитьЗаПериод(0, 2 ** 62))
+    print(f"{title:<34} опрос {polled:5.2f} с, всего {elapsed:5.2f} с, записано {stored:>7}, "
+          f"опоздание цикла p99 {p99 * 1000:6.1f} мс, макс {stalls[-1] * 1000 if stalls else 0:6.1f} мс")
+    if controller.конвейер is not None:
+        stats = controller.конвейер.stats()
+        print(f"{'':<34} очередь макс {stats['max_queue_chunks']} опросов / {stats['max_queue_records']} записей, "
+              f"ожиданий {stats['blocked_waits']}, сброшено {stats['dropped_records']}, "
+              f"пакетов {stats['batches_written']}")
+
+
+def main(sources: int, per_source: int) -> None:
+    random.seed(1)
+    logging.disable(logging.WARNING)
+    print(f"Источников: {sources}, записей на источник: {per_source}")
+    asyncio.run(_run("обработка внутри опроса", sources, per_source))
+    asyncio.run(_run("конвейер, block", sources, per_source,
+                     PipelinePolicy(queue_chunks=32, batch_records=5000, overflow=OVERFLOW_BLOCK)))
+    asyncio.run(_run("конвейер, drop_oldest, очередь 8", sources, per_source,
+                     PipelinePolicy(queue_chunks=8, batch_records=5000, overflow=OVERFLOW_DROP_OLDEST)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,110 @@
+"""
+Прием данных не по порядку: опоздавшие показания и водяные знаки
+Поток пакетов 1 Гц от множества станций, часть показаний каждого пакета
+досылается с опозданием от секунд до часов (обрыв связи, ручная загрузка).
+Печатает стоимость записи пакета в колоночное хранилище сенсоров (с чтением
+последней минуты после каждого пакета) и в ряды станций WeatherDataRepository
+без опозданий и с ними, а также распределение задержек прихода по WatermarkTracker.
+
+Запуск: python -m benchmarks.late_data [пакетов] [станций]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime
+
+from domain.columnar_repository import ColumnarSensorDataRepository
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import WeatherDataRepository
+from domain.watermarks import WatermarkTracker
+
+# Опоздание досылаемых показаний, с: (доля среди опоздавших, наибольшее опоздание)
+DELAYS = ((0.6, 30), (0.3, 600), (0.1, 6 * 3600))
+HISTORY_SECONDS = 6 * 3600
+
+
+def _delay() -> int:
+    порог = random.random()
+    for share, longest in DELAYS:
+        if порог < share:
+            return random.randint(1, longest)
+        порог -= share
+    return DELAYS[-1][1]
+
+
+def _stream(batches: int, stations: int, late_share: float) -> list:
+    """Пакеты [(момент приема, показания)]; опоздавшие показания измерены раньше момента приема"""
+    start = 1_700_000_000_000 + HISTORY_SECONDS * 1000
+    stream = []
+    for number in range(batches):
+        now = start + number * 1000
+        записи = []
+        for s in range(stations):
+            measured = now - _delay() * 1000 if random.random() < late_share else now
+            записи.append(ДанныеСенсора(f"{s}_{number}", measured, 10.0, "temperature", f"st{s}"))
+        stream.append((now, записи))
+    return stream
+
+
+def _history(stations: int) -> list:
+    """Уже принятая история станций за HISTORY_SECONDS с шагом минута"""
+    start = 1_700_000_000_000
+    return [ДанныеСенсора(f"h{s}_{t}", start + t * 1000, 10.0, "temperature", f"st{s}")
+            for t in range(0, HISTORY_SECONDS, 60) for s in range(stations)]
+
+
+def _weather(записи: list) -> list:
+    return [WeatherData(id=запись.идДанных, station_id=запись.идСтанции,
+                        timestamp=datetime.fromtimestamp(запись.времяИзмерения / 1000),
+                        temperature=запись.значение, humidity=0.0, pressure=0.0, wind_speed=0.0,
+                        wind_direction="", precipitation=0.0)
+            for запись in записи]
+
+
+def _run(stream: list, stations: int) -> tuple:
+    sensors = ColumnarSensorDataRepository()
+    weather = WeatherDataRepository()
+    watermarks = WatermarkTracker(allowed_lateness=5)
+    история = _history(stations)
+    sensors.сохранитьПакет(история)
+    asyncio.run(weather.save_many(_weather(история)))
+
+    sensor_seconds = weather_seconds = 0.0
+    for now, записи in stream:
+        watermarks.observe_readings(записи, arrival=now)
+
+        started = time.perf_counter()
+        sensors.сохранитьПакет(записи)
+        # Панель мониторинга читает последнюю минуту после каждого пакета
+        sensors.получитьМассивыЗаПериод(now - 60_000, now)
+        sensor_seconds += time.perf_counter() - started
+
+        наблюдения = _weather(записи)
+        started = time.perf_counter()
+        asyncio.run(weather.save_many(наблюдения))
+        weather_seconds += time.perf_counter() - started
+
+    for станция, тип in sensors._columns:
+        times, _ = sensors.получитьМассивыПоСтанции(станция, тип, -2 ** 63, 2 ** 63 - 1)
+        assert all(a <= b for a, b in zip(times, times[1:])), (станция, тип)
+    return sensor_seconds, weather_seconds, watermarks
+
+
+def main(batches: int, stations: int) -> None:
+    random.seed(1)
+    print(f"Пакетов {batches} по {stations} показаний, история {HISTORY_SECONDS // 3600} ч на станцию")
+    for late_share in (0.0, 0.05, 0.2):
+        sensor_seconds, weather_seconds, watermarks = _run(_stream(batches, stations, late_share), stations)
+        print(f"  опоздавших {late_share:4.0%}: колонки (запись и чтение) "
+              f"{sensor_seconds / batches * 1000:6.2f} мс/пакет, ряды станций {weather_seconds / batches * 1000:6.2f} мс/пакет")
+        if late_share:
+            stats = watermarks.stats()
+            print(f"    ниже водяного знака {stats['late']} из {stats['readings']}, "
+                  f"задержка прихода: {stats['arrival_delay']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 500)
@@ -0,0 +1,77 @@
+"""
+Замер памяти на запись для моделей предметной области
+Сравнивает модели со __slots__ с эквивалентными классами со словарем атрибутов.
+
+Запуск: python -m benchmarks.models_memory [количество записей]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import datetime, timedelta
+
+from domain.models import ДанныеСенсора, WeatherData, Forecast, Alert, AlertLevel
+
+
+def _without_slots(cls):
+    """Тот же набор полей без __slots__ (как были модели до оптимизации)"""
+    return make_dataclass(f"{cls.__name__}Dict", [(f.name, f.type, f) for f in fields(cls)])
+
+
+def _sensor(cls, i: int, base: datetime):
+    return cls(f"sensor-{i}", 1_700_000_000_000 + i * 1000, 20.0 + i % 10, "temperature")
+
+
+def _weather(cls, i: int, base: datetime):
+    return cls(f"weather-{i}", "26850", base + timedelta(seconds=i), 20.0 + i % 10,
+               70.0, 1013.0, 3.5, "С", 0.0, "")
+
+
+def _forecast(cls, i: int, base: datetime):
+    return cls(f"forecast-{i}", "WRF-ARW", base, base, base + timedelta(hours=72), "Минск", [])
+
+
+def _alert(cls, i: int, base: datetime):
+    return cls(f"alert-{i}", AlertLevel.WARNING, "Ветер", "Минск", base,
+               base + timedelta(hours=6), "Усиление ветра", True)
+
+
+CASES = [
+    (ДанныеСенсора, _sensor),
+    (WeatherData, _weather),
+    (Forecast, _forecast),
+    (Alert, _alert),
+]
+
+
+def measure(cls, build, count: int) -> float:
+    """Байт на запись: прирост памяти при создании count объектов"""
+    base = datetime(2024, 1, 1)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(cls, i, base) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Список ссылок одинаков для обоих вариантов - вычитаем его
+    per_record = (after - before - sys.getsizeof(records)) / count
+    del records
+    return per_record
+
+
+def main(count: int) -> None:
+    print(f"Записей: {count}")
+    print(f"{'модель':<16}{'dict, байт':>12}{'slots, байт':>13}{'экономия':>10}")
+    for cls, build in CASES:
+        started = time.perf_counter()
+        plain = measure(_without_slots(cls), build, count)
+        slotted = measure(cls, build, count)
+        print(f"{cls.__name__:<16}{plain:>12.1f}{slotted:>13.1f}{1 - slotted / plain:>10.0%}"
+              f"   ({time.perf_counter() - started:.1f} с)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,81 @@
+"""
+Пропускная способность потокового приема NDJSON
+Локальный генератор нагрузки отдает тело запроса фрагментами по 64 КБ
+(как request.stream() в POST /api/ingest); измеряется число принятых
+показаний в секунду с записью в репозитории.
+
+Запуск: python -m benchmarks.ndjson_ingest [показаний] [наблюдений WeatherData]
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+
+from controllers.data_controller import DataController
+from domain.repositories import ForecastRepository, SensorDataRepository, WeatherDataRepository
+from domain.rollups import RollupStore
+from web.ndjson_ingest import NDJSONIngestor
+
+CHUNK_BYTES = 64 * 1024
+
+_TYPES = {
+    "temperature": (-30, 35),
+    "humidity": (20, 100),
+    "pressure": (720, 780),
+    "wind_speed": (0, 30),
+    "precipitation": (0, 20)
+}
+
+
+def _body(readings: int, observations: int) -> bytes:
+    """Тело NDJSON: ~1% строк невалидны (испорченный JSON или значение вне диапазона)"""
+    start = int(time.time() * 1000) - 3_600_000
+    types = list(_TYPES)
+    lines = []
+    for i in range(readings):
+        тип = types[i % len(types)]
+        low, high = _TYPES[тип]
+        значение = round(random.uniform(low, high), 1)
+        if random.random() < 0.005:
+            значение = -999.0
+        lines.append(json.dumps({"station_id": f"st{i % 50}", "type": тип, "value": значение,
+                                 "timestamp": start + i}))
+        if random.random() < 0.005:
+            lines.append('{"station_id": "broken"')
+    for i in range(observations):
+        lines.append(json.dumps({"station_id": f"st{i % 50}", "timestamp": start + i,
+                                 "temperature": round(random.uniform(-10, 25), 1), "humidity": 70.0,
+                                 "pressure": 750.0, "wind_speed": 3.5, "wind_direction": "С"}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def _stream(body: bytes):
+    for offset in range(0, len(body), CHUNK_BYTES):
+        yield body[offset:offset + CHUNK_BYTES]
+        await asyncio.sleep(0)
+
+
+async def _run(body: bytes, records: int) -> None:
+    controller = DataController(WeatherDataRepository(), SensorDataRepository(),
+                                ForecastRepository(), rollups=RollupStore())
+    started = time.perf_counter()
+    result = await NDJSONIngestor(controller).ingest(_stream(body))
+    elapsed = time.perf_counter() - started
+    print(f"Тело {len(body) / 1e6:.1f} МБ, строк {records}: {elapsed:.2f} с, "
+          f"{records / elapsed:.0f} строк/с")
+    print(f"  принято {result['accepted']}, отклонено {result['rejected']} {result['rejected_by_reason']}")
+
+
+def main(readings: int, observations: int) -> None:
+    random.seed(1)
+    logging.disable(logging.WARNING)
+    body = _body(readings, observations)
+    asyncio.run(_run(body, body.count(b"\n")))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20_000)
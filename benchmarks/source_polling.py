@@ -0,0 +1,59 @@
+"""
+Время опроса источников DataIngestionController
+Источники отвечают со случайной задержкой, часть из них зависает и
+обрывается по сроку ответа. Сравнивается последовательный опрос с параллельным.
+
+Запуск: python -m benchmarks.source_polling [количество источников]
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import time
+
+from controllers.data_ingestion_controller import DataIngestionController, PollingPolicy
+from domain.models import ДанныеСенсора
+from domain.repositories import SensorDataRepository
+
+HANGING_SHARE = 0.02
+
+
+class _SimulatedIngestion(DataIngestionController):
+    """Источники с задержкой 50-200 мс; доля HANGING_SHARE не отвечает"""
+
+    async def _запроситьДанныеСИсточника(self, источник: str):
+        номер = int(источник.split("_")[1])
+        if номер % int(1 / HANGING_SHARE) == 0:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(random.uniform(0.05, 0.2))
+        сейчас = int(time.time() * 1000)
+        return [ДанныеСенсора(f"{источник}_{сейчас}", сейчас, 15.0, "temperature", источник)]
+
+
+async def _run(count: int, concurrency: int, timeout: float) -> None:
+    controller = _SimulatedIngestion(SensorDataRepository(),
+                                     polling=PollingPolicy(max_concurrency=concurrency, source_timeout=timeout))
+    controller.активные_источники = [f"station_{i}" for i in range(1, count + 1)]
+
+    started = time.perf_counter()
+    данные = await controller.опроситьИсточники()
+    elapsed = time.perf_counter() - started
+
+    статус = await controller.получитьСтатусИсточников()
+    таймаутов = sum(s["таймаутов"] for s in статус["статусы"].values())
+    p95 = max(s["задержка_мс"]["p95"] for s in статус["статусы"].values())
+    print(f"одновременно {concurrency:>4}: {elapsed:>7.2f} с, записей {len(данные)}, "
+          f"таймаутов {таймаутов}, p95 источника {p95:.0f} мс")
+
+
+def main(count: int) -> None:
+    random.seed(1)
+    logging.disable(logging.WARNING)
+    print(f"Источников: {count}, срок ответа 1 с")
+    for concurrency in (1, 16, 64, count):
+        asyncio.run(_run(count, concurrency, 1.0))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
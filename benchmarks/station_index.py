@@ -0,0 +1,53 @@
+"""
+Время пространственных запросов к сети станций
+Сравнивает индекс StationNetwork с полным перебором станций.
+
+Запуск: python -m benchmarks.station_index [количество станций]
+"""
+
+import random
+import sys
+import time
+
+from domain.models import GeoPoint, Метеостанция
+from domain.stations import StationNetwork, distance_km
+
+QUERIES = 500
+
+
+def _network(count: int) -> StationNetwork:
+    network = StationNetwork("bench", "Тестовая сеть")
+    for i in range(count):
+        point = GeoPoint(random.uniform(51.3, 56.2), random.uniform(23.2, 32.8))
+        network.add_station(Метеостанция(f"station-{i}", point, "активна"))
+    return network
+
+
+def _timed(name: str, query, points) -> None:
+    started = time.perf_counter()
+    for point in points:
+        query(point)
+    elapsed = (time.perf_counter() - started) / len(points) * 1e6
+    print(f"{name:<28}{elapsed:>10.0f} мкс")
+
+
+def main(count: int) -> None:
+    random.seed(1)
+    network = _network(count)
+    points = [GeoPoint(random.uniform(51.3, 56.2), random.uniform(23.2, 32.8)) for _ in range(QUERIES)]
+    network.find_nearest(points[0])  # построение KD-дерева
+
+    print(f"Станций: {count}, запросов: {QUERIES}")
+    _timed("5 ближайших", lambda p: network.find_nearest(p, 5), points)
+    _timed("радиус 20 км", lambda p: network.find_within_radius(p, 20), points)
+    _timed("прямоугольник 0.3x0.5°",
+           lambda p: network.find_in_bbox(p.latitude, p.longitude, p.latitude + 0.3, p.longitude + 0.5),
+           points)
+    _timed("станция по идентификатору", lambda p: network.get_station_by_id(f"station-{count - 1}"), points)
+    _timed("5 ближайших перебором",
+           lambda p: sorted(network.stations, key=lambda s: distance_km(p, s.координаты))[:5],
+           points[:20])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,79 @@
+"""
+Воспроизведение трафика приема с ускорением (TrafficRecorder / TrafficReplayer)
+Записывает синтетический трафик: каждую секунду пакет наблюдений всех станций
+через DataController и поток показаний сенсоров через DataIngestionController.
+Затем запись воспроизводится в свежие хранилища в 10x и 100x и печатается
+достигнутое ускорение, пропускная способность и процентили задержек.
+
+Запуск: python -m benchmarks.traffic_replay [секунд записи] [станций]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from controllers.data_controller import DataController
+from controllers.data_ingestion_controller import DataIngestionController
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from domain.rollups import RollupStore
+from infrastructure.replay import ReplayPolicy, TrafficReplayer
+from services.ingestion_pipeline import PipelinePolicy
+from services.traffic_recorder import TrafficRecorder
+
+
+def _controllers(recorder: TrafficRecorder = None):
+    data_controller = DataController(WeatherDataRepository(), SensorDataRepository(),
+                                     rollups=RollupStore(), recorder=recorder)
+    ingestion = DataIngestionController(SensorDataRepository(), RollupStore(),
+                                        pipeline=PipelinePolicy(), recorder=recorder)
+    return data_controller, ingestion
+
+
+def _record(path: str, seconds: int, stations: int) -> None:
+    """Запись трафика с модельными часами: пакеты приходят раз в секунду"""
+    clock = [0.0]
+    recorder = TrafficRecorder(path, clock=lambda: clock[0])
+    data_controller, ingestion = _controllers(recorder)
+    start = datetime.now() - timedelta(seconds=seconds)
+
+    async def traffic() -> None:
+        for second in range(seconds):
+            clock[0] = float(second)
+            moment = start + timedelta(seconds=second)
+            await data_controller.ingest_many([
+                WeatherData(f"{26000 + s}_{second}", str(26000 + s), moment, 10.0 + s % 7,
+                            70.0, 1013.0, 3.5, "С", 0.0)
+                for s in range(stations)
+            ])
+            clock[0] = second + 0.5
+            ms = int(moment.timestamp() * 1000) + 500
+            await ingestion.принятьДанные([ДанныеСенсора(f"feed_{s}_{second}", ms, 5.0, "wind_speed", str(26000 + s))
+                                           for s in range(stations)])
+        await ingestion.конвейер.stop()
+
+    asyncio.run(traffic())
+    recorder.close()
+
+
+def main(seconds: int, stations: int) -> None:
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traffic.ndjson")
+        _record(path, seconds, stations)
+        print(f"Запись: {seconds} с, {stations} станций, {os.path.getsize(path) / 1e6:.1f} МБ")
+
+        for speed in (10, 100):
+            data_controller, ingestion = _controllers()
+            result = asyncio.run(TrafficReplayer(data_controller, ingestion, ReplayPolicy(speed=speed)).run(path))
+            print(f"  {speed:>3}x: ускорение {result['achieved_speed']:6.2f}x, {result['records_per_second']:>7} записей/с, "
+                  f"очередь p50/p99 {result['queue_ms']['p50']:6.1f}/{result['queue_ms']['p99']:6.1f} мс, "
+                  f"полная задержка p50/p99 {result['latency_ms']['p50']:6.1f}/{result['latency_ms']['p99']:6.1f} мс")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200)
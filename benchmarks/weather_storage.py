@@ -0,0 +1,101 @@
+"""
+Хранение наблюдений: копии показаний сенсоров против представления над наблюдениями
+Прежний прием записывал каждое наблюдение WeatherData еще и четырьмя записями
+ДанныеСенсора в репозиторий сенсоров. Теперь показания выводятся из наблюдений
+при чтении (SensorReadingsView). Печатает память хранилищ, стоимость приема пакета
+и чтения суточного ряда станции для обоих вариантов.
+
+Запуск: python -m benchmarks.weather_storage [наблюдений] [станций]
+"""
+
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+from controllers.data_controller import DataController
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from domain.rollups import RollupStore
+
+BATCH = 500
+
+
+class _CopyingDataController(DataController):
+    """Прием как до представления: наблюдение копируется в репозиторий сенсоров"""
+
+    def __init__(self, data_repository, sensor_repository, **kwargs):
+        super().__init__(data_repository, sensor_repository, **kwargs)
+        # Показания читаются только из копий
+        self.readings = sensor_repository
+
+    async def ingest_many(self, weather_data_list: List[WeatherData]) -> int:
+        await self.data_repository.save_many(weather_data_list)
+        sensor_data_list: List[ДанныеСенсора] = []
+        for weather_data in weather_data_list:
+            sensor_data_list.extend(weather_data.to_данные_сенсора())
+        self.sensor_repository.сохранитьПакет(sensor_data_list)
+        self.rollups.add_many(sensor_data_list)
+        return len(weather_data_list)
+
+
+def _observations(count: int, stations: int) -> List[WeatherData]:
+    """Наблюдения станций за последние сутки с равным шагом"""
+    start = datetime.now() - timedelta(hours=23)
+    step = timedelta(hours=23) / (count // stations)
+    return [WeatherData(f"{26000 + i % stations}_{i}", str(26000 + i % stations), start + step * (i // stations),
+                        20.0 + i % 10, 70.0, 1013.0, 3.5, "С", 0.0)
+            for i in range(count)]
+
+
+def _ingest(cls, наблюдения: List[WeatherData]) -> tuple:
+    controller = cls(WeatherDataRepository(), SensorDataRepository(), rollups=RollupStore())
+
+    async def ingest() -> float:
+        started = time.perf_counter()
+        for i in range(0, len(наблюдения), BATCH):
+            await controller.ingest_many(наблюдения[i:i + BATCH])
+        return time.perf_counter() - started
+
+    return controller, asyncio.run(ingest())
+
+
+def _stored_bytes(cls, наблюдения: List[WeatherData]) -> int:
+    """Прирост памяти при приеме: сами наблюдения созданы заранее и не учитываются"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    controller, _ = _ingest(cls, наблюдения)
+    stored = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del controller
+    return stored
+
+
+def _run(cls, наблюдения: List[WeatherData]) -> tuple:
+    stored = _stored_bytes(cls, наблюдения)
+    gc.collect()
+    controller, seconds = _ingest(cls, наблюдения)
+
+    started = time.perf_counter()
+    rows = len(asyncio.run(controller.get_sensor_data(наблюдения[0].station_id)))
+    return stored, seconds, time.perf_counter() - started, rows
+
+
+def main(count: int, stations: int) -> None:
+    наблюдения = _observations(count, stations)
+    batches = len(наблюдения) / BATCH
+    print(f"Наблюдений {count}, станций {stations}, пакеты по {BATCH}")
+    for name, cls in (("копии показаний", _CopyingDataController), ("представление", DataController)):
+        stored, seconds, read_seconds, rows = _run(cls, наблюдения)
+        print(f"  {name:<16} память {stored / 1024 / 1024:7.1f} МБ ({stored / count:5.0f} байт на наблюдение), "
+              f"прием {seconds / batches * 1000:6.2f} мс/пакет, "
+              f"сутки станции {read_seconds * 1000:6.1f} мс ({rows} показаний)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -11,16 +11,23 @@ import uuid
 
 from domain.models import Alert, AlertLevel
 from domain.repositories import AlertRepository
+from domain.watermarks import WatermarkTracker
 from services.alert_service import AlertService
 
+# Окно трендовых оповещений, ч
+TREND_WINDOW_HOURS = 24
+
 
 class AlertsAlertController:
     """Контроллер управления оповещениями"""
 
     def __init__(self, alert_service: AlertService,
-                 alert_repository: AlertRepository):
+                 alert_repository: AlertRepository,
+                 watermarks: WatermarkTracker = None):
         self.alert_service = alert_service
         self.alert_repository = alert_repository
+        # Водяные знаки приема: по ним находятся окна, затронутые опоздавшими данными
+        self.watermarks = watermarks
         self.logger = logging.getLogger(__name__)
 
     async def проверитьИСгенерироватьОповещения(self, station_id: str) -> List[Alert]:
@@ -34,6 +41,25 @@ class AlertsAlertController:
 
         return alerts
 
+    async def пересчитатьЗатронутыеОкна(self) -> List[Alert]:
+        """
+        Пересчет трендовых оповещений только тех станций, в окно тренда которых
+        с прошлого пересчета попали опоздавшие наблюдения
+        """
+        if self.watermarks is None:
+            return []
+
+        граница = int((datetime.now() - timedelta(hours=TREND_WINDOW_HOURS)).timestamp() * 1000)
+        alerts = []
+        for station_id, начало in self.watermarks.take_affected().items():
+            if начало < граница:
+                # Опоздали данные старше окна тренда - оповещение от них не зависит
+                continue
+            self.logger.info(f"Пересчет трендовых оповещений станции {station_id} после опоздавших данных")
+            alerts.extend(await self.alert_service.check_trend_alerts(station_id, TREND_WINDOW_HOURS))
+
+        return alerts
+
     async def получитьАктивныеОповещения(self) -> List[Dict[str, Any]]:
         """Получение активных оповещений"""
         alerts = await self.alert_repository.get_active_alerts()
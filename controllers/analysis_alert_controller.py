@@ -17,6 +17,7 @@ import uuid
 
 from domain.models import Alert, Прогноз, Оповещение, AlertLevel
 from domain.repositories import IAlertRepo, IForecastRepo
+from domain.stations import StationNetwork
 
 
 class AnalysisAlertController:
@@ -25,7 +26,8 @@ class AnalysisAlertController:
     C AnalysisAlertController
     """
 
-    def __init__(self, alert_repo: IAlertRepo, forecast_repo: IForecastRepo):
+    def __init__(self, alert_repo: IAlertRepo, forecast_repo: IForecastRepo,
+                 stations: StationNetwork = None):
         """
         Конструктор получает репозитории через DI
         -alertRepo: iAlertRepo
@@ -33,6 +35,7 @@ class AnalysisAlertController:
         """
         self.alert_repo = alert_repo
         self.forecast_repo = forecast_repo
+        self.stations = stations
         self.logger = logging.getLogger(__name__)
 
         # Пороги для критических явлений
@@ -129,6 +132,12 @@ class AnalysisAlertController:
 
         каналы = ["веб-интерфейс", "email", "sms"]
 
+        # Адресаты в регионе предупреждения - по пространственному индексу станций
+        станции = self.stations.stations_in_region(alert.region) if self.stations else None
+        if станции is not None:
+            self.logger.info(f"Станций в регионе {alert.region}: {len(станции)} "
+                             f"({', '.join(s.идСтанции for s in станции[:10])})")
+
         for канал in каналы:
             self.logger.info(f"Отправка через {канал}: {alert.description[:50]}...")
 
@@ -5,21 +5,52 @@ C DataEngineControler (вероятно DataController)
 +getSensorData(sensorId: String): List<SensorData>! void
 """
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from domain.models import WeatherData, ДанныеСенсора
-from domain.repositories import WeatherDataRepository, SensorDataRepository
+from domain.models import SensorColumns, WeatherData, ДанныеСенсора, columns_size, readings_from_columns
+from domain.repositories import (
+    WeatherDataRepository,
+    SensorDataRepository,
+    ForecastRepository,
+    AlertRepository
+)
+from domain.retention import RetentionPolicy
+from domain.rollups import RollupStore
+from domain.sensor_view import SensorReadingsView
+from domain.validation import BatchValidation, ColumnValidation, validate_batch, validate_columns
+from domain.watermarks import WatermarkTracker
+from services.deduplication import ReadingDeduplicator
+from services.traffic_recorder import TrafficRecorder
 
 
 class DataController:
     """Контроллер управления данными"""
 
     def __init__(self, data_repository: WeatherDataRepository,
-                 sensor_repository: SensorDataRepository):
+                 sensor_repository: SensorDataRepository,
+                 forecast_repository: ForecastRepository = None,
+                 alert_repository: AlertRepository = None,
+                 retention: RetentionPolicy = None,
+                 rollups: RollupStore = None,
+                 dedup: ReadingDeduplicator = None,
+                 watermarks: WatermarkTracker = None,
+                 readings: SensorReadingsView = None,
+                 recorder: TrafficRecorder = None):
         self.data_repository = data_repository
         self.sensor_repository = sensor_repository
+        # Чтение показаний: собственные записи сенсоров и показания, выведенные из наблюдений
+        self.readings = readings or SensorReadingsView(sensor_repository, data_repository)
+        self.forecast_repository = forecast_repository
+        self.alert_repository = alert_repository
+        self.retention = retention or RetentionPolicy()
+        self.rollups = rollups
+        self.dedup = dedup
+        self.watermarks = watermarks
+        # Запись входящих пакетов для воспроизведения (ingestion.recording)
+        self.recorder = recorder
         self.logger = logging.getLogger(__name__)
         self.active_stations: Dict[str, bool] = {
             "26850": True,
@@ -29,15 +60,104 @@ class DataController:
 
     async def ingest_data(self, weather_data: WeatherData) -> None:
         """Прием и сохранение данных"""
-        await self.data_repository.save(weather_data)
+        if self.recorder is not None:
+            self.recorder.record_weather([weather_data])
+        if self.dedup is not None and not self.dedup.filter_weather([weather_data]):
+            self.logger.info(f"Повтор наблюдения отброшен: {weather_data.station_id} {weather_data.timestamp}")
+            return
+        if self.watermarks is not None and self.watermarks.observe_weather([weather_data]):
+            self.logger.info(f"Опоздавшее наблюдение: {weather_data.station_id} {weather_data.timestamp}")
 
-        # Также сохраняем как SensorData
-        sensor_data_list = weather_data.to_данные_сенсора()
-        for sensor_data in sensor_data_list:
-            self.sensor_repository.сохранить(sensor_data)
+        # Показания сенсоров выводятся из наблюдения при чтении (SensorReadingsView)
+        try:
+            await self.data_repository.save(weather_data)
+        except Exception:
+            if self.dedup is not None:
+                self.dedup.forget_weather([weather_data])
+            raise
+
+        if self.rollups is not None:
+            self.rollups.add_weather([weather_data])
 
         self.logger.info(f"Данные сохранены: {weather_data.station_id}")
 
+    async def ingest_many(self, weather_data_list: List[WeatherData]) -> int:
+        """
+        Прием пакета наблюдений: одна пакетная запись в каждый репозиторий.
+        Возвращает число сохраненных наблюдений (без отброшенных повторов)
+        """
+        if self.recorder is not None:
+            self.recorder.record_weather(weather_data_list)
+        if self.dedup is not None:
+            weather_data_list = self.dedup.filter_weather(weather_data_list)
+        if self.watermarks is not None:
+            self._log_late(self.watermarks.observe_weather(weather_data_list))
+        try:
+            await self.data_repository.save_many(weather_data_list)
+        except Exception:
+            if self.dedup is not None:
+                self.dedup.forget_weather(weather_data_list)
+            raise
+
+        if self.rollups is not None:
+            self.rollups.add_weather(weather_data_list)
+
+        self.logger.info(f"Сохранено наблюдений: {len(weather_data_list)}")
+        return len(weather_data_list)
+
+    async def ingest_readings(self, sensor_data_list: List[ДанныеСенсора]) -> BatchValidation:
+        """Прием пакета показаний сенсоров: проверка диапазонов и одна пакетная запись"""
+        if self.recorder is not None:
+            self.recorder.record_readings(sensor_data_list)
+        result = validate_batch(sensor_data_list)
+        if self.dedup is not None:
+            accepted = len(result.accepted)
+            result.accepted = self.dedup.filter_readings(result.accepted)
+            result.duplicates = accepted - len(result.accepted)
+        if self.watermarks is not None:
+            self._log_late(self.watermarks.observe_readings(result.accepted))
+        try:
+            self.sensor_repository.сохранитьПакет(result.accepted)
+        except Exception:
+            if self.dedup is not None:
+                self.dedup.forget_readings(result.accepted)
+            raise
+
+        if self.rollups is not None:
+            self.rollups.add_many(result.accepted)
+
+        self.logger.info(f"Сохранено показаний: {len(result.accepted)} из {len(sensor_data_list)}")
+        return result
+
+    async def ingest_columns(self, блоки: List[SensorColumns]) -> ColumnValidation:
+        """Прием показаний в колонках (двоичные кадры): проверка по рядам и запись массивами"""
+        if self.recorder is not None:
+            for колонки in блоки:
+                self.recorder.record_readings(readings_from_columns(колонки))
+        result = validate_columns(блоки)
+        if self.dedup is not None:
+            accepted = result.accepted_count
+            result.accepted = self.dedup.filter_columns(result.accepted)
+            result.duplicates = accepted - result.accepted_count
+        if self.watermarks is not None:
+            self._log_late(self.watermarks.observe_columns(result.accepted))
+        try:
+            self.sensor_repository.сохранитьКолонки(result.accepted)
+        except Exception:
+            if self.dedup is not None:
+                self.dedup.forget_columns(result.accepted)
+            raise
+
+        if self.rollups is not None:
+            self.rollups.add_columns(result.accepted)
+
+        self.logger.info(f"Сохранено показаний: {result.accepted_count} из {sum(map(columns_size, блоки))}")
+        return result
+
+    def _log_late(self, late: int) -> None:
+        if late:
+            self.logger.info(f"Опоздавших записей в пакете: {late}")
+
     async def stop_sensor(self, sensor_id: str) -> None:
         """+stopSensor(sensorId: String): void"""
         if sensor_id in self.active_stations:
@@ -48,17 +168,55 @@ class DataController:
 
     async def get_sensor_data(self, sensor_id: str, hours: int = 24) -> List[ДанныеСенсора]:
         """+getSensorData(sensorId: String): List<SensorData>! void"""
-        # Получение данных как WeatherData
-        weather_data_list = await self.data_repository.get_station_history(sensor_id, hours)
-
-        # Преобразование в SensorData
-        sensor_data_list = []
-        for weather_data in weather_data_list:
-            sensor_data_list.extend(weather_data.to_данные_сенсора())
+        # Выборка рядов станции: собственные показания по индексу (станция, тип), остальные - из ее наблюдений
+        конец = int(datetime.now().timestamp() * 1000)
+        начало = конец - hours * 3600 * 1000
+        sensor_data_list = self.readings.snapshot().получитьПоСтанции(sensor_id, None, начало, конец)
 
         self.logger.info(f"Получено {len(sensor_data_list)} записей для сенсора {sensor_id}")
         return sensor_data_list
 
+    async def get_archive(self, station_id: str, hours: int = 24,
+                          raw_hours: int = 48) -> List[WeatherData]:
+        """
+        Архив наблюдений станции.
+        Периоды длиннее raw_hours строятся по агрегатам самого грубого подходящего уровня:
+        одна строка на интервал со средними значениями.
+        """
+        now = datetime.now()
+        начало = int((now - timedelta(hours=hours)).timestamp() * 1000)
+        конец = int(now.timestamp() * 1000) + 1
+        tier = self.rollups.tier_for_period(hours * 3600 * 1000) if self.rollups is not None else None
+        if hours <= raw_hours or tier is None or not self._rollups_complete(station_id, начало, конец):
+            return await self.data_repository.snapshot().get_station_history(station_id, hours)
+
+        начало -= начало % tier.bucket_ms
+        средние: Dict[int, Dict[str, float]] = {}
+        for тип in ("temperature", "humidity", "pressure", "wind_speed", "precipitation"):
+            for start, summary in tier.buckets(station_id, тип, начало, конец):
+                средние.setdefault(start, {})[тип] = summary.среднее
+
+        return [
+            WeatherData(
+                id=f"{station_id}_{tier.name}_{start}",
+                station_id=station_id,
+                timestamp=datetime.fromtimestamp(start / 1000),
+                temperature=значения.get("temperature", 0.0),
+                humidity=значения.get("humidity", 0.0),
+                pressure=значения.get("pressure", 0.0),
+                wind_speed=значения.get("wind_speed", 0.0),
+                wind_direction="",
+                precipitation=значения.get("precipitation", 0.0)
+            )
+            for start, значения in sorted(средние.items())
+        ]
+
+    def _rollups_complete(self, station_id: str, начало: int, конец: int) -> bool:
+        """Агрегаты полны для станции за [начало, конец): в непокрытых частях периода нет ее наблюдений"""
+        снимок = self.data_repository.snapshot()
+        return all(покрыта or not any(снимок.observations_between(station_id, lo, hi - 1))
+                   for lo, hi, покрыта in self.rollups.coverage(начало, конец))
+
     async def start_sensor(self, sensor_id: str) -> None:
         """Запуск сенсора"""
         self.active_stations[sensor_id] = True
@@ -83,9 +241,41 @@ class DataController:
             status_dict[sensor_id] = await self.get_sensor_status(sensor_id)
         return status_dict
 
-    async def cleanup_old_data(self, days: int = 30) -> int:
-        """Очистка старых данных"""
-        cutoff_time = datetime.now() - timedelta(days=days)
-        # В реальной системе здесь была бы очистка БД
-        self.logger.info(f"Очистка данных старше {days} дней")
-        return 0  # Возвращает количество удаленных записей
\ No newline at end of file
+    async def cleanup_old_data(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Очистка старых данных по политике хранения.
+        Если задано days, оно заменяет сроки хранения всех репозиториев.
+        """
+        now = datetime.now()
+        targets = [
+            ("weather", self.data_repository, self.retention.weather_days),
+            ("sensor", self.sensor_repository, self.retention.sensor_days),
+            ("forecast", self.forecast_repository, self.retention.forecast_days),
+            ("alert", self.alert_repository, self.retention.alert_days)
+        ]
+
+        result: Dict[str, Any] = {"records": 0, "bytes": 0, "repositories": {}}
+        for name, repository, repository_days in targets:
+            if repository is None:
+                continue
+
+            keep_days = days if days is not None else repository_days
+            records, size = repository.evict_before(now - timedelta(days=keep_days))
+            result["repositories"][name] = {"records": records, "bytes": size}
+            result["records"] += records
+            result["bytes"] += size
+
+            # Отдаем управление циклу событий между репозиториями
+            await asyncio.sleep(0)
+
+        if self.rollups is not None:
+            records, size = self.rollups.evict_expired(now)
+            result["repositories"]["rollup"] = {"records": records, "bytes": size}
+            result["records"] += records
+            result["bytes"] += size
+
+        self.logger.info(
+            f"Очистка данных: удалено {result['records']} записей, "
+            f"освобождено ~{result['bytes']} байт"
+        )
+        return result
@@ -9,12 +9,187 @@ DataIngestionController <<Facade>>->(создает)SensorData
 
 import logging
 import asyncio
-from typing import List, Dict, Any
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field, fields
+from statistics import fmean
+from typing import Deque, List, Dict, Any, Optional, Sequence, Tuple, Union
 from datetime import datetime, timedelta
 import uuid
 
-from domain.models import ДанныеСенсора
+from domain.models import SensorColumns, ДанныеСенсора, columns_size, readings_from_columns
 from domain.repositories import ISensorRepo
+from domain.rollups import RollupStore
+from domain.watermarks import WatermarkTracker
+from domain.validation import (SENSOR_RANGES, BatchValidation, ColumnValidation, is_valid, normalized_value,
+                               validate_batch, validate_columns)
+from services.deduplication import ReadingDeduplicator
+from services.ingestion_pipeline import IngestionPipeline, PipelinePolicy
+from services.traffic_recorder import TrafficRecorder
+
+# Сколько последних опросов источника учитывается в статистике задержек
+LATENCY_WINDOW = 128
+
+# Разброс паузы после ошибки, чтобы упавшие вместе источники не опрашивались синхронно
+BACKOFF_JITTER = 0.1
+
+# Состояния предохранителя источника
+BREAKER_CLOSED = "closed"        # источник опрашивается по своему интервалу
+BREAKER_OPEN = "open"            # после ошибок подряд опросы пропускаются до конца паузы
+BREAKER_HALF_OPEN = "half_open"  # пауза прошла: один пробный опрос решает, замкнуть или снова разомкнуть
+
+
+def _показаний_в_части(часть: Sequence[Union[ДанныеСенсора, SensorColumns]]) -> int:
+    """Размер части конвейера: записи опроса или блоки колонок потока сенсоров (по одному на отправку)"""
+    if часть and type(часть[0]) is dict:
+        return sum(map(columns_size, часть))
+    return len(часть)
+
+
+@dataclass
+class PollingPolicy:
+    """Параметры опроса источников"""
+    max_concurrency: int = 16    # одновременно опрашиваемых источников
+    source_timeout: float = 5.0  # срок ответа одного источника в секундах
+    interval: float = 300.0      # обычный интервал опроса источника в секундах
+    min_interval: float = 30.0   # интервал для быстро меняющихся источников; шаг задачи опроса
+    max_interval: float = 1800.0  # интервал для источников без свежих данных
+    change_fraction: float = 0.01  # изменение значения (доля диапазона типа), ускоряющее опрос
+    failure_threshold: int = 3   # ошибок подряд до размыкания предохранителя
+    backoff_max: float = 3600.0  # наибольшая пауза после ошибок в секундах
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'PollingPolicy':
+        section = dict(config.get("ingestion", {}))
+        # Обычный интервал по умолчанию - интервал задачи опроса из секции services
+        services = config.get("services", {})
+        if "interval" not in section and "data_ingestion_interval" in services:
+            section["interval"] = services["data_ingestion_interval"]
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+@dataclass(slots=True)
+class _SourceStats:
+    """Статистика опросов одного источника"""
+    опросов: int = 0
+    ошибок: int = 0
+    таймаутов: int = 0
+    последний_опрос: Optional[datetime] = None
+    последний_успех: Optional[datetime] = None
+    последняя_ошибка: Optional[str] = None
+    задержки: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, задержка: float, ошибка: Optional[str] = None, таймаут: bool = False) -> None:
+        self.опросов += 1
+        self.последний_опрос = datetime.now()
+        self.задержки.append(задержка)
+        if ошибка is None:
+            self.последний_успех = self.последний_опрос
+        else:
+            self.ошибок += 1
+            if таймаут:
+                self.таймаутов += 1
+        self.последняя_ошибка = ошибка
+
+    def summary(self) -> Dict[str, Any]:
+        задержки = {}
+        if self.задержки:
+            упорядоченные = sorted(self.задержки)
+            задержки = {
+                "последняя": round(self.задержки[-1] * 1000, 1),
+                "средняя": round(fmean(упорядоченные) * 1000, 1),
+                "p50": round(упорядоченные[len(упорядоченные) // 2] * 1000, 1),
+                "p95": round(упорядоченные[int(len(упорядоченные) * 0.95)] * 1000, 1),
+                "макс": round(упорядоченные[-1] * 1000, 1)
+            }
+        return {
+            "последний_опрос": self.последний_опрос.isoformat() if self.последний_опрос else None,
+            "последний_успех": self.последний_успех.isoformat() if self.последний_успех else None,
+            "опросов": self.опросов,
+            "ошибок": self.ошибок,
+            "таймаутов": self.таймаутов,
+            "последняя_ошибка": self.последняя_ошибка,
+            "задержка_мс": задержки
+        }
+
+
+@dataclass(slots=True)
+class _SourceHealth:
+    """
+    Состояние источника для адаптивного опроса: предохранитель и текущий интервал.
+    Интервал сокращается, пока значения источника заметно меняются, и растет,
+    пока свежих измерений нет. Ошибки откладывают следующий опрос
+    экспоненциально (interval * 2^ошибок, не более backoff_max).
+    """
+    interval: float
+    state: str = BREAKER_CLOSED
+    next_poll: float = 0.0   # момент следующего опроса по часам контроллера
+    failures: int = 0        # ошибок подряд
+    backoff: float = 0.0     # текущая пауза после ошибки
+    trips: int = 0           # сколько раз предохранитель размыкался
+    opened_at: Optional[datetime] = None
+    last_measurement: int = 0  # время самого свежего полученного измерения
+    last_values: Dict[Tuple[str, str], float] = field(default_factory=dict)
+
+    def due(self, now: float) -> bool:
+        """Пора ли опрашивать; по окончании паузы разомкнутый предохранитель пропускает пробный опрос"""
+        if now < self.next_poll:
+            return False
+        if self.state == BREAKER_OPEN:
+            self.state = BREAKER_HALF_OPEN
+        return True
+
+    def success(self, данные: List[ДанныеСенсора], policy: PollingPolicy, now: float) -> None:
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.backoff = 0.0
+        self.opened_at = None
+
+        свежие = [запись for запись in данные if запись.времяИзмерения > self.last_measurement]
+        изменились = False
+        for запись in свежие:
+            ключ = (запись.идСтанции, запись.типИзмерения)
+            прежнее = self.last_values.get(ключ)
+            диапазон = SENSOR_RANGES.get(запись.типИзмерения)
+            if (прежнее is not None and диапазон is not None
+                    and abs(запись.значение - прежнее) >= policy.change_fraction * (диапазон[1] - диапазон[0])):
+                изменились = True
+            self.last_values[ключ] = запись.значение
+        if свежие:
+            self.last_measurement = max(запись.времяИзмерения for запись in свежие)
+
+        if изменились:
+            self.interval = max(policy.min_interval, self.interval / 2)
+        elif not свежие:
+            self.interval = min(policy.max_interval, self.interval * 2)
+        elif self.interval > policy.interval:
+            self.interval = policy.interval
+        else:
+            # Данные идут, но почти не меняются - возврат к обычному интервалу
+            self.interval = min(policy.interval, self.interval * 1.5)
+        self.next_poll = now + self.interval
+
+    def failure(self, policy: PollingPolicy, now: float) -> None:
+        self.failures += 1
+        self.backoff = min(policy.backoff_max, self.interval * 2 ** self.failures)
+        if self.state == BREAKER_HALF_OPEN or self.failures >= policy.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.trips += 1
+                self.opened_at = datetime.now()
+            self.state = BREAKER_OPEN
+        self.next_poll = now + self.backoff * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        return {
+            "предохранитель": self.state,
+            "ошибок_подряд": self.failures,
+            "размыканий": self.trips,
+            "разомкнут_с": self.opened_at.isoformat() if self.opened_at else None,
+            "интервал_с": round(self.interval, 1),
+            "пауза_с": round(self.backoff, 1),
+            "следующий_опрос_через_с": round(max(0.0, self.next_poll - now), 1)
+        }
 
 
 class DataIngestionController:
@@ -23,28 +198,56 @@ class DataIngestionController:
     C DataIngestionController <<Facade>>
     """
 
-    def __init__(self, data_repo: ISensorRepo):
+    def __init__(self, data_repo: ISensorRepo, rollups: RollupStore = None,
+                 polling: PollingPolicy = None, pipeline: PipelinePolicy = None,
+                 dedup: ReadingDeduplicator = None, watermarks: WatermarkTracker = None,
+                 recorder: TrafficRecorder = None):
         """
         Конструктор получает iSensorRepo через DI
         -dataRepo: iSensorRepo
         """
         self.data_repo = data_repo
+        self.rollups = rollups
+        self.polling = polling or PollingPolicy()
+        # Повторно отправленные источниками показания отбрасываются до записи
+        self.dedup = dedup
+        # Время измерения против времени приема: опоздавшие показания и их окна
+        self.watermarks = watermarks
+        # Запись данных источников для воспроизведения (ingestion.recording)
+        self.recorder = recorder
         self.logger = logging.getLogger(__name__)
         self.активные_источники = ["station_26850", "station_26851", "radar_minsk"]
+        self.статистика: Dict[str, _SourceStats] = {}
+        self.состояние: Dict[str, _SourceHealth] = {}
+        # Часы расписания опросов (секунды, монотонные); моделирование подставляет свои
+        self.clock = time.monotonic
+        # Общий лимит: перекрывающиеся опросы не превышают max_concurrency вместе
+        self._семафор = asyncio.Semaphore(self.polling.max_concurrency)
+        # Конвейер записи; без него данные опроса обрабатываются сразу в опросе
+        self.конвейер: Optional[IngestionPipeline] = None
+        if pipeline is not None and pipeline.enabled:
+            self.конвейер = IngestionPipeline(self._записатьИзКонвейера, pipeline, size=_показаний_в_части)
 
     async def опроситьИсточники(self) -> List[ДанныеСенсора]:
         """+опроситьИсточники():void"""
         self.logger.info("Опрос источников данных...")
 
-        все_данные: List[ДанныеСенсора] = []
+        # Опрашиваются только источники, чей интервал или пауза после ошибок истекли;
+        # источники с разомкнутым предохранителем не тратят срок ответа каждый цикл.
+        # Источники опрашиваются параллельно, не более max_concurrency одновременно.
+        # Отмена опроса отменяет и все незавершенные запросы к источникам
+        сейчас = self.clock()
+        к_опросу = [источник for источник in list(self.активные_источники)
+                    if self._состояниеИсточника(источник).due(сейчас)]
+        результаты = await asyncio.gather(
+            *(self._опроситьИсточник(источник) for источник in к_опросу)
+        )
+        все_данные: List[ДанныеСенсора] = [запись for данные in результаты for запись in данные]
 
-        for источник in self.активные_источники:
-            try:
-                данные = await self._запроситьДанныеСИсточника(источник)
-                все_данные.extend(данные)
-                self.logger.info(f"Источник {источник}: получено {len(данные)} записей")
-            except Exception as e:
-                self.logger.error(f"Ошибка опроса источника {источник}: {e}")
+        if self.конвейер is not None:
+            # Данные каждого источника уже переданы в конвейер
+            self.logger.info(f"Всего получено {len(все_данные)} записей")
+            return все_данные
 
         # Обработка полученных данных
         await self.обработатьДанные(все_данные)
@@ -52,31 +255,158 @@ class DataIngestionController:
         self.logger.info(f"Всего получено и обработано {len(все_данные)} записей")
         return все_данные
 
-    async def обработатьДанные(self, данные: List[ДанныеСенсора]) -> None:
-        """+обработатьДанные(данные:List<SensorData>):void"""
+    async def _опроситьИсточник(self, источник: str) -> List[ДанныеСенсора]:
+        """Опрос одного источника со сроком ответа; ошибка или таймаут дают пустой результат"""
+        статистика = self.статистика.setdefault(источник, _SourceStats())
+        состояние = self._состояниеИсточника(источник)
+        async with self._семафор:
+            начало = time.perf_counter()
+            try:
+                данные = await asyncio.wait_for(self._запроситьДанныеСИсточника(источник),
+                                                self.polling.source_timeout)
+            except asyncio.TimeoutError:
+                статистика.record(time.perf_counter() - начало,
+                                  f"нет ответа за {self.polling.source_timeout} с", таймаут=True)
+                self._ошибкаИсточника(источник, состояние, f"нет ответа за {self.polling.source_timeout} с")
+                return []
+            except Exception as e:
+                статистика.record(time.perf_counter() - начало, str(e))
+                self._ошибкаИсточника(источник, состояние, str(e))
+                return []
+
+        статистика.record(time.perf_counter() - начало)
+        if состояние.state != BREAKER_CLOSED:
+            self.logger.info(f"Источник {источник}: пробный опрос успешен, предохранитель замкнут")
+        состояние.success(данные, self.polling, self.clock())
+        self.logger.info(f"Источник {источник}: получено {len(данные)} записей")
+        if self.recorder is not None:
+            self.recorder.record_source(данные)
+        if self.конвейер is not None:
+            # При заполненной очереди опрос ждет здесь, не занимая место в семафоре
+            await self.конвейер.submit(данные)
+        return данные
+
+    def _состояниеИсточника(self, источник: str) -> _SourceHealth:
+        состояние = self.состояние.get(источник)
+        if состояние is None:
+            состояние = self.состояние[источник] = _SourceHealth(self.polling.interval)
+        return состояние
+
+    def _ошибкаИсточника(self, источник: str, состояние: _SourceHealth, ошибка: str) -> None:
+        прежнее = состояние.state
+        состояние.failure(self.polling, self.clock())
+        if состояние.state == BREAKER_OPEN and прежнее != BREAKER_OPEN:
+            self.logger.warning(f"Источник {источник}: {ошибка}; предохранитель разомкнут "
+                                f"после {состояние.failures} ошибок подряд, пауза {состояние.backoff:.0f} с")
+        else:
+            self.logger.warning(f"Источник {источник}: {ошибка}; следующий опрос через {состояние.backoff:.0f} с")
+
+    async def обработатьДанные(self, данные: List[ДанныеСенсора]) -> BatchValidation:
+        """
+        +обработатьДанные(данные:List<SensorData>):void
+        Пакет проверяется и нормализуется целиком (validate_batch), значения
+        принятых записей округляются на месте. Возвращает маску отклоненных
+        записей и число отклоненных по типам измерения.
+        """
+        return self._записатьПакет(данные)
+
+    async def принятьДанные(self, данные: List[ДанныеСенсора]) -> None:
+        """Прием данных, которые источник передал сам (поток сенсоров): через конвейер, если он включен"""
+        if self.recorder is not None:
+            self.recorder.record_source(данные)
+        if self.конвейер is not None:
+            await self.конвейер.submit(данные)
+        else:
+            await self.обработатьДанные(данные)
+
+    async def принятьКолонки(self, колонки: SensorColumns) -> None:
+        """Прием показаний двоичного потока в колонках: через конвейер, если он включен"""
+        if self.recorder is not None:
+            self.recorder.record_source(readings_from_columns(колонки))
+        if self.конвейер is not None:
+            await self.конвейер.submit([колонки])
+        else:
+            self._записатьКолонки([колонки])
+
+    def _записатьИзКонвейера(self, пакет: List[Union[ДанныеСенсора, SensorColumns]]) -> None:
+        """Пакет конвейера: записи опросов и блоки колонок потоков сенсоров записываются каждые своим путем"""
+        блоки = [часть for часть in пакет if type(часть) is dict]
+        if not блоки:
+            self._записатьПакет(пакет)
+            return
+        if len(блоки) != len(пакет):
+            self._записатьПакет([запись for запись in пакет if type(запись) is not dict])
+        self._записатьКолонки(блоки)
+
+    def _записатьКолонки(self, блоки: List[SensorColumns]) -> ColumnValidation:
+        """Проверка и запись показаний в колонках - тот же порядок шагов, что у _записатьПакет"""
+        проверка = validate_columns(блоки)
+        колонки = проверка.accepted
+        if проверка.rejected_by_type:
+            self.logger.warning(f"Невалидные данные по типам: {проверка.rejected_by_type}")
+
+        if self.dedup is not None:
+            принятые = columns_size(колонки)
+            колонки = проверка.accepted = self.dedup.filter_columns(колонки)
+            проверка.duplicates = принятые - columns_size(колонки)
+            if проверка.duplicates:
+                self.logger.info(f"Отброшено повторов: {проверка.duplicates}")
+
+        if self.watermarks is not None:
+            опоздавшие = self.watermarks.observe_columns(колонки)
+            if опоздавшие:
+                self.logger.info(f"Опоздавших показаний в пакете: {опоздавшие}")
+
+        try:
+            self.data_repo.сохранитьКолонки(колонки)
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения {columns_size(колонки)} показаний в колонках: {e}")
+            if self.dedup is not None:
+                self.dedup.forget_columns(колонки)
+            return проверка
+
+        if self.rollups is not None:
+            self.rollups.add_columns(колонки)
+
+        self.logger.info(f"Обработано {columns_size(колонки)} показаний в колонках")
+        return проверка
+
+    def _записатьПакет(self, данные: List[ДанныеСенсора]) -> BatchValidation:
+        """Проверка и запись пакета; писатели конвейера вызывают ее в пуле потоков"""
         self.logger.info(f"Обработка {len(данные)} записей данных")
 
-        обработанные_данные = []
+        проверка = validate_batch(данные)
+        обработанные_данные = проверка.accepted
+        if проверка.rejected_by_type:
+            self.logger.warning(f"Невалидные данные по типам: {проверка.rejected_by_type}")
 
-        for запись in данные:
-            try:
-                # Валидация данных
-                if self._валидироватьДанные(запись):
-                    # Нормализация значений
-                    нормализованная = self._нормализоватьДанные(запись)
-                    обработанные_данные.append(нормализованная)
-
-                    # Сохранение в репозиторий
-                    self.data_repo.сохранить(нормализованная)
-
-                    # DataIngestionController <<Facade>>->(создает)SensorData
-                    self.logger.debug(f"Созданы SensorData: {запись.идДанных}")
-                else:
-                    self.logger.warning(f"Невалидные данные: {запись.идДанных}")
-            except Exception as e:
-                self.logger.error(f"Ошибка обработки данных {запись.идДанных}: {e}")
+        if self.dedup is not None:
+            принятые = len(обработанные_данные)
+            обработанные_данные = проверка.accepted = self.dedup.filter_readings(обработанные_данные)
+            проверка.duplicates = принятые - len(обработанные_данные)
+            if проверка.duplicates:
+                self.logger.info(f"Отброшено повторов: {проверка.duplicates}")
+
+        if self.watermarks is not None:
+            опоздавшие = self.watermarks.observe_readings(обработанные_данные)
+            if опоздавшие:
+                self.logger.info(f"Опоздавших показаний в пакете: {опоздавшие}")
+
+        # Сохранение в репозиторий одним пакетом
+        try:
+            self.data_repo.сохранитьПакет(обработанные_данные)
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения пакета из {len(обработанные_данные)} записей: {e}")
+            if self.dedup is not None:
+                # Несохраненные показания не должны считаться повторами при повторной отправке
+                self.dedup.forget_readings(обработанные_данные)
+            return проверка
+
+        if self.rollups is not None:
+            self.rollups.add_many(обработанные_данные)
 
         self.logger.info(f"Обработано {len(обработанные_данные)} записей")
+        return проверка
 
     async def _запроситьДанныеСИсточника(self, источник: str) -> List[ДанныеСенсора]:
         """Имитация запроса данных с источника"""
@@ -93,25 +423,29 @@ class DataIngestionController:
                     идДанных=f"{station_id}_temp_{сейчас}",
                     времяИзмерения=сейчас,
                     значение=15.0 + (int(station_id) % 10),
-                    типИзмерения="temperature"
+                    типИзмерения="temperature",
+                    идСтанции=station_id
                 ),
                 ДанныеСенсора(
                     идДанных=f"{station_id}_hum_{сейчас}",
                     времяИзмерения=сейчас,
                     значение=60.0 + (int(station_id) % 20),
-                    типИзмерения="humidity"
+                    типИзмерения="humidity",
+                    идСтанции=station_id
                 ),
                 ДанныеСенсора(
                     идДанных=f"{station_id}_pres_{сейчас}",
                     времяИзмерения=сейчас,
                     значение=750.0 + (int(station_id) % 10),
-                    типИзмерения="pressure"
+                    типИзмерения="pressure",
+                    идСтанции=station_id
                 ),
                 ДанныеСенсора(
                     идДанных=f"{station_id}_wind_{сейчас}",
                     времяИзмерения=сейчас,
                     значение=5.0 + (int(station_id) % 15),
-                    типИзмерения="wind_speed"
+                    типИзмерения="wind_speed",
+                    идСтанции=station_id
                 )
             ])
 
@@ -120,47 +454,24 @@ class DataIngestionController:
                 идДанных=f"radar_precip_{сейчас}",
                 времяИзмерения=сейчас,
                 значение=2.5,
-                типИзмерения="precipitation"
+                типИзмерения="precipitation",
+                идСтанции=источник
             ))
 
         return данные
 
     def _валидироватьДанные(self, данные: ДанныеСенсора) -> bool:
         """Валидация данных сенсора"""
-        диапазоны = {
-            "temperature": (-60, 60),
-            "humidity": (0, 100),
-            "pressure": (600, 800),
-            "wind_speed": (0, 100),
-            "precipitation": (0, 500)
-        }
-
-        if данные.типИзмерения not in диапазоны:
-            return False
-
-        мин, макс = диапазоны[данные.типИзмерения]
-        return мин <= данные.значение <= макс
+        return is_valid(данные)
 
     def _нормализоватьДанные(self, данные: ДанныеСенсора) -> ДанныеСенсора:
         """Нормализация данных"""
-        точность = {
-            "temperature": 1,
-            "humidity": 1,
-            "pressure": 0,
-            "wind_speed": 1,
-            "precipitation": 2
-        }
-
-        if данные.типИзмерения in точность:
-            значение = round(данные.значение, точность[данные.типИзмерения])
-        else:
-            значение = round(данные.значение, 2)
-
         return ДанныеСенсора(
             идДанных=данные.идДанных,
             времяИзмерения=данные.времяИзмерения,
-            значение=значение,
-            типИзмерения=данные.типИзмерения
+            значение=normalized_value(данные.типИзмерения, данные.значение),
+            типИзмерения=данные.типИзмерения,
+            идСтанции=данные.идСтанции
         )
 
     async def добавитьИсточник(self, источник: str) -> None:
@@ -170,16 +481,25 @@ class DataIngestionController:
             self.logger.info(f"Добавлен новый источник: {источник}")
 
     async def получитьСтатусИсточников(self) -> Dict[str, Any]:
-        """Получение статуса всех источников"""
+        """Получение статуса всех источников: предохранитель, интервал опроса, задержки последних опросов"""
+        сейчас = self.clock()
         статусы = {}
         for источник in self.активные_источники:
+            статистика = self.статистика.get(источник) or _SourceStats()
+            состояние = self.состояние.get(источник) or _SourceHealth(self.polling.interval)
             статусы[источник] = {
-                "активен": True,
-                "последний_опрос": datetime.now().isoformat(),
-                "тип": "станция" if "station" in источник else "радар"
+                "активен": состояние.state == BREAKER_CLOSED,
+                "тип": "станция" if "station" in источник else "радар",
+                **состояние.summary(сейчас),
+                **статистика.summary()
             }
 
         return {
             "всего_источников": len(self.активные_источники),
+            "одновременных_опросов": self.polling.max_concurrency,
+            "таймаут_источника": self.polling.source_timeout,
+            "конвейер": self.конвейер.stats() if self.конвейер is not None else None,
+            "дедупликация": self.dedup.stats() if self.dedup is not None else None,
+            "водяные_знаки": self.watermarks.stats() if self.watermarks is not None else None,
             "статусы": статусы
         }
\ No newline at end of file
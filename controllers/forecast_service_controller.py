@@ -18,6 +18,7 @@ import uuid
 
 from domain.models import Прогноз, ДанныеСенсора
 from domain.repositories import IForecastRepo, ISensorRepo
+from domain.stations import StationNetwork
 
 class ForecastServiceController:
     """
@@ -25,7 +26,8 @@ class ForecastServiceController:
     C ForecastServiceController <<Facade>>
     """
 
-    def __init__(self, forecast_repo: IForecastRepo, data_repo: ISensorRepo):
+    def __init__(self, forecast_repo: IForecastRepo, data_repo: ISensorRepo,
+                 stations: StationNetwork = None):
         """
         Конструктор получает репозитории через DI
         -forecastRepo: iForecastRepo
@@ -33,8 +35,10 @@ class ForecastServiceController:
         """
         self.forecast_repo = forecast_repo
         self.data_repo = data_repo
+        self.stations = stations
         self.logger = logging.getLogger(__name__)
         self.доступные_модели = ["WRF-ARW", "GFS", "ICON-EU", "ECMWF"]
+        self.входные_параметры = ["temperature", "humidity", "pressure", "wind_speed"]
 
     async def запуститьМодель(self, типМодели: str, регион: str) -> Прогноз:
         """+запуститьМодель(типМодели:String,регион:String):Forecast"""
@@ -92,21 +96,25 @@ class ForecastServiceController:
         конец = int(datetime.now().timestamp() * 1000)
         начало = конец - (24 * 3600 * 1000)
 
-        # Получение данных через iSensorRepo
-        данные = self.data_repo.получитьЗаПериод(начало, конец)
+        # Станции региона по пространственному индексу; без границ региона - все станции
+        станции_региона = self.stations.stations_in_region(регион) if self.stations else None
+        if станции_региона is not None and not станции_региона:
+            self.logger.warning(f"В регионе {регион} нет станций, используются данные всей сети")
+            станции_региона = None
+        идентификаторы = [None] if станции_региона is None else [s.идСтанции for s in станции_региона]
 
-        # Группировка данных
-        сгруппированные_данные = {}
-        for запись in данные:
-            if запись.типИзмерения not in сгруппированные_данные:
-                сгруппированные_данные[запись.типИзмерения] = []
-            сгруппированные_данные[запись.типИзмерения].append(запись.значение)
-
-        # Расчет средних значений
+        # Получение через iSensorRepo только нужных модели рядов - по индексу (станция, тип).
+        # Все ряды читаются из одного снимка, чтобы начальные условия были согласованы
+        репозиторий = self.data_repo.snapshot()
         начальные_условия = {}
-        for тип, значения in сгруппированные_данные.items():
-            if значения:
-                начальные_условия[тип] = sum(значения) / len(значения)
+        for тип in self.входные_параметры:
+            сумма = количество = 0
+            for ид_станции in идентификаторы:
+                _, значения = репозиторий.получитьМассивыПоСтанции(ид_станции, тип, начало, конец)
+                сумма += sum(значения)
+                количество += len(значения)
+            if количество:
+                начальные_условия[тип] = сумма / количество
 
         return начальные_условия
 
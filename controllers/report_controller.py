@@ -7,12 +7,13 @@ iSensorRepo->(использует)ReportContoller <<Facade>
 """
 
 import logging
+from array import array
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from domain.models import ДанныеСенсора
 from domain.repositories import ISensorRepo
 from domain.reports import КлиматическийОтчет
+from domain.rollups import RawReader, RollupStore, RollupSummary
 
 
 class ReportController:
@@ -21,25 +22,38 @@ class ReportController:
     C ReportContoller <<Facade>>
     """
 
-    def __init__(self, data_repo: ISensorRepo):
+    def __init__(self, data_repo: ISensorRepo, rollups: RollupStore = None):
         """
         Конструктор получает iSensorRepo через DI
         -dataRepo: iSensorRepo
         """
         self.data_repo = data_repo
+        self.rollups = rollups
         self.logger = logging.getLogger(__name__)
 
-    async def создатьКлиматическийОтчет(self, период: str) -> КлиматическийОтчет:
-        """+создатьКлиматическийОчет(период:String):Report"""
+    async def создатьКлиматическийОтчет(self, период: str, станция: Optional[str] = None) -> КлиматическийОтчет:
+        """
+        +создатьКлиматическийОчет(период:String):Report
+        Если задана станция, отчет строится только по её данным.
+        """
         self.logger.info(f"Создание климатического отчета за период: {период}")
 
         # Определение временного диапазона по периоду
         начало, конец = self._определитьПериод(период)
 
-        # Получение данных за период
-        данные = self.data_repo.получитьЗаПериод(начало, конец)
+        # Статистика по типам измерения: из агрегатов, если они есть, иначе из сырых данных.
+        # Сырые данные читаются из снимка репозитория - отчет не видит записей, идущих параллельно
+        сырые_данные = self._сырыеДанные(self.data_repo.snapshot(), станция)
+        if self.rollups is not None:
+            сводки = self.rollups.summarize(начало, конец, сырые_данные, станция)
+        else:
+            сводки = {}
+            for тип, (_, значения) in сырые_данные(начало, конец).items():
+                сводка = сводки[тип] = RollupSummary()
+                сводка.add_values(значения)
+        всего_записей = sum(сводка.количество for сводка in сводки.values())
 
-        if not данные:
+        if not всего_записей:
             return КлиматическийОтчет(
                 период=период,
                 данных=0,
@@ -47,12 +61,12 @@ class ReportController:
             )
 
         # Анализ данных
-        анализ = self._проанализироватьДанные(данные)
+        анализ = self._проанализироватьДанные(сводки)
 
         # Создание отчета
         отчет = КлиматическийОтчет(
             период=период,
-            данных=len(данные),
+            данных=всего_записей,
             временной_диапазон={
                 "начало": datetime.fromtimestamp(начало / 1000).isoformat(),
                 "конец": datetime.fromtimestamp(конец / 1000).isoformat()
@@ -63,6 +77,23 @@ class ReportController:
 
         return отчет
 
+    def _сырыеДанные(self, репозиторий: ISensorRepo, станция: Optional[str]) -> RawReader:
+        """Чтение сырых данных за интервал: по всем станциям или по индексу (станция, тип)"""
+        if станция is None:
+            return репозиторий.получитьМассивыЗаПериод
+
+        def по_станции(начало: int, конец: int) -> Dict[str, Tuple[array, array]]:
+            результат: Dict[str, Tuple[array, array]] = {}
+            for запись in репозиторий.получитьПоСтанции(станция, None, начало, конец):
+                колонки = результат.get(запись.типИзмерения)
+                if колонки is None:
+                    колонки = результат[запись.типИзмерения] = (array('q'), array('d'))
+                колонки[0].append(запись.времяИзмерения)
+                колонки[1].append(запись.значение)
+            return результат
+
+        return по_станции
+
     def _определитьПериод(self, период: str) -> tuple[int, int]:
         """Определение временного диапазона по строке периода"""
         сейчас = int(datetime.now().timestamp() * 1000)
@@ -82,7 +113,7 @@ class ReportController:
 
         return начало, сейчас
 
-    def _проанализироватьДанные(self, данные: List[ДанныеСенсора]) -> Dict[str, Any]:
+    def _проанализироватьДанные(self, сводки: Dict[str, RollupSummary]) -> Dict[str, Any]:
         """Анализ климатических данных"""
         анализ = {
             "температура": {},
@@ -92,23 +123,16 @@ class ReportController:
             "осадки": {}
         }
 
-        # Группировка по типам
-        данные_по_типам: Dict[str, List[float]] = {}
-        for запись in данные:
-            if запись.типИзмерения not in данные_по_типам:
-                данные_по_типам[запись.типИзмерения] = []
-            данные_по_типам[запись.типИзмерения].append(запись.значение)
-
         # Статистика для каждого типа
-        for тип, значения in данные_по_типам.items():
-            if значения:
+        for тип, сводка in сводки.items():
+            if сводка.количество:
                 ключ = self._маппингТипа(тип)
                 if ключ in анализ:
                     анализ[ключ] = {
-                        "среднее": sum(значения) / len(значения),
-                        "минимум": min(значения),
-                        "максимум": max(значения),
-                        "количество": len(значения)
+                        "среднее": сводка.среднее,
+                        "минимум": сводка.минимум,
+                        "максимум": сводка.максимум,
+                        "количество": сводка.количество
                     }
 
         return анализ
@@ -0,0 +1,577 @@
+"""
+Колоночное хранилище данных сенсоров
+Для каждой пары (станция, тип измерения) хранятся порции массивов int64 (время)
+и float64 (значение), объекты ДанныеСенсора создаются только по запросу.
+Идентификаторы по умолчанию (reading_id) выводятся из ряда и времени и не хранятся.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from heapq import merge
+from itertools import chain, repeat
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Dict, Sequence, Set, Tuple
+
+from .models import SensorColumns, SeriesKey, ДанныеСенсора, readings_from_columns, reading_id
+from .repositories import IRepository, ISensorRepo, _Snapshots
+from .retention import estimate_bytes
+
+# Записей в порции колонки
+COLUMN_CHUNK = 4096
+
+
+class _SensorColumn:
+    """
+    Колонки одного ряда (станция, тип): время и значение, нарезанные на порции
+    по COLUMN_CHUNK записей (массивы int64 и float64).
+    Колонки всегда упорядочены по времени: опоздавшие записи вливаются в хвост
+    начиная с порции самой ранней из них, без пересортировки ряда.
+    Копия колонки (copy) разделяет порции с оригиналом; общая порция копируется
+    перед первым изменением, поэтому запись после снимка копирует одну-две порции.
+    Идентификатор записи хранится, только если он отличается от reading_id:
+    ids - списки идентификаторов параллельно порциям (None - идентификатор выводится),
+    aliases - поиск явного идентификатора по времени записи. Пока явных идентификаторов нет, ids = None.
+    Позиция записи - пара (порция, позиция в порции).
+    """
+
+    __slots__ = ("_times", "_values", "_starts", "_owned", "_count", "ids", "aliases", "_own_aliases")
+
+    def __init__(self):
+        self._times: List[array] = []
+        self._values: List[array] = []
+        # Первая метка времени каждой порции - для поиска порции
+        self._starts: List[int] = []
+        # id порций, которые колонка может менять (не разделены с копией)
+        self._owned: Set[int] = set()
+        self._count = 0
+        self.ids: Optional[List[List[Optional[str]]]] = None
+        self.aliases: Dict[str, int] = {}
+        self._own_aliases = True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def copy(self) -> '_SensorColumn':
+        колонка = _SensorColumn()
+        колонка._times = list(self._times)
+        колонка._values = list(self._values)
+        колонка._starts = list(self._starts)
+        колонка._count = self._count
+        колонка.ids = list(self.ids) if self.ids is not None else None
+        колонка.aliases = self.aliases
+        колонка._own_aliases = False
+        return колонка
+
+    def first_time(self) -> Optional[int]:
+        return self._starts[0] if self._starts else None
+
+    def last_time(self) -> Optional[int]:
+        return self._times[-1][-1] if self._times else None
+
+    def _detach(self, chunk: int) -> None:
+        """Собственная копия порции: порция разделена с копией колонки или на неё есть представления читателей"""
+        self._owned.discard(id(self._times[chunk]))
+        times = self._times[chunk] = array('q', self._times[chunk])
+        self._values[chunk] = array('d', self._values[chunk])
+        if self.ids is not None:
+            self.ids[chunk] = list(self.ids[chunk])
+        self._owned.add(id(times))
+
+    def _writable_aliases(self) -> Dict[str, int]:
+        if not self._own_aliases:
+            self.aliases = dict(self.aliases)
+            self._own_aliases = True
+        return self.aliases
+
+    def _add_ids(self, ids: List[Optional[str]], times: Iterable[int]) -> None:
+        """Явные идентификаторы добавляемых записей: заводятся списки ids и псевдонимы"""
+        явные = [(ид, timestamp) for ид, timestamp in zip(ids, times) if ид is not None]
+        if явные:
+            if self.ids is None:
+                self.ids = [[None] * len(chunk) for chunk in self._times]
+            self._writable_aliases().update(явные)
+
+    def _insert_chunks(self, at: int, times: List[int], values: List[float], ids: List[Optional[str]]) -> None:
+        """Упорядоченные записи нарезаются на порции и вставляются на место at"""
+        chunks = [array('q', times[i:i + COLUMN_CHUNK]) for i in range(0, len(times), COLUMN_CHUNK)]
+        self._times[at:at] = chunks
+        self._values[at:at] = [array('d', values[i:i + COLUMN_CHUNK]) for i in range(0, len(values), COLUMN_CHUNK)]
+        if self.ids is not None:
+            self.ids[at:at] = [list(ids[i:i + COLUMN_CHUNK]) for i in range(0, len(ids), COLUMN_CHUNK)]
+        self._starts[at:at] = [chunk[0] for chunk in chunks]
+        self._owned.update(map(id, chunks))
+
+    def _delete_chunks(self, lo: int, hi: int) -> None:
+        for chunk in self._times[lo:hi]:
+            self._owned.discard(id(chunk))
+        del self._times[lo:hi]
+        del self._values[lo:hi]
+        if self.ids is not None:
+            del self.ids[lo:hi]
+        del self._starts[lo:hi]
+
+    def append(self, timestamp: int, значение: float, ид: Optional[str]) -> None:
+        self.extend([timestamp], [значение], [ид])
+
+    def extend(self, times: List[int], values: List[float], ids: List[Optional[str]]) -> None:
+        """Добавление пакета записей одного типа"""
+        if not times:
+            return
+        if any(a > b for a, b in zip(times, times[1:])):
+            порядок = sorted(range(len(times)), key=times.__getitem__)
+            times = [times[i] for i in порядок]
+            values = [values[i] for i in порядок]
+            ids = [ids[i] for i in порядок]
+        if self._times and times[0] < self._times[-1][-1]:
+            self._merge_tail(times, values, ids)
+            return
+
+        self._count += len(times)
+        self._add_ids(ids, times)
+        last = len(self._times) - 1
+        if last >= 0 and len(self._times[last]) < COLUMN_CHUNK:
+            self._splice(last, len(self._times[last]), times, values, ids)
+        else:
+            self._insert_chunks(last + 1, times, values, ids)
+
+    def _merge_tail(self, times: List[int], values: List[float], ids: List[Optional[str]]) -> None:
+        """
+        Слияние упорядоченного пакета с опоздавшими записями: переписывается только
+        хвост колонки от позиции самой ранней записи пакета до порции самой поздней,
+        остальные порции не меняются
+        """
+        self._count += len(times)
+        self._add_ids(ids, times)
+        lo = max(bisect_right(self._starts, times[0]) - 1, 0)
+        hi = bisect_right(self._starts, times[-1], lo)
+        pos = bisect_right(self._times[lo], times[0])
+        старые_ids = (chain(self.ids[lo][pos:], *self.ids[lo + 1:hi]) if self.ids is not None
+                      else repeat(None))
+        старые = zip(chain(self._times[lo][pos:], *self._times[lo + 1:hi]),
+                     chain(self._values[lo][pos:], *self._values[lo + 1:hi]), старые_ids)
+        слитые = list(merge(старые, zip(times, values, ids), key=itemgetter(0)))
+        self._delete_chunks(lo + 1, hi)
+        self._splice(lo, pos, list(map(itemgetter(0), слитые)), list(map(itemgetter(1), слитые)),
+                     [запись[2] for запись in слитые])
+
+    def _splice(self, chunk: int, pos: int, times: List[int], values: List[float],
+                ids: List[Optional[str]]) -> None:
+        """Записи порции chunk начиная с pos заменяются упорядоченными записями, излишек - новые порции за ней"""
+        if id(self._times[chunk]) not in self._owned:
+            self._detach(chunk)
+        прежняя = self._times[chunk]
+        room = max(COLUMN_CHUNK - pos, 0)
+        for колонки, часть, код in ((self._times, times, 'q'), (self._values, values, 'd')):
+            try:
+                del колонки[chunk][pos:]
+                колонки[chunk].extend(часть[:room])
+            except BufferError:
+                # На порцию есть живые представления у читателей - пишем в копию,
+                # читатели продолжают работать со старым буфером
+                колонки[chunk] = array(код, колонки[chunk][:pos])
+                колонки[chunk].extend(часть[:room])
+        if self._times[chunk] is not прежняя:
+            self._owned.discard(id(прежняя))
+            self._owned.add(id(self._times[chunk]))
+        if self.ids is not None:
+            self.ids[chunk][pos:] = ids[:room]
+        self._starts[chunk] = self._times[chunk][0]
+        if len(times) > room:
+            self._insert_chunks(chunk + 1, times[room:], values[room:], ids[room:])
+
+    def _chunks_between(self, начало: int, конец: int) -> Iterator[Tuple[int, int, int]]:
+        chunk = max(bisect_left(self._starts, начало) - 1, 0)
+        while chunk < len(self._starts) and self._starts[chunk] <= конец:
+            times = self._times[chunk]
+            lo = bisect_left(times, начало)
+            hi = bisect_right(times, конец, lo)
+            if lo < hi:
+                yield chunk, lo, hi
+            chunk += 1
+
+    def slices(self, начало: int, конец: int) -> List[Tuple[int, int, int]]:
+        """Части порций (порция, от, до) с записями за [начало, конец]"""
+        return list(self._chunks_between(начало, конец))
+
+    def position(self, timestamp: int, ид: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Позиция записи с временем timestamp и явным идентификатором ид (None - выводимым)"""
+        for chunk, lo, hi in self._chunks_between(timestamp, timestamp):
+            ids = self.ids[chunk] if self.ids is not None else None
+            for pos in range(lo, hi):
+                if (ids[pos] if ids is not None else None) == ид:
+                    return chunk, pos
+        return None
+
+    def remove(self, position: Tuple[int, int]) -> None:
+        """Удаление записи; порция заменяется копией - выданные представления не меняются"""
+        chunk, pos = position
+        self._detach(chunk)
+        times = self._times[chunk]
+        del times[pos]
+        del self._values[chunk][pos]
+        if self.ids is not None:
+            ид = self.ids[chunk].pop(pos)
+            if ид is not None:
+                del self._writable_aliases()[ид]
+        if not times:
+            self._delete_chunks(chunk, chunk + 1)
+        elif pos == 0:
+            self._starts[chunk] = times[0]
+        self._count -= 1
+
+    def overwrite(self, updates: List[Tuple[Tuple[int, int], float]]) -> None:
+        """
+        Замена значений (позиция, значение) в копиях затронутых порций:
+        представления, выданные читателям, продолжают видеть прежние значения
+        """
+        скопированы = set()
+        for (chunk, pos), значение in updates:
+            if chunk not in скопированы:
+                self._detach(chunk)
+                скопированы.add(chunk)
+            self._values[chunk][pos] = значение
+
+    def drop_before(self, граница: int) -> Tuple[int, List[str]]:
+        """
+        Удаление записей раньше границы; целые порции удаляются без копирования.
+        Возвращает (записей, явные идентификаторы удаленных записей)
+        """
+        chunks = bisect_left(self._starts, граница)
+        if not chunks:
+            return 0, []
+        i = bisect_left(self._times[chunks - 1], граница)
+        count = sum(map(len, self._times[:chunks - 1])) + i
+        явные: List[str] = []
+        if self.ids is not None:
+            явные = [ид for ids in self.ids[:chunks - 1] for ид in ids if ид is not None]
+            явные.extend(ид for ид in self.ids[chunks - 1][:i] if ид is not None)
+        if i == len(self._times[chunks - 1]):
+            self._delete_chunks(0, chunks)
+        else:
+            self._delete_chunks(0, chunks - 1)
+            # Остаток порции - новые массивы: представления читателей не меняются
+            self._owned.discard(id(self._times[0]))
+            times = self._times[0] = self._times[0][i:]
+            self._values[0] = self._values[0][i:]
+            if self.ids is not None:
+                self.ids[0] = self.ids[0][i:]
+            self._starts[0] = times[0]
+            self._owned.add(id(times))
+        if явные:
+            aliases = self._writable_aliases()
+            for ид in явные:
+                del aliases[ид]
+        self._count -= count
+        return count, явные
+
+    def views(self, начало: int, конец: int) -> Optional[Tuple[Sequence[int], Sequence[float]]]:
+        """
+        Массивы (время, значение) за [начало, конец]: в пределах одной порции -
+        представления без копирования, иначе части порций копируются в новые массивы
+        """
+        части = self.slices(начало, конец)
+        if not части:
+            return None
+        if len(части) == 1:
+            chunk, lo, hi = части[0]
+            return memoryview(self._times[chunk])[lo:hi], memoryview(self._values[chunk])[lo:hi]
+        времена, значения = array('q'), array('d')
+        for chunk, lo, hi in части:
+            времена.extend(self._times[chunk][lo:hi])
+            значения.extend(self._values[chunk][lo:hi])
+        return времена, значения
+
+    def materialize(self, key: SeriesKey, части: List[Tuple[int, int, int]]) -> List[ДанныеСенсора]:
+        станция, тип = key
+        результат = []
+        for chunk, lo, hi in части:
+            ids = self.ids[chunk][lo:hi] if self.ids is not None else repeat(None)
+            результат.extend(
+                ДанныеСенсора(
+                    идДанных=ид if ид is not None else reading_id(станция, тип, время),
+                    времяИзмерения=время,
+                    значение=значение,
+                    типИзмерения=тип,
+                    идСтанции=станция
+                )
+                for время, значение, ид in zip(self._times[chunk][lo:hi], self._values[chunk][lo:hi], ids)
+            )
+        return результат
+
+
+def _merge_series(части: List[Tuple[Sequence[int], Sequence[float]]]) -> Tuple[Sequence[int], Sequence[float]]:
+    """Слияние упорядоченных рядов (время, значение); единственный ряд возвращается без копирования"""
+    if len(части) == 1:
+        return части[0]
+    времена, значения = array('q'), array('d')
+    for время, значение in merge(*(zip(*часть) for часть in части), key=itemgetter(0)):
+        времена.append(время)
+        значения.append(значение)
+    return времена, значения
+
+
+class ColumnarSensorDataRepository(_Snapshots, IRepository['ДанныеСенсора'], ISensorRepo):
+    """
+    Колоночная реализация SensorDataRepository
+    Запись добавляется в массивы своего ряда (станция, тип) за амортизированное O(1),
+    выборки по времени - бинарный поиск по отсортированному массиву времени.
+    Снимок разделяет колонки с репозиторием; писатель копирует список порций колонки,
+    а сами порции - только те, которые изменяет.
+    Идентификатор уникален в пределах ряда: запись с тем же идентификатором
+    в другом ряду (станция, тип) - другая запись.
+    Если подключен архив (SensorSegmentArchive), все записи дописываются и в него,
+    а выборки старше данных в памяти читаются из архива.
+    """
+
+    def __init__(self, archive=None):
+        self._columns: Dict[SeriesKey, _SensorColumn] = {}
+        self._archive = archive
+        # Ряды, колонки которых разделены с выданным снимком
+        self._shared: Set[SeriesKey] = set()
+        self._init_snapshots()
+
+    def _freeze(self) -> 'ColumnarSensorDataRepository':
+        view = ColumnarSensorDataRepository(self._archive)
+        view._columns = dict(self._columns)
+        self._shared = set(self._columns)
+        return view
+
+    def _locate(self, ид: str) -> Optional[Tuple[SeriesKey, _SensorColumn, int]]:
+        """Поиск записи: явные идентификаторы - по словарям рядов, выводимые - разбором по ключу ряда"""
+        for key, колонка in self._columns.items():
+            timestamp = колонка.aliases.get(ид)
+            if timestamp is not None:
+                return key, колонка, колонка.position(timestamp, ид)
+
+        for key, колонка in self._columns.items():
+            префикс = f"{key[0]}_{key[1]}_"
+            if not ид.startswith(префикс):
+                continue
+            время = ид[len(префикс):]
+            if время.lstrip("-").isdigit():
+                pos = колонка.position(int(время), None)
+                if pos is not None:
+                    return key, колонка, pos
+        return None
+
+    def _column(self, key: SeriesKey) -> _SensorColumn:
+        """Колонка для изменения: общая со снимком колонка сначала копируется"""
+        колонка = self._columns.get(key)
+        if колонка is None:
+            колонка = self._columns[key] = _SensorColumn()
+        elif key in self._shared:
+            колонка = self._columns[key] = колонка.copy()
+            self._shared.discard(key)
+        return колонка
+
+    def _keys_for(self, станция: Optional[str], тип: Optional[str]) -> List[SeriesKey]:
+        return [key for key in self._columns
+                if (станция is None or key[0] == станция) and (тип is None or key[1] == тип)]
+
+    def найтиПоИд(self, ид: str) -> Optional[ДанныеСенсора]:
+        найдено = self._locate(ид)
+        if найдено is None:
+            return None
+
+        key, колонка, (chunk, pos) = найдено
+        return колонка.materialize(key, [(chunk, pos, pos + 1)])[0]
+
+    def сохранить(self, entity: ДанныеСенсора) -> None:
+        self.сохранитьПакет([entity])
+
+    def _overwrite(self, key: SeriesKey, повторы: List[Tuple[ДанныеСенсора, Optional[str], int]]) -> None:
+        """Перезапись сохраненных записей ряда: новое значение или перенос на новое время"""
+        колонка = self._column(key)
+        обновления = []
+        for entity, ид, прежнее_время in повторы:
+            if прежнее_время == entity.времяИзмерения:
+                обновления.append((entity.времяИзмерения, ид, entity.значение))
+            else:
+                колонка.remove(колонка.position(прежнее_время, ид))
+                колонка.append(entity.времяИзмерения, entity.значение, ид)
+        if обновления:
+            колонка.overwrite([(колонка.position(timestamp, ид), значение)
+                               for timestamp, ид, значение in обновления])
+
+    def сохранитьПакет(self, entities: Iterable[ДанныеСенсора]) -> None:
+        """Сохранение пакета: новые записи дописываются в колонки своего ряда одним расширением"""
+        по_рядам: Dict[SeriesKey, Dict[str, ДанныеСенсора]] = {}
+        for entity in entities:
+            по_рядам.setdefault((entity.идСтанции, entity.типИзмерения), {})[entity.идДанных] = entity
+
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append_many(entity for пакет in по_рядам.values() for entity in пакет.values())
+            self._save_series(по_рядам)
+
+    def _save_series(self, по_рядам: Dict[SeriesKey, Dict[str, ДанныеСенсора]]) -> None:
+        for (станция, тип), пакет in по_рядам.items():
+            колонка = self._columns.get((станция, тип))
+            последнее = колонка.last_time() if колонка is not None else None
+            aliases = колонка.aliases if колонка is not None else {}
+            новые: List[Tuple[ДанныеСенсора, Optional[str]]] = []
+            повторы = []
+            for ид, entity in пакет.items():
+                время = entity.времяИзмерения
+                if ид == reading_id(станция, тип, время):
+                    # Выводимый идентификатор не хранится; он привязан ко времени,
+                    # поэтому позже последней записи ряда повтора быть не может
+                    ид = None
+                    прежнее_время = (время if последнее is not None and время <= последнее
+                                     and колонка.position(время, None) is not None else None)
+                else:
+                    прежнее_время = aliases.get(ид)
+                if прежнее_время is None:
+                    новые.append((entity, ид))
+                else:
+                    повторы.append((entity, ид, прежнее_время))
+
+            # Перезапись существующих записей - редкий случай
+            if повторы:
+                self._overwrite((станция, тип), повторы)
+            if новые:
+                self._column((станция, тип)).extend([entity.времяИзмерения for entity, _ in новые],
+                                                    [entity.значение for entity, _ in новые],
+                                                    [ид for _, ид in новые])
+
+    def сохранитьКолонки(self, колонки: SensorColumns) -> None:
+        """
+        Сохранение показаний в колонках с идентификаторами reading_id: упорядоченный ряд
+        позже последней записи колонки дописывается массивами, без объектов ДанныеСенсора.
+        Ряды, которые могут перезаписать сохраненные показания, идут через сохранитьПакет
+        """
+        повторные: Dict[SeriesKey, Dict[str, ДанныеСенсора]] = {}
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append_columns(колонки)
+            for key, (times, values) in колонки.items():
+                times = times.tolist() if hasattr(times, "tolist") else list(times)
+                values = values.tolist() if hasattr(values, "tolist") else list(values)
+                if not times:
+                    continue
+                колонка = self._columns.get(key)
+                последнее = колонка.last_time() if колонка is not None else None
+                if ((последнее is None or times[0] > последнее)
+                        and all(a < b for a, b in zip(times, times[1:]))):
+                    self._column(key).extend(times, values, [None] * len(times))
+                else:
+                    повторные[key] = {entity.идДанных: entity
+                                      for entity in readings_from_columns({key: (times, values)})}
+            if повторные:
+                self._save_series(повторные)
+
+    def найтиВсе(self) -> List[ДанныеСенсора]:
+        результат = []
+        for key, колонка in self._columns.items():
+            результат.extend(колонка.materialize(key, колонка.slices(-2 ** 63, 2 ** 63 - 1)))
+        return результат
+
+    def _archive_bounds(self, начало: int, конец: int) -> Optional[Tuple[int, int]]:
+        """Часть интервала, которая старше данных в памяти и читается из архива"""
+        if self._archive is None:
+            return None
+        граница = min((время for время in (колонка.first_time() for колонка in self._columns.values())
+                       if время is not None), default=None)
+        if граница is None:
+            return начало, конец
+        if начало >= граница:
+            return None
+        return начало, min(конец, граница - 1)
+
+    def получитьПоСтанции(self, станция: Optional[str], тип: Optional[str],
+                          начало: int, конец: int) -> List[ДанныеСенсора]:
+        """Выборка рядов (станция, тип) бинарным поиском по каждой подходящей колонке"""
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is None:
+            return self._memory_series(станция, тип, начало, конец)
+        return (self._archive.scan_series(станция, тип, *archive_bounds)
+                + self._memory_series(станция, тип, начало, конец))
+
+    def _memory_series(self, станция: Optional[str], тип: Optional[str],
+                       начало: int, конец: int) -> List[ДанныеСенсора]:
+        части = []
+        for key in self._keys_for(станция, тип):
+            колонка = self._columns[key]
+            куски = колонка.slices(начало, конец)
+            if куски:
+                части.append(колонка.materialize(key, куски))
+
+        if len(части) == 1:
+            return части[0]
+        return list(merge(*части, key=lambda x: x.времяИзмерения))
+
+    def получитьЗаПериод(self, начало: int, конец: int) -> List[ДанныеСенсора]:
+        return self.получитьПоСтанции(None, None, начало, конец)
+
+    def получитьПоТипу(self, тип: str) -> List[ДанныеСенсора]:
+        return self._memory_series(None, тип, -2 ** 63, 2 ** 63 - 1)
+
+    def _views(self, key: SeriesKey, начало: int, конец: int) -> Optional[Tuple[Sequence[int], Sequence[float]]]:
+        return self._columns[key].views(начало, конец)
+
+    def получитьМассивыПоСтанции(self, станция: Optional[str], тип: str,
+                                 начало: int, конец: int) -> Tuple[Sequence[int], Sequence[float]]:
+        """
+        Ряд (время, значение) станции и типа измерения.
+        Для одной станции в пределах порции - представления колонок без копирования.
+        """
+        части = [views for views in (self._views(key, начало, конец) for key in self._keys_for(станция, тип))
+                 if views is not None]
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is not None:
+            архив = self._archive.scan_series(станция, тип, *archive_bounds)
+            if архив:
+                части.insert(0, (array('q', [x.времяИзмерения for x in архив]),
+                                 array('d', [x.значение for x in архив])))
+        if not части:
+            return memoryview(array('q')), memoryview(array('d'))
+        return _merge_series(части)
+
+    def получитьМассивыЗаПериод(self, начало: int, конец: int) -> Dict[str, Tuple[Sequence[int], Sequence[float]]]:
+        """
+        Массивы (время, значение) по типам измерения.
+        Ряды разных станций одного типа сливаются по времени, единственный ряд
+        в пределах порции отдается представлением без копирования.
+        """
+        по_типам: Dict[str, List[Tuple[Sequence[int], Sequence[float]]]] = {}
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is not None:
+            # Архивная часть читается последовательно из сегментов без создания объектов
+            for тип, колонки in self._archive.scan_arrays(*archive_bounds).items():
+                по_типам[тип] = [колонки]
+        for key in self._columns:
+            views = self._views(key, начало, конец)
+            if views is not None:
+                по_типам.setdefault(key[1], []).append(views)
+        return {тип: _merge_series(части) for тип, части in по_типам.items()}
+
+    def получитьМассивыПоТипу(self, тип: str) -> Tuple[Sequence[int], Sequence[float]]:
+        """Массивы (время, значение) одного типа измерения по всем станциям в памяти"""
+        части = [views for views in (self._views(key, -2 ** 63, 2 ** 63 - 1) for key in self._keys_for(None, тип))
+                 if views is not None]
+        if not части:
+            return memoryview(array('q')), memoryview(array('d'))
+        return _merge_series(части)
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """
+        Удаление записей старше cutoff. Возвращает (записей, байт).
+        Колонки упорядочены по времени, поэтому устаревшие данные - префикс массивов,
+        который отрезается целиком без обхода отдельных записей.
+        """
+        граница = int(cutoff.timestamp() * 1000)
+        records = 0
+        size = 0
+
+        with self._writing():
+            for key in list(self._columns):
+                first = self._columns[key].first_time()
+                if first is None or first >= граница:
+                    continue
+
+                count, явные = self._column(key).drop_before(граница)
+                size += count * (array('q').itemsize + array('d').itemsize) + estimate_bytes(явные)
+                records += count
+
+        return records, size
@@ -26,6 +26,18 @@ from .repositories import (
     WeatherDataRepository
 )
 
+from .columnar_repository import ColumnarSensorDataRepository
+
+from .retention import RetentionPolicy, TimePartitions
+
+from .rollups import RollupStore, RollupTier, RollupSummary
+
+from .validation import BatchValidation, ColumnValidation, validate_batch, validate_columns
+
+from .watermarks import WatermarkTracker
+
+from .sensor_view import SensorReadingsView
+
 from .users import (
     Пользователь,
     Метеоролог,
@@ -57,6 +69,18 @@ __all__ = [
     'ForecastRepository',
     'SensorDataRepository',
     'WeatherDataRepository',
+    'ColumnarSensorDataRepository',
+    'RetentionPolicy',
+    'TimePartitions',
+    'RollupStore',
+    'RollupTier',
+    'RollupSummary',
+    'BatchValidation',
+    'ColumnValidation',
+    'validate_batch',
+    'validate_columns',
+    'WatermarkTracker',
+    'SensorReadingsView',
     'Пользователь',
     'Метеоролог',
     'Климатолог',
@@ -6,11 +6,53 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Dict, Any, Optional, TypeVar, Generic
+from typing import List, Dict, Any, Optional, Sequence, Tuple, TypeVar, Generic
 import statistics
 
 T = TypeVar('T')
 
+# Показания, выводимые из наблюдения WeatherData: (тип измерения, суффикс идентификатора).
+# Тип измерения совпадает с именем поля WeatherData
+WEATHER_READINGS = (
+    ("temperature", "temp"),
+    ("humidity", "hum"),
+    ("pressure", "pres"),
+    ("wind_speed", "wind")
+)
+
+
+def reading_id(станция: str, тип: str, время: int) -> str:
+    """
+    Идентификатор показания по умолчанию: ряд (станция, тип) и время измерения.
+    Колоночное хранилище выводит такие идентификаторы и не хранит их
+    """
+    return f"{станция}_{тип}_{время}"
+
+
+# Ключ ряда показаний: (станция, тип измерения)
+SeriesKey = Tuple[str, str]
+
+# Показания в колонках: ряд (станция, тип) -> (время измерения в мс, значение).
+# Так показания двоичных кадров проходят прием без объектов ДанныеСенсора
+SensorColumns = Dict[SeriesKey, Tuple[Sequence[int], Sequence[float]]]
+
+
+def columns_size(колонки: SensorColumns) -> int:
+    """Число показаний в колонках"""
+    return sum(len(times) for times, _ in колонки.values())
+
+
+def readings_from_columns(колонки: SensorColumns) -> List['ДанныеСенсора']:
+    """Записи ДанныеСенсора с идентификаторами reading_id - для хранилищ и журналов построчного формата"""
+    записи: List[ДанныеСенсора] = []
+    for (станция, тип), (times, values) in колонки.items():
+        if type(times) is not list:
+            times = times.tolist() if hasattr(times, "tolist") else times
+            values = values.tolist() if hasattr(values, "tolist") else values
+        записи.extend(ДанныеСенсора(reading_id(станция, тип, время), время, значение, тип, станция)
+                      for время, значение in zip(times, values))
+    return записи
+
 
 class AlertLevel(Enum):
     OK = "ok"
@@ -29,7 +71,7 @@ class GeoPoint:
         return f"{self.latitude:.4f},{self.longitude:.4f}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ДанныеСенсора:
     """
     C ДанныеСенсора
@@ -37,11 +79,13 @@ class ДанныеСенсора:
     -времяИзмерения:Long
     -значение:Double
     -типИзмерения:String
+    -идСтанции:String
     """
     идДанных: str
     времяИзмерения: int  # timestamp в миллисекундах
     значение: float
     типИзмерения: str
+    идСтанции: str = ""  # станция-источник измерения
 
     def to_datetime(self) -> datetime:
         return datetime.fromtimestamp(self.времяИзмерения / 1000)
@@ -52,29 +96,13 @@ class ДанныеСенсора:
 
         return [
             ДанныеСенсора(
-                идДанных=f"{weather_data.id}_temp",
-                времяИзмерения=timestamp,
-                значение=weather_data.temperature,
-                типИзмерения="temperature"
-            ),
-            ДанныеСенсора(
-                идДанных=f"{weather_data.id}_hum",
-                времяИзмерения=timestamp,
-                значение=weather_data.humidity,
-                типИзмерения="humidity"
-            ),
-            ДанныеСенсора(
-                идДанных=f"{weather_data.id}_pres",
+                идДанных=f"{weather_data.id}_{суффикс}",
                 времяИзмерения=timestamp,
-                значение=weather_data.pressure,
-                типИзмерения="pressure"
-            ),
-            ДанныеСенсора(
-                идДанных=f"{weather_data.id}_wind",
-                времяИзмерения=timestamp,
-                значение=weather_data.wind_speed,
-                типИзмерения="wind_speed"
+                значение=getattr(weather_data, тип),
+                типИзмерения=тип,
+                идСтанции=weather_data.station_id
             )
+            for тип, суффикс in WEATHER_READINGS
         ]
 
 
@@ -178,7 +206,7 @@ class Прогноз:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class WeatherData:
     """Данные с метеостанции"""
     id: str
@@ -196,7 +224,7 @@ class WeatherData:
         return ДанныеСенсора.from_weather_data(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Forecast:
     """Прогноз погоды"""
     id: str
@@ -227,7 +255,7 @@ class Forecast:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """Штормовое предупреждение"""
     id: str
@@ -3,13 +3,46 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic, Dict, Any
+from typing import List, Optional, TypeVar, Generic, Dict, Any, Iterable, Sequence, Set, Tuple
 from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import chain
+from operator import attrgetter, itemgetter
+import threading
 import uuid
 
+from .models import SensorColumns, readings_from_columns
+from .retention import TimePartitions, estimate_bytes
+
 T = TypeVar('T')
 
 
+def _ms(moment: datetime) -> int:
+    """Метка времени в миллисекундах"""
+    return int(moment.timestamp() * 1000)
+
+
+def _datetime_bound(ms: int) -> datetime:
+    """Граница выборки в мс как datetime; границы вне диапазона datetime - его края"""
+    try:
+        return datetime.fromtimestamp(ms / 1000)
+    except (OverflowError, OSError, ValueError):
+        return datetime.min if ms < 0 else datetime.max
+
+
+def _footprint(partitions: List[Any]) -> Tuple[int, int]:
+    """Суммарные (записей, байт) удаленных партиций"""
+    records = 0
+    size = 0
+    for partition in partitions:
+        partition_records, partition_size = partition.footprint()
+        records += partition_records
+        size += partition_size
+    return records, size
+
+
 class IRepository(Generic[T], ABC):
     """
     I iRepository<T>
@@ -30,6 +63,49 @@ class IRepository(Generic[T], ABC):
     def найтиВсе(self) -> List[T]:
         pass
 
+    def сохранитьПакет(self, entities: Iterable[T]) -> None:
+        """Сохранение пакета записей. Реализации переопределяют метод для записи за один проход"""
+        for entity in entities:
+            self.сохранить(entity)
+
+
+class _Snapshots(ABC):
+    """
+    Согласованное чтение без блокировки писателей.
+    Писатели изменяют репозиторий под self._lock и сбрасывают кэшированный снимок;
+    snapshot() под той же блокировкой собирает представление только для чтения,
+    общие с ним части писатель копирует перед изменением (копирование при записи).
+    Живой репозиторий безопасно читать только из потока, в котором идут записи.
+    """
+
+    def _init_snapshots(self) -> None:
+        self._lock = threading.RLock()
+        self._view = None
+
+    def _writing(self) -> '_Snapshots':
+        """Блокировка писателя; без генератора - запись одной строки на горячем пути"""
+        return self
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+        self._view = None
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+    def snapshot(self):
+        """Представление репозитория только для чтения, не меняющееся при последующих записях"""
+        with self._lock:
+            if self._view is None:
+                view = self._freeze()
+                view._view = view
+                self._view = view
+            return self._view
+
+    @abstractmethod
+    def _freeze(self):
+        """Представление только для чтения; вызывается под блокировкой писателей"""
+
 
 class IAlertRepo(ABC):
     """I iAiertRepo"""
@@ -38,6 +114,10 @@ class IAlertRepo(ABC):
     def найтиАктуальные(self, текущееВремя: int) -> List['Оповещение']:
         pass
 
+    def snapshot(self) -> 'IAlertRepo':
+        """Представление для согласованного чтения. Хранилища с транзакциями возвращают себя"""
+        return self
+
 
 class IForecastRepo(ABC):
     """I iForecastRepo"""
@@ -47,6 +127,10 @@ class IForecastRepo(ABC):
         """+получитьАктуальные(регион:String):List<Forecast>"""
         pass
 
+    def snapshot(self) -> 'IForecastRepo':
+        """Представление для согласованного чтения. Хранилища с транзакциями возвращают себя"""
+        return self
+
 
 class ISensorRepo(ABC):
     """I iSensorRepo"""
@@ -56,40 +140,135 @@ class ISensorRepo(ABC):
         """+получитьЗаПериод(начало:Long,конец:Long):List<SensorData>"""
         pass
 
+    def сохранитьКолонки(self, колонки: SensorColumns) -> None:
+        """
+        Сохранение показаний в колонках (станция, тип) -> (время, значение) с идентификаторами reading_id.
+        По умолчанию записи создаются и сохраняются пакетом; колоночные хранилища
+        переопределяют метод и дописывают массивы без объектов ДанныеСенсора.
+        """
+        self.сохранитьПакет(readings_from_columns(колонки))
+
+    def получитьМассивыЗаПериод(self, начало: int, конец: int) -> Dict[str, Tuple[Sequence[int], Sequence[float]]]:
+        """
+        Данные за период в виде массивов (время, значение) по типам измерения.
+        Колоночные реализации переопределяют метод и отдают представления без копирования.
+        """
+        результат: Dict[str, Tuple[array, array]] = {}
+        for запись in self.получитьЗаПериод(начало, конец):
+            колонки = результат.get(запись.типИзмерения)
+            if колонки is None:
+                колонки = результат[запись.типИзмерения] = (array('q'), array('d'))
+            колонки[0].append(запись.времяИзмерения)
+            колонки[1].append(запись.значение)
+        return результат
+
+    def получитьПоСтанции(self, станция: Optional[str], тип: Optional[str],
+                          начало: int, конец: int) -> List['ДанныеСенсора']:
+        """
+        Данные станции и типа измерения за период, упорядоченные по времени.
+        None вместо станции или типа - без фильтра по этому полю.
+        Реализации с индексом (станция, тип) переопределяют метод.
+        """
+        return [запись for запись in self.получитьЗаПериод(начало, конец)
+                if (станция is None or запись.идСтанции == станция)
+                and (тип is None or запись.типИзмерения == тип)]
+
+    def получитьМассивыПоСтанции(self, станция: Optional[str], тип: str,
+                                 начало: int, конец: int) -> Tuple[Sequence[int], Sequence[float]]:
+        """Ряд (время, значение) станции и типа измерения за период"""
+        записи = self.получитьПоСтанции(станция, тип, начало, конец)
+        return (array('q', (запись.времяИзмерения for запись in записи)),
+                array('d', (запись.значение for запись in записи)))
+
+    def snapshot(self) -> 'ISensorRepo':
+        """Представление для согласованного чтения. Хранилища с транзакциями возвращают себя"""
+        return self
+
+
+class _AlertPartition:
+    """Оповещения, истекающие в пределах одной временной партиции"""
+
+    __slots__ = ("storage", "оповещения")
+
+    def __init__(self):
+        self.storage: Dict[str, 'Alert'] = {}
+        self.оповещения: Dict[str, 'Оповещение'] = {}
+
+    def copy(self) -> '_AlertPartition':
+        partition = _AlertPartition()
+        partition.storage = dict(self.storage)
+        partition.оповещения = dict(self.оповещения)
+        return partition
+
+    def footprint(self) -> Tuple[int, int]:
+        return (len(self.storage),
+                estimate_bytes(self.storage.values()) + estimate_bytes(self.оповещения.values()))
+
 
-class AlertRepository(IRepository['Alert'], IAlertRepo):
+class AlertRepository(_Snapshots, IRepository['Alert'], IAlertRepo):
     """
     C AiertRepository
     AiertRepository->iRepository<Aiert>
     AiertRepository->iAiertRepo
+    Оповещения партиционированы по времени истечения
     """
 
     def __init__(self):
-        self._storage: Dict[str, 'Alert'] = {}
-        self._оповещения: Dict[str, 'Оповещение'] = {}
+        self._partitions: TimePartitions[_AlertPartition] = TimePartitions(_AlertPartition)
+        self._init_snapshots()
+
+    def _freeze(self) -> 'AlertRepository':
+        view = AlertRepository()
+        view._partitions = self._partitions.snapshot()
+        return view
+
+    def _find_partition(self, ид: str) -> Optional[_AlertPartition]:
+        for partition in self._partitions.newest_first():
+            if ид in partition.storage:
+                return partition
+        return None
+
+    def _find_key(self, ид: str) -> Optional[int]:
+        for key, partition in self._partitions.newest_first_keyed():
+            if ид in partition.storage:
+                return key
+        return None
 
     def найтиПоИд(self, ид: str) -> Optional['Alert']:
-        return self._storage.get(ид)
+        partition = self._find_partition(ид)
+        return partition.storage[ид] if partition else None
 
     def сохранить(self, entity: 'Alert') -> None:
-        self._storage[entity.id] = entity
-        оповещение = entity.to_оповещение()
-        self._оповещения[оповещение.идОповещения] = оповещение
+        with self._writing():
+            previous_key = self._find_key(entity.id)
+            partition = self._partitions.for_time(_ms(entity.valid_to))
+            if previous_key is not None:
+                previous = self._partitions.writable(previous_key)
+                if previous is not partition:
+                    del previous.storage[entity.id]
+                    previous.оповещения.pop(entity.id, None)
+
+            partition.storage[entity.id] = entity
+            оповещение = entity.to_оповещение()
+            partition.оповещения[оповещение.идОповещения] = оповещение
 
     def найтиВсе(self) -> List['Alert']:
-        return list(self._storage.values())
+        return [alert for partition in self._partitions for alert in partition.storage.values()]
 
     def найтиАктуальные(self, текущееВремя: int) -> List['Оповещение']:
         актуальные = []
-        for оповещение in self._оповещения.values():
-            if оповещение.проверитьАктуальность(текущееВремя):
-                актуальные.append(оповещение)
+        # Партиции с уже истекшими оповещениями не просматриваются
+        for partition in self._partitions.since(текущееВремя):
+            for оповещение in partition.оповещения.values():
+                if оповещение.проверитьАктуальность(текущееВремя):
+                    актуальные.append(оповещение)
         return актуальные
 
     async def get_active_alerts(self) -> List['Alert']:
         now = datetime.now()
         return [
-            alert for alert in self._storage.values()
+            alert for partition in self._partitions.since(_ms(now))
+            for alert in partition.storage.values()
             if alert.is_active and alert.valid_from <= now <= alert.valid_to
         ]
 
@@ -102,68 +281,123 @@ class AlertRepository(IRepository['Alert'], IAlertRepo):
     async def get_all(self) -> List['Alert']:
         return self.найтиВсе()
 
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Удаление оповещений, истекших до cutoff. Возвращает (записей, байт)"""
+        with self._writing():
+            return _footprint(self._partitions.drop_before(_ms(cutoff)))
 
-class ForecastRepository(IRepository['Forecast'], IForecastRepo):
+
+class _ForecastPartition:
+    """Прогнозы, рассчитанные в пределах одной временной партиции"""
+
+    __slots__ = ("storage", "прогнозы", "region_index")
+
+    def __init__(self):
+        self.storage: Dict[str, 'Forecast'] = {}
+        self.прогнозы: Dict[str, 'Прогноз'] = {}
+        self.region_index: Dict[str, List[str]] = {}
+
+    def copy(self) -> '_ForecastPartition':
+        partition = _ForecastPartition()
+        partition.storage = dict(self.storage)
+        partition.прогнозы = dict(self.прогнозы)
+        partition.region_index = {region: list(ids) for region, ids in self.region_index.items()}
+        return partition
+
+    def footprint(self) -> Tuple[int, int]:
+        return (len(self.storage),
+                estimate_bytes(self.storage.values()) + estimate_bytes(self.прогнозы.values()))
+
+
+class ForecastRepository(_Snapshots, IRepository['Forecast'], IForecastRepo):
     """
     C ForecastRepository
     +получитьАктуальные(регион:String):List<Forecast>
     ForecastRepository->iRepository<forecast>
     ForecastRepository->iForecastRepo
+    Прогнозы партиционированы по времени расчета
     """
 
     def __init__(self):
-        self._storage: Dict[str, 'Forecast'] = {}
-        self._прогнозы: Dict[str, 'Прогноз'] = {}
-        self._region_index: Dict[str, List[str]] = {}
+        self._partitions: TimePartitions[_ForecastPartition] = TimePartitions(_ForecastPartition)
+        self._init_snapshots()
+
+    def _freeze(self) -> 'ForecastRepository':
+        view = ForecastRepository()
+        view._partitions = self._partitions.snapshot()
+        return view
+
+    def _find_partition(self, ид: str) -> Optional[_ForecastPartition]:
+        for partition in self._partitions.newest_first():
+            if ид in partition.storage:
+                return partition
+        return None
+
+    def _find_key(self, ид: str) -> Optional[int]:
+        for key, partition in self._partitions.newest_first_keyed():
+            if ид in partition.storage:
+                return key
+        return None
 
     def найтиПоИд(self, ид: str) -> Optional['Forecast']:
-        return self._storage.get(ид)
+        partition = self._find_partition(ид)
+        return partition.storage[ид] if partition else None
 
     def сохранить(self, entity: 'Forecast') -> None:
-        self._storage[entity.id] = entity
-        прогноз = entity.to_прогноз()
-        self._прогнозы[прогноз.идПрогноза] = прогноз
-
-        if entity.region not in self._region_index:
-            self._region_index[entity.region] = []
-        if entity.id not in self._region_index[entity.region]:
-            self._region_index[entity.region].append(entity.id)
+        with self._writing():
+            previous_key = self._find_key(entity.id)
+            partition = self._partitions.for_time(_ms(entity.calculation_time))
+            if previous_key is not None:
+                previous = self._partitions.writable(previous_key)
+                if previous is not partition:
+                    old = previous.storage.pop(entity.id)
+                    previous.прогнозы.pop(entity.id, None)
+                    previous.region_index[old.region].remove(entity.id)
+
+            partition.storage[entity.id] = entity
+            прогноз = entity.to_прогноз()
+            partition.прогнозы[прогноз.идПрогноза] = прогноз
+
+            if entity.region not in partition.region_index:
+                partition.region_index[entity.region] = []
+            if entity.id not in partition.region_index[entity.region]:
+                partition.region_index[entity.region].append(entity.id)
 
     def найтиВсе(self) -> List['Forecast']:
-        return list(self._storage.values())
+        return [forecast for partition in self._partitions for forecast in partition.storage.values()]
 
     def получитьАктуальные(self, регион: str) -> List['Прогноз']:
-        if регион not in self._region_index:
-            return []
-
         актуальные = []
         текущееВремя = int(datetime.now().timestamp() * 1000)
 
-        for прогноз_id in self._region_index[регион]:
-            прогноз = self._прогнозы.get(прогноз_id)
-            if прогноз:
-                if текущееВремя - прогноз.датаСоздания <= 24 * 3600 * 1000:
-                    актуальные.append(прогноз)
+        # Актуальны прогнозы за последние сутки - старые партиции не просматриваются
+        for partition in self._partitions.since(текущееВремя - 24 * 3600 * 1000):
+            for прогноз_id in partition.region_index.get(регион, []):
+                прогноз = partition.прогнозы.get(прогноз_id)
+                if прогноз:
+                    if текущееВремя - прогноз.датаСоздания <= 24 * 3600 * 1000:
+                        актуальные.append(прогноз)
 
         return актуальные
 
     async def get_all_for_region(self, region: str) -> List['Forecast']:
-        if region not in self._region_index:
-            return []
-
         forecasts = []
-        for forecast_id in self._region_index[region]:
-            forecast = self._storage.get(forecast_id)
-            if forecast:
-                forecasts.append(forecast)
+        for partition in self._partitions:
+            for forecast_id in partition.region_index.get(region, []):
+                forecast = partition.storage.get(forecast_id)
+                if forecast:
+                    forecasts.append(forecast)
 
         return forecasts
 
     async def get_latest_for_region(self, region: str) -> Optional['Forecast']:
-        forecasts = await self.get_all_for_region(region)
-        if not forecasts:
-            return None
-        return max(forecasts, key=lambda x: x.calculation_time)
+        # Самый свежий прогноз находится в самой новой партиции, где есть регион
+        for partition in self._partitions.newest_first():
+            forecasts = [partition.storage[forecast_id]
+                         for forecast_id in partition.region_index.get(region, [])]
+            if forecasts:
+                return max(forecasts, key=lambda x: x.calculation_time)
+        return None
 
     async def save(self, forecast: 'Forecast') -> None:
         self.сохранить(forecast)
@@ -174,79 +408,798 @@ class ForecastRepository(IRepository['Forecast'], IForecastRepo):
     async def get_all(self) -> List['Forecast']:
         return self.найтиВсе()
 
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Удаление прогнозов, рассчитанных до cutoff. Возвращает (записей, байт)"""
+        with self._writing():
+            return _footprint(self._partitions.drop_before(_ms(cutoff)))
+
+
+# Записей в порции упорядоченного ряда или индекса
+SERIES_CHUNK = 1024
 
-class SensorDataRepository(IRepository['ДанныеСенсора'], ISensorRepo):
+# Число частей словаря записей партиции
+PARTITION_SHARDS = 64
+
+
+class _ShardedDict:
+    """
+    Словарь записей партиции, разбитый на PARTITION_SHARDS частей по хэшу ключа.
+    Копия (copy) разделяет части с оригиналом и копирует только их список;
+    общая часть копируется перед первым изменением. Запись в партицию, выданную
+    снимку, копирует одну часть, а не весь словарь партиции.
+    """
+
+    __slots__ = ("_shards", "_owned")
+
+    def __init__(self):
+        self._shards: List[Dict[str, Any]] = [{} for _ in range(PARTITION_SHARDS)]
+        # Номера частей, которые словарь может менять (не разделены с копией)
+        self._owned: Set[int] = set(range(PARTITION_SHARDS))
+
+    def __len__(self) -> int:
+        return sum(map(len, self._shards))
+
+    def __iter__(self):
+        return chain.from_iterable(self._shards)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shards[hash(key) % PARTITION_SHARDS]
+
+    def __getitem__(self, key: str) -> Any:
+        return self._shards[hash(key) % PARTITION_SHARDS][key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._writable(hash(key) % PARTITION_SHARDS)[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._writable(hash(key) % PARTITION_SHARDS)[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._shards[hash(key) % PARTITION_SHARDS].get(key, default)
+
+    def pop(self, key: str) -> Any:
+        return self._writable(hash(key) % PARTITION_SHARDS).pop(key)
+
+    def values(self) -> List[Any]:
+        return list(chain.from_iterable(shard.values() for shard in self._shards))
+
+    def intersection(self, keys: Iterable[str]) -> List[str]:
+        """Ключи из keys, которые есть в словаре"""
+        shards = self._shards
+        return [key for key in keys if key in shards[hash(key) % PARTITION_SHARDS]]
+
+    def copy(self) -> '_ShardedDict':
+        копия = _ShardedDict.__new__(_ShardedDict)
+        копия._shards = list(self._shards)
+        копия._owned = set()
+        return копия
+
+    def _writable(self, shard: int) -> Dict[str, Any]:
+        if shard in self._owned:
+            return self._shards[shard]
+        self._owned.add(shard)
+        копия = self._shards[shard] = dict(self._shards[shard])
+        return копия
+
+
+class _TimeIndex:
+    """
+    Упорядоченный по времени индекс из порций по SERIES_CHUNK меток.
+    Метки времени и идентификаторы хранятся в параллельных отсортированных порциях,
+    поэтому выборка диапазона стоит O(log n + k) и не требует пересортировки.
+    Копия индекса (copy) разделяет порции с оригиналом; общая порция копируется
+    перед первым изменением, поэтому запись после снимка копирует одну-две порции.
+    """
+
+    __slots__ = ("_times", "_ids", "_starts", "_owned", "_count")
+
+    def __init__(self):
+        self._times: List[List[int]] = []
+        self._ids: List[List[str]] = []
+        # Первая метка времени каждой порции - для поиска порции
+        self._starts: List[int] = []
+        # id порций, которые индекс может менять (не разделены с копией)
+        self._owned: Set[int] = set()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def copy(self) -> '_TimeIndex':
+        index = _TimeIndex()
+        index._times = list(self._times)
+        index._ids = list(self._ids)
+        index._starts = list(self._starts)
+        index._count = self._count
+        return index
+
+    def _writable(self, chunk: int) -> Tuple[List[int], List[str]]:
+        times = self._times[chunk]
+        if id(times) not in self._owned:
+            times = self._times[chunk] = list(times)
+            self._ids[chunk] = list(self._ids[chunk])
+            self._owned.add(id(times))
+        return times, self._ids[chunk]
+
+    def _insert_chunks(self, at: int, times: List[int], ids: List[str]) -> None:
+        """Упорядоченные метки нарезаются на порции и вставляются на место at"""
+        chunks = [times[i:i + SERIES_CHUNK] for i in range(0, len(times), SERIES_CHUNK)]
+        self._times[at:at] = chunks
+        self._ids[at:at] = [ids[i:i + SERIES_CHUNK] for i in range(0, len(ids), SERIES_CHUNK)]
+        self._starts[at:at] = [chunk[0] for chunk in chunks]
+        self._owned.update(map(id, chunks))
+
+    def _delete_chunks(self, lo: int, hi: int) -> None:
+        for chunk in self._times[lo:hi]:
+            self._owned.discard(id(chunk))
+        del self._times[lo:hi]
+        del self._ids[lo:hi]
+        del self._starts[lo:hi]
+
+    def insert(self, timestamp: int, ид: str) -> None:
+        self._count += 1
+        last = len(self._times) - 1
+        # Данные обычно приходят по возрастанию времени - добавляем в конец без поиска
+        if last < 0 or (timestamp >= self._times[last][-1] and len(self._times[last]) >= SERIES_CHUNK):
+            self._insert_chunks(last + 1, [timestamp], [ид])
+            return
+
+        chunk = last if timestamp >= self._starts[last] else max(bisect_right(self._starts, timestamp) - 1, 0)
+        times, ids = self._writable(chunk)
+        pos = len(times) if timestamp >= times[-1] else bisect_right(times, timestamp)
+        times.insert(pos, timestamp)
+        ids.insert(pos, ид)
+        if pos == 0:
+            self._starts[chunk] = timestamp
+        if len(times) > 2 * SERIES_CHUNK:
+            # Переполненная порция делится заново
+            self._delete_chunks(chunk, chunk + 1)
+            self._insert_chunks(chunk, times, ids)
+
+    def insert_many(self, times: List[int], ids: List[str]) -> None:
+        """Вставка пакета, упорядоченного по времени"""
+        if not times:
+            return
+        self._count += len(times)
+        if not self._times or times[0] >= self._times[-1][-1]:
+            last = len(self._times) - 1
+            if last >= 0 and len(self._times[last]) < SERIES_CHUNK:
+                last_times, last_ids = self._writable(last)
+                room = SERIES_CHUNK - len(last_times)
+                last_times.extend(times[:room])
+                last_ids.extend(ids[:room])
+                times, ids = times[room:], ids[room:]
+            if times:
+                self._insert_chunks(len(self._times), times, ids)
+            return
+
+        # Сливается только хвост индекса от первой метки пакета до порции последней:
+        # данные приходят почти по порядку, и хвост обычно короткий
+        lo = max(bisect_right(self._starts, times[0]) - 1, 0)
+        hi = bisect_right(self._starts, times[-1], lo)
+        pos = bisect_right(self._times[lo], times[0])
+        хвост = zip(chain(self._times[lo][pos:], *self._times[lo + 1:hi]),
+                    chain(self._ids[lo][pos:], *self._ids[lo + 1:hi]))
+        merged = list(merge(хвост, zip(times, ids), key=itemgetter(0)))
+        self._delete_chunks(lo + 1, hi)
+        first_times, first_ids = self._writable(lo)
+        room = max(SERIES_CHUNK - pos, 0)
+        del first_times[pos:]
+        del first_ids[pos:]
+        first_times.extend(timestamp for timestamp, _ in merged[:room])
+        first_ids.extend(ид for _, ид in merged[:room])
+        self._starts[lo] = first_times[0]
+        if len(merged) > room:
+            self._insert_chunks(lo + 1, [timestamp for timestamp, _ in merged[room:]],
+                                [ид for _, ид in merged[room:]])
+
+    def remove(self, timestamp: int, ид: str) -> None:
+        chunk = max(bisect_left(self._starts, timestamp) - 1, 0)
+        while chunk < len(self._starts) and self._starts[chunk] <= timestamp:
+            times = self._times[chunk]
+            lo = bisect_left(times, timestamp)
+            hi = bisect_right(times, timestamp, lo)
+            try:
+                pos = self._ids[chunk].index(ид, lo, hi)
+            except ValueError:
+                chunk += 1
+                continue
+            times, ids = self._writable(chunk)
+            del times[pos]
+            del ids[pos]
+            if not times:
+                self._delete_chunks(chunk, chunk + 1)
+            elif pos == 0:
+                self._starts[chunk] = times[0]
+            self._count -= 1
+            return
+
+    def range(self, начало: int, конец: int) -> List[str]:
+        result: List[str] = []
+        chunk = max(bisect_left(self._starts, начало) - 1, 0)
+        while chunk < len(self._starts) and self._starts[chunk] <= конец:
+            times = self._times[chunk]
+            lo = bisect_left(times, начало)
+            result.extend(self._ids[chunk][lo:bisect_right(times, конец, lo)])
+            chunk += 1
+        return result
+
+
+class _SensorPartition:
+    """
+    Данные сенсоров одной временной партиции с упорядоченными индексами:
+    общим по времени и составным (станция, тип) с упорядочением по времени внутри.
+    Копия партиции разделяет с оригиналом части словаря и порции индексов,
+    индекс ряда копируется при первом изменении.
+    """
+
+    __slots__ = ("storage", "time_index", "series", "_shared_series")
+
+    def __init__(self):
+        self.storage = _ShardedDict()
+        self.time_index = _TimeIndex()
+        self.series: Dict[Tuple[str, str], _TimeIndex] = {}
+        # Ряды, индексы которых разделены с оригиналом партиции
+        self._shared_series: Set[Tuple[str, str]] = set()
+
+    def copy(self) -> '_SensorPartition':
+        partition = _SensorPartition()
+        partition.storage = self.storage.copy()
+        partition.time_index = self.time_index.copy()
+        partition.series = dict(self.series)
+        partition._shared_series = set(self.series)
+        return partition
+
+    def index(self, entity: 'ДанныеСенсора') -> None:
+        self.time_index.insert(entity.времяИзмерения, entity.идДанных)
+        self._series_index(entity).insert(entity.времяИзмерения, entity.идДанных)
+
+    def index_many(self, entities: List['ДанныеСенсора']) -> None:
+        """Индексация пакета, упорядоченного по времени"""
+        self.time_index.insert_many([entity.времяИзмерения for entity in entities],
+                                    [entity.идДанных for entity in entities])
+        по_рядам: Dict[Tuple[str, str], List['ДанныеСенсора']] = {}
+        for entity in entities:
+            по_рядам.setdefault((entity.идСтанции, entity.типИзмерения), []).append(entity)
+        for записи in по_рядам.values():
+            self._series_index(записи[0]).insert_many([запись.времяИзмерения for запись in записи],
+                                                     [запись.идДанных for запись in записи])
+
+    def unindex(self, entity: 'ДанныеСенсора') -> None:
+        self.time_index.remove(entity.времяИзмерения, entity.идДанных)
+        self._series_index(entity).remove(entity.времяИзмерения, entity.идДанных)
+
+    def _series_index(self, entity: 'ДанныеСенсора') -> _TimeIndex:
+        key = (entity.идСтанции, entity.типИзмерения)
+        index = self.series.get(key)
+        if index is None:
+            index = self.series[key] = _TimeIndex()
+        elif key in self._shared_series:
+            index = self.series[key] = index.copy()
+            self._shared_series.discard(key)
+        return index
+
+    def footprint(self) -> Tuple[int, int]:
+        return len(self.storage), estimate_bytes(self.storage.values())
+
+
+class SensorDataRepository(_Snapshots, IRepository['ДанныеСенсора'], ISensorRepo):
     """
     C SensorDataRepostory
     +получитьЗаПериод(начало:Long,конец:Long):List<SensorData>
     SensorDataRepostory->iRepository<SensorData>
     SensorDataRepostory->iSensorRepo
+    Данные партиционированы по времени измерения.
+    Если подключен архив (SensorSegmentArchive), все записи дописываются и в него,
+    а выборки старше данных в памяти читаются из архива.
     """
 
-    def __init__(self):
-        self._storage: Dict[str, 'ДанныеСенсора'] = {}
-        self._time_index: Dict[int, List[str]] = {}
+    def __init__(self, archive=None):
+        self._partitions: TimePartitions[_SensorPartition] = TimePartitions(_SensorPartition)
+        self._archive = archive
+        # Все встречавшиеся пары (станция, тип) - для выборок с фильтром по одному полю
+        self._series_keys: Set[Tuple[str, str]] = set()
+        self._init_snapshots()
+
+    def _freeze(self) -> 'SensorDataRepository':
+        view = SensorDataRepository(self._archive)
+        view._partitions = self._partitions.snapshot()
+        view._series_keys = set(self._series_keys)
+        return view
+
+    def _find_partition(self, ид: str) -> Optional[_SensorPartition]:
+        for partition in self._partitions.newest_first():
+            if ид in partition.storage:
+                return partition
+        return None
+
+    def _find_key(self, ид: str) -> Optional[int]:
+        for key, partition in self._partitions.newest_first_keyed():
+            if ид in partition.storage:
+                return key
+        return None
 
     def найтиПоИд(self, ид: str) -> Optional['ДанныеСенсора']:
-        return self._storage.get(ид)
+        partition = self._find_partition(ид)
+        return partition.storage[ид] if partition else None
 
     def сохранить(self, entity: 'ДанныеСенсора') -> None:
-        self._storage[entity.идДанных] = entity
-
-        if entity.времяИзмерения not in self._time_index:
-            self._time_index[entity.времяИзмерения] = []
-        if entity.идДанных not in self._time_index[entity.времяИзмерения]:
-            self._time_index[entity.времяИзмерения].append(entity.идДанных)
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append(entity)
+
+            previous_key = self._find_key(entity.идДанных)
+            partition = self._partitions.for_time(entity.времяИзмерения)
+
+            if previous_key is not None:
+                previous_partition = self._partitions.writable(previous_key)
+                предыдущие = previous_partition.storage[entity.идДанных]
+                if (предыдущие.времяИзмерения == entity.времяИзмерения
+                        and предыдущие.идСтанции == entity.идСтанции
+                        and предыдущие.типИзмерения == entity.типИзмерения):
+                    partition.storage[entity.идДанных] = entity
+                    return
+                # Запись перезаписана с другим временем или рядом - переносим её в индексах
+                del previous_partition.storage[entity.идДанных]
+                previous_partition.unindex(предыдущие)
+
+            partition.storage[entity.идДанных] = entity
+            partition.index(entity)
+            self._series_keys.add((entity.идСтанции, entity.типИзмерения))
+
+    def сохранитьПакет(self, entities: Iterable['ДанныеСенсора']) -> None:
+        """
+        Сохранение пакета за один проход.
+        Повторы внутри пакета схлопываются, уже сохраненные записи находятся
+        пересечением множеств идентификаторов с каждой партицией.
+        """
+        пакет = {entity.идДанных: entity for entity in entities}
+        if not пакет:
+            return
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append_many(пакет.values())
+
+            for key, partition in self._partitions.newest_first_keyed():
+                общие = partition.storage.intersection(пакет)
+                if not общие:
+                    continue
+                partition = self._partitions.writable(key)
+                for ид in общие:
+                    предыдущие = partition.storage[ид]
+                    entity = пакет[ид]
+                    if (предыдущие.времяИзмерения == entity.времяИзмерения
+                            and предыдущие.идСтанции == entity.идСтанции
+                            and предыдущие.типИзмерения == entity.типИзмерения):
+                        partition.storage[ид] = пакет.pop(ид)
+                    else:
+                        # Запись перезаписана с другим временем или рядом - вставляется заново
+                        del partition.storage[ид]
+                        partition.unindex(предыдущие)
+
+            новые: Dict[_SensorPartition, List['ДанныеСенсора']] = {}
+            for entity in sorted(пакет.values(), key=attrgetter('времяИзмерения')):
+                partition = self._partitions.for_time(entity.времяИзмерения)
+                partition.storage[entity.идДанных] = entity
+                новые.setdefault(partition, []).append(entity)
+
+            for partition, записи in новые.items():
+                partition.index_many(записи)
+            self._series_keys.update((entity.идСтанции, entity.типИзмерения) for entity in пакет.values())
 
     def найтиВсе(self) -> List['ДанныеСенсора']:
-        return list(self._storage.values())
+        return [data for partition in self._partitions for data in partition.storage.values()]
+
+    def _archive_bounds(self, начало: int, конец: int) -> Optional[Tuple[int, int]]:
+        """Часть интервала, которая старше данных в памяти и читается из архива"""
+        if self._archive is None:
+            return None
+        граница = self._partitions.start()
+        if граница is None:
+            return начало, конец
+        if начало >= граница:
+            return None
+        return начало, min(конец, граница - 1)
+
+    def _memory_range(self, начало: int, конец: int) -> List['ДанныеСенсора']:
+        # Партиции и индексы внутри них упорядочены по времени - результат не требует сортировки
+        result = []
+        for partition in self._partitions.overlapping(начало, конец):
+            storage = partition.storage
+            result.extend(storage[data_id] for data_id in partition.time_index.range(начало, конец))
+        return result
 
     def получитьЗаПериод(self, начало: int, конец: int) -> List['ДанныеСенсора']:
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is None:
+            return self._memory_range(начало, конец)
+        return self._archive.scan(*archive_bounds) + self._memory_range(начало, конец)
+
+    def получитьМассивыЗаПериод(self, начало: int, конец: int) -> Dict[str, Tuple[Sequence[int], Sequence[float]]]:
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is None:
+            return super().получитьМассивыЗаПериод(начало, конец)
+
+        # Архивная часть читается последовательно из сегментов без создания объектов
+        результат = self._archive.scan_arrays(*archive_bounds)
+        for запись in self._memory_range(начало, конец):
+            колонки = результат.get(запись.типИзмерения)
+            if колонки is None:
+                колонки = результат[запись.типИзмерения] = (array('q'), array('d'))
+            колонки[0].append(запись.времяИзмерения)
+            колонки[1].append(запись.значение)
+        return результат
+
+    def _keys_for(self, станция: Optional[str], тип: Optional[str]) -> List[Tuple[str, str]]:
+        return [key for key in self._series_keys
+                if (станция is None or key[0] == станция) and (тип is None or key[1] == тип)]
+
+    def _memory_series(self, keys: List[Tuple[str, str]], начало: int, конец: int) -> List['ДанныеСенсора']:
         result = []
-        for timestamp, ids in self._time_index.items():
-            if начало <= timestamp <= конец:
-                for data_id in ids:
-                    data = self._storage.get(data_id)
-                    if data:
-                        result.append(data)
-
-        result.sort(key=lambda x: x.времяИзмерения)
+        for partition in self._partitions.overlapping(начало, конец):
+            storage = partition.storage
+            части = []
+            for key in keys:
+                index = partition.series.get(key)
+                if index is not None:
+                    ids = index.range(начало, конец)
+                    if ids:
+                        части.append([storage[data_id] for data_id in ids])
+            if len(части) == 1:
+                result.extend(части[0])
+            elif части:
+                result.extend(merge(*части, key=attrgetter('времяИзмерения')))
         return result
 
+    def получитьПоСтанции(self, станция: Optional[str], тип: Optional[str],
+                          начало: int, конец: int) -> List['ДанныеСенсора']:
+        """Выборка по индексу (станция, тип): O(log n + k) на партицию"""
+        keys = self._keys_for(станция, тип)
+        archive_bounds = self._archive_bounds(начало, конец)
+        if archive_bounds is None:
+            return self._memory_series(keys, начало, конец)
+        return (self._archive.scan_series(станция, тип, *archive_bounds)
+                + self._memory_series(keys, начало, конец))
+
     def получитьПоТипу(self, тип: str) -> List['ДанныеСенсора']:
-        return [data for data in self._storage.values()
-                if data.типИзмерения == тип]
+        граница = self._partitions.start()
+        if граница is None:
+            return []
+        return self._memory_series(self._keys_for(None, тип), граница, 2 ** 63 - 1)
 
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Удаление партиций старше cutoff. Возвращает (записей, байт)"""
+        with self._writing():
+            return _footprint(self._partitions.drop_before(_ms(cutoff)))
 
-class WeatherDataRepository:
-    """Репозиторий для WeatherData"""
+
+class _StationSeries:
+    """
+    Упорядоченный по времени ряд наблюдений станции из порций по SERIES_CHUNK записей.
+    Копия ряда (copy) разделяет порции с оригиналом и копирует только их список;
+    общая порция копируется перед первым изменением. Запись в ряд, выданный снимку,
+    копирует одну-две порции, а не всю историю станции.
+    """
+
+    __slots__ = ("_records", "_times", "_starts", "_owned", "_count")
 
     def __init__(self):
-        self._data: Dict[str, 'WeatherData'] = {}
-        self._station_data: Dict[str, List['WeatherData']] = {}
+        self._records: List[List['WeatherData']] = []
+        self._times: List[List[datetime]] = []
+        # Первая метка времени каждой порции - для поиска порции
+        self._starts: List[datetime] = []
+        # id порций, которые ряд может менять (не разделены с копией)
+        self._owned: Set[int] = set()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def copy(self) -> '_StationSeries':
+        series = _StationSeries()
+        series._records = list(self._records)
+        series._times = list(self._times)
+        series._starts = list(self._starts)
+        series._count = self._count
+        return series
+
+    def first_time(self) -> Optional[datetime]:
+        return self._starts[0] if self._starts else None
+
+    def last(self) -> 'WeatherData':
+        return self._records[-1][-1]
+
+    def _writable(self, chunk: int) -> Tuple[List['WeatherData'], List[datetime]]:
+        records = self._records[chunk]
+        if id(records) not in self._owned:
+            records = self._records[chunk] = list(records)
+            self._times[chunk] = list(self._times[chunk])
+            self._owned.add(id(records))
+        return records, self._times[chunk]
+
+    def _insert_chunks(self, at: int, records: List['WeatherData']) -> None:
+        """Упорядоченные записи нарезаются на порции и вставляются на место at"""
+        chunks = [records[i:i + SERIES_CHUNK] for i in range(0, len(records), SERIES_CHUNK)]
+        times = [[record.timestamp for record in chunk] for chunk in chunks]
+        self._records[at:at] = chunks
+        self._times[at:at] = times
+        self._starts[at:at] = [chunk_times[0] for chunk_times in times]
+        self._owned.update(map(id, chunks))
+
+    def _delete_chunks(self, lo: int, hi: int) -> None:
+        for chunk in self._records[lo:hi]:
+            self._owned.discard(id(chunk))
+        del self._records[lo:hi]
+        del self._times[lo:hi]
+        del self._starts[lo:hi]
+
+    def extend(self, records: List['WeatherData']) -> None:
+        """Добавление упорядоченных записей не раньше последней записи ряда"""
+        self._count += len(records)
+        if self._records and len(self._records[-1]) < SERIES_CHUNK:
+            last_records, last_times = self._writable(len(self._records) - 1)
+            room = SERIES_CHUNK - len(last_records)
+            last_records.extend(records[:room])
+            last_times.extend(record.timestamp for record in records[:room])
+            records = records[room:]
+        if records:
+            self._insert_chunks(len(self._records), records)
+
+    def merge(self, records: List['WeatherData']) -> None:
+        """Слияние упорядоченных опоздавших записей: перестраиваются порции от самой ранней из них"""
+        chunk = max(bisect_right(self._starts, records[0].timestamp) - 1, 0)
+        tail = [record for part in self._records[chunk:] for record in part]
+        self._delete_chunks(chunk, len(self._records))
+        self._insert_chunks(chunk, list(merge(tail, records, key=attrgetter('timestamp'))))
+        self._count += len(records)
+
+    def remove(self, weather_data: 'WeatherData') -> bool:
+        moment = weather_data.timestamp
+        chunk = max(bisect_left(self._starts, moment) - 1, 0)
+        while chunk < len(self._starts) and self._starts[chunk] <= moment:
+            times = self._times[chunk]
+            lo = bisect_left(times, moment)
+            for pos in range(lo, bisect_right(times, moment, lo)):
+                if self._records[chunk][pos].id == weather_data.id:
+                    records, times = self._writable(chunk)
+                    del records[pos]
+                    del times[pos]
+                    if not records:
+                        self._delete_chunks(chunk, chunk + 1)
+                    elif pos == 0:
+                        self._starts[chunk] = times[0]
+                    self._count -= 1
+                    return True
+            chunk += 1
+        return False
+
+    def between(self, lo: datetime, hi: datetime) -> List['WeatherData']:
+        """Записи с меткой времени в [lo, hi]"""
+        результат: List['WeatherData'] = []
+        chunk = max(bisect_left(self._starts, lo) - 1, 0)
+        while chunk < len(self._starts) and self._starts[chunk] <= hi:
+            times = self._times[chunk]
+            start = bisect_left(times, lo)
+            результат.extend(self._records[chunk][start:bisect_right(times, hi, start)])
+            chunk += 1
+        return результат
+
+    def drop_before(self, boundary: datetime) -> int:
+        """Удаление записей раньше boundary; целые порции удаляются без копирования"""
+        chunks = bisect_left(self._starts, boundary)
+        if not chunks:
+            return 0
+        dropped = sum(len(part) for part in self._records[:chunks - 1])
+        self._delete_chunks(0, chunks - 1)
+        i = bisect_left(self._times[0], boundary)
+        if i == len(self._times[0]):
+            self._delete_chunks(0, 1)
+        else:
+            records, times = self._writable(0)
+            del records[:i]
+            del times[:i]
+            self._starts[0] = times[0]
+        dropped += i
+        self._count -= dropped
+        return dropped
+
+
+class WeatherDataRepository(_Snapshots):
+    """
+    Репозиторий для WeatherData
+    История каждой станции хранится упорядоченной по времени наблюдения,
+    последнее наблюдение станции доступно за O(1).
+    Записи партиционированы по времени наблюдения.
+    Если подключен архив (WeatherSegmentArchive), все наблюдения дописываются и в него,
+    а история старше данных в памяти читается из архива.
+    """
 
-    async def save(self, weather_data: 'WeatherData') -> None:
-        self._data[weather_data.id] = weather_data
+    def __init__(self, archive=None):
+        self._archive = archive
+        self._partitions: TimePartitions[_ShardedDict] = TimePartitions(_ShardedDict)
+        self._station_data: Dict[str, _StationSeries] = {}
+        self._latest: Dict[str, 'WeatherData'] = {}
+        # Станции, ряды которых разделены с выданным снимком
+        self._shared_stations: Set[str] = set()
+        self._init_snapshots()
+
+    def _freeze(self) -> 'WeatherDataRepository':
+        view = WeatherDataRepository(self._archive)
+        view._partitions = self._partitions.snapshot()
+        view._station_data = dict(self._station_data)
+        view._latest = dict(self._latest)
+        self._shared_stations = set(self._station_data)
+        return view
+
+    def _station_series(self, station_id: str) -> _StationSeries:
+        """Изменяемый ряд станции: ряд, общий со снимком, сначала копируется (список порций)"""
+        series = self._station_data.get(station_id)
+        if series is None:
+            series = self._station_data[station_id] = _StationSeries()
+        elif station_id in self._shared_stations:
+            series = self._station_data[station_id] = series.copy()
+            self._shared_stations.discard(station_id)
+        return series
+
+    def _find_partition(self, data_id: str) -> Optional[_ShardedDict]:
+        for partition in self._partitions.newest_first():
+            if data_id in partition:
+                return partition
+        return None
+
+    def _find_key(self, data_id: str) -> Optional[int]:
+        for key, partition in self._partitions.newest_first_keyed():
+            if data_id in partition:
+                return key
+        return None
+
+    def _remove_from_station(self, weather_data: 'WeatherData') -> None:
+        if not self._station_data.get(weather_data.station_id):
+            return
+
+        series = self._station_series(weather_data.station_id)
+        series.remove(weather_data)
+        if series:
+            self._latest[weather_data.station_id] = series.last()
+        else:
+            self._latest.pop(weather_data.station_id, None)
 
-        if weather_data.station_id not in self._station_data:
-            self._station_data[weather_data.station_id] = []
-        self._station_data[weather_data.station_id].append(weather_data)
+    async def save(self, weather_data: 'WeatherData') -> None:
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append(weather_data)
+
+            previous_key = self._find_key(weather_data.id)
+            if previous_key is not None:
+                # Повторное сохранение записи - убираем старую версию из ряда станции
+                previous_partition = self._partitions.writable(previous_key)
+                self._remove_from_station(previous_partition.pop(weather_data.id))
+
+            self._partitions.for_time(_ms(weather_data.timestamp))[weather_data.id] = weather_data
+            series = self._station_series(weather_data.station_id)
+
+            # Наблюдения обычно приходят по порядку - добавляем в конец без поиска
+            if not series or weather_data.timestamp >= series.last().timestamp:
+                series.extend([weather_data])
+            else:
+                series.merge([weather_data])
+
+            self._latest[weather_data.station_id] = series.last()
+
+    async def save_many(self, weather_data_list: Iterable['WeatherData']) -> None:
+        """
+        Сохранение пакета наблюдений за один проход.
+        Уже сохраненные записи находятся пересечением множеств идентификаторов,
+        ряд каждой станции дополняется один раз.
+        """
+        пакет = {weather_data.id: weather_data for weather_data in weather_data_list}
+        if not пакет:
+            return
+        with self._writing():
+            if self._archive is not None:
+                self._archive.append_many(пакет.values())
+
+            for key, partition in self._partitions.newest_first_keyed():
+                общие = partition.intersection(пакет)
+                if общие:
+                    partition = self._partitions.writable(key)
+                    for data_id in общие:
+                        self._remove_from_station(partition.pop(data_id))
+
+            по_станциям: Dict[str, List['WeatherData']] = {}
+            for weather_data in пакет.values():
+                self._partitions.for_time(_ms(weather_data.timestamp))[weather_data.id] = weather_data
+                по_станциям.setdefault(weather_data.station_id, []).append(weather_data)
+
+            by_time = attrgetter('timestamp')
+            for station_id, новые in по_станциям.items():
+                новые.sort(key=by_time)
+                series = self._station_series(station_id)
+
+                if not series or новые[0].timestamp >= series.last().timestamp:
+                    series.extend(новые)
+                else:
+                    # Опоздавшие наблюдения - сливается только хвост ряда
+                    # от порции самого раннего из них
+                    series.merge(новые)
+
+                self._latest[station_id] = series.last()
+
+    def find(self, data_id: str) -> Optional['WeatherData']:
+        partition = self._find_partition(data_id)
+        return partition[data_id] if partition else None
 
     async def get_by_id(self, data_id: str) -> Optional['WeatherData']:
-        return self._data.get(data_id)
+        return self.find(data_id)
 
     async def get_all(self) -> List['WeatherData']:
-        return list(self._data.values())
+        return [data for partition in self._partitions for data in partition.values()]
+
+    def observations_between(self, station_id: Optional[str], начало: int, конец: int) -> List[List['WeatherData']]:
+        """
+        Наблюдения за [начало, конец] (мс): по ряду на станцию, упорядоченному по времени.
+        Без станции - все станции. История старше данных в памяти читается из архива.
+        """
+        по_станциям: Dict[str, List['WeatherData']] = {}
+        if self._archive is not None:
+            граница = self._partitions.start()
+            if граница is None or начало < граница:
+                верх = конец if граница is None else min(конец, граница - 1)
+                архив = (self._archive.scan_station(station_id, начало, верх) if station_id is not None
+                         else self._archive.scan(начало, верх))
+                for наблюдение in архив:
+                    по_станциям.setdefault(наблюдение.station_id, []).append(наблюдение)
+
+        lo, hi = _datetime_bound(начало), _datetime_bound(конец)
+        stations = [station_id] if station_id is not None else list(self._station_data)
+        for station in stations:
+            series = self._station_data.get(station)
+            наблюдения = series.between(lo, hi) if series else None
+            if наблюдения:
+                по_станциям.setdefault(station, []).extend(наблюдения)
+
+        return list(по_станциям.values())
 
     async def get_latest_by_station(self, station_id: str) -> Optional['WeatherData']:
-        if station_id not in self._station_data or not self._station_data[station_id]:
-            return None
-        return max(self._station_data[station_id], key=lambda x: x.timestamp)
+        """Одно чтение словаря - живой репозиторий можно читать без снимка из любого потока"""
+        latest = self._latest.get(station_id)
+        if latest is None and self._archive is not None:
+            latest = self._archive.latest(station_id)
+        return latest
 
     async def get_station_history(self, station_id: str, hours: int = 24) -> List['WeatherData']:
-        if station_id not in self._station_data:
-            return []
-
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [d for d in self._station_data[station_id]
-                if d.timestamp >= cutoff_time]
\ No newline at end of file
+
+        history: List['WeatherData'] = []
+        if self._archive is not None:
+            # История старше данных в памяти читается из архива
+            граница = self._partitions.start()
+            if граница is None or _ms(cutoff_time) < граница:
+                верх = int(datetime.now().timestamp() * 1000) if граница is None else граница - 1
+                history = self._archive.scan_station(station_id, _ms(cutoff_time), верх)
+
+        if station_id not in self._station_data:
+            return history
+
+        return history + self._station_data[station_id].between(cutoff_time, datetime.max)
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Удаление партиций старше cutoff. Возвращает (записей, байт)"""
+        with self._writing():
+            dropped = self._partitions.drop_before(_ms(cutoff))
+            if not dropped:
+                return 0, 0
+
+            # Ряды станций упорядочены - отрезаем префикс до границы удаленных партиций
+            boundary = datetime.fromtimestamp(self._partitions.boundary(_ms(cutoff)) / 1000)
+            for station_id, series in list(self._station_data.items()):
+                first = series.first_time()
+                if first is not None and first < boundary:
+                    series = self._station_series(station_id)
+                    series.drop_before(boundary)
+                    if not series:
+                        self._latest.pop(station_id, None)
+
+        records = sum(len(partition) for partition in dropped)
+        size = sum(estimate_bytes(partition.values()) for partition in dropped)
+        return records, size
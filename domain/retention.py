@@ -0,0 +1,142 @@
+"""
+Политика хранения и временное партиционирование репозиториев
+"""
+
+import sys
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, fields, is_dataclass
+from itertools import islice
+from typing import Any, Callable, Collection, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+P = TypeVar('P')
+
+# Длина партиции по умолчанию - сутки, в миллисекундах
+PARTITION_MS = 24 * 3600 * 1000
+
+# Сколько записей партиции измеряется для оценки её размера
+_SIZE_SAMPLE = 16
+
+
+@dataclass
+class RetentionPolicy:
+    """Сроки хранения данных по репозиториям (в днях)"""
+    weather_days: int = 30
+    sensor_days: int = 30
+    forecast_days: int = 7
+    alert_days: int = 30
+    cleanup_interval: int = 3600  # период очистки в секундах
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RetentionPolicy':
+        section = config.get("retention", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+class TimePartitions(Generic[P]):
+    """
+    Разбиение хранилища на партиции фиксированной длины по времени.
+    Устаревшие партиции удаляются целиком, без обхода отдельных записей.
+    Снимок (snapshot) разделяет партиции с живым разбиением: писатель получает
+    партицию через for_time/writable и копирует её перед первым изменением,
+    поэтому читатели снимка не видят последующих записей.
+    Партиции должны поддерживать copy().
+    """
+
+    def __init__(self, factory: Callable[[], P], partition_ms: int = PARTITION_MS):
+        self._factory = factory
+        self._partition_ms = partition_ms
+        self._keys: List[int] = []
+        self._partitions: Dict[int, P] = {}
+        # Ключи партиций, на которые ссылается выданный снимок
+        self._shared: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        """Партиции в порядке возрастания времени"""
+        return iter([self._partitions[key] for key in self._keys])
+
+    def newest_first(self) -> List[P]:
+        return [self._partitions[key] for key in reversed(self._keys)]
+
+    def newest_first_keyed(self) -> List[Tuple[int, P]]:
+        """Пары (ключ, партиция) от новых к старым - для поиска партиции, которую нужно изменить"""
+        return [(key, self._partitions[key]) for key in reversed(self._keys)]
+
+    def start(self) -> Optional[int]:
+        """Начало самой старой партиции (None, если данных нет)"""
+        return self._keys[0] * self._partition_ms if self._keys else None
+
+    def for_time(self, timestamp_ms: int) -> P:
+        """Изменяемая партиция для метки времени (создается при необходимости)"""
+        key = timestamp_ms // self._partition_ms
+        if key in self._partitions:
+            return self.writable(key)
+        partition = self._partitions[key] = self._factory()
+        if not self._keys or key > self._keys[-1]:
+            self._keys.append(key)
+        else:
+            insort(self._keys, key)
+        return partition
+
+    def writable(self, key: int) -> P:
+        """Партиция для изменения: общая со снимком партиция сначала копируется"""
+        partition = self._partitions[key]
+        if key in self._shared:
+            partition = self._partitions[key] = partition.copy()
+            self._shared.discard(key)
+        return partition
+
+    def snapshot(self) -> 'TimePartitions[P]':
+        """
+        Разбиение только для чтения на текущий момент.
+        Копируется лишь список партиций, сами партиции копирует писатель при изменении.
+        """
+        view: TimePartitions[P] = TimePartitions(self._factory, self._partition_ms)
+        view._keys = list(self._keys)
+        view._partitions = dict(self._partitions)
+        self._shared = set(self._keys)
+        return view
+
+    def overlapping(self, начало: int, конец: int) -> List[P]:
+        """Партиции, пересекающиеся с интервалом [начало, конец], по возрастанию времени"""
+        lo = bisect_left(self._keys, начало // self._partition_ms)
+        hi = bisect_right(self._keys, конец // self._partition_ms, lo)
+        return [self._partitions[key] for key in self._keys[lo:hi]]
+
+    def since(self, начало: int) -> List[P]:
+        """Партиции, содержащие данные не старше начала"""
+        lo = bisect_left(self._keys, начало // self._partition_ms)
+        return [self._partitions[key] for key in self._keys[lo:]]
+
+    def boundary(self, cutoff_ms: int) -> int:
+        """Граница, до которой партиции целиком старше cutoff_ms"""
+        return (cutoff_ms // self._partition_ms) * self._partition_ms
+
+    def drop_before(self, cutoff_ms: int) -> List[P]:
+        """Удаление партиций, целиком лежащих раньше cutoff_ms"""
+        i = bisect_left(self._keys, cutoff_ms // self._partition_ms)
+        dropped = [self._partitions.pop(key) for key in self._keys[:i]]
+        self._shared.difference_update(self._keys[:i])
+        del self._keys[:i]
+        return dropped
+
+
+def record_size(record: Any) -> int:
+    """Приблизительный размер записи в байтах вместе со значениями полей"""
+    size = sys.getsizeof(record)
+    attributes = getattr(record, "__dict__", None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+    if is_dataclass(record):
+        size += sum(sys.getsizeof(getattr(record, f.name)) for f in fields(record))
+    return size
+
+
+def estimate_bytes(records: Collection[Any]) -> int:
+    """Оценка занимаемой памяти по выборке записей"""
+    if not records:
+        return 0
+    sample = list(islice(records, _SIZE_SAMPLE))
+    return len(records) * sum(map(record_size, sample)) // len(sample)
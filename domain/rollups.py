@@ -0,0 +1,440 @@
+"""
+Многоуровневые агрегаты данных сенсоров (минута, час, сутки)
+Агрегаты обновляются при приеме данных и позволяют строить отчеты за длинные
+периоды по сотням строк вместо миллионов сырых измерений.
+"""
+
+import json
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .models import WEATHER_READINGS, SensorColumns
+from .sensor_view import MAX_TIME
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+
+# Минимальное число интервалов, при котором уровень агрегации считается подходящим для периода
+MIN_BUCKETS = 24
+
+_META = struct.Struct("<I")
+
+# Сырые данные за интервал: {тип: (времена, значения)}
+RawReader = Callable[[int, int], Dict[str, Tuple[Sequence[int], Sequence[float]]]]
+
+
+@dataclass
+class RollupSummary:
+    """Сводная статистика по набору измерений"""
+    количество: int = 0
+    сумма: float = 0.0
+    минимум: float = float("inf")
+    максимум: float = float("-inf")
+
+    @property
+    def среднее(self) -> float:
+        return self.сумма / self.количество if self.количество else 0.0
+
+    def add_values(self, values: Sequence[float]) -> None:
+        if not values:
+            return
+        self.количество += len(values)
+        self.сумма += sum(values)
+        self.минимум = min(self.минимум, min(values))
+        self.максимум = max(self.максимум, max(values))
+
+    def merge(self, other: 'RollupSummary') -> None:
+        if not other.количество:
+            return
+        self.количество += other.количество
+        self.сумма += other.сумма
+        self.минимум = min(self.минимум, other.минимум)
+        self.максимум = max(self.максимум, other.максимум)
+
+
+class _RollupSeries:
+    """
+    Интервалы одного уровня для пары (станция, тип): параллельные массивы.
+    Новые интервалы внутри ряда (опоздавшие данные) копятся в late и
+    вставляются одним слиянием в merge_late, а не сдвигом массивов на каждую точку.
+    """
+
+    __slots__ = ("starts", "counts", "totals", "minimums", "maximums", "late")
+
+    def __init__(self):
+        self.starts = array('q')
+        self.counts = array('q')
+        self.totals = array('d')
+        self.minimums = array('d')
+        self.maximums = array('d')
+        # Начало интервала -> [количество, сумма, минимум, максимум]
+        self.late: Dict[int, List] = {}
+
+    def columns(self) -> Tuple[array, ...]:
+        return self.starts, self.counts, self.totals, self.minimums, self.maximums
+
+    def add(self, start: int, value: float) -> bool:
+        """Добавление значения; True - интервал отложен в late до merge_late"""
+        starts = self.starts
+        if starts and starts[-1] == start:
+            pos = len(starts) - 1
+        elif not starts or starts[-1] < start:
+            # Обычный случай - данные приходят по порядку, интервал добавляется в конец
+            starts.append(start)
+            self.counts.append(1)
+            self.totals.append(value)
+            self.minimums.append(value)
+            self.maximums.append(value)
+            return False
+        else:
+            pos = bisect_left(starts, start)
+            if starts[pos] != start:
+                bucket = self.late.get(start)
+                if bucket is None:
+                    self.late[start] = [1, value, value, value]
+                else:
+                    bucket[0] += 1
+                    bucket[1] += value
+                    if value < bucket[2]:
+                        bucket[2] = value
+                    if value > bucket[3]:
+                        bucket[3] = value
+                return True
+
+        self.counts[pos] += 1
+        self.totals[pos] += value
+        if value < self.minimums[pos]:
+            self.minimums[pos] = value
+        if value > self.maximums[pos]:
+            self.maximums[pos] = value
+        return False
+
+    def merge_late(self) -> None:
+        """Вставка отложенных интервалов: один проход по массивам на пакет"""
+        if not self.late:
+            return
+        late = sorted(self.late.items())
+        self.late = {}
+        positions = [bisect_left(self.starts, start) for start, _ in late]
+        for index, column in enumerate(self.columns()):
+            merged = array(column.typecode)
+            prev = 0
+            for pos, (start, bucket) in zip(positions, late):
+                merged.extend(column[prev:pos])
+                merged.append(start if index == 0 else bucket[index - 1])
+                prev = pos
+            merged.extend(column[prev:])
+            column[:] = merged
+
+    def bounds(self, начало: int, конец: int) -> Tuple[int, int]:
+        """Интервалы, начинающиеся в [начало, конец)"""
+        lo = bisect_left(self.starts, начало)
+        return lo, bisect_left(self.starts, конец, lo)
+
+    def summarize(self, начало: int, конец: int, summary: RollupSummary) -> None:
+        lo, hi = self.bounds(начало, конец)
+        if lo >= hi:
+            return
+        summary.merge(RollupSummary(
+            количество=sum(self.counts[lo:hi]),
+            сумма=sum(self.totals[lo:hi]),
+            минимум=min(self.minimums[lo:hi]),
+            максимум=max(self.maximums[lo:hi])
+        ))
+
+    def drop_before(self, cutoff: int) -> int:
+        count = bisect_left(self.starts, cutoff)
+        for column in self.columns():
+            del column[:count]
+        return count
+
+
+class RollupTier:
+    """
+    Уровень агрегации с интервалом фиксированной длины.
+    Агрегаты невелики, поэтому чтение и запись согласуются короткой блокировкой,
+    общей для всех уровней хранилища.
+    """
+
+    def __init__(self, name: str, bucket_ms: int, keep_days: int,
+                 lock: Optional[threading.RLock] = None):
+        self.name = name
+        self.bucket_ms = bucket_ms
+        self.keep_days = keep_days
+        self._lock = lock or threading.RLock()
+        self._series: Dict[Tuple[str, str], _RollupSeries] = {}
+        # Ряды с отложенными опоздавшими интервалами
+        self._late: Set[_RollupSeries] = set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            return sum(len(series.starts) for series in self._series.values())
+
+    def add(self, станция: str, тип: str, timestamp: int, значение: float) -> None:
+        """Опоздавшие интервалы откладываются до flush; чтения уровня вызывают его сами"""
+        with self._lock:
+            series = self._series.get((станция, тип))
+            if series is None:
+                series = self._series[(станция, тип)] = _RollupSeries()
+            if series.add(timestamp - timestamp % self.bucket_ms, значение):
+                self._late.add(series)
+
+    def flush(self) -> None:
+        """Слияние отложенных интервалов с рядами"""
+        with self._lock:
+            for series in self._late:
+                series.merge_late()
+            self._late.clear()
+
+    def summarize(self, начало: int, конец: int, станция: Optional[str] = None
+                  ) -> Dict[str, RollupSummary]:
+        """Статистика по интервалам, начинающимся в [начало, конец), по типам измерения"""
+        результат: Dict[str, RollupSummary] = {}
+        with self._lock:
+            self.flush()
+            for (ключ_станции, тип), series in self._series.items():
+                if станция is not None and ключ_станции != станция:
+                    continue
+                series.summarize(начало, конец, результат.setdefault(тип, RollupSummary()))
+        return результат
+
+    def buckets(self, станция: str, тип: str, начало: int, конец: int
+                ) -> List[Tuple[int, RollupSummary]]:
+        """Интервалы одной станции и типа измерения в [начало, конец)"""
+        with self._lock:
+            self.flush()
+            series = self._series.get((станция, тип))
+            if series is None:
+                return []
+            lo, hi = series.bounds(начало, конец)
+            return [
+                (series.starts[i], RollupSummary(series.counts[i], series.totals[i],
+                                                 series.minimums[i], series.maximums[i]))
+                for i in range(lo, hi)
+            ]
+
+    def evict_before(self, cutoff: int) -> Tuple[int, int]:
+        records = 0
+        with self._lock:
+            self.flush()
+            for series in self._series.values():
+                records += series.drop_before(cutoff)
+        # Интервал хранится в пяти колонках по 8 байт
+        return records, records * 5 * 8
+
+
+class RollupStore:
+    """
+    Агрегаты по станциям и типам измерения на уровнях минута/час/сутки.
+    Агрегаты полны на покрытых интервалах: с covered_from (прием после создания
+    хранилища) и на интервалах, загруженных целиком (cover, загрузка архивов).
+    Остальные данные читаются из репозитория.
+    """
+
+    def __init__(self, minute_days: int = 2, hour_days: int = 90, day_days: int = 3650):
+        self._lock = threading.RLock()
+        self.tiers: List[RollupTier] = [
+            RollupTier("minute", MINUTE_MS, minute_days, self._lock),
+            RollupTier("hour", HOUR_MS, hour_days, self._lock),
+            RollupTier("day", DAY_MS, day_days, self._lock),
+        ]
+        now = int(datetime.now().timestamp() * 1000)
+        # Данные, принятые до создания хранилища, в агрегаты не попали.
+        # Покрытые интервалы [начало, конец) упорядочены и не пересекаются
+        self._covered: List[Tuple[int, int]] = [(now - now % MINUTE_MS + MINUTE_MS, MAX_TIME)]
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'RollupStore':
+        section = config.get("rollups", {})
+        return cls(**{key: section[key] for key in ("minute_days", "hour_days", "day_days")
+                      if key in section})
+
+    def add(self, станция: str, тип: str, timestamp: int, значение: float) -> None:
+        with self._lock:
+            self._add(станция, тип, timestamp, значение)
+            self._flush()
+
+    def _add(self, станция: str, тип: str, timestamp: int, значение: float) -> None:
+        for tier in self.tiers:
+            tier.add(станция, тип, timestamp, значение)
+
+    def _flush(self) -> None:
+        for tier in self.tiers:
+            tier.flush()
+
+    def add_many(self, записи: Iterable) -> None:
+        """Добавление записей ДанныеСенсора; опоздавшие интервалы вставляются один раз на пакет"""
+        with self._lock:
+            for запись in записи:
+                self._add(запись.идСтанции, запись.типИзмерения, запись.времяИзмерения, запись.значение)
+            self._flush()
+
+    def add_columns(self, колонки: SensorColumns) -> None:
+        """Добавление показаний в колонках без создания ДанныеСенсора"""
+        with self._lock:
+            for (станция, тип), (times, values) in колонки.items():
+                for timestamp, значение in zip(times, values):
+                    self._add(станция, тип, timestamp, значение)
+            self._flush()
+
+    def add_weather(self, наблюдения: Iterable) -> None:
+        """Добавление показаний WEATHER_READINGS из наблюдений WeatherData без создания ДанныеСенсора"""
+        with self._lock:
+            for наблюдение in наблюдения:
+                timestamp = int(наблюдение.timestamp.timestamp() * 1000)
+                for тип, _ in WEATHER_READINGS:
+                    self._add(наблюдение.station_id, тип, timestamp, getattr(наблюдение, тип))
+            self._flush()
+
+    @property
+    def covered_from(self) -> int:
+        """Начало непрерывного покрытия до текущего момента"""
+        with self._lock:
+            return self._covered[-1][0]
+
+    def cover(self, начало: int, конец: int) -> None:
+        """
+        Отметка интервала [начало, конец] как полного: все его данные прошли через агрегаты.
+        Вызывается после загрузки истории, которой в репозитории не было (загрузка архивов).
+        Интервал расширяется до целых минут - интервалов самого мелкого уровня.
+        """
+        начало -= начало % MINUTE_MS
+        конец += MINUTE_MS - конец % MINUTE_MS
+        with self._lock:
+            интервалы = []
+            for lo, hi in self._covered:
+                if hi < начало or lo > конец:
+                    интервалы.append((lo, hi))
+                else:
+                    начало, конец = min(начало, lo), max(конец, hi)
+            интервалы.append((начало, конец))
+            интервалы.sort()
+            self._covered = интервалы
+
+    def is_covered(self, начало: int, конец: int) -> bool:
+        """Интервал [начало, конец] целиком покрыт агрегатами"""
+        with self._lock:
+            return any(lo <= начало and конец < hi for lo, hi in self._covered)
+
+    def coverage(self, начало: int, конец: int) -> List[Tuple[int, int, bool]]:
+        """Разбиение [начало, конец) на части (начало, конец, покрыта ли агрегатами)"""
+        части = []
+        with self._lock:
+            covered = list(self._covered)
+        for lo, hi in covered:
+            if hi <= начало or lo >= конец:
+                continue
+            if lo > начало:
+                части.append((начало, lo, False))
+            части.append((max(начало, lo), min(конец, hi), True))
+            начало = min(конец, hi)
+        if начало < конец:
+            части.append((начало, конец, False))
+        return части
+
+    def tier_for_period(self, period_ms: int) -> Optional[RollupTier]:
+        """Самый грубый уровень, дающий не меньше MIN_BUCKETS интервалов за период"""
+        for tier in reversed(self.tiers):
+            if tier.bucket_ms * MIN_BUCKETS <= period_ms:
+                return tier
+        return None
+
+    def summarize(self, начало: int, конец: int, raw: RawReader,
+                  станция: Optional[str] = None) -> Dict[str, RollupSummary]:
+        """
+        Статистика за [начало, конец] по типам измерения.
+        Период разбивается на выровненные интервалы самого грубого уровня,
+        края - на интервалы более мелких уровней, остаток меньше минуты и
+        непокрытые части периода читаются из сырых данных.
+        """
+        результат: Dict[str, RollupSummary] = {}
+        конец += 1  # дальше интервалы полуоткрытые
+
+        def from_raw(lo: int, hi: int) -> None:
+            if lo < hi:
+                for тип, (_, значения) in raw(lo, hi - 1).items():
+                    результат.setdefault(тип, RollupSummary()).add_values(значения)
+
+        def from_tier(level: int, lo: int, hi: int) -> None:
+            if lo >= hi:
+                return
+            if level < 0:
+                from_raw(lo, hi)
+                return
+
+            tier = self.tiers[level]
+            aligned_lo = -(-lo // tier.bucket_ms) * tier.bucket_ms
+            aligned_hi = hi - hi % tier.bucket_ms
+            if aligned_lo >= aligned_hi:
+                from_tier(level - 1, lo, hi)
+                return
+
+            from_tier(level - 1, lo, aligned_lo)
+            for тип, summary in tier.summarize(aligned_lo, aligned_hi, станция).items():
+                результат.setdefault(тип, RollupSummary()).merge(summary)
+            from_tier(level - 1, aligned_hi, hi)
+
+        for lo, hi, покрыта in self.coverage(начало, конец):
+            if покрыта:
+                from_tier(len(self.tiers) - 1, lo, hi)
+            else:
+                from_raw(lo, hi)
+        return {тип: summary for тип, summary in результат.items() if summary.количество}
+
+    def evict_expired(self, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """Удаление интервалов старше срока хранения своего уровня. Возвращает (интервалов, байт)"""
+        now = now or datetime.now()
+        records = size = 0
+        for tier in self.tiers:
+            cutoff = int((now - timedelta(days=tier.keep_days)).timestamp() * 1000)
+            tier_records, tier_size = tier.evict_before(cutoff)
+            records += tier_records
+            size += tier_size
+        return records, size
+
+    # --- Сериализация для снимков ---
+
+    def dumps(self) -> bytes:
+        columns = []
+        with self._lock:
+            meta = {"byteorder": sys.byteorder, "covered": self._covered, "series": []}
+            self._flush()
+            for tier in self.tiers:
+                for (станция, тип), series in tier._series.items():
+                    meta["series"].append([tier.name, станция, тип, len(series.starts)])
+                    columns.extend(column.tobytes() for column in series.columns())
+        data = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        return _META.pack(len(data)) + data + b"".join(columns)
+
+    def loads(self, data: bytes) -> None:
+        (length,) = _META.unpack_from(data, 0)
+        meta = json.loads(bytes(data[_META.size:_META.size + length]).decode("utf-8"))
+        tiers = {tier.name: tier for tier in self.tiers}
+        offset = _META.size + length
+
+        for tier_name, станция, тип, count in meta["series"]:
+            series = _RollupSeries()
+            for column in series.columns():
+                size = count * column.itemsize
+                column.frombytes(data[offset:offset + size])
+                if meta["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                offset += size
+            if tier_name in tiers:
+                with self._lock:
+                    tiers[tier_name]._series[(станция, тип)] = series
+
+        with self._lock:
+            if "covered" in meta:
+                self._covered = [tuple(интервал) for интервал in meta["covered"]]
+            else:
+                # Снимки прежних версий: одно покрытие с covered_from
+                self._covered = [(meta["covered_from"], MAX_TIME)]
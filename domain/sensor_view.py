@@ -0,0 +1,144 @@
+"""
+Показания сенсоров как представление над наблюдениями станций
+Наблюдение WeatherData хранится один раз - в WeatherDataRepository. Показания
+температуры, влажности, давления и ветра (WEATHER_READINGS) выводятся из него при
+чтении, а не копируются в репозиторий сенсоров четырьмя записями ДанныеСенсора.
+Репозиторий сенсоров хранит только показания, принятые напрямую (DataIngestionController);
+выборки представления сливают оба источника по времени измерения.
+"""
+
+from array import array
+from datetime import datetime
+from heapq import merge
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .columnar_repository import _merge_series
+from .models import WEATHER_READINGS, SensorColumns, WeatherData, ДанныеСенсора
+from .repositories import IRepository, ISensorRepo, WeatherDataRepository
+
+MIN_TIME, MAX_TIME = -2 ** 63, 2 ** 63 - 1
+
+_ТИП_ПО_СУФФИКСУ = {суффикс: тип for тип, суффикс in WEATHER_READINGS}
+_ТИПЫ = tuple(тип for тип, _ in WEATHER_READINGS)
+
+
+def split_reading_id(ид: str) -> Optional[Tuple[str, str]]:
+    """(идентификатор наблюдения, тип измерения) для идентификатора выведенного показания"""
+    основа, _, суффикс = ид.rpartition("_")
+    тип = _ТИП_ПО_СУФФИКСУ.get(суффикс)
+    return (основа, тип) if основа and тип else None
+
+
+def _ms(наблюдение: WeatherData) -> int:
+    return int(наблюдение.timestamp.timestamp() * 1000)
+
+
+def _readings(ряд: List[WeatherData], тип: str, times: List[int]) -> List[ДанныеСенсора]:
+    суффикс = WEATHER_READINGS[_ТИПЫ.index(тип)][1]
+    return [ДанныеСенсора(f"{наблюдение.id}_{суффикс}", время, getattr(наблюдение, тип),
+                          тип, наблюдение.station_id)
+            for наблюдение, время in zip(ряд, times)]
+
+
+def _arrays(ряд: List[WeatherData], тип: str) -> Tuple[array, array]:
+    return (array('q', [_ms(наблюдение) for наблюдение in ряд]),
+            array('d', [getattr(наблюдение, тип) for наблюдение in ряд]))
+
+
+class SensorReadingsView(IRepository['ДанныеСенсора'], ISensorRepo):
+    """
+    Репозиторий сенсоров с выведенными из наблюдений показаниями.
+    Запись идет в репозиторий сенсоров, чтение - из него и из рядов станций WeatherDataRepository.
+    """
+
+    def __init__(self, sensors: ISensorRepo, weather: WeatherDataRepository):
+        self.sensors = sensors
+        self.weather = weather
+
+    def _types(self, тип: Optional[str]) -> Sequence[str]:
+        if тип is None:
+            return _ТИПЫ
+        return (тип,) if тип in _ТИПЫ else ()
+
+    def _derived(self, станция: Optional[str], тип: Optional[str],
+                 начало: int, конец: int) -> List[List[ДанныеСенсора]]:
+        """Упорядоченные по времени ряды выведенных показаний"""
+        типы = self._types(тип)
+        if not типы:
+            return []
+        ряды = []
+        for ряд in self.weather.observations_between(станция, начало, конец):
+            times = [_ms(наблюдение) for наблюдение in ряд]
+            ряды.extend(_readings(ряд, т, times) for т in типы)
+        return ряды
+
+    def найтиПоИд(self, ид: str) -> Optional[ДанныеСенсора]:
+        запись = self.sensors.найтиПоИд(ид)
+        if запись is not None:
+            return запись
+        разбор = split_reading_id(ид)
+        if разбор is None:
+            return None
+        наблюдение = self.weather.find(разбор[0])
+        return _readings([наблюдение], разбор[1], [_ms(наблюдение)])[0] if наблюдение is not None else None
+
+    def сохранить(self, entity: ДанныеСенсора) -> None:
+        self.sensors.сохранить(entity)
+
+    def сохранитьПакет(self, entities: Iterable[ДанныеСенсора]) -> None:
+        self.sensors.сохранитьПакет(entities)
+
+    def сохранитьКолонки(self, колонки: SensorColumns) -> None:
+        self.sensors.сохранитьКолонки(колонки)
+
+    def найтиВсе(self) -> List[ДанныеСенсора]:
+        результат = self.sensors.найтиВсе()
+        for ряд in self._derived(None, None, MIN_TIME, MAX_TIME):
+            результат.extend(ряд)
+        return результат
+
+    def получитьПоСтанции(self, станция: Optional[str], тип: Optional[str],
+                          начало: int, конец: int) -> List[ДанныеСенсора]:
+        части = [часть for часть in self._derived(станция, тип, начало, конец) if часть]
+        собственные = self.sensors.получитьПоСтанции(станция, тип, начало, конец)
+        if собственные:
+            части.append(собственные)
+        if len(части) == 1:
+            return части[0]
+        return list(merge(*части, key=attrgetter('времяИзмерения')))
+
+    def получитьЗаПериод(self, начало: int, конец: int) -> List[ДанныеСенсора]:
+        return self.получитьПоСтанции(None, None, начало, конец)
+
+    def получитьПоТипу(self, тип: str) -> List[ДанныеСенсора]:
+        return self.получитьПоСтанции(None, тип, MIN_TIME, MAX_TIME)
+
+    def получитьМассивыПоСтанции(self, станция: Optional[str], тип: str,
+                                 начало: int, конец: int) -> Tuple[Sequence[int], Sequence[float]]:
+        """Ряд (время, значение) строится из наблюдений без создания объектов ДанныеСенсора"""
+        части = []
+        if тип in _ТИПЫ:
+            части = [_arrays(ряд, тип) for ряд in self.weather.observations_between(станция, начало, конец)]
+        собственные = self.sensors.получитьМассивыПоСтанции(станция, тип, начало, конец)
+        if len(собственные[0]):
+            части.append(собственные)
+        return _merge_series(части) if части else собственные
+
+    def получитьМассивыЗаПериод(self, начало: int, конец: int) -> Dict[str, Tuple[Sequence[int], Sequence[float]]]:
+        по_типам: Dict[str, List[Tuple[Sequence[int], Sequence[float]]]] = {}
+        for ряд in self.weather.observations_between(None, начало, конец):
+            for тип in _ТИПЫ:
+                по_типам.setdefault(тип, []).append(_arrays(ряд, тип))
+        for тип, колонки in self.sensors.получитьМассивыЗаПериод(начало, конец).items():
+            if len(колонки[0]):
+                по_типам.setdefault(тип, []).append(колонки)
+        return {тип: _merge_series(части) for тип, части in по_типам.items()}
+
+    def snapshot(self) -> 'SensorReadingsView':
+        """Представление над снимками обоих репозиториев"""
+        return SensorReadingsView(self.sensors.snapshot(), self.weather.snapshot())
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Сроки хранения наблюдений применяются к WeatherDataRepository, здесь - только к собственным показаниям"""
+        return self.sensors.evict_before(cutoff)
@@ -2,11 +2,209 @@
 Модели метеостанций
 """
 
+import heapq
+import math
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from .models import GeoPoint, Метеостанция
 
+EARTH_RADIUS_KM = 6371.0
+
+# Прямоугольник на карте: (юг, запад, север, восток) в градусах
+BBox = Tuple[float, float, float, float]
+
+
+def distance_km(a: GeoPoint, b: GeoPoint) -> float:
+    """Расстояние по большому кругу (формула гаверсинусов)"""
+    return _haversine(a.latitude, a.longitude, b.latitude, b.longitude)
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _chord_to_km(chord_sq: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+def _km_to_chord(distance_km: float) -> float:
+    return 2 * math.sin(min(math.pi, distance_km / EARTH_RADIUS_KM) / 2)
+
+
+class _KDTree:
+    """
+    KD-дерево по единичным векторам станций на сфере.
+    Хорда монотонна по расстоянию на поверхности, поэтому поиск ближайших
+    и выборка по радиусу не зависят от широты и 180-го меридиана.
+    """
+
+    LEAF_SIZE = 16
+
+    def __init__(self, stations: List[Метеостанция]):
+        points = [_unit_vector(s.координаты.latitude, s.координаты.longitude) + (s,) for s in stations]
+        self._root = self._build(points) if points else []
+
+    def _build(self, points: List[tuple]):
+        if len(points) <= self.LEAF_SIZE:
+            return points
+        # Делим по оси наибольшего разброса - ячейки остаются близкими к кубам
+        axis = max(range(3), key=lambda a: max(p[a] for p in points) - min(p[a] for p in points))
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        return axis, points[mid][axis], self._build(points[:mid]), self._build(points[mid:])
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[Tuple[float, Метеостанция]]:
+        q = _unit_vector(lat, lon)
+        # Макс-куча k лучших: (-квадрат хорды, порядковый номер, станция)
+        best: List[Tuple[float, int, Метеостанция]] = []
+        counter = 0
+
+        def search(node) -> None:
+            nonlocal counter
+            if isinstance(node, list):
+                for x, y, z, station in node:
+                    d2 = (x - q[0]) ** 2 + (y - q[1]) ** 2 + (z - q[2]) ** 2
+                    counter += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, counter, station))
+                    elif -d2 > best[0][0]:
+                        heapq.heapreplace(best, (-d2, counter, station))
+                return
+            axis, split, left, right = node
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if len(best) < k or diff * diff < -best[0][0]:
+                search(far)
+
+        search(self._root)
+        return [(_chord_to_km(-d2), station) for d2, _, station in sorted(best, reverse=True)]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Метеостанция]]:
+        q = _unit_vector(lat, lon)
+        limit = _km_to_chord(radius_km) ** 2
+        found: List[Tuple[float, Метеостанция]] = []
+
+        def search(node) -> None:
+            if isinstance(node, list):
+                for x, y, z, station in node:
+                    d2 = (x - q[0]) ** 2 + (y - q[1]) ** 2 + (z - q[2]) ** 2
+                    if d2 <= limit:
+                        found.append((d2, station))
+                return
+            axis, split, left, right = node
+            diff = q[axis] - split
+            if diff < 0 or diff * diff <= limit:
+                search(left)
+            if diff >= 0 or diff * diff <= limit:
+                search(right)
+
+        search(self._root)
+        found.sort(key=lambda item: item[0])
+        return [(_chord_to_km(d2), station) for d2, station in found]
+
+
+class StationIndex:
+    """
+    Пространственный индекс станций.
+    Прямоугольники ищутся по равномерной сетке широта/долгота, ближайшие
+    станции и радиус - по KD-дереву, которое перестраивается при первом
+    запросе после изменения состава сети (станции меняются редко).
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self._columns = max(1, math.ceil(360 / cell_deg))
+        self._rows = max(1, math.ceil(180 / cell_deg))
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Метеостанция]]] = {}
+        # id(станции) -> (ячейка при добавлении, станция): координаты могут измениться до remove
+        self._stations: Dict[int, Tuple[Tuple[int, int], Метеостанция]] = {}
+        self._tree: Optional[_KDTree] = None
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def _row(self, lat: float) -> int:
+        return min(self._rows - 1, max(0, int((lat + 90) // self.cell_deg)))
+
+    def _column(self, lon: float) -> int:
+        # Долгота замкнута: ячейки за 180-м меридианом продолжаются с -180
+        return int((lon + 180) // self.cell_deg) % self._columns
+
+    def _cell(self, point: GeoPoint) -> Tuple[int, int]:
+        return self._row(point.latitude), self._column(point.longitude)
+
+    def add(self, station: Метеостанция) -> None:
+        """Повторное добавление той же станции переносит ее на текущие координаты"""
+        if id(station) in self._stations:
+            self.remove(station)
+        point = station.координаты
+        cell = self._cell(point)
+        self._cells.setdefault(cell, []).append((point.latitude, point.longitude, station))
+        self._stations[id(station)] = (cell, station)
+        self._tree = None
+
+    def remove(self, station: Метеостанция) -> None:
+        indexed = self._stations.pop(id(station), None)
+        if indexed is None:
+            return
+        cell = indexed[0]
+        entries = self._cells[cell]
+        entries[:] = [entry for entry in entries if entry[2] is not station]
+        if not entries:
+            del self._cells[cell]
+        self._tree = None
+
+    def _columns_between(self, west: float, east: float) -> Iterator[int]:
+        if east - west >= 360:
+            yield from range(self._columns)
+            return
+        column, last = self._column(west), self._column(east)
+        while True:
+            yield column
+            if column == last:
+                return
+            column = (column + 1) % self._columns
+
+    def in_bbox(self, south: float, west: float, north: float, east: float) -> List[Метеостанция]:
+        """Станции внутри прямоугольника; west > east - прямоугольник через 180-й меридиан"""
+        if west > east:
+            east += 360
+        columns = list(self._columns_between(west, east))
+        found = []
+        for row in range(self._row(south), self._row(north) + 1):
+            for column in columns:
+                for lat, lon, station in self._cells.get((row, column), ()):
+                    if south <= lat <= north and (west <= lon <= east or west <= lon + 360 <= east):
+                        found.append(station)
+        return found
+
+    def _kdtree(self) -> _KDTree:
+        if self._tree is None:
+            self._tree = _KDTree([station for _, station in self._stations.values()])
+        return self._tree
+
+    def nearest(self, center: GeoPoint, k: int = 1) -> List[Tuple[float, Метеостанция]]:
+        """k ближайших станций: список (расстояние в км, станция) по возрастанию"""
+        if k <= 0 or not self._stations:
+            return []
+        return self._kdtree().nearest(center.latitude, center.longitude, k)
+
+    def within_radius(self, center: GeoPoint, radius_km: float) -> List[Tuple[float, Метеостанция]]:
+        """Станции не дальше radius_km от точки: список (расстояние в км, станция) по возрастанию"""
+        if not self._stations:
+            return []
+        return self._kdtree().within(center.latitude, center.longitude, radius_km)
+
 
 @dataclass
 class StationNetwork:
@@ -15,18 +213,77 @@ class StationNetwork:
     name: str
     stations: List[Метеостанция] = field(default_factory=list)
     coverage_area: Dict[str, Any] = field(default_factory=dict)
+    # Границы регионов прогнозов и предупреждений: название -> (юг, запад, север, восток)
+    regions: Dict[str, BBox] = field(default_factory=dict)
+    grid_cell_deg: float = 0.5
+    _by_id: Dict[str, Метеостанция] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _spatial: StationIndex = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._spatial = StationIndex(self.grid_cell_deg)
+        stations, self.stations = self.stations, []
+        for station in stations:
+            self.add_station(station)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StationNetwork':
+        """Сеть станций из секции stations: locations и regions"""
+        section = config.get("stations", {})
+        network = cls(
+            id=section.get("network_id", "default"),
+            name=section.get("network_name", "Сеть метеостанций"),
+            regions={
+                name: (bounds["south"], bounds["west"], bounds["north"], bounds["east"])
+                for name, bounds in section.get("regions", {}).items()
+            },
+            grid_cell_deg=section.get("grid_cell_deg", 0.5)
+        )
+        for station_id, location in section.get("locations", {}).items():
+            network.add_station(Метеостанция(
+                идСтанции=station_id,
+                координаты=GeoPoint(location["lat"], location["lon"]),
+                статус=location.get("status", "активна")
+            ))
+        return network
 
     def add_station(self, station: Метеостанция) -> None:
-        self.stations.append(station)
+        """Добавление станции; станция с тем же идентификатором заменяется на месте"""
+        previous = self._by_id.get(station.идСтанции)
+        if previous is None:
+            self.stations.append(station)
+        else:
+            self._spatial.remove(previous)
+            self.stations[next(pos for pos, s in enumerate(self.stations) if s is previous)] = station
+        self._by_id[station.идСтанции] = station
+        self._spatial.add(station)
 
     def get_active_stations(self) -> List[Метеостанция]:
         return [s for s in self.stations if s.статус == "активна"]
 
     def get_station_by_id(self, station_id: str) -> Метеостанция:
-        for station in self.stations:
-            if station.идСтанции == station_id:
-                return station
-        raise ValueError(f"Станция {station_id} не найдена")
+        station = self._by_id.get(station_id)
+        if station is None:
+            raise ValueError(f"Станция {station_id} не найдена")
+        return station
+
+    def find_nearest(self, point: GeoPoint, k: int = 1) -> List[Tuple[float, Метеостанция]]:
+        """k ближайших станций к точке: (расстояние в км, станция)"""
+        return self._spatial.nearest(point, k)
+
+    def find_within_radius(self, point: GeoPoint, radius_km: float) -> List[Tuple[float, Метеостанция]]:
+        """Станции в радиусе radius_km от точки: (расстояние в км, станция)"""
+        return self._spatial.within_radius(point, radius_km)
+
+    def find_in_bbox(self, south: float, west: float, north: float, east: float) -> List[Метеостанция]:
+        """Станции внутри прямоугольника координат"""
+        return self._spatial.in_bbox(south, west, north, east)
+
+    def stations_in_region(self, region: str) -> Optional[List[Метеостанция]]:
+        """Станции региона; None, если границы региона не заданы"""
+        bounds = self.regions.get(region)
+        if bounds is None:
+            return None
+        return self._spatial.in_bbox(*bounds)
 
     def calculate_coverage(self) -> Dict[str, Any]:
         if not self.stations:
@@ -38,4 +295,4 @@ class StationNetwork:
             "stations_count": len(self.stations),
             "active_stations": active_count,
             "coverage_percentage": (active_count / len(self.stations)) * 100
-        }
\ No newline at end of file
+        }
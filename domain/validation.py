@@ -0,0 +1,287 @@
+"""
+Проверка диапазонов и нормализация точности измерений сенсоров
+Пакет записей обрабатывается векторно (NumPy) по кодам типов измерения;
+без NumPy используется построчный проход с теми же правилами.
+Показания в колонках (SensorColumns) проверяются по рядам (станция, тип) теми же правилами.
+"""
+
+from dataclasses import dataclass, field
+from itertools import chain, compress, repeat
+from operator import attrgetter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+from .models import SensorColumns, WeatherData, ДанныеСенсора, columns_size
+
+# Допустимые диапазоны значений по типам измерения; прочие типы отклоняются
+SENSOR_RANGES: Dict[str, Tuple[float, float]] = {
+    "temperature": (-60, 60),
+    "humidity": (0, 100),
+    "pressure": (600, 800),
+    "wind_speed": (0, 100),
+    "precipitation": (0, 500)
+}
+
+# Число знаков после запятой по типам измерения
+SENSOR_PRECISION: Dict[str, int] = {
+    "temperature": 1,
+    "humidity": 1,
+    "pressure": 0,
+    "wind_speed": 1,
+    "precipitation": 2
+}
+DEFAULT_PRECISION = 2
+
+# Поля WeatherData, значения которых проверяются по диапазонам SENSOR_RANGES
+WEATHER_FIELDS = ("temperature", "humidity", "pressure", "wind_speed", "precipitation")
+
+# Коды типов для векторной обработки: индекс в таблицах границ и масштаба округления
+_TYPE_CODES = {тип: код for код, тип in enumerate(SENSOR_RANGES)}
+_UNKNOWN = len(_TYPE_CODES)
+_TYPES = tuple(_TYPE_CODES)
+_type_of = attrgetter("типИзмерения")
+_value_of = attrgetter("значение")
+if np is not None:
+    # Для неизвестного типа диапазон пуст: NaN не проходит ни одно сравнение
+    _LOW = np.array([low for low, _ in SENSOR_RANGES.values()] + [np.nan])
+    _HIGH = np.array([high for _, high in SENSOR_RANGES.values()] + [np.nan])
+    _SCALE = 10.0 ** np.array([SENSOR_PRECISION.get(тип, DEFAULT_PRECISION) for тип in SENSOR_RANGES]
+                              + [DEFAULT_PRECISION])
+    # Расстояние до половины последнего знака (в его долях), ближе которого округление
+    # проверяется round(): с запасом больше погрешности умножения v*10**p
+    _HALF_TOLERANCE = 1e-6
+
+
+@dataclass
+class BatchValidation:
+    """Результат проверки пакета; пакеты большие, поэтому в repr только счетчики"""
+    accepted: List[ДанныеСенсора] = field(repr=False)  # прошедшие проверку записи с нормализованными значениями
+    rejected: Sequence[bool] = field(repr=False)       # маска отклоненных записей в порядке входного пакета
+    rejected_by_type: Dict[str, int]                   # число отклоненных записей по типам измерения
+    duplicates: int = 0                                # принятые записи, отброшенные как повторы при приеме
+
+
+@dataclass
+class ColumnValidation:
+    """Результат проверки показаний в колонках"""
+    accepted: SensorColumns = field(repr=False)  # прошедшие проверку ряды: списки времени и округленных значений
+    rejected_by_type: Dict[str, int]             # число отклоненных показаний по типам измерения
+    duplicates: int = 0                          # принятые показания, отброшенные как повторы при приеме
+
+    @property
+    def accepted_count(self) -> int:
+        return columns_size(self.accepted)
+
+
+def is_valid(запись: ДанныеСенсора) -> bool:
+    """Проверка диапазона значения одной записи"""
+    диапазон = SENSOR_RANGES.get(запись.типИзмерения)
+    if диапазон is None:
+        return False
+    return диапазон[0] <= запись.значение <= диапазон[1]
+
+
+def weather_out_of_range(наблюдение: WeatherData) -> List[str]:
+    """Поля наблюдения, значения которых вне допустимого диапазона (NaN - тоже вне)"""
+    return [поле for поле in WEATHER_FIELDS
+            if not SENSOR_RANGES[поле][0] <= getattr(наблюдение, поле) <= SENSOR_RANGES[поле][1]]
+
+
+def normalized_value(тип: str, значение: float) -> float:
+    """Значение, округленное до точности типа измерения"""
+    return round(значение, SENSOR_PRECISION.get(тип, DEFAULT_PRECISION))
+
+
+def validate_batch(записи: Sequence[ДанныеСенсора]) -> BatchValidation:
+    """
+    Проверка и нормализация пакета.
+    Пакет изменяется: значения принятых записей округляются на месте (как
+    normalized_value), новые объекты не создаются, accepted содержит те же
+    объекты. Если исходные значения еще нужны вызывающему, передаются копии.
+    """
+    if np is not None and записи:
+        try:
+            return _validate_vectorized(записи)
+        except (TypeError, ValueError):
+            # Нечисловое значение в пакете - построчная проверка отклонит только его
+            pass
+    return _validate_rows(записи)
+
+
+def _validate_vectorized(записи: Sequence[ДанныеСенсора]) -> BatchValidation:
+    # Поля записей извлекаются цепочками map без Python-кода на запись
+    count = len(записи)
+    codes = np.fromiter(map(_TYPE_CODES.get, map(_type_of, записи), repeat(_UNKNOWN)),
+                        dtype=np.intp, count=count)
+    values = np.fromiter(map(_value_of, записи), dtype=np.float64, count=count)
+
+    valid = (values >= _LOW[codes]) & (values <= _HIGH[codes])
+
+    # Значения округляются как np.round: rint(v*10**p)/10**p с масштабом своего типа.
+    # Изменяются только значения, которые округление меняет; данные приборов обычно
+    # уже нужной точности, и таких значений немного
+    scale = _SCALE[codes]
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    changed = np.flatnonzero(valid & (rounded != values))
+    if changed.size:
+        новые = rounded[changed].tolist()
+        # Деление на точную степень десяти дает ближайшее число к десятичной дроби, как round();
+        # расходиться с round() может только выбор соседа у значений в пределах погрешности
+        # умножения от половины последнего знака - их округляет round(), как построчный проход
+        доля = scaled[changed] - np.floor(scaled[changed])
+        for j in np.flatnonzero(np.abs(доля - 0.5) < _HALF_TOLERANCE).tolist():
+            запись = записи[changed[j]]
+            новые[j] = normalized_value(запись.типИзмерения, запись.значение)
+        for запись, значение in zip(map(записи.__getitem__, changed.tolist()), новые):
+            запись.значение = значение
+    accepted = list(compress(записи, valid.tolist()))
+
+    rejected = ~valid
+    rejected_by_type: Dict[str, int] = {}
+    if len(accepted) != count:
+        counts = np.bincount(codes[rejected], minlength=_UNKNOWN + 1).tolist()
+        rejected_by_type = {тип: counts[код] for тип, код in _TYPE_CODES.items() if counts[код]}
+        if counts[_UNKNOWN]:
+            for i in np.flatnonzero(rejected & (codes == _UNKNOWN)).tolist():
+                тип = записи[i].типИзмерения
+                rejected_by_type[тип] = rejected_by_type.get(тип, 0) + 1
+
+    return BatchValidation(accepted, rejected, rejected_by_type)
+
+
+def validate_columns(блоки: Iterable[SensorColumns]) -> ColumnValidation:
+    """
+    Проверка и нормализация показаний в колонках.
+    Блоки сливаются по рядам (станция, тип) в порядке следования; в accepted -
+    списки времени и значений принятых показаний, округленных как normalized_value.
+    Входные колонки не изменяются.
+    """
+    части: Dict[Tuple[str, str], List[Tuple[Sequence[int], Sequence[float]]]] = {}
+    for колонки in блоки:
+        for key, колонка in колонки.items():
+            прежние = части.get(key)
+            if прежние is None:
+                части[key] = [колонка]
+            else:
+                прежние.append(колонка)
+    ряды: SensorColumns = {}
+    for key, колонки in части.items():
+        if len(колонки) > 1:
+            ряды[key] = (list(chain.from_iterable(map(_as_list, (times for times, _ in колонки)))),
+                         list(chain.from_iterable(map(_as_list, (values for _, values in колонки)))))
+        elif len(колонки[0][0]):
+            ряды[key] = колонки[0]
+
+    if np is not None and ряды:
+        try:
+            return _validate_columns_vectorized(ряды)
+        except (TypeError, ValueError):
+            pass
+    return _validate_columns_rows(ряды)
+
+
+def _as_list(колонка: Sequence) -> list:
+    return колонка if type(колонка) is list else (колонка.tolist() if hasattr(колонка, "tolist") else list(колонка))
+
+
+def _validate_columns_vectorized(ряды: SensorColumns) -> ColumnValidation:
+    # Все ряды проверяются одним проходом: значения подряд, код типа повторяется на длину ряда
+    колонки = list(ряды.values())
+    lengths = [len(times) for times, _ in колонки]
+    count = sum(lengths)
+    if all(type(values) is list for _, values in колонки):
+        values = np.fromiter(chain.from_iterable(values for _, values in колонки), dtype=np.float64, count=count)
+    else:
+        values = np.concatenate([np.asarray(values, dtype=np.float64) for _, values in колонки])
+    codes = np.repeat(np.array([_TYPE_CODES.get(тип, _UNKNOWN) for _, тип in ряды], dtype=np.intp), lengths)
+
+    valid = (values >= _LOW[codes]) & (values <= _HIGH[codes])
+    scale = _SCALE[codes]
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    новые = values.tolist()
+    changed = np.flatnonzero(valid & (rounded != values))
+    if changed.size:
+        # Округление как в _validate_vectorized: значения у половины последнего знака - через round()
+        for i, значение in zip(changed.tolist(), rounded[changed].tolist()):
+            новые[i] = значение
+        доля = scaled[changed] - np.floor(scaled[changed])
+        for i in changed[np.abs(доля - 0.5) < _HALF_TOLERANCE].tolist():
+            новые[i] = normalized_value(_TYPES[codes[i]], float(values[i]))
+
+    accepted: SensorColumns = {}
+    rejected_by_type: Dict[str, int] = {}
+    start = 0
+    if valid.all():
+        for (key, (times, _)), length in zip(ряды.items(), lengths):
+            end = start + length
+            accepted[key] = (_as_list(times), новые[start:end])
+            start = end
+        return ColumnValidation(accepted, rejected_by_type)
+
+    starts = np.cumsum([0] + lengths[:-1])
+    принято = np.add.reduceat(valid.astype(np.intp), starts).tolist()
+    valid_list = valid.tolist()
+    for (key, (times, _)), length, n in zip(ряды.items(), lengths, принято):
+        end = start + length
+        if n == length:
+            accepted[key] = (_as_list(times), новые[start:end])
+        else:
+            rejected_by_type[key[1]] = rejected_by_type.get(key[1], 0) + length - n
+            if n:
+                маска = valid_list[start:end]
+                accepted[key] = (list(compress(_as_list(times), маска)), list(compress(новые[start:end], маска)))
+        start = end
+    return ColumnValidation(accepted, rejected_by_type)
+
+
+def _validate_columns_rows(ряды: SensorColumns) -> ColumnValidation:
+    accepted: SensorColumns = {}
+    rejected_by_type: Dict[str, int] = {}
+    for key, (times, values) in ряды.items():
+        тип = key[1]
+        диапазон = SENSOR_RANGES.get(тип)
+        точность = SENSOR_PRECISION.get(тип, DEFAULT_PRECISION)
+        принятые_times: List[int] = []
+        принятые_values: List[float] = []
+        for время, значение in zip(_as_list(times), _as_list(values)):
+            try:
+                ok = диапазон is not None and диапазон[0] <= значение <= диапазон[1]
+            except TypeError:
+                ok = False
+            if ok:
+                принятые_times.append(время)
+                принятые_values.append(round(значение, точность))
+            else:
+                rejected_by_type[тип] = rejected_by_type.get(тип, 0) + 1
+        if принятые_times:
+            accepted[key] = (принятые_times, принятые_values)
+    return ColumnValidation(accepted, rejected_by_type)
+
+
+def _validate_rows(записи: Sequence[ДанныеСенсора]) -> BatchValidation:
+    accepted: List[ДанныеСенсора] = []
+    rejected: List[bool] = []
+    rejected_by_type: Dict[str, int] = {}
+
+    for запись in записи:
+        тип = запись.типИзмерения
+        диапазон = SENSOR_RANGES.get(тип)
+        try:
+            ok = диапазон is not None and диапазон[0] <= запись.значение <= диапазон[1]
+        except TypeError:
+            ok = False
+
+        rejected.append(not ok)
+        if ok:
+            запись.значение = round(запись.значение, SENSOR_PRECISION.get(тип, DEFAULT_PRECISION))
+            accepted.append(запись)
+        else:
+            rejected_by_type[тип] = rejected_by_type.get(тип, 0) + 1
+
+    return BatchValidation(accepted, rejected, rejected_by_type)
@@ -0,0 +1,152 @@
+"""
+Водяные знаки времени измерения по станциям
+Для каждой станции отслеживается самое позднее принятое время измерения;
+водяной знак - это время минус допустимое опоздание. Показание со временем
+измерения ниже водяного знака считается опоздавшим (досылка после обрыва связи,
+загрузка архива): хранилища вливают его в упорядоченные ряды, а окно, которое
+оно затрагивает, отмечается для пересчета производных данных.
+Задержка прихода (время приема минус время измерения) собирается в гистограмму.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from itertools import chain, repeat
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import SensorColumns, WeatherData, ДанныеСенсора
+
+# Границы интервалов гистограммы задержки прихода, мс
+LATENESS_BUCKETS_MS = (1_000, 10_000, 60_000, 600_000, 3_600_000, 86_400_000)
+LATENESS_LABELS = ("<1s", "<10s", "<1m", "<10m", "<1h", "<1d", ">=1d")
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+@dataclass(slots=True)
+class _StationWatermark:
+    """Водяной знак и счетчики опозданий одной станции"""
+    max_event_time: int
+    watermark: int
+    readings: int = 0
+    late: int = 0
+    # Наибольшее отставание опоздавшего показания от самого позднего измерения станции, мс
+    max_lateness: int = 0
+    # Начало окна с опоздавшими показаниями, еще не переданного на пересчет
+    affected_from: Optional[int] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "max_event_time": self.max_event_time,
+            "watermark": self.watermark,
+            "readings": self.readings,
+            "late": self.late,
+            "max_lateness_ms": self.max_lateness
+        }
+
+
+class WatermarkTracker:
+    """
+    Водяные знаки станций и распределение задержек прихода.
+    Вызывается при каждом приеме (в том числе писателями конвейера из пула потоков).
+    take_affected() отдает станции с опоздавшими показаниями и начало затронутого окна -
+    по ним производные данные пересчитываются точечно, а не целиком.
+    """
+
+    def __init__(self, allowed_lateness: float = 60.0):
+        # Допустимое опоздание, с: показания в его пределах - обычный поток не по порядку
+        self.allowed_lateness = allowed_lateness
+        self._allowed_ms = int(allowed_lateness * 1000)
+        self._stations: Dict[str, _StationWatermark] = {}
+        self._lock = threading.Lock()
+
+        # Метрики
+        self.readings = 0
+        self.late = 0
+        self.histogram: List[int] = [0] * len(LATENESS_LABELS)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'WatermarkTracker':
+        section = config.get("ingestion", {}).get("watermarks", {})
+        return cls(**{key: section[key] for key in ("allowed_lateness",) if key in section})
+
+    def observe(self, stations: Iterable[str], event_times: Iterable[int], arrival: Optional[int] = None) -> int:
+        """
+        Учет принятых показаний (станция, время измерения в мс).
+        Возвращает число опоздавших - оказавшихся ниже водяного знака своей станции.
+        """
+        arrival = _now_ms() if arrival is None else arrival
+        late = 0
+        count = 0
+        with self._lock:
+            histogram = self.histogram
+            for station, event_time in zip(stations, event_times):
+                count += 1
+                delay = arrival - event_time
+                # Измерения "из будущего" (расхождение часов) - в первом интервале
+                histogram[bisect_right(LATENESS_BUCKETS_MS, delay) if delay > 0 else 0] += 1
+
+                state = self._stations.get(station)
+                if state is None:
+                    state = self._stations[station] = _StationWatermark(event_time, event_time - self._allowed_ms)
+                elif event_time > state.max_event_time:
+                    state.max_event_time = event_time
+                    state.watermark = event_time - self._allowed_ms
+                elif event_time < state.watermark:
+                    late += 1
+                    state.late += 1
+                    state.max_lateness = max(state.max_lateness, state.max_event_time - event_time)
+                    if state.affected_from is None or event_time < state.affected_from:
+                        state.affected_from = event_time
+                state.readings += 1
+
+            self.readings += count
+            self.late += late
+        return late
+
+    def observe_readings(self, записи: List[ДанныеСенсора], arrival: Optional[int] = None) -> int:
+        return self.observe(map(attrgetter("идСтанции"), записи), map(attrgetter("времяИзмерения"), записи), arrival)
+
+    def observe_columns(self, колонки: SensorColumns, arrival: Optional[int] = None) -> int:
+        stations = chain.from_iterable(repeat(станция, len(times)) for (станция, _), (times, _) in колонки.items())
+        return self.observe(stations, chain.from_iterable(times for times, _ in колонки.values()), arrival)
+
+    def observe_weather(self, наблюдения: List[WeatherData], arrival: Optional[int] = None) -> int:
+        return self.observe([наблюдение.station_id for наблюдение in наблюдения],
+                            [int(наблюдение.timestamp.timestamp() * 1000) for наблюдение in наблюдения], arrival)
+
+    def watermark(self, station: str) -> Optional[int]:
+        state = self._stations.get(station)
+        return state.watermark if state is not None else None
+
+    def is_late(self, station: str, event_time: int) -> bool:
+        """Измерение ниже водяного знака станции - досылка, а не живой поток"""
+        state = self._stations.get(station)
+        return state is not None and event_time < state.watermark
+
+    def take_affected(self) -> Dict[str, int]:
+        """Станции с опоздавшими показаниями после прошлого вызова -> начало затронутого окна, мс"""
+        with self._lock:
+            affected = {}
+            for station, state in self._stations.items():
+                if state.affected_from is not None:
+                    affected[station] = state.affected_from
+                    state.affected_from = None
+            return affected
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stations = {station: state.summary() for station, state in self._stations.items()}
+            histogram = dict(zip(LATENESS_LABELS, self.histogram))
+        return {
+            "allowed_lateness": self.allowed_lateness,
+            "readings": self.readings,
+            "late": self.late,
+            "late_share": self.late / self.readings if self.readings else 0.0,
+            "arrival_delay": histogram,
+            "stations": stations
+        }
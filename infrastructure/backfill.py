@@ -0,0 +1,256 @@
+"""
+Загрузка исторических архивов станций из CSV (backfill)
+Файл делится на фрагменты по границам строк, фрагменты разбираются в пуле
+процессов, а наблюдения записываются пакетной записью DataController.ingest_many
+строго в порядке фрагментов. После фиксации (сброс буферов хранилищ) смещение
+конца последнего записанного фрагмента сохраняется в файле состояния: повторный
+запуск продолжает с него. В обработке одновременно не больше window фрагментов,
+поэтому память разбора не зависит от размера файла. Загруженные строки остаются
+в хранилище: сроки хранения к ним применяет обычная очистка, а не загрузка.
+
+Загружаемый период отмечается в агрегатах как покрытый (RollupStore.cover) -
+отчеты за него строятся по агрегатам. Предполагается, что архив загружает
+историю, которой в хранилище еще нет.
+
+Формат: первая строка - заголовок. Обязательные колонки station_id, timestamp,
+temperature; необязательные id, humidity, pressure, wind_speed, wind_direction,
+precipitation, phenomena. timestamp - миллисекунды эпохи или ISO 8601.
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from controllers.data_controller import DataController
+from domain.models import WeatherData
+from domain.sensor_view import MAX_TIME, MIN_TIME
+
+REQUIRED_COLUMNS = ("station_id", "timestamp", "temperature")
+# Необязательные колонки и значения по умолчанию, в порядке полей WeatherData
+OPTIONAL_COLUMNS = (("humidity", 0.0), ("pressure", 0.0), ("wind_speed", 0.0),
+                    ("wind_direction", ""), ("precipitation", 0.0))
+
+MiB = 1024 * 1024
+
+
+@dataclass
+class BackfillPolicy:
+    """Параметры загрузки архивов (секция backfill)"""
+    workers: int = 0  # 0 - по числу процессоров
+    chunk_bytes: int = 1 * MiB
+    # Фрагментов в разборе и ожидании записи; 0 - workers + 1
+    window: int = 0
+    # Фиксация (сброс хранилищ, снимок, смещение) не чаще, чем раз в столько байт
+    commit_bytes: int = 64 * MiB
+    delimiter: str = ","
+    state_dir: str = "data/backfill"
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'BackfillPolicy':
+        section = config.get("backfill", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+class BackfillError(ValueError):
+    """Файл нельзя загрузить: нет обязательных колонок"""
+
+
+def _timestamp(value: str) -> Tuple[int, datetime]:
+    """Метка времени (мс эпохи, datetime): миллисекунды эпохи или строка ISO 8601"""
+    if value.isdigit():
+        ms = int(value)
+        return ms, datetime.fromtimestamp(ms / 1000)
+    moment = datetime.fromisoformat(value)
+    return int(moment.timestamp() * 1000), moment
+
+
+def _parse_chunk(path: str, start: int, end: int, header: List[str],
+                 delimiter: str) -> Tuple[int, List[tuple], Dict[str, int]]:
+    """
+    Разбор фрагмента [start, end) в процессе пула.
+    Возвращает смещение конца, строки в порядке полей WeatherData и отклоненные по причинам.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8", errors="replace")
+
+    station_col, time_col, temperature_col = (header.index(name) for name in REQUIRED_COLUMNS)
+    id_col = header.index("id") if "id" in header else None
+    phenomena_col = header.index("phenomena") if "phenomena" in header else None
+    optional = [(header.index(name) if name in header else None, default) for name, default in OPTIONAL_COLUMNS]
+    width = max(station_col, time_col, temperature_col)
+
+    rows: List[tuple] = []
+    rejected: Dict[str, int] = {}
+    for values in csv.reader(text.splitlines(), delimiter=delimiter):
+        if not values:
+            continue
+        if len(values) <= width or not values[station_col]:
+            rejected["missing_field"] = rejected.get("missing_field", 0) + 1
+            continue
+        try:
+            station_id = values[station_col]
+            ms, moment = _timestamp(values[time_col])
+            humidity, pressure, wind_speed, wind_direction, precipitation = (
+                default if col is None or col >= len(values) or not values[col]
+                else type(default)(values[col])
+                for col, default in optional
+            )
+            rows.append((
+                values[id_col] if id_col is not None and id_col < len(values) and values[id_col]
+                else f"{station_id}_{ms}",
+                station_id, moment, float(values[temperature_col]),
+                humidity, pressure, wind_speed, wind_direction, precipitation,
+                values[phenomena_col] if phenomena_col is not None and phenomena_col < len(values) else ""
+            ))
+        except ValueError:
+            rejected["invalid_value"] = rejected.get("invalid_value", 0) + 1
+
+    return end, rows, rejected
+
+
+def _chunk_bounds(path: str, start: int, chunk_bytes: int) -> Iterator[Tuple[int, int]]:
+    """Фрагменты [начало, конец) примерно по chunk_bytes, выровненные по концу строки"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + chunk_bytes, size) - 1)
+            f.readline()
+            end = min(f.tell(), size)
+            yield start, end
+            start = end
+
+
+class BackfillImporter:
+    """Возобновляемая загрузка CSV-архивов через пакетную запись DataController"""
+
+    def __init__(self, data_controller: DataController, policy: BackfillPolicy = None,
+                 commit: Optional[Callable[[], None]] = None):
+        """commit - сброс буферизованных записей хранилищ перед сохранением смещения"""
+        self.data_controller = data_controller
+        self.policy = policy or BackfillPolicy()
+        self.commit = commit
+        self.logger = logging.getLogger(__name__)
+
+    def _state_path(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.policy.state_dir, f"{os.path.basename(path)}.{key}.json")
+
+    def _load_state(self, path: str, size: int) -> Dict[str, Any]:
+        """Зафиксированное смещение и число загруженных строк прошлых запусков"""
+        try:
+            with open(self._state_path(path), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {"offset": 0, "rows": 0}
+        if state.get("size", 0) > size:
+            # Файл заменен более коротким - прежнее смещение к нему не относится
+            self.logger.warning(f"{path}: файл изменился после прошлой загрузки, загрузка с начала")
+            return {"offset": 0, "rows": 0}
+        return state
+
+    def _save_offset(self, path: str, offset: int, size: int, rows: int) -> None:
+        os.makedirs(self.policy.state_dir, exist_ok=True)
+        state_path = self._state_path(path)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": os.path.abspath(path), "offset": offset, "size": size, "rows": rows,
+                       "committed_at": datetime.now().isoformat()}, f)
+        os.replace(tmp_path, state_path)
+
+    @staticmethod
+    def _header(path: str, delimiter: str) -> Tuple[List[str], int]:
+        with open(path, "rb") as f:
+            line = f.readline()
+            offset = f.tell()
+        header = [name.strip() for name in next(csv.reader([line.decode("utf-8-sig")], delimiter=delimiter), [])]
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise BackfillError(f"{path}: нет обязательных колонок {', '.join(missing)}")
+        return header, offset
+
+    async def _commit(self, path: str, offset: int, size: int, rows: int) -> None:
+        if self.commit is not None:
+            self.commit()
+        self._save_offset(path, offset, size, rows)
+
+    async def run(self, path: str, restart: bool = False) -> Dict[str, Any]:
+        """Загрузка файла с последнего зафиксированного смещения; возвращает итоги и скорость"""
+        policy = self.policy
+        header, data_start = self._header(path, policy.delimiter)
+        size = os.path.getsize(path)
+        if restart and os.path.exists(self._state_path(path)):
+            os.remove(self._state_path(path))
+        state = self._load_state(path, size)
+        start = max(state["offset"], data_start)
+        if start > data_start:
+            self.logger.info(f"{path}: продолжение с байта {start} из {size}")
+
+        workers = policy.workers or os.cpu_count() or 1
+        window = policy.window or workers + 1
+        loop = asyncio.get_running_loop()
+
+        totals = {"rows": 0, "rejected": 0, "duplicates": 0}
+        rejected_by_reason: Dict[str, int] = {}
+        offset = committed = start
+        span = [MAX_TIME, MIN_TIME]
+        started = time.perf_counter()
+        pending: deque = deque()
+
+        async def write_next() -> None:
+            """Запись следующего по порядку разобранного фрагмента и, если пора, фиксация"""
+            nonlocal offset, committed
+            offset, parsed, chunk_rejected = await pending.popleft()
+            saved = await self.data_controller.ingest_many([WeatherData(*row) for row in parsed])
+            rollups = self.data_controller.rollups
+            if rollups is not None and parsed:
+                # Покрывается весь загруженный период, а не каждый фрагмент отдельно:
+                # промежутки между фрагментами не дробят покрытие
+                moments = [row[2] for row in parsed]
+                span[0] = min(span[0], int(min(moments).timestamp() * 1000))
+                span[1] = max(span[1], int(max(moments).timestamp() * 1000))
+                rollups.cover(*span)
+            totals["rows"] += saved
+            totals["duplicates"] += len(parsed) - saved
+            totals["rejected"] += sum(chunk_rejected.values())
+            for reason, count in chunk_rejected.items():
+                rejected_by_reason[reason] = rejected_by_reason.get(reason, 0) + count
+
+            if offset - committed >= policy.commit_bytes:
+                await self._commit(path, offset, size, state["rows"] + totals["rows"])
+                committed = offset
+                self.logger.info(f"{path}: {offset / size:.1%}, строк {totals['rows']}, "
+                                 f"{totals['rows'] / (time.perf_counter() - started):.0f} строк/с")
+
+        # spawn: рабочие процессы не наследуют репозитории и потоки родителя
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for chunk_start, chunk_end in _chunk_bounds(path, start, policy.chunk_bytes):
+                pending.append(loop.run_in_executor(pool, _parse_chunk, path, chunk_start, chunk_end,
+                                                    header, policy.delimiter))
+                if len(pending) >= window:
+                    await write_next()
+            while pending:
+                await write_next()
+
+        if offset > committed:
+            await self._commit(path, offset, size, state["rows"] + totals["rows"])
+
+        elapsed = time.perf_counter() - started
+        return {
+            "path": path,
+            **totals,
+            "rejected_by_reason": rejected_by_reason,
+            "bytes": offset - start,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(totals["rows"] / elapsed) if elapsed else 0
+        }
@@ -8,6 +8,7 @@ Application_Bootstrap->(использует)Configuration_Manager
 
 import asyncio
 import logging
+import os
 import signal
 import sys
 from typing import Dict, Any, Type
@@ -55,6 +56,123 @@ class Application_Bootstrap:
             print(f"\nКритическая ошибка: {e}")
             sys.exit(1)
 
+    @staticmethod
+    def backfill(args: list) -> None:
+        """
+        Загрузка исторических архивов CSV без запуска системы:
+        python main.py backfill archive.csv [...] [--workers N] [--chunk-mb M] [--restart]
+        """
+        import argparse
+        from controllers.data_controller import DataController
+        from infrastructure.backfill import BackfillError, BackfillImporter, BackfillPolicy
+        from infrastructure.snapshots import SnapshotManager
+
+        parser = argparse.ArgumentParser(prog="main.py backfill",
+                                         description="Загрузка исторических архивов станций из CSV")
+        parser.add_argument("files", nargs="+", help="CSV-файлы с заголовком")
+        parser.add_argument("--workers", type=int, help="процессов разбора (по умолчанию - по числу процессоров)")
+        parser.add_argument("--chunk-mb", type=float, help="размер фрагмента разбора, МБ")
+        parser.add_argument("--delimiter", help="разделитель полей")
+        parser.add_argument("--restart", action="store_true", help="загрузка с начала, без сохраненного смещения")
+        options = parser.parse_args(args)
+
+        config = ConfigurationManager().загрузитьНастройки()
+        Application_Bootstrap.инициализироватьСистему(config)
+        di_container = Application_Bootstrap._di_container
+
+        policy = BackfillPolicy.from_config(config)
+        if options.workers is not None:
+            policy.workers = options.workers
+        if options.chunk_mb is not None:
+            policy.chunk_bytes = int(options.chunk_mb * 1024 * 1024)
+        if options.delimiter is not None:
+            policy.delimiter = options.delimiter
+        importer = BackfillImporter(di_container.разрешить(DataController), policy,
+                                    commit=Application_Bootstrap._commit_storage)
+
+        async def run() -> None:
+            # Снимок перезаписывается при каждой фиксации - сначала он загружается целиком
+            snapshot_manager = di_container.get_singleton_instances().get(SnapshotManager)
+            if snapshot_manager is not None:
+                await snapshot_manager.load_remaining()
+
+            for path in options.files:
+                result = await importer.run(path, restart=options.restart)
+                print(f"{path}: загружено строк {result['rows']}, отклонено {result['rejected']}, "
+                      f"повторов {result['duplicates']} за {result['seconds']} с - "
+                      f"{result['rows_per_second']} строк/с")
+
+        try:
+            asyncio.run(run())
+        except (BackfillError, OSError) as e:
+            print(f"Ошибка загрузки: {e}")
+            sys.exit(1)
+        finally:
+            Application_Bootstrap._save_snapshot()
+            Application_Bootstrap._close_storage()
+
+    @staticmethod
+    def replay(args: list) -> None:
+        """
+        Воспроизведение записанного трафика приема без опроса источников и API:
+        python main.py replay traffic.ndjson [--speed 10] [--max-in-flight N] [--configured-storage]
+        """
+        import argparse
+        import copy
+        from controllers.data_controller import DataController
+        from infrastructure.replay import ReplayPolicy, TrafficReplayer
+        from services.traffic_recorder import RecordingError
+
+        parser = argparse.ArgumentParser(prog="main.py replay",
+                                         description="Воспроизведение записи трафика приема с ускорением")
+        parser.add_argument("file", help="файл записи запуска (ingestion.recording, имя со временем запуска)")
+        parser.add_argument("--speed", type=float, help="ускорение: 1, 10, 100")
+        parser.add_argument("--max-in-flight", type=int, help="пакетов в доставке одновременно")
+        parser.add_argument("--configured-storage", action="store_true",
+                            help="писать в хранилища из конфигурации (по умолчанию - в память)")
+        options = parser.parse_args(args)
+
+        config = copy.deepcopy(ConfigurationManager().загрузитьНастройки())
+        # Воспроизведение не записывается повторно
+        config.setdefault("ingestion", {}).setdefault("recording", {})["enabled"] = False
+        if not options.configured_storage:
+            # Без побочных эффектов: хранилища только в памяти, снимок не загружается и не пишется
+            config.setdefault("database", {})["engine"] = "memory"
+            config.setdefault("storage", {}).setdefault("segment_log", {})["enabled"] = False
+            config.setdefault("snapshots", {})["enabled"] = False
+
+        policy = ReplayPolicy.from_config(config)
+        if options.speed is not None:
+            policy.speed = options.speed
+        if options.max_in_flight is not None:
+            policy.max_in_flight = options.max_in_flight
+
+        Application_Bootstrap.инициализироватьСистему(config)
+        di_container = Application_Bootstrap._di_container
+        replayer = TrafficReplayer(di_container.разрешить(DataController),
+                                   di_container.разрешить(ControllerFactory).создатьDataController(), policy)
+
+        try:
+            result = asyncio.run(replayer.run(options.file))
+        except (RecordingError, OSError, ValueError) as e:
+            print(f"Ошибка воспроизведения: {e}")
+            sys.exit(1)
+        finally:
+            if options.configured_storage:
+                Application_Bootstrap._close_storage()
+
+        print(f"{options.file}: пакетов {result['entries']}, записей {result['records']}, "
+              f"ошибок {result['errors']}")
+        print(f"  запись {result['recorded_seconds']} с, воспроизведение {result['seconds']} с - "
+              f"ускорение {result['achieved_speed']}x из {policy.speed:g}x, {result['records_per_second']} записей/с")
+        print(f"  задержка очереди, мс: {result['queue_ms']}")
+        print(f"  полная задержка, мс: {result['latency_ms']}")
+        if result["pipeline"] is not None:
+            pipeline = result["pipeline"]
+            print(f"  конвейер: записано {pipeline['records_written']}, сброшено {pipeline['dropped_records']}, "
+                  f"наибольшая очередь {pipeline['max_queue_records']} записей, "
+                  f"ожидание места {pipeline['blocked_seconds']:.2f} с")
+
     @staticmethod
     def инициализироватьСистему(config: Dict[str, Any]) -> None:
         """+инициализироватьСистему(конфиг:Config):void"""
@@ -80,6 +198,9 @@ class Application_Bootstrap:
         Application_Bootstrap._di_container = di_container
         Application_Bootstrap._config = config
 
+        # Восстановление последних наблюдений из снимка (остальное - в фоне)
+        Application_Bootstrap._restore_snapshot(di_container, config)
+
         logger.info("Система инициализирована успешно")
 
     @staticmethod
@@ -91,12 +212,20 @@ class Application_Bootstrap:
             AlertRepository,
             SensorDataRepository
         )
+        from domain.retention import RetentionPolicy
+        from domain.rollups import RollupStore
+        from domain.sensor_view import SensorReadingsView
+        from domain.stations import StationNetwork
+        from domain.watermarks import WatermarkTracker
         from services.forecast_service import ForecastService
         from services.alert_service import AlertService
         from controllers.data_controller import DataController
         from controllers.forecast_controller import ForecastController
         from controllers.alerts_controller import AlertsAlertController
-        from controllers.data_ingestion_controller import DataIngestionController
+        from controllers.data_ingestion_controller import DataIngestionController, PollingPolicy
+        from services.ingestion_pipeline import PipelinePolicy
+        from services.deduplication import ReadingDeduplicator
+        from services.traffic_recorder import RecordingPolicy, TrafficRecorder
         from controllers.forecast_service_controller import ForecastServiceController
         from controllers.report_controller import ReportController
         from controllers.analysis_alert_controller import AnalysisAlertController
@@ -111,10 +240,85 @@ class Application_Bootstrap:
             ПанельКлиматолога = None
 
         # Регистрация репозиториев
-        di_container.зарегистрировать(WeatherDataRepository, WeatherDataRepository)
-        di_container.зарегистрировать(ForecastRepository, ForecastRepository)
-        di_container.зарегистрировать(AlertRepository, AlertRepository)
-        di_container.зарегистрировать(SensorDataRepository, SensorDataRepository)
+        database_config = config.get("database", {})
+        if database_config.get("engine", "memory") == "sqlite":
+            from infrastructure.sqlite_repositories import (
+                SQLiteDatabase,
+                SQLiteWeatherDataRepository,
+                SQLiteForecastRepository,
+                SQLiteAlertRepository,
+                SQLiteSensorDataRepository
+            )
+
+            database = SQLiteDatabase(
+                database_config.get("path", "weather.db"),
+                batch_size=database_config.get("batch_size", 500),
+                flush_interval=database_config.get("flush_interval", 1.0)
+            )
+            di_container.зарегистрировать(SQLiteDatabase, database, is_instance=True)
+            di_container.зарегистрировать(WeatherDataRepository, SQLiteWeatherDataRepository(database), is_instance=True)
+            di_container.зарегистрировать(ForecastRepository, SQLiteForecastRepository(database), is_instance=True)
+            di_container.зарегистрировать(AlertRepository, SQLiteAlertRepository(database), is_instance=True)
+            di_container.зарегистрировать(SensorDataRepository, SQLiteSensorDataRepository(database), is_instance=True)
+        else:
+            di_container.зарегистрировать(ForecastRepository, ForecastRepository)
+            di_container.зарегистрировать(AlertRepository, AlertRepository)
+
+            # Архив сырой истории в журнале сегментов
+            storage_config = config.get("storage", {})
+            segment_config = storage_config.get("segment_log", {})
+            weather_archive = sensor_archive = None
+            if segment_config.get("enabled", False):
+                from infrastructure.segment_log import SensorSegmentArchive, WeatherSegmentArchive
+
+                directory = segment_config.get("directory", "data/segments")
+                segment_records = segment_config.get("segment_records", 1_000_000)
+                weather_archive = WeatherSegmentArchive(os.path.join(directory, "weather"), segment_records)
+                sensor_archive = SensorSegmentArchive(os.path.join(directory, "sensor"), segment_records)
+                di_container.зарегистрировать(WeatherSegmentArchive, weather_archive, is_instance=True)
+                di_container.зарегистрировать(SensorSegmentArchive, sensor_archive, is_instance=True)
+
+            di_container.зарегистрировать(WeatherDataRepository, WeatherDataRepository(weather_archive), is_instance=True)
+
+            # Выбор реализации хранилища данных сенсоров
+            sensor_backend = storage_config.get("sensor_backend", "memory")
+            if sensor_backend == "columnar":
+                from domain.columnar_repository import ColumnarSensorDataRepository
+                di_container.зарегистрировать(SensorDataRepository, ColumnarSensorDataRepository(sensor_archive),
+                                              is_instance=True)
+            else:
+                di_container.зарегистрировать(SensorDataRepository, SensorDataRepository(sensor_archive), is_instance=True)
+
+        # Показания сенсоров для чтения: показания наблюдений выводятся из WeatherDataRepository
+        di_container.зарегистрировать(
+            SensorReadingsView,
+            lambda: SensorReadingsView(di_container.разрешить(SensorDataRepository),
+                                       di_container.разрешить(WeatherDataRepository))
+        )
+
+        # Политика хранения данных
+        di_container.зарегистрировать(RetentionPolicy, RetentionPolicy.from_config(config), is_instance=True)
+
+        # Агрегаты данных сенсоров для отчетов за длинные периоды
+        di_container.зарегистрировать(RollupStore, RollupStore.from_config(config), is_instance=True)
+
+        # Сеть станций с пространственным индексом
+        di_container.зарегистрировать(StationNetwork, StationNetwork.from_config(config), is_instance=True)
+
+        # Параметры параллельного опроса источников
+        di_container.зарегистрировать(PollingPolicy, PollingPolicy.from_config(config), is_instance=True)
+        di_container.зарегистрировать(PipelinePolicy, PipelinePolicy.from_config(config), is_instance=True)
+
+        # Общий для всех путей приема фильтр повторно отправленных показаний
+        di_container.зарегистрировать(ReadingDeduplicator, ReadingDeduplicator.from_config(config), is_instance=True)
+
+        # Водяные знаки времени измерения по станциям, общие для всех путей приема
+        di_container.зарегистрировать(WatermarkTracker, WatermarkTracker.from_config(config), is_instance=True)
+
+        # Запись входящего трафика приема для воспроизведения (main.py replay)
+        recording = RecordingPolicy.from_config(config)
+        if recording.enabled:
+            di_container.зарегистрировать(TrafficRecorder, TrafficRecorder(recording.run_path()), is_instance=True)
 
         # Регистрация сервисов
         di_container.зарегистрировать(ForecastService, ForecastService)
@@ -126,7 +330,11 @@ class Application_Bootstrap:
         di_container.зарегистрировать(AlertsAlertController, AlertsAlertController)
         di_container.зарегистрировать(DataIngestionController, DataIngestionController)
         di_container.зарегистрировать(ForecastServiceController, ForecastServiceController)
-        di_container.зарегистрировать(ReportController, ReportController)
+        di_container.зарегистрировать(
+            ReportController,
+            lambda: ReportController(di_container.разрешить(SensorReadingsView),
+                                     di_container.разрешить(RollupStore))
+        )
         di_container.зарегистрировать(AnalysisAlertController, AnalysisAlertController)
 
         # Регистрация панелей (если они существуют)
@@ -136,7 +344,7 @@ class Application_Bootstrap:
             di_container.зарегистрировать(ПанельКлиматолога, ПанельКлиматолога)
 
         # Регистрация фабрики
-        di_container.зарегистрировать(ControllerFactory, WeatherControllerFactory)
+        di_container.зарегистрировать(ControllerFactory, lambda: WeatherControllerFactory(di_container))
 
         # Сохранение конфигурации - создаем специальный класс-обертку
         class ConfigWrapper:
@@ -166,6 +374,53 @@ class Application_Bootstrap:
         # Также регистрируем как словарь для обратной совместимости
         #di_container.зарегистрировать(dict, config, is_instance=True)
 
+    @staticmethod
+    def _restore_snapshot(di_container: 'DI_Container', config: Dict[str, Any]) -> None:
+        """Создание менеджера снимков и синхронная загрузка последних наблюдений станций"""
+        from domain.repositories import (
+            WeatherDataRepository,
+            ForecastRepository,
+            AlertRepository,
+            SensorDataRepository
+        )
+        from domain.rollups import RollupStore
+        from infrastructure.snapshots import SnapshotManager
+
+        logger = logging.getLogger(__name__)
+        snapshot_config = config.get("snapshots", {})
+        if not snapshot_config.get("enabled", False):
+            return
+        if config.get("database", {}).get("engine", "memory") == "sqlite":
+            # Данные и так хранятся в базе - в снимке только агрегаты
+            manager = SnapshotManager(None, None, None, None,
+                                      path=snapshot_config.get("path", "data/snapshot.bin"),
+                                      interval=snapshot_config.get("interval", 600),
+                                      history=False, rollups=di_container.разрешить(RollupStore))
+            di_container.зарегистрировать(SnapshotManager, manager, is_instance=True)
+            try:
+                asyncio.run(manager.load_latest())
+            except Exception as e:
+                logger.error(f"Снимок агрегатов не загружен: {e}")
+            return
+
+        segment_log_enabled = config.get("storage", {}).get("segment_log", {}).get("enabled", False)
+        manager = SnapshotManager(
+            di_container.разрешить(WeatherDataRepository),
+            di_container.разрешить(SensorDataRepository),
+            di_container.разрешить(ForecastRepository),
+            di_container.разрешить(AlertRepository),
+            path=snapshot_config.get("path", "data/snapshot.bin"),
+            interval=snapshot_config.get("interval", 600),
+            history=not segment_log_enabled,
+            rollups=di_container.разрешить(RollupStore)
+        )
+        di_container.зарегистрировать(SnapshotManager, manager, is_instance=True)
+
+        try:
+            asyncio.run(manager.load_latest())
+        except Exception as e:
+            logger.error(f"Снимок не загружен: {e}")
+
     @staticmethod
     async def _run_system() -> None:
         """Запуск основной работы системы"""
@@ -173,6 +428,7 @@ class Application_Bootstrap:
         logger.info("Запуск системных задач...")
 
         Application_Bootstrap._running = True
+        data_ingestion_controller = None
 
         try:
             # Получение фабрики контроллеров
@@ -196,6 +452,37 @@ class Application_Bootstrap:
             logger.error(f"Ошибка создания контроллеров: {e}")
             logger.info("Продолжаем без контроллеров...")
 
+        # Фоновая загрузка остатка снимка
+        from infrastructure.snapshots import SnapshotManager
+        snapshot_manager = Application_Bootstrap._di_container.get_singleton_instances().get(SnapshotManager)
+        if snapshot_manager is not None:
+            asyncio.create_task(snapshot_manager.load_remaining())
+
+        # Периодические задачи: опрос источников, прогнозы, оповещения, очистка, снимки
+        scheduler = None
+        try:
+            scheduler = Application_Bootstrap._schedule_tasks(
+                Application_Bootstrap._di_container,
+                Application_Bootstrap._config,
+                data_ingestion_controller
+            )
+            scheduler.start()
+        except Exception as e:
+            logger.error(f"Планировщик не запущен: {e}")
+
+        # Прием двоичных потоков сенсоров по TCP/UDP
+        feed_server = None
+        try:
+            from web.sensor_feed_server import BinaryFeedPolicy, SensorFeedServer
+            feed_policy = BinaryFeedPolicy.from_config(Application_Bootstrap._config)
+            if feed_policy.enabled and data_ingestion_controller is not None:
+                feed_server = SensorFeedServer(data_ingestion_controller, feed_policy)
+                await feed_server.start()
+                Application_Bootstrap._di_container.зарегистрировать(SensorFeedServer, feed_server,
+                                                                     is_instance=True)
+        except Exception as e:
+            logger.error(f"Прием двоичных потоков не запущен: {e}")
+
         # Запуск веб-сервера (если есть)
         try:
             from web.api_server import WeatherAPIServer
@@ -214,8 +501,83 @@ class Application_Bootstrap:
         while Application_Bootstrap._running:
             await asyncio.sleep(1)
 
+        try:
+            if scheduler is not None:
+                await scheduler.stop()
+
+            if feed_server is not None:
+                await feed_server.stop()
+
+            # Запись данных, оставшихся в конвейере приема
+            if data_ingestion_controller is not None and data_ingestion_controller.конвейер is not None:
+                await data_ingestion_controller.конвейер.stop()
+        finally:
+            # Снимок и закрытие хранилищ - после остановки всех писателей
+            Application_Bootstrap._save_snapshot()
+            Application_Bootstrap._close_storage()
+
         logger.info("Система завершила работу")
 
+    @staticmethod
+    def _schedule_tasks(di_container: 'DI_Container', config: Dict[str, Any],
+                        data_ingestion_controller) -> 'Scheduler':
+        """Регистрация периодических задач с интервалами из секции services"""
+        from controllers.alerts_controller import AlertsAlertController
+        from controllers.data_controller import DataController
+        from controllers.forecast_controller import ForecastController
+        from domain.models import ModelParameters
+        from domain.retention import RetentionPolicy
+        from domain.stations import StationNetwork
+        from infrastructure.scheduler import Scheduler
+        from infrastructure.snapshots import SnapshotManager
+        from infrastructure.sqlite_repositories import SQLiteDatabase
+
+        services = config.get("services", {})
+        jitter = services.get("schedule_jitter", 0.1)
+        scheduler = Scheduler()
+
+        # Опрос источников - сразу после старта, дальше с шагом min_interval:
+        # каждый шаг опрашивает только источники, чей собственный интервал истек
+        if data_ingestion_controller is not None:
+            scheduler.add("ingestion", data_ingestion_controller.polling.min_interval,
+                          data_ingestion_controller.опроситьИсточники, jitter, initial_delay=0)
+
+        forecast_controller = di_container.разрешить(ForecastController)
+        regions = services.get("forecast_regions", ["Минск"])
+        params = ModelParameters(algorithm=config.get("models", {}).get("default", "WRF-ARW"))
+
+        async def refresh_forecasts() -> None:
+            await asyncio.gather(*(forecast_controller.calculate_forecast(region, params) for region in regions))
+
+        scheduler.add("forecast", services.get("forecast_update_interval", 3600), refresh_forecasts, jitter)
+
+        alerts_controller = di_container.разрешить(AlertsAlertController)
+        stations = di_container.разрешить(StationNetwork)
+
+        async def check_alerts() -> None:
+            for station in stations.get_active_stations():
+                await alerts_controller.проверитьИСгенерироватьОповещения(station.идСтанции)
+            # Трендовые оповещения пересчитываются только для окон с опоздавшими данными
+            await alerts_controller.пересчитатьЗатронутыеОкна()
+
+        scheduler.add("alerts", services.get("alert_check_interval", 60), check_alerts, jitter)
+
+        data_controller = di_container.разрешить(DataController)
+        scheduler.add("retention", di_container.разрешить(RetentionPolicy).cleanup_interval,
+                      data_controller.cleanup_old_data, jitter)
+
+        # Буферы SQLite сбрасываются и без новых записей
+        database = di_container.get_singleton_instances().get(SQLiteDatabase)
+        if database is not None:
+            scheduler.add("sqlite_flush", database.flush_interval, database.flush_async, jitter)
+
+        snapshot_manager = di_container.get_singleton_instances().get(SnapshotManager)
+        if snapshot_manager is not None:
+            scheduler.add("snapshot", snapshot_manager.interval, snapshot_manager.save_async, jitter)
+
+        di_container.зарегистрировать(Scheduler, scheduler, is_instance=True)
+        return scheduler
+
     @staticmethod
     async def _demonstrate_system() -> None:
         """Демонстрация работы системы"""
@@ -254,10 +616,59 @@ class Application_Bootstrap:
 
     @staticmethod
     def _handle_shutdown(signum, frame):
-        """Обработка сигнала завершения"""
+        """
+        Обработка сигнала завершения: только останавливает цикл _run_system,
+        снимок и закрытие хранилищ выполняются там после остановки приема
+        """
         print("\nПолучен сигнал завершения...")
         Application_Bootstrap._running = False
 
+    @staticmethod
+    def _save_snapshot() -> None:
+        """Запись снимка репозиториев перед завершением работы"""
+        from infrastructure.snapshots import SnapshotManager
+
+        di_container = Application_Bootstrap._di_container
+        if di_container is None:
+            return
+
+        manager = di_container.get_singleton_instances().get(SnapshotManager)
+        if manager is not None:
+            try:
+                manager.save()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Снимок не записан: {e}")
+
+    @staticmethod
+    def _commit_storage() -> None:
+        """Сброс буферизованных записей базы данных и архивов и запись снимка (фиксация загрузки архивов)"""
+        from infrastructure.sqlite_repositories import SQLiteDatabase
+        from infrastructure.segment_log import SensorSegmentArchive, WeatherSegmentArchive
+
+        instances = Application_Bootstrap._di_container.get_singleton_instances()
+        for storage_type in (SQLiteDatabase, WeatherSegmentArchive, SensorSegmentArchive):
+            storage = instances.get(storage_type)
+            if storage is not None:
+                storage.flush()
+        Application_Bootstrap._save_snapshot()
+
+    @staticmethod
+    def _close_storage() -> None:
+        """Сброс буферизованных записей и закрытие базы данных и архивов"""
+        from infrastructure.sqlite_repositories import SQLiteDatabase
+        from infrastructure.segment_log import SensorSegmentArchive, WeatherSegmentArchive
+        from services.traffic_recorder import TrafficRecorder
+
+        di_container = Application_Bootstrap._di_container
+        if di_container is None:
+            return
+
+        instances = di_container.get_singleton_instances()
+        for storage_type in (SQLiteDatabase, WeatherSegmentArchive, SensorSegmentArchive, TrafficRecorder):
+            storage = instances.get(storage_type)
+            if storage is not None:
+                storage.close()
+
     @staticmethod
     def get_di_container() -> 'DI_Container':
         """Получение DI контейнера"""
@@ -35,6 +35,10 @@ class ConfigurationManager:
         """Конфигурация по умолчанию"""
         return {
             "database": {
+                "engine": "memory",
+                "path": "weather.db",
+                "batch_size": 500,
+                "flush_interval": 1.0,
                 "host": "localhost",
                 "port": 5432,
                 "name": "weather_db",
@@ -45,9 +49,84 @@ class ConfigurationManager:
                 "data_ingestion_interval": 300,
                 "forecast_update_interval": 3600,
                 "alert_check_interval": 60,
+                "schedule_jitter": 0.1,
+                "forecast_regions": ["Минск"],
                 "api_port": 8000,
                 "api_host": "0.0.0.0"
             },
+            "ingestion": {
+                "max_concurrency": 16,
+                "source_timeout": 5.0,
+                "min_interval": 30.0,
+                "max_interval": 1800.0,
+                "change_fraction": 0.01,
+                "failure_threshold": 3,
+                "backoff_max": 3600.0,
+                "pipeline": {
+                    "enabled": True,
+                    "queue_chunks": 256,
+                    "batch_records": 5000,
+                    "flush_interval": 1.0,
+                    "writers": 1,
+                    "overflow": "block",
+                    "block_timeout": 5.0
+                },
+                "dedup": {
+                    "capacity": 500000
+                },
+                "watermarks": {
+                    "allowed_lateness": 60.0
+                },
+                "recording": {
+                    "enabled": False,
+                    "path": "data/recordings/traffic.ndjson"
+                },
+                "binary_feed": {
+                    "enabled": False,
+                    "host": "0.0.0.0",
+                    "tcp_port": 9100,
+                    "udp_port": 9101,
+                    "udp_receive_buffer": 4194304,
+                    "udp_max_in_flight": 256
+                }
+            },
+            "replay": {
+                "speed": 1.0,
+                "max_in_flight": 256
+            },
+            "backfill": {
+                "workers": 0,
+                "chunk_bytes": 1048576,
+                "window": 0,
+                "commit_bytes": 67108864,
+                "delimiter": ",",
+                "state_dir": "data/backfill"
+            },
+            "storage": {
+                "sensor_backend": "memory",
+                "segment_log": {
+                    "enabled": False,
+                    "directory": "data/segments",
+                    "segment_records": 1000000
+                }
+            },
+            "rollups": {
+                "minute_days": 2,
+                "hour_days": 90,
+                "day_days": 3650
+            },
+            "snapshots": {
+                "enabled": True,
+                "path": "data/snapshot.bin",
+                "interval": 600
+            },
+            "retention": {
+                "weather_days": 30,
+                "sensor_days": 30,
+                "forecast_days": 7,
+                "alert_days": 30,
+                "cleanup_interval": 3600
+            },
             "models": {
                 "default": "WRF-ARW",
                 "available": ["WRF-ARW", "GFS", "ICON-EU", "ECMWF"],
@@ -62,6 +141,10 @@ class ConfigurationManager:
                         "lon": 27.69,
                         "type": "meteo"
                     }
+                },
+                "grid_cell_deg": 0.5,
+                "regions": {
+                    "Минск": {"south": 53.82, "west": 27.38, "north": 54.00, "east": 27.78}
                 }
             },
             "alerts": {
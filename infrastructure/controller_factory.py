@@ -45,13 +45,24 @@ class WeatherControllerFactory(ControllerFactory):
     def создатьDataController(self) -> 'DataIngestionController':
         """Создание DataIngestionController"""
         try:
-            from controllers.data_ingestion_controller import DataIngestionController
+            from controllers.data_ingestion_controller import DataIngestionController, PollingPolicy
+            from services.ingestion_pipeline import PipelinePolicy
+            from services.deduplication import ReadingDeduplicator
             from domain.repositories import SensorDataRepository
+            from domain.rollups import RollupStore
+            from domain.watermarks import WatermarkTracker
+            from services.traffic_recorder import TrafficRecorder
 
             if self.di_container:
                 # Получаем зависимости через DI
                 data_repo = self.di_container.разрешить(SensorDataRepository)
-                return DataIngestionController(data_repo)
+                rollups = self.di_container.разрешить(RollupStore)
+                polling = self.di_container.разрешить(PollingPolicy)
+                pipeline = self.di_container.разрешить(PipelinePolicy)
+                dedup = self.di_container.разрешить(ReadingDeduplicator)
+                watermarks = self.di_container.разрешить(WatermarkTracker)
+                recorder = self.di_container.get_singleton_instances().get(TrafficRecorder)
+                return DataIngestionController(data_repo, rollups, polling, pipeline, dedup, watermarks, recorder)
             else:
                 # Создаем зависимости напрямую
                 data_repo = SensorDataRepository()
@@ -66,12 +77,15 @@ class WeatherControllerFactory(ControllerFactory):
         try:
             from controllers.forecast_service_controller import ForecastServiceController
             from domain.repositories import ForecastRepository, SensorDataRepository
+            from domain.sensor_view import SensorReadingsView
+            from domain.stations import StationNetwork
 
             if self.di_container:
                 # Получаем зависимости через DI
                 forecast_repo = self.di_container.разрешить(ForecastRepository)
-                data_repo = self.di_container.разрешить(SensorDataRepository)
-                return ForecastServiceController(forecast_repo, data_repo)
+                data_repo = self.di_container.разрешить(SensorReadingsView)
+                stations = self.di_container.разрешить(StationNetwork)
+                return ForecastServiceController(forecast_repo, data_repo, stations)
             else:
                 # Создаем зависимости напрямую
                 forecast_repo = ForecastRepository()
@@ -6,11 +6,35 @@ from .bootstrap import Application_Bootstrap
 from .config_manager import ConfigurationManager
 from .di_container import DI_Container
 from .controller_factory import ControllerFactory, WeatherControllerFactory
+from .sqlite_repositories import (
+    SQLiteDatabase,
+    SQLiteWeatherDataRepository,
+    SQLiteSensorDataRepository,
+    SQLiteForecastRepository,
+    SQLiteAlertRepository
+)
+from .segment_log import SegmentLog, SensorSegmentArchive, WeatherSegmentArchive
+from .snapshots import SnapshotManager
+from .backfill import BackfillImporter, BackfillPolicy
+from .replay import ReplayPolicy, TrafficReplayer
 
 __all__ = [
     'Application_Bootstrap',
     'ConfigurationManager',
     'DI_Container',
     'ControllerFactory',
-    'WeatherControllerFactory'
+    'WeatherControllerFactory',
+    'SQLiteDatabase',
+    'SQLiteWeatherDataRepository',
+    'SQLiteSensorDataRepository',
+    'SQLiteForecastRepository',
+    'SQLiteAlertRepository',
+    'SegmentLog',
+    'SensorSegmentArchive',
+    'WeatherSegmentArchive',
+    'SnapshotManager',
+    'BackfillImporter',
+    'BackfillPolicy',
+    'ReplayPolicy',
+    'TrafficReplayer'
 ]
\ No newline at end of file
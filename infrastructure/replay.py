@@ -0,0 +1,153 @@
+"""
+Воспроизведение записанного трафика приема с ускорением (оценка нагрузки)
+Пакеты записи (services.traffic_recorder) подаются в те же API приема, куда
+они пришли: наблюдения - в DataController.ingest_many, показания - в
+DataController.ingest_readings, данные источников - в DataIngestionController.принятьДанные.
+Интервалы между приходами сохраняются и делятся на speed (1x, 10x, 100x).
+Пакеты доставляются независимыми задачами, как параллельные запросы клиентов;
+одновременно доставляется не больше max_in_flight пакетов.
+
+Задержка очереди - от запланированного момента прихода до начала доставки,
+полная задержка - до ее завершения. При включенном конвейере приема после
+последнего пакета конвейер останавливается с записью всех принятых данных -
+время дозаписи входит в общее время.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+from controllers.data_controller import DataController
+from controllers.data_ingestion_controller import DataIngestionController
+from services.traffic_recorder import KIND_SOURCE, KIND_WEATHER, read_recording
+
+
+@dataclass
+class ReplayPolicy:
+    """Параметры воспроизведения (секция replay)"""
+    speed: float = 1.0
+    max_in_flight: int = 256
+
+    def __post_init__(self):
+        if self.speed <= 0:
+            raise ValueError(f"Ускорение воспроизведения должно быть положительным: {self.speed}")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ReplayPolicy':
+        section = config.get("replay", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """Процентили в миллисекундах"""
+    if not values:
+        return {}
+    упорядоченные = sorted(values)
+    return {
+        "p50": round(упорядоченные[len(упорядоченные) // 2] * 1000, 2),
+        "p90": round(упорядоченные[int(len(упорядоченные) * 0.9)] * 1000, 2),
+        "p99": round(упорядоченные[int(len(упорядоченные) * 0.99)] * 1000, 2),
+        "max": round(упорядоченные[-1] * 1000, 2)
+    }
+
+
+class TrafficReplayer:
+    """Воспроизведение записи трафика в контроллеры приема с масштабированием времени"""
+
+    def __init__(self, data_controller: DataController,
+                 ingestion_controller: Optional[DataIngestionController] = None,
+                 policy: ReplayPolicy = None):
+        """Без ingestion_controller данные источников подаются в DataController.ingest_readings"""
+        self.data_controller = data_controller
+        self.ingestion_controller = ingestion_controller
+        self.policy = policy or ReplayPolicy()
+        self.logger = logging.getLogger(__name__)
+
+    async def _deliver(self, kind: str, records: list) -> Optional[int]:
+        """Подача пакета в API приема; возвращает число принятых записей (None - известно позже)"""
+        if kind == KIND_WEATHER:
+            return await self.data_controller.ingest_many(records)
+        if kind == KIND_SOURCE and self.ingestion_controller is not None:
+            await self.ingestion_controller.принятьДанные(records)
+            return None
+        return len((await self.data_controller.ingest_readings(records)).accepted)
+
+    async def run(self, path: str) -> Dict[str, Any]:
+        """Воспроизведение файла записи; возвращает пропускную способность и процентили задержек"""
+        policy = self.policy
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(policy.max_in_flight)
+        in_flight = set()
+
+        lags: List[float] = []
+        latencies: List[float] = []
+        by_kind: Dict[str, Dict[str, int]] = {}
+        totals = {"entries": 0, "records": 0, "accepted": 0, "errors": 0}
+
+        async def deliver(kind: str, records: list, due: float) -> None:
+            start = loop.time()
+            try:
+                accepted = await self._deliver(kind, records)
+                if accepted is not None:
+                    totals["accepted"] += accepted
+            except Exception as e:
+                totals["errors"] += 1
+                self.logger.error(f"Воспроизведение: ошибка приема пакета из {len(records)} записей: {e}")
+            finally:
+                slots.release()
+            end = loop.time()
+            lags.append(start - due)
+            latencies.append(end - due)
+
+        started = loop.time()
+        first = last = None
+        for t, kind, records in read_recording(path):
+            if first is None:
+                first = t
+            last = t
+            due = started + (t - first) / policy.speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Занятые слоты задерживают следующие пакеты - это видно в задержке очереди
+            await slots.acquire()
+            task = loop.create_task(deliver(kind, records, due))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+            totals["entries"] += 1
+            totals["records"] += len(records)
+            counts = by_kind.setdefault(kind, {"entries": 0, "records": 0})
+            counts["entries"] += 1
+            counts["records"] += len(records)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        delivered = loop.time() - started
+
+        pipeline = None
+        конвейер = self.ingestion_controller.конвейер if self.ingestion_controller is not None else None
+        if конвейер is not None and конвейер.running:
+            await конвейер.stop()
+            # Данные источников принимаются конвейером: записанное - в его статистике
+            pipeline = конвейер.stats()
+        elapsed = loop.time() - started
+
+        recorded = (last - first) if first is not None else 0.0
+        return {
+            "path": path,
+            "speed": policy.speed,
+            **totals,
+            "by_kind": by_kind,
+            "recorded_seconds": round(recorded, 3),
+            "delivered_seconds": round(delivered, 3),
+            "seconds": round(elapsed, 3),
+            # Достигнутое ускорение ниже заданного - прием не успевает за потоком
+            "achieved_speed": round(recorded / delivered, 2) if delivered else 0.0,
+            "records_per_second": round(totals["records"] / elapsed) if elapsed else 0,
+            "queue_ms": _percentiles(lags),
+            "latency_ms": _percentiles(latencies),
+            "pipeline": pipeline
+        }
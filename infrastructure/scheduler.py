@@ -0,0 +1,173 @@
+"""
+Планировщик периодических задач системы
+Каждая задача запускается с постоянным интервалом (services.*_interval в config.json)
+со случайным сдвигом, новый запуск пропускается, пока не завершился предыдущий.
+Для задач ведется статистика длительности выполнения и опоздания запусков.
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+@dataclass(slots=True)
+class JobStats:
+    """Статистика запусков задачи; длительности и опоздания в секундах"""
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0    # срок наступил, а предыдущий запуск еще выполняется
+    missed: int = 0     # сроки, пропущенные из-за опоздания планировщика больше интервала
+    overruns: int = 0   # запуски дольше интервала
+    running: bool = False
+    last_started: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        finished = self.runs - self.running
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "running": self.running,
+            "last_started": self.last_started.isoformat() if self.last_started else None,
+            "last_duration": self.last_duration,
+            "mean_duration": self.total_duration / finished if finished else None,
+            "max_duration": self.max_duration,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "last_error": self.last_error
+        }
+
+
+class ScheduledJob:
+    """Периодическая задача планировщика"""
+
+    def __init__(self, name: str, interval: float, action: Callable[[], Awaitable[Any]],
+                 jitter: float = 0.1, initial_delay: Optional[float] = None):
+        if interval <= 0:
+            raise ValueError(f"Интервал задачи {name} должен быть положительным: {interval}")
+        self.name = name
+        self.interval = interval
+        self.action = action
+        self.jitter = jitter  # доля интервала
+        self.initial_delay = interval if initial_delay is None else initial_delay
+        self.stats = JobStats()
+        self._run: Optional[asyncio.Task] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._run is not None and not self._run.done()
+
+
+class Scheduler:
+    """
+    Планировщик задач в цикле событий.
+    Сроки задачи идут с постоянным шагом interval от первого срока, сдвиг
+    (до jitter * interval) не накапливается. Если планировщик проснулся позже
+    следующего срока (цикл событий был занят), просроченные сроки учитываются
+    как missed и не запускаются пачкой.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._loops: Dict[str, asyncio.Task] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, name: str, interval: float, action: Callable[[], Awaitable[Any]],
+            jitter: float = 0.1, initial_delay: Optional[float] = None) -> ScheduledJob:
+        """Регистрация задачи; задачи, добавленные после start(), запускаются сразу"""
+        if name in self.jobs:
+            raise ValueError(f"Задача {name} уже зарегистрирована")
+        job = self.jobs[name] = ScheduledJob(name, interval, action, jitter, initial_delay)
+        if self._loops:
+            self._loops[name] = asyncio.create_task(self._loop(job), name=f"scheduler:{name}")
+        return job
+
+    def start(self) -> None:
+        """Запуск задач в текущем цикле событий"""
+        for name, job in self.jobs.items():
+            if name not in self._loops:
+                self._loops[name] = asyncio.create_task(self._loop(job), name=f"scheduler:{name}")
+        self.logger.info(f"Планировщик запущен: {', '.join(self.jobs) or 'нет задач'}")
+
+    async def stop(self) -> None:
+        """Остановка планирования и отмена выполняющихся запусков"""
+        tasks = list(self._loops.values())
+        tasks.extend(job._run for job in self.jobs.values() if job.busy)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика задач: интервал, запуски, длительности и опоздания"""
+        return {
+            name: {"interval": job.interval, **job.stats.as_dict()}
+            for name, job in self.jobs.items()
+        }
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        loop = asyncio.get_running_loop()
+        due = loop.time() + job.initial_delay
+        while True:
+            target = due + random.uniform(0, job.jitter * job.interval)
+            await asyncio.sleep(max(0.0, target - loop.time()))
+
+            now = loop.time()
+            lag = now - target
+            job.stats.last_lag = lag
+            job.stats.max_lag = max(job.stats.max_lag, lag)
+            if lag >= job.interval:
+                missed = int(lag // job.interval)
+                job.stats.missed += missed
+                due += missed * job.interval
+                self.logger.warning(f"Задача {job.name}: пропущено запусков из-за опоздания {missed}")
+
+            if job.busy:
+                job.stats.skipped += 1
+                self.logger.warning(f"Задача {job.name}: предыдущий запуск еще выполняется, запуск пропущен")
+            else:
+                job._run = asyncio.create_task(self._execute(job), name=f"job:{job.name}")
+
+            due += job.interval
+
+    async def _execute(self, job: ScheduledJob) -> None:
+        loop = asyncio.get_running_loop()
+        stats = job.stats
+        stats.runs += 1
+        stats.running = True
+        stats.last_started = datetime.now()
+        started = loop.time()
+        try:
+            await job.action()
+            stats.last_error = None
+        except asyncio.CancelledError:
+            # Прерванный остановкой запуск в длительностях не учитывается
+            stats.runs -= 1
+            stats.running = False
+            raise
+        except Exception as e:
+            stats.failures += 1
+            stats.last_error = str(e)
+            self.logger.error(f"Ошибка задачи {job.name}: {e}")
+
+        duration = loop.time() - started
+        stats.running = False
+        stats.last_duration = duration
+        stats.total_duration += duration
+        stats.max_duration = max(stats.max_duration, duration)
+        if duration > job.interval:
+            stats.overruns += 1
+            self.logger.warning(
+                f"Задача {job.name} выполнялась {duration:.1f} с, дольше интервала {job.interval} с"
+            )
@@ -0,0 +1,435 @@
+"""
+Журнал сегментов для долговременной истории
+Записи фиксированной длины дописываются в конец активного сегмента.
+Заполненные сегменты закрываются для записи и читаются через mmap без разбора файла.
+Повторное сохранение записи дописывает ее новую версию: архивы при выборке
+оставляют по идентификатору последнюю версию в порядке журнала.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from datetime import datetime
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+from domain.models import ДанныеСенсора, WeatherData, SensorColumns, reading_id
+
+_TIME = struct.Struct("<q")
+
+
+class _Segment:
+    """Закрытый сегмент журнала, отображенный в память"""
+
+    __slots__ = ("path", "count", "min_time", "max_time", "ordered", "_file", "_mmap")
+
+    def __init__(self, path: str, stats: Dict[str, Any]):
+        self.path = path
+        self.count = stats["count"]
+        self.min_time = stats["min"]
+        self.max_time = stats["max"]
+        self.ordered = stats["ordered"]
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def view(self) -> memoryview:
+        return memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+class SegmentLog:
+    """
+    Журнал из сегментов с записями фиксированной длины.
+    Первое поле записи - метка времени int64 в миллисекундах.
+    Запись и фиксация состояния сегментов для чтения выполняются под блокировкой,
+    сами выборки идут по отображениям в память без блокировки.
+    """
+
+    def __init__(self, directory: str, record: struct.Struct, segment_records: int = 1_000_000):
+        self.directory = directory
+        self.record = record
+        self.segment_records = segment_records
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._meta_path = os.path.join(directory, "segments.json")
+        self._meta: Dict[str, Any] = {"format": record.format, "segments": {}, "codes": {}}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+            if self._meta.setdefault("format", record.format) != record.format:
+                raise ValueError(
+                    f"Журнал {directory} записан в формате {self._meta['format']}, "
+                    f"ожидается {record.format}"
+                )
+        self._names = {code: name for name, code in self._meta["codes"].items()}
+
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".seg"))
+        self._sealed: List[_Segment] = [self._open_sealed(name) for name in names[:-1]]
+        self._open_active(names[-1] if names else self._segment_name(0))
+
+    # --- Сегменты ---
+
+    @staticmethod
+    def _segment_name(number: int) -> str:
+        return f"{number:08d}.seg"
+
+    def _stats(self, data) -> Dict[str, Any]:
+        """Статистика сегмента: количество, диапазон времени, упорядоченность"""
+        size = self.record.size
+        count = len(data) // size
+        stats = {"count": count, "min": 0, "max": 0, "ordered": True}
+        if not count:
+            return stats
+
+        times = [_TIME.unpack_from(data, i * size)[0] for i in range(count)]
+        stats["min"] = min(times)
+        stats["max"] = max(times)
+        stats["ordered"] = all(a <= b for a, b in zip(times, times[1:]))
+        return stats
+
+    def _open_sealed(self, name: str) -> _Segment:
+        path = os.path.join(self.directory, name)
+        stats = self._meta["segments"].get(name)
+        if stats is None:
+            # Сегмент закрыт, но метаданные не успели сохраниться - считаем заново
+            with open(path, "rb") as f:
+                stats = self._stats(f.read())
+            self._meta["segments"][name] = stats
+            self._save_meta()
+        return _Segment(path, stats)
+
+    def _open_active(self, name: str) -> None:
+        path = os.path.join(self.directory, name)
+        data = b""
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            tail = len(data) % self.record.size
+            if tail:
+                # Обрезаем недописанную запись после аварийного завершения
+                data = data[:-tail]
+                with open(path, "r+b") as f:
+                    f.truncate(len(data))
+
+        stats = self._stats(data)
+        self._active_name = name
+        self._active_path = path
+        self._active_count = stats["count"]
+        self._active_min = stats["min"]
+        self._active_max = stats["max"]
+        self._active_ordered = stats["ordered"]
+        self._active = open(path, "ab")
+
+    def _seal(self) -> None:
+        self._active.close()
+        self._meta["segments"][self._active_name] = {
+            "count": self._active_count,
+            "min": self._active_min,
+            "max": self._active_max,
+            "ordered": self._active_ordered
+        }
+        self._save_meta()
+        self._sealed.append(_Segment(self._active_path, self._meta["segments"][self._active_name]))
+
+        number = int(self._active_name.split(".")[0]) + 1
+        self._open_active(self._segment_name(number))
+
+    def _save_meta(self) -> None:
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    # --- Коды строковых значений ---
+
+    def code_for(self, name: str) -> int:
+        """Числовой код строкового значения (например, типа измерения)"""
+        code = self._meta["codes"].get(name)
+        if code is None:
+            with self._lock:
+                code = self._meta["codes"].get(name)
+                if code is None:
+                    code = self._meta["codes"][name] = len(self._meta["codes"]) + 1
+                    self._names[code] = name
+                    self._save_meta()
+        return code
+
+    def find_code(self, name: str) -> Optional[int]:
+        """Код значения без регистрации нового (None, если значение не встречалось)"""
+        return self._meta["codes"].get(name)
+
+    def name_for(self, code: int) -> str:
+        return self._names.get(code, "")
+
+    # --- Запись и чтение ---
+
+    def _track(self, timestamp: int) -> None:
+        """Учет метки времени в статистике активного сегмента"""
+        if self._active_count == 0:
+            self._active_min = self._active_max = timestamp
+        else:
+            if timestamp < self._active_max:
+                self._active_ordered = False
+            self._active_min = min(self._active_min, timestamp)
+            self._active_max = max(self._active_max, timestamp)
+
+    def append(self, values: Tuple[Any, ...]) -> None:
+        data = self.record.pack(*values)
+        with self._lock:
+            self._track(values[0])
+            self._active.write(data)
+            self._active_count += 1
+            if self._active_count >= self.segment_records:
+                self._seal()
+
+    def append_many(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Дописывание пакета записей одной операцией записи на сегмент"""
+        rows = list(rows)
+        with self._lock:
+            буфер = []
+            for values in rows:
+                self._track(values[0])
+                буфер.append(self.record.pack(*values))
+                self._active_count += 1
+                if self._active_count >= self.segment_records:
+                    self._active.write(b"".join(буфер))
+                    буфер = []
+                    self._seal()
+            if буфер:
+                self._active.write(b"".join(буфер))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._active.flush()
+
+    def _segments(self) -> List[Tuple[int, int, bool, memoryview]]:
+        """Представления всех сегментов: закрытых через mmap и активного"""
+        with self._lock:
+            views = [(s.min_time, s.max_time, s.ordered, s.view()) for s in self._sealed if s.count]
+            if self._active_count:
+                self._active.flush()
+                with open(self._active_path, "rb") as f:
+                    active = mmap.mmap(f.fileno(), self._active_count * self.record.size, access=mmap.ACCESS_READ)
+                views.append((self._active_min, self._active_max, self._active_ordered, memoryview(active)))
+        return views
+
+    def _lower_bound(self, view: memoryview, timestamp: int) -> int:
+        size = self.record.size
+        lo, hi = 0, len(view) // size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _TIME.unpack_from(view, mid * size)[0] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def scan(self, начало: int, конец: int) -> List[Tuple[Any, ...]]:
+        """Записи с меткой времени в [начало, конец] в порядке журнала"""
+        size = self.record.size
+        result = []
+        for min_time, max_time, ordered, view in self._segments():
+            if max_time < начало or min_time > конец:
+                continue
+
+            if ordered:
+                # Сегмент упорядочен - читаем только нужный непрерывный участок
+                lo = self._lower_bound(view, начало)
+                hi = self._lower_bound(view, конец + 1)
+                result.extend(self.record.iter_unpack(view[lo * size:hi * size]))
+            else:
+                result.extend(values for values in self.record.iter_unpack(view)
+                              if начало <= values[0] <= конец)
+        return result
+
+    def views_newest_first(self) -> List[Tuple[int, memoryview]]:
+        """Представления сегментов по убыванию максимальной метки времени"""
+        return sorted(((max_time, view) for _, max_time, _, view in self._segments()),
+                      key=lambda item: item[0], reverse=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._active.close()
+            for segment in self._sealed:
+                segment.close()
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8", "ignore")
+
+
+def _last_versions(rows: List[Tuple[Any, ...]], id_field: int) -> List[Tuple[Any, ...]]:
+    """Последняя версия каждой записи из строк в порядке журнала"""
+    return list({row[id_field]: row for row in rows}.values())
+
+
+class SensorSegmentArchive:
+    """Архив данных сенсоров: время, значение, коды типа и станции, идентификатор (64 байта)"""
+
+    RECORD = struct.Struct("<qdHH44s")
+    ID_FIELD = 4
+
+    def __init__(self, directory: str, segment_records: int = 1_000_000):
+        self.log = SegmentLog(directory, self.RECORD, segment_records)
+
+    def _values(self, запись: ДанныеСенсора) -> Tuple[Any, ...]:
+        return (запись.времяИзмерения, запись.значение,
+                self.log.code_for(запись.типИзмерения),
+                self.log.code_for(запись.идСтанции),
+                запись.идДанных.encode("utf-8"))
+
+    def append(self, запись: ДанныеСенсора) -> None:
+        self.log.append(self._values(запись))
+
+    def append_many(self, записи: Iterable[ДанныеСенсора]) -> None:
+        self.log.append_many(map(self._values, записи))
+
+    def append_columns(self, колонки: SensorColumns) -> None:
+        """Показания в колонках с идентификаторами reading_id - без объектов ДанныеСенсора"""
+        rows = []
+        for (станция, тип), (times, values) in колонки.items():
+            код_типа, код_станции = self.log.code_for(тип), self.log.code_for(станция)
+            if hasattr(times, "tolist"):
+                times, values = times.tolist(), values.tolist()
+            rows.extend((время, значение, код_типа, код_станции, reading_id(станция, тип, время).encode("utf-8"))
+                        for время, значение in zip(times, values))
+        self.log.append_many(rows)
+
+    def flush(self) -> None:
+        self.log.flush()
+
+    def _records(self, rows: List[Tuple[Any, ...]]) -> List[ДанныеСенсора]:
+        return [
+            ДанныеСенсора(
+                идДанных=_text(ид),
+                времяИзмерения=время,
+                значение=значение,
+                типИзмерения=self.log.name_for(код),
+                идСтанции=self.log.name_for(станция)
+            )
+            for время, значение, код, станция, ид in sorted(rows, key=lambda r: r[0])
+        ]
+
+    def _scan(self, начало: int, конец: int) -> List[Tuple[Any, ...]]:
+        return _last_versions(self.log.scan(начало, конец), self.ID_FIELD)
+
+    def scan(self, начало: int, конец: int) -> List[ДанныеСенсора]:
+        return self._records(self._scan(начало, конец))
+
+    def scan_series(self, станция: Optional[str], тип: Optional[str],
+                    начало: int, конец: int) -> List[ДанныеСенсора]:
+        """Записи станции и типа измерения (None - без фильтра) с отбором по числовым кодам"""
+        код_станции = self.log.find_code(станция) if станция is not None else None
+        код_типа = self.log.find_code(тип) if тип is not None else None
+        if (станция is not None and код_станции is None) or (тип is not None and код_типа is None):
+            return []
+        return self._records([
+            row for row in self._scan(начало, конец)
+            if (код_типа is None or row[2] == код_типа)
+            and (код_станции is None or row[3] == код_станции)
+        ])
+
+    def scan_arrays(self, начало: int, конец: int) -> Dict[str, Tuple[array, array]]:
+        """Массивы (время, значение) по типам измерения без создания объектов записей"""
+        результат: Dict[int, Tuple[array, array]] = {}
+        for время, значение, код, _, _ in sorted(self._scan(начало, конец), key=lambda r: r[0]):
+            колонки = результат.get(код)
+            if колонки is None:
+                колонки = результат[код] = (array('q'), array('d'))
+            колонки[0].append(время)
+            колонки[1].append(значение)
+        return {self.log.name_for(код): колонки for код, колонки in результат.items()}
+
+    def close(self) -> None:
+        self.log.close()
+
+
+class WeatherSegmentArchive:
+    """Архив наблюдений WeatherData (184 байта на запись, строки обрезаются по длине поля)"""
+
+    RECORD = struct.Struct("<qddddd8s24s40s64s")
+    ID_FIELD = 8
+
+    def __init__(self, directory: str, segment_records: int = 1_000_000):
+        self.log = SegmentLog(directory, self.RECORD, segment_records)
+
+    @staticmethod
+    def _values(weather_data: WeatherData) -> Tuple[Any, ...]:
+        return (
+            int(weather_data.timestamp.timestamp() * 1000),
+            weather_data.temperature,
+            weather_data.humidity,
+            weather_data.pressure,
+            weather_data.wind_speed,
+            weather_data.precipitation,
+            weather_data.wind_direction.encode("utf-8"),
+            weather_data.station_id.encode("utf-8"),
+            weather_data.id.encode("utf-8"),
+            weather_data.phenomena.encode("utf-8")
+        )
+
+    def append(self, weather_data: WeatherData) -> None:
+        self.log.append(self._values(weather_data))
+
+    def append_many(self, weather_data_list: Iterable[WeatherData]) -> None:
+        self.log.append_many(map(self._values, weather_data_list))
+
+    def flush(self) -> None:
+        self.log.flush()
+
+    @staticmethod
+    def _weather(values: Tuple[Any, ...]) -> WeatherData:
+        время, температура, влажность, давление, ветер, осадки, направление, станция, ид, явления = values
+        return WeatherData(
+            id=_text(ид),
+            station_id=_text(станция),
+            timestamp=datetime.fromtimestamp(время / 1000),
+            temperature=температура,
+            humidity=влажность,
+            pressure=давление,
+            wind_speed=ветер,
+            wind_direction=_text(направление),
+            precipitation=осадки,
+            phenomena=_text(явления)
+        )
+
+    def _scan(self, начало: int, конец: int) -> List[Tuple[Any, ...]]:
+        return sorted(_last_versions(self.log.scan(начало, конец), self.ID_FIELD), key=lambda r: r[0])
+
+    def scan(self, начало: int, конец: int) -> List[WeatherData]:
+        """Наблюдения всех станций за [начало, конец], упорядоченные по времени"""
+        return [self._weather(values) for values in self._scan(начало, конец)]
+
+    def scan_station(self, station_id: str, начало: int, конец: int) -> List[WeatherData]:
+        станция = station_id.encode("utf-8")
+        return [
+            self._weather(values)
+            for values in self._scan(начало, конец)
+            if values[7].rstrip(b"\0") == станция
+        ]
+
+    def latest(self, station_id: str) -> Optional[WeatherData]:
+        станция = station_id.encode("utf-8")
+        best = None
+        for max_time, view in self.log.views_newest_first():
+            if best is not None and best[0] >= max_time:
+                # В оставшихся сегментах нет записей новее найденной
+                break
+            candidate = None
+            for values in self.RECORD.iter_unpack(view):
+                # При равном времени побеждает более поздняя версия записи
+                if values[7].rstrip(b"\0") == станция and (candidate is None or values[0] >= candidate[0]):
+                    candidate = values
+            if candidate is not None and (best is None or candidate[0] > best[0]):
+                best = candidate
+        return self._weather(best) if best is not None else None
+
+    def close(self) -> None:
+        self.log.close()
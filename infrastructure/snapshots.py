@@ -0,0 +1,383 @@
+"""
+Снимки репозиториев в памяти
+Компактный двоичный формат для быстрого старта: сначала записываются последние
+наблюдения станций, затем вся история. Последние наблюдения загружаются сразу
+при инициализации, остальное - в фоне порциями, не блокируя цикл событий.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from domain.models import ДанныеСенсора, WeatherData, Forecast, Alert, AlertLevel
+from domain.sensor_view import split_reading_id
+
+MAGIC = b"WSNP"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sHq")        # сигнатура, версия, время создания (мкс)
+_SECTION = struct.Struct("<BQ")         # тип секции, длина
+_CHUNK = struct.Struct("<II")           # записей в порции, длина порции
+_TABLE = struct.Struct("<I")            # длина таблицы строк
+_WEATHER = struct.Struct("<qdddddHHHB")  # время, 5 значений, коды строк, длина ид
+_SENSOR = struct.Struct("<qdHHB")        # время, значение, коды типа и станции, длина ид
+
+SECTION_LATEST = 1
+SECTION_WEATHER = 2
+SECTION_SENSOR = 3
+SECTION_FORECAST = 4
+SECTION_ALERT = 5
+SECTION_ROLLUP = 6
+
+
+def _resolve(awaitable):
+    """
+    Выполнение корутины репозитория без цикла событий.
+    Репозитории в памяти не ожидают ввода-вывода, поэтому корутина завершается сразу.
+    """
+    try:
+        awaitable.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("Репозиторий ожидает ввода-вывода - снимок недоступен")
+
+
+class _StringTable:
+    """Таблица повторяющихся строк (станции, направления ветра, типы измерений)"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = values or []
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self) -> bytes:
+        data = json.dumps(self.values, ensure_ascii=False).encode("utf-8")
+        return _TABLE.pack(len(data)) + data
+
+    @classmethod
+    def decode(cls, buffer: memoryview, offset: int) -> Tuple['_StringTable', int]:
+        (length,) = _TABLE.unpack_from(buffer, offset)
+        offset += _TABLE.size
+        values = json.loads(bytes(buffer[offset:offset + length]).decode("utf-8"))
+        return cls(values), offset + length
+
+
+def _us(moment: datetime) -> int:
+    """Метка времени в микросекундах - снимок сохраняет время без потери точности"""
+    return round(moment.timestamp() * 1_000_000)
+
+
+def _dt(us: int) -> datetime:
+    seconds, microseconds = divmod(us, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=microseconds)
+
+
+class SnapshotManager:
+    """Запись и загрузка снимков репозиториев"""
+
+    def __init__(self, weather_repo, sensor_repo, forecast_repo, alert_repo,
+                 path: str = "data/snapshot.bin", interval: int = 600,
+                 chunk_records: int = 10_000, history: bool = True, rollups=None):
+        self.weather_repo = weather_repo
+        self.sensor_repo = sensor_repo
+        self.forecast_repo = forecast_repo
+        self.alert_repo = alert_repo
+        self.path = path
+        self.interval = interval
+        self.chunk_records = chunk_records
+        # Без истории снимок содержит только прогнозы и предупреждения
+        # (наблюдения и данные сенсоров уже хранятся в журнале сегментов).
+        # Без репозиториев (None) - только агрегаты: данные хранятся в базе SQLite
+        self.history = history
+        self.rollups = rollups
+        self.logger = logging.getLogger(__name__)
+        # Пока снимок не загружен целиком, новый снимок записывать нельзя - он будет неполным
+        self._restoring = False
+
+    # --- Кодирование секций ---
+
+    def _encode_weather(self, records: List[WeatherData]) -> bytes:
+        strings = _StringTable()
+        chunks = []
+        for start in range(0, len(records), self.chunk_records):
+            part = []
+            for wd in records[start:start + self.chunk_records]:
+                ид = wd.id.encode("utf-8")
+                part.append(_WEATHER.pack(
+                    _us(wd.timestamp), wd.temperature, wd.humidity, wd.pressure,
+                    wd.wind_speed, wd.precipitation, strings.code(wd.station_id),
+                    strings.code(wd.wind_direction), strings.code(wd.phenomena), len(ид)
+                ))
+                part.append(ид)
+            payload = b"".join(part)
+            chunks.append(_CHUNK.pack(min(self.chunk_records, len(records) - start), len(payload)) + payload)
+        return strings.encode() + b"".join(chunks)
+
+    def _encode_sensor(self, records: List[ДанныеСенсора]) -> bytes:
+        strings = _StringTable()
+        chunks = []
+        for start in range(0, len(records), self.chunk_records):
+            part = []
+            for запись in records[start:start + self.chunk_records]:
+                ид = запись.идДанных.encode("utf-8")
+                part.append(_SENSOR.pack(запись.времяИзмерения, запись.значение,
+                                         strings.code(запись.типИзмерения),
+                                         strings.code(запись.идСтанции), len(ид)))
+                part.append(ид)
+            payload = b"".join(part)
+            chunks.append(_CHUNK.pack(min(self.chunk_records, len(records) - start), len(payload)) + payload)
+        return strings.encode() + b"".join(chunks)
+
+    @staticmethod
+    def _encode_json(rows: List[Dict[str, Any]]) -> bytes:
+        return zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+
+    def _collect(self) -> Dict[int, bytes]:
+        # Порядок секций важен: агрегаты и последние наблюдения читаются первыми
+        sections: Dict[int, bytes] = {}
+        if self.rollups is not None:
+            sections[SECTION_ROLLUP] = self.rollups.dumps()
+
+        if self.history:
+            weather = _resolve(self.weather_repo.get_all())
+            latest: Dict[str, WeatherData] = {}
+            for wd in weather:
+                current = latest.get(wd.station_id)
+                if current is None or wd.timestamp >= current.timestamp:
+                    latest[wd.station_id] = wd
+
+            sections[SECTION_LATEST] = self._encode_weather(list(latest.values()))
+            sections[SECTION_WEATHER] = self._encode_weather(weather)
+            sections[SECTION_SENSOR] = self._encode_sensor(self.sensor_repo.найтиВсе())
+
+        if self.forecast_repo is None:
+            return sections
+
+        forecasts = [
+            {
+                "id": f.id, "model_type": f.model_type, "calculation_time": _us(f.calculation_time),
+                "valid_from": _us(f.valid_from), "valid_to": _us(f.valid_to),
+                "region": f.region, "points": f.points
+            }
+            for f in self.forecast_repo.найтиВсе()
+        ]
+        alerts = [
+            {
+                "id": a.id, "level": a.level.value, "type": a.type, "region": a.region,
+                "valid_from": _us(a.valid_from), "valid_to": _us(a.valid_to),
+                "description": a.description, "is_active": a.is_active
+            }
+            for a in self.alert_repo.найтиВсе()
+        ]
+
+        sections[SECTION_FORECAST] = self._encode_json(forecasts)
+        sections[SECTION_ALERT] = self._encode_json(alerts)
+        return sections
+
+    def _write(self, sections: Dict[int, bytes]) -> int:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, int(time.time() * 1_000_000)))
+            for section_type, payload in sections.items():
+                f.write(_SECTION.pack(section_type, len(payload)))
+                f.write(payload)
+        os.replace(tmp_path, self.path)
+        return os.path.getsize(self.path)
+
+    def save(self) -> int:
+        """Синхронная запись снимка (при завершении работы). Возвращает размер файла"""
+        if self._restoring:
+            self.logger.warning("Снимок не записан: предыдущий снимок еще загружается")
+            return 0
+        size = self._write(self._collect())
+        self.logger.info(f"Снимок репозиториев записан: {self.path} ({size} байт)")
+        return size
+
+    async def save_async(self) -> int:
+        """
+        Запись снимка в потоке.
+        Репозитории читаются через согласованные представления (snapshot()),
+        поэтому сбор записей не задерживает цикл событий и параллельный прием данных.
+        """
+        if self._restoring:
+            self.logger.warning("Снимок не записан: предыдущий снимок еще загружается")
+            return 0
+
+        repos = [repo.snapshot() if repo is not None else None
+                 for repo in (self.weather_repo, self.sensor_repo, self.forecast_repo, self.alert_repo)]
+        snapshot = SnapshotManager(*repos, self.path, self.interval, self.chunk_records, self.history, self.rollups)
+        size = await asyncio.to_thread(lambda: snapshot._write(snapshot._collect()))
+        self.logger.info(f"Снимок репозиториев записан: {self.path} ({size} байт)")
+        return size
+
+    # --- Загрузка ---
+
+    def _sections(self, buffer: memoryview) -> Dict[int, memoryview]:
+        magic, version, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Неподдерживаемый формат снимка {self.path}")
+
+        sections = {}
+        offset = _HEADER.size
+        while offset < len(buffer):
+            section_type, length = _SECTION.unpack_from(buffer, offset)
+            offset += _SECTION.size
+            sections[section_type] = buffer[offset:offset + length]
+            offset += length
+        return sections
+
+    @staticmethod
+    def _decode_weather_chunk(strings: _StringTable, chunk: memoryview, count: int) -> List[WeatherData]:
+        records = []
+        offset = 0
+        for _ in range(count):
+            (ts, temperature, humidity, pressure, wind_speed, precipitation,
+             station, direction, phenomena, id_length) = _WEATHER.unpack_from(chunk, offset)
+            offset += _WEATHER.size
+            records.append(WeatherData(
+                id=bytes(chunk[offset:offset + id_length]).decode("utf-8"),
+                station_id=strings.values[station],
+                timestamp=_dt(ts),
+                temperature=temperature,
+                humidity=humidity,
+                pressure=pressure,
+                wind_speed=wind_speed,
+                wind_direction=strings.values[direction],
+                precipitation=precipitation,
+                phenomena=strings.values[phenomena]
+            ))
+            offset += id_length
+        return records
+
+    @staticmethod
+    def _decode_sensor_chunk(strings: _StringTable, chunk: memoryview, count: int) -> List[ДанныеСенсора]:
+        records = []
+        offset = 0
+        for _ in range(count):
+            ts, value, type_code, station_code, id_length = _SENSOR.unpack_from(chunk, offset)
+            offset += _SENSOR.size
+            records.append(ДанныеСенсора(
+                идДанных=bytes(chunk[offset:offset + id_length]).decode("utf-8"),
+                времяИзмерения=ts,
+                значение=value,
+                типИзмерения=strings.values[type_code],
+                идСтанции=strings.values[station_code]
+            ))
+            offset += id_length
+        return records
+
+    def _own_readings(self, records: List[ДанныеСенсора]) -> List[ДанныеСенсора]:
+        """
+        Снимки прежних версий содержат копии показаний наблюдений - они выводятся
+        из наблюдений при чтении, поэтому не загружаются повторно
+        """
+        own = []
+        for record in records:
+            derived = split_reading_id(record.идДанных)
+            if derived is None or self.weather_repo.find(derived[0]) is None:
+                own.append(record)
+        return own
+
+    @staticmethod
+    def _chunks(payload: memoryview):
+        strings, offset = _StringTable.decode(payload, 0)
+        while offset < len(payload):
+            count, length = _CHUNK.unpack_from(payload, offset)
+            offset += _CHUNK.size
+            yield strings, payload[offset:offset + length], count
+            offset += length
+
+    def _read(self) -> Optional[Dict[int, memoryview]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            return self._sections(memoryview(f.read()))
+
+    async def load_latest(self) -> int:
+        """Загрузка агрегатов и последних наблюдений станций - достаточно для ответа текущей погоды"""
+        sections = self._read()
+        if sections is None:
+            return 0
+
+        self._restoring = True
+        if self.rollups is not None and SECTION_ROLLUP in sections:
+            self.rollups.loads(sections[SECTION_ROLLUP])
+
+        if SECTION_LATEST not in sections or self.weather_repo is None:
+            return 0
+
+        loaded = 0
+        for strings, chunk, count in self._chunks(sections[SECTION_LATEST]):
+            records = self._decode_weather_chunk(strings, chunk, count)
+            await self.weather_repo.save_many(records)
+            loaded += len(records)
+        self.logger.info(f"Из снимка загружены последние наблюдения {loaded} станций")
+        return loaded
+
+    async def load_remaining(self) -> int:
+        """Фоновая загрузка остальных секций порциями"""
+        try:
+            return await self._load_sections()
+        finally:
+            self._restoring = False
+
+    async def _load_sections(self) -> int:
+        started = time.monotonic()
+        sections = self._read()
+        if sections is None or self.weather_repo is None:
+            return 0
+
+        loaded = 0
+        if SECTION_WEATHER in sections:
+            for strings, chunk, count in self._chunks(sections[SECTION_WEATHER]):
+                await self.weather_repo.save_many(self._decode_weather_chunk(strings, chunk, count))
+                loaded += count
+                await asyncio.sleep(0)
+
+        if SECTION_SENSOR in sections:
+            for strings, chunk, count in self._chunks(sections[SECTION_SENSOR]):
+                self.sensor_repo.сохранитьПакет(self._own_readings(self._decode_sensor_chunk(strings, chunk, count)))
+                loaded += count
+                await asyncio.sleep(0)
+
+        if SECTION_FORECAST in sections:
+            for row in json.loads(zlib.decompress(sections[SECTION_FORECAST])):
+                self.forecast_repo.сохранить(Forecast(
+                    id=row["id"], model_type=row["model_type"],
+                    calculation_time=_dt(row["calculation_time"]),
+                    valid_from=_dt(row["valid_from"]), valid_to=_dt(row["valid_to"]),
+                    region=row["region"], points=row["points"]
+                ))
+                loaded += 1
+
+        if SECTION_ALERT in sections:
+            for row in json.loads(zlib.decompress(sections[SECTION_ALERT])):
+                self.alert_repo.сохранить(Alert(
+                    id=row["id"], level=AlertLevel(row["level"]), type=row["type"],
+                    region=row["region"], valid_from=_dt(row["valid_from"]),
+                    valid_to=_dt(row["valid_to"]), description=row["description"],
+                    is_active=row["is_active"]
+                ))
+                loaded += 1
+
+        self.logger.info(
+            f"Снимок загружен: {loaded} записей за {time.monotonic() - started:.2f} с"
+        )
+        return loaded
+
@@ -0,0 +1,530 @@
+"""
+Репозитории на SQLite
+Долговременное хранение данных: WAL-журнал, пакетная запись в транзакциях,
+фильтры выборок выполняются по индексам в SQL
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Iterable, List, Optional, Dict, Any, Sequence, Tuple
+
+from domain.models import (ДанныеСенсора, WeatherData, Forecast, Alert, AlertLevel, Оповещение, Прогноз,
+                           SensorColumns, reading_id)
+from domain.repositories import IRepository, IAlertRepo, IForecastRepo, ISensorRepo
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS weather_data (
+    id TEXT PRIMARY KEY,
+    station_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    temperature REAL NOT NULL,
+    humidity REAL NOT NULL,
+    pressure REAL NOT NULL,
+    wind_speed REAL NOT NULL,
+    wind_direction TEXT NOT NULL,
+    precipitation REAL NOT NULL,
+    phenomena TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_weather_station_time ON weather_data (station_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS sensor_data (
+    id TEXT PRIMARY KEY,
+    measured_at INTEGER NOT NULL,
+    value REAL NOT NULL,
+    type TEXT NOT NULL,
+    station_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_sensor_time ON sensor_data (measured_at);
+CREATE INDEX IF NOT EXISTS idx_sensor_type_time ON sensor_data (type, measured_at);
+
+CREATE TABLE IF NOT EXISTS forecasts (
+    id TEXT PRIMARY KEY,
+    model_type TEXT NOT NULL,
+    calculation_time INTEGER NOT NULL,
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    points TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_forecast_region_time ON forecasts (region, calculation_time);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    level TEXT NOT NULL,
+    type TEXT NOT NULL,
+    region TEXT NOT NULL,
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    is_active INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_valid_to ON alerts (valid_to);
+"""
+
+# Изменения схемы для баз, созданных предыдущими версиями: (таблица, колонка, DDL колонки)
+_COLUMNS = [
+    ("sensor_data", "station_id", "station_id TEXT NOT NULL DEFAULT ''"),
+]
+
+_MIGRATED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_sensor_station_type_time ON sensor_data (station_id, type, measured_at);
+"""
+
+
+def _ms(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+
+def _dt(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000)
+
+
+class SQLiteDatabase:
+    """
+    Общее соединение с базой SQLite для всех репозиториев.
+    Записи копятся в буферах репозиториев и пишутся пакетом из batch_size строк
+    или после flush_interval секунд с предыдущего сброса. Запись проверяет срок
+    сама, а без новых записей буфер сбрасывает периодическая задача flush_async
+    (планировщик) - записи не ждут дольше flush_interval и шага задачи.
+    """
+
+    def __init__(self, path: str = "weather.db", batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._repositories: List['_SQLiteRepository'] = []
+
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Добавление колонок, которых нет в базах предыдущих версий"""
+        for table, column, ddl in _COLUMNS:
+            existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+        self.connection.executescript(_MIGRATED_INDEXES)
+
+    def register(self, repository: '_SQLiteRepository') -> None:
+        self._repositories.append(repository)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def write_batch(self, sql: str, rows: List[tuple]) -> None:
+        """Запись пакета строк одной транзакцией"""
+        with self._lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(sql, rows)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def delete(self, sql: str, params: Sequence[Any]) -> Tuple[int, int]:
+        """Удаление строк. Возвращает (строк, байт освобожденных страниц)"""
+        with self._lock:
+            page_size = self.connection.execute("PRAGMA page_size").fetchone()[0]
+            free_before = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+            cursor = self.connection.execute(sql, params)
+            free_after = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+            return cursor.rowcount, max(0, free_after - free_before) * page_size
+
+    def flush(self) -> None:
+        for repository in self._repositories:
+            repository.flush()
+
+    def flush_due(self) -> None:
+        """Сброс буферов, которые ждут дольше flush_interval"""
+        with self._lock:
+            for repository in self._repositories:
+                repository._flush_if_due()
+
+    async def flush_async(self) -> None:
+        """Периодический сброс буферов вне цикла событий"""
+        await asyncio.to_thread(self.flush_due)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self.connection.close()
+
+
+class _SQLiteRepository:
+    """Буферизация записей и сброс пакетами"""
+
+    _insert_sql = ""
+
+    def __init__(self, database: SQLiteDatabase):
+        self._db = database
+        self._pending: Dict[str, tuple] = {}
+        self._last_flush = time.monotonic()
+        database.register(self)
+
+    def snapshot(self) -> '_SQLiteRepository':
+        """Каждый запрос читает согласованное состояние базы - отдельный снимок не нужен"""
+        return self
+
+    def _enqueue(self, key: str, row: tuple) -> None:
+        # Повторная запись того же ключа в пределах пакета заменяет предыдущую
+        with self._db._lock:
+            self._pending[key] = row
+            self._flush_if_due()
+
+    def _enqueue_many(self, rows: Dict[str, tuple]) -> None:
+        with self._db._lock:
+            self._pending.update(rows)
+            self._flush_if_due()
+
+    def _flush_if_due(self) -> None:
+        if (len(self._pending) >= self._db.batch_size
+                or time.monotonic() - self._last_flush >= self._db.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._db._lock:
+            if self._pending:
+                rows = list(self._pending.values())
+                self._pending = {}
+                self._db.write_batch(self._insert_sql, rows)
+            self._last_flush = time.monotonic()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        # Перед чтением сбрасываем буфер, чтобы выборка видела все записи
+        self.flush()
+        return self._db.execute(sql, params)
+
+    def _delete(self, sql: str, params: Sequence[Any]) -> Tuple[int, int]:
+        self.flush()
+        return self._db.delete(sql, params)
+
+
+class SQLiteSensorDataRepository(_SQLiteRepository, IRepository[ДанныеСенсора], ISensorRepo):
+    """SensorDataRepository на SQLite"""
+
+    _insert_sql = (
+        "INSERT OR REPLACE INTO sensor_data (id, measured_at, value, type, station_id) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    _select = "SELECT id, measured_at, value, type, station_id FROM sensor_data"
+
+    @staticmethod
+    def _row(row: tuple) -> ДанныеСенсора:
+        return ДанныеСенсора(идДанных=row[0], времяИзмерения=row[1], значение=row[2],
+                             типИзмерения=row[3], идСтанции=row[4])
+
+    def найтиПоИд(self, ид: str) -> Optional[ДанныеСенсора]:
+        rows = self._query(f"{self._select} WHERE id = ?", (ид,))
+        return self._row(rows[0]) if rows else None
+
+    @staticmethod
+    def _values(entity: ДанныеСенсора) -> tuple:
+        return entity.идДанных, entity.времяИзмерения, entity.значение, entity.типИзмерения, entity.идСтанции
+
+    def сохранить(self, entity: ДанныеСенсора) -> None:
+        self._enqueue(entity.идДанных, self._values(entity))
+
+    def сохранитьПакет(self, entities: Iterable[ДанныеСенсора]) -> None:
+        self._enqueue_many({entity.идДанных: self._values(entity) for entity in entities})
+
+    def сохранитьКолонки(self, колонки: SensorColumns) -> None:
+        """Строки таблицы собираются прямо из колонок, без объектов ДанныеСенсора"""
+        строки = {}
+        for (станция, тип), (times, values) in колонки.items():
+            times = times.tolist() if hasattr(times, "tolist") else times
+            values = values.tolist() if hasattr(values, "tolist") else values
+            for время, значение in zip(times, values):
+                ид = reading_id(станция, тип, время)
+                строки[ид] = (ид, время, значение, тип, станция)
+        self._enqueue_many(строки)
+
+    def найтиВсе(self) -> List[ДанныеСенсора]:
+        return [self._row(row) for row in self._query(f"{self._select} ORDER BY measured_at")]
+
+    def получитьЗаПериод(self, начало: int, конец: int) -> List[ДанныеСенсора]:
+        rows = self._query(
+            f"{self._select} WHERE measured_at BETWEEN ? AND ? ORDER BY measured_at",
+            (начало, конец)
+        )
+        return [self._row(row) for row in rows]
+
+    def получитьПоТипу(self, тип: str) -> List[ДанныеСенсора]:
+        rows = self._query(f"{self._select} WHERE type = ? ORDER BY measured_at", (тип,))
+        return [self._row(row) for row in rows]
+
+    @staticmethod
+    def _series_filter(станция: Optional[str], тип: Optional[str]) -> Tuple[str, List[Any]]:
+        условия, params = [], []
+        if станция is not None:
+            условия.append("station_id = ?")
+            params.append(станция)
+        if тип is not None:
+            условия.append("type = ?")
+            params.append(тип)
+        return "".join(f"{условие} AND " for условие in условия), params
+
+    def получитьПоСтанции(self, станция: Optional[str], тип: Optional[str],
+                          начало: int, конец: int) -> List[ДанныеСенсора]:
+        фильтр, params = self._series_filter(станция, тип)
+        rows = self._query(
+            f"{self._select} WHERE {фильтр}measured_at BETWEEN ? AND ? ORDER BY measured_at",
+            (*params, начало, конец)
+        )
+        return [self._row(row) for row in rows]
+
+    def получитьМассивыПоСтанции(self, станция: Optional[str], тип: str,
+                                 начало: int, конец: int) -> Tuple[array, array]:
+        фильтр, params = self._series_filter(станция, тип)
+        rows = self._query(
+            f"SELECT measured_at, value FROM sensor_data WHERE {фильтр}"
+            f"measured_at BETWEEN ? AND ? ORDER BY measured_at",
+            (*params, начало, конец)
+        )
+        return array('q', (row[0] for row in rows)), array('d', (row[1] for row in rows))
+
+    def получитьМассивыЗаПериод(self, начало: int, конец: int) -> Dict[str, Tuple[array, array]]:
+        результат: Dict[str, Tuple[array, array]] = {}
+        rows = self._query(
+            "SELECT type, measured_at, value FROM sensor_data "
+            "WHERE measured_at BETWEEN ? AND ? ORDER BY measured_at",
+            (начало, конец)
+        )
+        for тип, время, значение in rows:
+            колонки = результат.get(тип)
+            if колонки is None:
+                колонки = результат[тип] = (array('q'), array('d'))
+            колонки[0].append(время)
+            колонки[1].append(значение)
+        return результат
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        return self._delete("DELETE FROM sensor_data WHERE measured_at < ?", (_ms(cutoff),))
+
+
+class SQLiteWeatherDataRepository(_SQLiteRepository):
+    """WeatherDataRepository на SQLite"""
+
+    _insert_sql = (
+        "INSERT OR REPLACE INTO weather_data (id, station_id, timestamp, temperature, humidity, "
+        "pressure, wind_speed, wind_direction, precipitation, phenomena) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _select = (
+        "SELECT id, station_id, timestamp, temperature, humidity, pressure, wind_speed, "
+        "wind_direction, precipitation, phenomena FROM weather_data"
+    )
+
+    @staticmethod
+    def _row(row: tuple) -> WeatherData:
+        return WeatherData(
+            id=row[0],
+            station_id=row[1],
+            timestamp=_dt(row[2]),
+            temperature=row[3],
+            humidity=row[4],
+            pressure=row[5],
+            wind_speed=row[6],
+            wind_direction=row[7],
+            precipitation=row[8],
+            phenomena=row[9]
+        )
+
+    @staticmethod
+    def _values(weather_data: WeatherData) -> tuple:
+        return (
+            weather_data.id, weather_data.station_id, _ms(weather_data.timestamp),
+            weather_data.temperature, weather_data.humidity, weather_data.pressure,
+            weather_data.wind_speed, weather_data.wind_direction,
+            weather_data.precipitation, weather_data.phenomena
+        )
+
+    async def save(self, weather_data: WeatherData) -> None:
+        self._enqueue(weather_data.id, self._values(weather_data))
+
+    async def save_many(self, weather_data_list: Iterable[WeatherData]) -> None:
+        self._enqueue_many({weather_data.id: self._values(weather_data)
+                            for weather_data in weather_data_list})
+
+    def find(self, data_id: str) -> Optional[WeatherData]:
+        rows = self._query(f"{self._select} WHERE id = ?", (data_id,))
+        return self._row(rows[0]) if rows else None
+
+    async def get_by_id(self, data_id: str) -> Optional[WeatherData]:
+        return self.find(data_id)
+
+    async def get_all(self) -> List[WeatherData]:
+        return [self._row(row) for row in self._query(self._select)]
+
+    def observations_between(self, station_id: Optional[str], начало: int, конец: int) -> List[List[WeatherData]]:
+        """Наблюдения за [начало, конец] (мс): по ряду на станцию, упорядоченному по времени"""
+        sql = f"{self._select} WHERE timestamp BETWEEN ? AND ?"
+        params: List[Any] = [max(начало, -2 ** 63), min(конец, 2 ** 63 - 1)]
+        if station_id is not None:
+            sql += " AND station_id = ?"
+            params.append(station_id)
+        по_станциям: Dict[str, List[WeatherData]] = {}
+        for row in self._query(f"{sql} ORDER BY timestamp", params):
+            по_станциям.setdefault(row[1], []).append(self._row(row))
+        return list(по_станциям.values())
+
+    async def get_latest_by_station(self, station_id: str) -> Optional[WeatherData]:
+        rows = self._query(
+            f"{self._select} WHERE station_id = ? ORDER BY timestamp DESC LIMIT 1",
+            (station_id,)
+        )
+        return self._row(rows[0]) if rows else None
+
+    async def get_station_history(self, station_id: str, hours: int = 24) -> List[WeatherData]:
+        cutoff = int(time.time() * 1000) - hours * 3600 * 1000
+        rows = self._query(
+            f"{self._select} WHERE station_id = ? AND timestamp >= ? ORDER BY timestamp",
+            (station_id, cutoff)
+        )
+        return [self._row(row) for row in rows]
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        return self._delete("DELETE FROM weather_data WHERE timestamp < ?", (_ms(cutoff),))
+
+
+class SQLiteForecastRepository(_SQLiteRepository, IRepository[Forecast], IForecastRepo):
+    """ForecastRepository на SQLite"""
+
+    _insert_sql = (
+        "INSERT OR REPLACE INTO forecasts (id, model_type, calculation_time, valid_from, "
+        "valid_to, region, points) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+    _select = "SELECT id, model_type, calculation_time, valid_from, valid_to, region, points FROM forecasts"
+
+    @staticmethod
+    def _row(row: tuple) -> Forecast:
+        return Forecast(
+            id=row[0],
+            model_type=row[1],
+            calculation_time=_dt(row[2]),
+            valid_from=_dt(row[3]),
+            valid_to=_dt(row[4]),
+            region=row[5],
+            points=json.loads(row[6])
+        )
+
+    def найтиПоИд(self, ид: str) -> Optional[Forecast]:
+        rows = self._query(f"{self._select} WHERE id = ?", (ид,))
+        return self._row(rows[0]) if rows else None
+
+    def сохранить(self, entity: Forecast) -> None:
+        self._enqueue(entity.id, (
+            entity.id, entity.model_type, _ms(entity.calculation_time),
+            _ms(entity.valid_from), _ms(entity.valid_to), entity.region,
+            json.dumps(entity.points, ensure_ascii=False)
+        ))
+
+    def найтиВсе(self) -> List[Forecast]:
+        return [self._row(row) for row in self._query(self._select)]
+
+    def получитьАктуальные(self, регион: str) -> List[Прогноз]:
+        текущееВремя = int(time.time() * 1000)
+        rows = self._query(
+            f"{self._select} WHERE region = ? AND calculation_time >= ? ORDER BY calculation_time",
+            (регион, текущееВремя - 24 * 3600 * 1000)
+        )
+        return [self._row(row).to_прогноз() for row in rows]
+
+    async def get_all_for_region(self, region: str) -> List[Forecast]:
+        rows = self._query(f"{self._select} WHERE region = ? ORDER BY calculation_time", (region,))
+        return [self._row(row) for row in rows]
+
+    async def get_latest_for_region(self, region: str) -> Optional[Forecast]:
+        rows = self._query(
+            f"{self._select} WHERE region = ? ORDER BY calculation_time DESC LIMIT 1",
+            (region,)
+        )
+        return self._row(rows[0]) if rows else None
+
+    async def save(self, forecast: Forecast) -> None:
+        self.сохранить(forecast)
+
+    async def get_by_id(self, forecast_id: str) -> Optional[Forecast]:
+        return self.найтиПоИд(forecast_id)
+
+    async def get_all(self) -> List[Forecast]:
+        return self.найтиВсе()
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        return self._delete("DELETE FROM forecasts WHERE calculation_time < ?", (_ms(cutoff),))
+
+
+class SQLiteAlertRepository(_SQLiteRepository, IRepository[Alert], IAlertRepo):
+    """AlertRepository на SQLite"""
+
+    _insert_sql = (
+        "INSERT OR REPLACE INTO alerts (id, level, type, region, valid_from, valid_to, "
+        "description, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _select = "SELECT id, level, type, region, valid_from, valid_to, description, is_active FROM alerts"
+
+    @staticmethod
+    def _row(row: tuple) -> Alert:
+        return Alert(
+            id=row[0],
+            level=AlertLevel(row[1]),
+            type=row[2],
+            region=row[3],
+            valid_from=_dt(row[4]),
+            valid_to=_dt(row[5]),
+            description=row[6],
+            is_active=bool(row[7])
+        )
+
+    def найтиПоИд(self, ид: str) -> Optional[Alert]:
+        rows = self._query(f"{self._select} WHERE id = ?", (ид,))
+        return self._row(rows[0]) if rows else None
+
+    def сохранить(self, entity: Alert) -> None:
+        self._enqueue(entity.id, (
+            entity.id, entity.level.value, entity.type, entity.region,
+            _ms(entity.valid_from), _ms(entity.valid_to), entity.description,
+            int(entity.is_active)
+        ))
+
+    def найтиВсе(self) -> List[Alert]:
+        return [self._row(row) for row in self._query(self._select)]
+
+    def найтиАктуальные(self, текущееВремя: int) -> List[Оповещение]:
+        rows = self._query(
+            f"{self._select} WHERE valid_to >= ? AND valid_from <= ?",
+            (текущееВремя, текущееВремя)
+        )
+        return [self._row(row).to_оповещение() for row in rows]
+
+    async def get_active_alerts(self) -> List[Alert]:
+        now = int(time.time() * 1000)
+        rows = self._query(
+            f"{self._select} WHERE valid_to >= ? AND valid_from <= ? AND is_active = 1",
+            (now, now)
+        )
+        return [self._row(row) for row in rows]
+
+    async def save(self, alert: Alert) -> None:
+        self.сохранить(alert)
+
+    async def get_by_id(self, alert_id: str) -> Optional[Alert]:
+        return self.найтиПоИд(alert_id)
+
+    async def get_all(self) -> List[Alert]:
+        return self.найтиВсе()
+
+    def evict_before(self, cutoff: datetime) -> Tuple[int, int]:
+        return self._delete("DELETE FROM alerts WHERE valid_to < ?", (_ms(cutoff),))
@@ -10,7 +10,17 @@ from infrastructure.bootstrap import Application_Bootstrap
 def main():
     """
     Точка входа в приложение
+    python main.py - запуск системы
+    python main.py backfill archive.csv [...] - загрузка исторических архивов
+    python main.py replay traffic.ndjson --speed 10 - воспроизведение записанного трафика приема
     """
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        Application_Bootstrap.backfill(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        Application_Bootstrap.replay(sys.argv[2:])
+        return
+
     print("=" * 60)
     print("СИСТЕМА МОНИТОРИНГА И ПРОГНОЗИРОВАНИЯ ПОГОДЫ")
     print("=" * 60)
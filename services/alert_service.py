@@ -3,9 +3,9 @@
 """
 
 import logging
+from dataclasses import replace
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
-import uuid
 
 from domain.models import Alert, AlertLevel, WeatherData
 from domain.repositories import WeatherDataRepository, AlertRepository
@@ -25,78 +25,64 @@ class AlertService:
         }
 
     async def check_alerts(self, station_id: str) -> List[Alert]:
-        """Проверка условий для генерации оповещений"""
+        """
+        Проверка условий для генерации оповещений.
+        Пороговое оповещение одно на станцию и вид условия (постоянный идентификатор,
+        как у трендовых): периодическая проверка обновляет его, а не создает новое,
+        и снимает, когда значение вернулось в норму.
+        """
         latest_data = await self.data_repo.get_latest_by_station(station_id)
         if not latest_data:
             return []
 
-        alerts = []
         now = datetime.now()
+        temperature = latest_data.temperature
+        conditions = [
+            # (вид, выполнено, уровень, тип, срок действия в часах, описание)
+            ("wind", latest_data.wind_speed >= self.thresholds["wind_speed"], AlertLevel.DANGER,
+             "Шквалистый ветер", 3, f"Шквалистый ветер до {latest_data.wind_speed} м/с"),
+            ("frost", temperature <= self.thresholds["temperature_low"], AlertLevel.WARNING,
+             "Сильный мороз", 12, f"Температура опустилась до {temperature}°C"),
+            ("heat", temperature >= self.thresholds["temperature_high"], AlertLevel.WARNING,
+             "Сильная жара", 12, f"Температура поднялась до {temperature}°C"),
+            ("precipitation", latest_data.precipitation >= self.thresholds["precipitation"], AlertLevel.WARNING,
+             "Сильные осадки", 6, f"Интенсивность осадков {latest_data.precipitation} мм/час"),
+        ]
 
-        # Проверка скорости ветра
-        if latest_data.wind_speed >= self.thresholds["wind_speed"]:
-            alert = Alert(
-                id=str(uuid.uuid4()),
-                level=AlertLevel.DANGER,
-                type="Шквалистый ветер",
-                region=f"Станция {station_id}",
-                valid_from=now,
-                valid_to=now + timedelta(hours=3),
-                description=f"Шквалистый ветер до {latest_data.wind_speed} м/с"
-            )
-            alerts.append(alert)
-
-        # Проверка температуры
-        if latest_data.temperature <= self.thresholds["temperature_low"]:
-            alert = Alert(
-                id=str(uuid.uuid4()),
-                level=AlertLevel.WARNING,
-                type="Сильный мороз",
-                region=f"Станция {station_id}",
-                valid_from=now,
-                valid_to=now + timedelta(hours=12),
-                description=f"Температура опустилась до {latest_data.temperature}°C"
-            )
-            alerts.append(alert)
-        elif latest_data.temperature >= self.thresholds["temperature_high"]:
-            alert = Alert(
-                id=str(uuid.uuid4()),
-                level=AlertLevel.WARNING,
-                type="Сильная жара",
-                region=f"Станция {station_id}",
-                valid_from=now,
-                valid_to=now + timedelta(hours=12),
-                description=f"Температура поднялась до {latest_data.temperature}°C"
-            )
-            alerts.append(alert)
-
-        # Проверка осадков
-        if latest_data.precipitation >= self.thresholds["precipitation"]:
-            alert = Alert(
-                id=str(uuid.uuid4()),
-                level=AlertLevel.WARNING,
-                type="Сильные осадки",
-                region=f"Станция {station_id}",
-                valid_from=now,
-                valid_to=now + timedelta(hours=6),
-                description=f"Интенсивность осадков {latest_data.precipitation} мм/час"
-            )
-            alerts.append(alert)
+        alerts = []
+        for kind, triggered, level, alert_type, hours, description in conditions:
+            alert_id = f"threshold_{kind}_{station_id}"
+            if triggered:
+                alert = Alert(
+                    id=alert_id,
+                    level=level,
+                    type=alert_type,
+                    region=f"Станция {station_id}",
+                    valid_from=now,
+                    valid_to=now + timedelta(hours=hours),
+                    description=description
+                )
+                await self.alert_repo.save(alert)
+                alerts.append(alert)
+                continue
 
-        # Сохранение оповещений
-        for alert in alerts:
-            await self.alert_repo.save(alert)
+            previous = await self.alert_repo.get_by_id(alert_id)
+            if previous is not None and previous.is_active:
+                await self.alert_repo.save(replace(previous, is_active=False))
 
         return alerts
 
     async def check_trend_alerts(self, station_id: str, hours: int = 24) -> List[Alert]:
-        """Проверка трендов для генерации оповещений"""
+        """
+        Проверка трендов для генерации оповещений.
+        Трендовое оповещение станции одно (постоянный идентификатор): повторная проверка,
+        например после досылки опоздавших наблюдений в окно тренда, обновляет его
+        или снимает, если условие больше не выполняется.
+        """
+        alert_id = f"trend_pressure_{station_id}"
         history = await self.data_repo.get_station_history(station_id, hours)
-        if len(history) < 2:
-            return []
 
         # Анализ трендов
-        temperatures = [data.temperature for data in history]
         pressures = [data.pressure for data in history]
 
         # Проверка быстрого падения давления (признак ухудшения погоды)
@@ -104,7 +90,7 @@ class AlertService:
             pressure_change = pressures[-1] - pressures[0]
             if pressure_change < -10:  # Падение более 10 гПа за период
                 alert = Alert(
-                    id=str(uuid.uuid4()),
+                    id=alert_id,
                     level=AlertLevel.WARNING,
                     type="Быстрое падение давления",
                     region=f"Станция {station_id}",
@@ -115,4 +101,7 @@ class AlertService:
                 await self.alert_repo.save(alert)
                 return [alert]
 
-        return []
\ No newline at end of file
+        previous = await self.alert_repo.get_by_id(alert_id)
+        if previous is not None and previous.is_active:
+            await self.alert_repo.save(replace(previous, is_active=False))
+        return []
@@ -0,0 +1,148 @@
+"""
+Подавление повторов показаний при приеме
+После переподключения источники повторно отправляют уже переданные показания,
+нередко с новыми идентификаторами. Повтор определяется по ключу
+(станция, тип измерения, время измерения), независимо от идентификатора записи.
+Недавно виденные ключи хранятся в двух поколениях ограниченного размера
+(приближенный LRU): память не растет при длительной нагрузке.
+Фильтр отмечает ключи пропущенных записей сразу, чтобы повтор из параллельного
+пакета не прошел до сохранения; если сохранение не удалось, вызывающий
+возвращает ключи методами forget_* - повторная отправка будет принята.
+"""
+
+import threading
+from itertools import compress
+from typing import Any, Dict, List, Sequence, Set, TypeVar
+
+from domain.models import SensorColumns, WeatherData, ДанныеСенсора
+
+T = TypeVar('T')
+
+# Тип измерения в ключе наблюдения WeatherData целиком
+WEATHER_KEY_TYPE = "weather"
+
+
+class ReadingDeduplicator:
+    """
+    Фильтр повторов с ограниченной памятью.
+    Ключи (их хеши) попадают в текущее поколение; когда в нем capacity/2 ключей,
+    оно становится предыдущим, а самое старое поколение отбрасывается.
+    Повтор распознается, пока его ключ среди последних capacity/2..capacity ключей;
+    повтор из предыдущего поколения переносится в текущее, как в LRU.
+    capacity = 0 отключает фильтр.
+    """
+
+    def __init__(self, capacity: int = 500_000):
+        self.capacity = capacity
+        self._generation_size = max(capacity // 2, 1)
+        self._current: Set[int] = set()
+        self._previous: Set[int] = set()
+        # Фильтр вызывается писателями конвейера из пула потоков
+        self._lock = threading.Lock()
+
+        # Метрики
+        self.checked = 0
+        self.duplicates = 0
+        self.rotations = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ReadingDeduplicator':
+        section = config.get("ingestion", {}).get("dedup", {})
+        return cls(**{key: section[key] for key in ("capacity",) if key in section})
+
+    @staticmethod
+    def _reading_keys(записи: List[ДанныеСенсора]) -> List[int]:
+        return [hash((запись.идСтанции, запись.типИзмерения, запись.времяИзмерения)) for запись in записи]
+
+    @staticmethod
+    def _weather_keys(наблюдения: List[WeatherData]) -> List[int]:
+        return [hash((наблюдение.station_id, WEATHER_KEY_TYPE, наблюдение.timestamp)) for наблюдение in наблюдения]
+
+    def filter_readings(self, записи: List[ДанныеСенсора]) -> List[ДанныеСенсора]:
+        """Показания без повторов - уже принятых ранее и повторяющихся внутри пакета"""
+        if not self.capacity:
+            return записи
+        return self._filter(записи, self._reading_keys(записи))
+
+    def filter_columns(self, колонки: SensorColumns) -> SensorColumns:
+        """Показания в колонках без повторов; ключи те же, что у записей ДанныеСенсора"""
+        if not self.capacity:
+            return колонки
+        keys = [hash((станция, тип, время)) for (станция, тип), (times, _) in колонки.items() for время in times]
+        kept = self._filter(range(len(keys)), keys)
+        if len(kept) == len(keys):
+            return колонки
+
+        оставлено = bytearray(len(keys))
+        for i in kept:
+            оставлено[i] = 1
+        результат: SensorColumns = {}
+        start = 0
+        for key, (times, values) in колонки.items():
+            end = start + len(times)
+            маска = оставлено[start:end]
+            if all(маска):
+                результат[key] = (times, values)
+            elif any(маска):
+                результат[key] = (list(compress(times, маска)), list(compress(values, маска)))
+            start = end
+        return результат
+
+    def filter_weather(self, наблюдения: List[WeatherData]) -> List[WeatherData]:
+        """Наблюдения WeatherData без повторов по (станция, время наблюдения)"""
+        if not self.capacity:
+            return наблюдения
+        return self._filter(наблюдения, self._weather_keys(наблюдения))
+
+    def forget_readings(self, записи: List[ДанныеСенсора]) -> None:
+        """Снятие отметки с показаний, пропущенных фильтром, но не сохраненных"""
+        if self.capacity:
+            self._forget(self._reading_keys(записи))
+
+    def forget_columns(self, колонки: SensorColumns) -> None:
+        if self.capacity:
+            self._forget([hash((станция, тип, время)) for (станция, тип), (times, _) in колонки.items()
+                          for время in times])
+
+    def forget_weather(self, наблюдения: List[WeatherData]) -> None:
+        """Снятие отметки с наблюдений, пропущенных фильтром, но не сохраненных"""
+        if self.capacity:
+            self._forget(self._weather_keys(наблюдения))
+
+    def _filter(self, items: List[T], keys: Sequence[int]) -> List[T]:
+        kept: List[T] = []
+        with self._lock:
+            current, previous = self._current, self._previous
+            size = self._generation_size
+            for item, key in zip(items, keys):
+                if key in current:
+                    continue
+                repeated = key in previous
+                current.add(key)
+                if len(current) >= size:
+                    previous, current = current, set()
+                    self.rotations += 1
+                if not repeated:
+                    kept.append(item)
+            self._current, self._previous = current, previous
+
+            self.checked += len(items)
+            self.duplicates += len(items) - len(kept)
+        return kept
+
+    def _forget(self, keys: Sequence[int]) -> None:
+        # Ключи пропущенных записей не было ни в одном поколении до фильтра;
+        # после смены поколения они могут оказаться в предыдущем
+        with self._lock:
+            for key in keys:
+                self._current.discard(key)
+                self._previous.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "tracked_keys": len(self._current) + len(self._previous),
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "rotations": self.rotations
+        }
@@ -0,0 +1,242 @@
+"""
+Конвейер приема данных: опросчики -> ограниченная очередь -> пакетировщик -> писатели
+Опросчики кладут в очередь записи одного опроса источника. Пакетировщик собирает
+их в пакеты по размеру или по времени, писатели записывают пакеты в пуле потоков,
+чтобы запись не занимала цикл событий, обслуживающий запросы API.
+Заполненная очередь останавливает опросчиков или сбрасывает данные по политике переполнения.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+
+# Политики переполнения очереди
+OVERFLOW_BLOCK = "block"              # опросчик ждет места до block_timeout, затем данные сбрасываются
+OVERFLOW_DROP_NEWEST = "drop_newest"  # новые данные сбрасываются сразу
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # вытесняются самые старые данные очереди
+
+_STOP = None
+
+
+@dataclass
+class PipelinePolicy:
+    """Параметры конвейера приема (секция ingestion.pipeline)"""
+    enabled: bool = True
+    queue_chunks: int = 256      # вместимость очереди в опросах источников
+    batch_records: int = 5000    # размер пакета записи
+    flush_interval: float = 1.0  # наибольшее ожидание неполного пакета в секундах
+    writers: int = 1
+    overflow: str = OVERFLOW_BLOCK
+    block_timeout: float = 5.0
+
+    def __post_init__(self):
+        if self.overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST):
+            raise ValueError(f"Неизвестная политика переполнения: {self.overflow}")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'PipelinePolicy':
+        section = config.get("ingestion", {}).get("pipeline", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+class IngestionPipeline(Generic[T]):
+    """
+    Ограниченный конвейер записи.
+    sink - синхронная функция записи пакета; выполняется в пуле потоков,
+    поэтому хранилища должны допускать запись из другого потока.
+    size - число записей в отправленной части (по умолчанию len): часть может
+    состоять из блоков, каждый из которых несет много записей.
+    Задачи конвейера запускаются при первой отправке данных.
+    """
+
+    def __init__(self, sink: Callable[[List[T]], Any], policy: PipelinePolicy = None,
+                 name: str = "ingestion", size: Callable[[Sequence[T]], int] = len):
+        self.sink = sink
+        self.size = size
+        self.policy = policy or PipelinePolicy()
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batches: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+
+        # Метрики
+        self.queued_records = 0
+        self.max_queued_chunks = 0
+        self.max_queued_records = 0
+        self.submitted_records = 0
+        self.dropped_records = 0
+        self.dropped_chunks = 0
+        self.blocked_waits = 0
+        self.blocked_seconds = 0.0
+        self.batches_written = 0
+        self.records_written = 0
+        self.write_errors = 0
+        self.last_write_seconds: Optional[float] = None
+        self.max_write_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _start(self) -> None:
+        self._queue = asyncio.Queue(self.policy.queue_chunks)
+        # Очередь готовых пакетов короткая: занятые писатели останавливают пакетировщик
+        self._batches = asyncio.Queue(self.policy.writers)
+        self._tasks = [asyncio.create_task(self._batch_loop(), name=f"{self.name}:batcher")]
+        self._tasks.extend(
+            asyncio.create_task(self._write_loop(), name=f"{self.name}:writer{i}")
+            for i in range(self.policy.writers)
+        )
+
+    async def submit(self, records: Sequence[T]) -> bool:
+        """
+        Отправка записей одного опроса. Возвращает False, если записи сброшены
+        по политике переполнения или конвейер остановлен.
+        """
+        if not records:
+            return True
+        if self._closing:
+            self._drop(records)
+            return False
+        if not self._tasks:
+            self._start()
+
+        queue = self._queue
+        if queue.full():
+            overflow = self.policy.overflow
+            if overflow == OVERFLOW_DROP_NEWEST:
+                self._drop(records)
+                return False
+            if overflow == OVERFLOW_DROP_OLDEST:
+                while queue.full():
+                    self._dequeued(self._drop(queue.get_nowait()))
+            else:
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                self.blocked_waits += 1
+                try:
+                    await asyncio.wait_for(queue.put(records), self.policy.block_timeout)
+                except asyncio.TimeoutError:
+                    self._drop(records)
+                    return False
+                finally:
+                    self.blocked_seconds += loop.time() - started
+                self._enqueued(records)
+                return True
+
+        queue.put_nowait(records)
+        self._enqueued(records)
+        return True
+
+    async def stop(self) -> None:
+        """Остановка с записью всех принятых данных"""
+        if not self._tasks:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._closing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Глубина очереди, сброшенные данные, время ожидания опросчиков и записи"""
+        return {
+            "running": self.running,
+            "overflow": self.policy.overflow,
+            "queue_chunks": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.policy.queue_chunks,
+            "queue_records": self.queued_records,
+            "max_queue_chunks": self.max_queued_chunks,
+            "max_queue_records": self.max_queued_records,
+            "pending_batches": self._batches.qsize() if self._batches else 0,
+            "submitted_records": self.submitted_records,
+            "dropped_records": self.dropped_records,
+            "dropped_chunks": self.dropped_chunks,
+            "blocked_waits": self.blocked_waits,
+            "blocked_seconds": self.blocked_seconds,
+            "batches_written": self.batches_written,
+            "records_written": self.records_written,
+            "write_errors": self.write_errors,
+            "last_write_seconds": self.last_write_seconds,
+            "max_write_seconds": self.max_write_seconds
+        }
+
+    def _enqueued(self, records: Sequence[T]) -> None:
+        count = self.size(records)
+        self.submitted_records += count
+        self.queued_records += count
+        self.max_queued_records = max(self.max_queued_records, self.queued_records)
+        self.max_queued_chunks = max(self.max_queued_chunks, self._queue.qsize())
+
+    def _dequeued(self, records: Sequence[T]) -> None:
+        self.queued_records -= self.size(records)
+
+    def _drop(self, records: Sequence[T]) -> Sequence[T]:
+        count = self.size(records)
+        self.dropped_records += count
+        self.dropped_chunks += 1
+        self.logger.warning(f"Конвейер {self.name}: очередь заполнена, сброшено записей {count}")
+        return records
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            chunk = await queue.get()
+            if chunk is _STOP:
+                break
+            batch = list(chunk)
+            batch_size = self.size(chunk)
+            self._dequeued(chunk)
+
+            # Пакет закрывается по размеру или по истечении flush_interval с первой записи
+            deadline = loop.time() + self.policy.flush_interval
+            while batch_size < self.policy.batch_records:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        chunk = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    chunk = queue.get_nowait()
+                if chunk is _STOP:
+                    stopping = True
+                    break
+                batch.extend(chunk)
+                batch_size += self.size(chunk)
+                self._dequeued(chunk)
+
+            await self._batches.put((batch, batch_size))
+
+        for _ in range(self.policy.writers):
+            await self._batches.put(_STOP)
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._batches.get()
+            if item is _STOP:
+                return
+            batch, batch_size = item
+
+            started = loop.time()
+            try:
+                await asyncio.to_thread(self.sink, batch)
+                self.batches_written += 1
+                self.records_written += batch_size
+            except Exception as e:
+                self.write_errors += 1
+                self.logger.error(f"Конвейер {self.name}: ошибка записи пакета из {batch_size} записей: {e}")
+            elapsed = loop.time() - started
+            self.last_write_seconds = elapsed
+            self.max_write_seconds = max(self.max_write_seconds, elapsed)
@@ -4,8 +4,16 @@
 
 from .forecast_service import ForecastService
 from .alert_service import AlertService
+from .ingestion_pipeline import IngestionPipeline, PipelinePolicy
+from .deduplication import ReadingDeduplicator
+from .traffic_recorder import RecordingPolicy, TrafficRecorder
 
 __all__ = [
     'ForecastService',
-    'AlertService'
+    'AlertService',
+    'IngestionPipeline',
+    'PipelinePolicy',
+    'ReadingDeduplicator',
+    'RecordingPolicy',
+    'TrafficRecorder'
 ]
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Запись входящего трафика приема для последующего воспроизведения
+Каждый вызов API приема (пакет наблюдений DataController, пакет показаний,
+данные источника DataIngestionController) записывается строкой NDJSON в порядке
+прихода вместе со временем прихода от начала записи. Воспроизведение
+(infrastructure.replay) подает записанные пакеты в те же API с теми же интервалами.
+
+Формат: первая строка - заголовок {"format", "version", "started_at"}, далее
+{"t": секунды от начала, "kind": вид пакета, "records": [[поля записи], ...]}.
+Поля наблюдения - RECORD_FIELDS[KIND_WEATHER], показания - RECORD_FIELDS[KIND_READINGS].
+Каждый запуск пишет свой файл: к имени из ingestion.recording.path добавляется
+время запуска (RecordingPolicy.run_path), существующие записи не перезаписываются.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+from domain.models import WeatherData, ДанныеСенсора
+
+FORMAT = "meteo-traffic"
+VERSION = 1
+
+# Виды пакетов: куда пакет пришел и куда подается при воспроизведении
+KIND_WEATHER = "weather"    # DataController.ingest_data / ingest_many
+KIND_READINGS = "readings"  # DataController.ingest_readings
+KIND_SOURCE = "source"      # DataIngestionController: опрос источника или поток сенсоров
+
+RECORD_FIELDS = {
+    KIND_WEATHER: ("id", "station_id", "timestamp", "temperature", "humidity", "pressure",
+                   "wind_speed", "wind_direction", "precipitation", "phenomena"),
+    KIND_READINGS: ("id", "timestamp", "value", "type", "station_id"),
+}
+RECORD_FIELDS[KIND_SOURCE] = RECORD_FIELDS[KIND_READINGS]
+
+
+class RecordingError(ValueError):
+    """Файл не является записью трафика или записан несовместимой версией"""
+
+
+@dataclass
+class RecordingPolicy:
+    """Параметры записи трафика (секция ingestion.recording)"""
+    enabled: bool = False
+    path: str = "data/recordings/traffic.ndjson"
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RecordingPolicy':
+        section = config.get("ingestion", {}).get("recording", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+    def run_path(self, moment: Optional[datetime] = None) -> str:
+        """Файл записи запуска: traffic.ndjson -> traffic-20260301-120000.ndjson (с номером при совпадении)"""
+        moment = moment or datetime.now()
+        directory, name = os.path.split(self.path)
+        stem, dot, suffix = name.partition(".")
+        stem = f"{stem}-{moment:%Y%m%d-%H%M%S}"
+        path = os.path.join(directory, f"{stem}{dot}{suffix}")
+        number = 1
+        while os.path.exists(path):
+            path = os.path.join(directory, f"{stem}-{number}{dot}{suffix}")
+            number += 1
+        return path
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Файлы с расширением .gz сжимаются"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _weather_row(weather_data: WeatherData) -> list:
+    return [weather_data.id, weather_data.station_id, int(weather_data.timestamp.timestamp() * 1000),
+            weather_data.temperature, weather_data.humidity, weather_data.pressure, weather_data.wind_speed,
+            weather_data.wind_direction, weather_data.precipitation, weather_data.phenomena]
+
+
+def _reading_row(запись: ДанныеСенсора) -> list:
+    return [запись.идДанных, запись.времяИзмерения, запись.значение, запись.типИзмерения, запись.идСтанции]
+
+
+def _weather(row: list) -> WeatherData:
+    ид, станция, время, температура, влажность, давление, ветер, направление, осадки, явления = row
+    return WeatherData(ид, станция, datetime.fromtimestamp(время / 1000), температура, влажность,
+                       давление, ветер, направление, осадки, явления)
+
+
+def _reading(row: list) -> ДанныеСенсора:
+    return ДанныеСенсора(*row)
+
+
+class TrafficRecorder:
+    """
+    Запись пакетов приема в порядке прихода.
+    Вызывается контроллерами приема в начале обработки пакета, до проверки
+    и фильтрации повторов, - воспроизведение повторяет всю их работу.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        """
+        path - новый файл: существующий файл не перезаписывается (FileExistsError).
+        clock - часы времени прихода в секундах; моделирование подставляет свои
+        """
+        self.path = path
+        self.clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = _open(path, "x")
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._file.write(json.dumps({"format": FORMAT, "version": VERSION,
+                                     "started_at": datetime.now().isoformat()}) + "\n")
+        self.entries = 0
+        self.records = 0
+        self.logger = logging.getLogger(__name__)
+        self.logger.info(f"Запись трафика приема в {path}")
+
+    def _write(self, kind: str, rows: List[list]) -> None:
+        if not rows:
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            # Время прихода - под блокировкой, чтобы строки шли в порядке времени
+            t = round(self.clock() - self._started, 6)
+            self._file.write(json.dumps({"t": t, "kind": kind, "records": rows},
+                                        ensure_ascii=False, separators=(",", ":")) + "\n")
+            self.entries += 1
+            self.records += len(rows)
+
+    def record_weather(self, weather_data_list: List[WeatherData]) -> None:
+        self._write(KIND_WEATHER, [_weather_row(weather_data) for weather_data in weather_data_list])
+
+    def record_readings(self, записи: List[ДанныеСенсора]) -> None:
+        self._write(KIND_READINGS, [_reading_row(запись) for запись in записи])
+
+    def record_source(self, записи: List[ДанныеСенсора]) -> None:
+        self._write(KIND_SOURCE, [_reading_row(запись) for запись in записи])
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.logger.info(f"Запись трафика завершена: пакетов {self.entries}, записей {self.records}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "entries": self.entries, "records": self.records}
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, str, list]]:
+    """Пакеты записи по порядку: (секунды от начала записи, вид, записи моделей)"""
+    with _open(path, "r") as f:
+        try:
+            header = json.loads(f.readline() or "null")
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise RecordingError(f"{path}: не запись трафика приема")
+        if header.get("version") != VERSION:
+            raise RecordingError(f"{path}: неподдерживаемая версия записи {header.get('version')}")
+
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            kind = entry["kind"]
+            if kind not in RECORD_FIELDS:
+                raise RecordingError(f"{path}: неизвестный вид пакета {kind!r}")
+            build = _weather if kind == KIND_WEATHER else _reading
+            yield entry["t"], kind, [build(row) for row in entry["records"]]
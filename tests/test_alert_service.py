@@ -0,0 +1,49 @@
+"""Пороговые и трендовые оповещения станции"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from domain.models import WeatherData
+from domain.repositories import AlertRepository, WeatherDataRepository
+from services.alert_service import AlertService
+
+
+def _observe(repo, ид, wind_speed, temperature=10.0, moment=None):
+    moment = moment or datetime.now()
+    asyncio.run(repo.save(WeatherData(ид, "26850", moment, temperature, 70.0, 1013.0, wind_speed, "С", 0.0)))
+
+
+def test_repeated_checks_keep_one_alert_per_condition():
+    data, alerts = WeatherDataRepository(), AlertRepository()
+    service = AlertService(data, alerts)
+    _observe(data, "w1", wind_speed=25.0, temperature=-30.0)
+
+    for _ in range(5):
+        found = asyncio.run(service.check_alerts("26850"))
+        assert sorted(alert.type for alert in found) == ["Сильный мороз", "Шквалистый ветер"]
+    active = asyncio.run(alerts.get_active_alerts())
+    assert len(active) == 2
+    assert {alert.id for alert in active} == {"threshold_wind_26850", "threshold_frost_26850"}
+
+
+def test_alert_is_cleared_when_value_returns_to_normal():
+    data, alerts = WeatherDataRepository(), AlertRepository()
+    service = AlertService(data, alerts)
+    _observe(data, "w1", wind_speed=25.0, moment=datetime.now() - timedelta(minutes=10))
+    asyncio.run(service.check_alerts("26850"))
+
+    _observe(data, "w2", wind_speed=5.0)
+    assert asyncio.run(service.check_alerts("26850")) == []
+    assert asyncio.run(alerts.get_active_alerts()) == []
+    assert asyncio.run(alerts.get_by_id("threshold_wind_26850")).is_active is False
+
+
+def test_cleared_alert_does_not_change_earlier_results():
+    data, alerts = WeatherDataRepository(), AlertRepository()
+    service = AlertService(data, alerts)
+    _observe(data, "w1", wind_speed=25.0, moment=datetime.now() - timedelta(minutes=10))
+    raised = asyncio.run(service.check_alerts("26850"))
+
+    _observe(data, "w2", wind_speed=5.0)
+    asyncio.run(service.check_alerts("26850"))
+    assert [alert.is_active for alert in raised] == [True]
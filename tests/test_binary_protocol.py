@@ -0,0 +1,132 @@
+"""Двоичный формат кадров показаний и приемник потоков"""
+
+import asyncio
+
+import pytest
+
+from controllers.data_ingestion_controller import DataIngestionController
+from domain.columnar_repository import ColumnarSensorDataRepository
+from domain.models import ДанныеСенсора, columns_size, readings_from_columns
+from services.ingestion_pipeline import PipelinePolicy
+from web.binary_protocol import (MAX_RECORDS, RECORD, FrameError, FrameReader, columns_of, decode_frames,
+                                 encode_frame, encode_readings, records_of)
+from web.sensor_feed_server import BinaryFeedPolicy, SensorFeedServer
+
+
+def _readings(count, станция="26850"):
+    типы = ("temperature", "humidity", "pressure", "wind_speed", "precipitation")
+    return [ДанныеСенсора(f"r{i}", 1_700_000_000_000 + i * 1000, float(i % 50) + 0.5, типы[i % 5], станция)
+            for i in range(count)]
+
+
+def _fields(записи):
+    return [(запись.идСтанции, запись.типИзмерения, запись.времяИзмерения, запись.значение) for запись in записи]
+
+
+def test_round_trip_keeps_fields():
+    записи = _readings(20) + _readings(7, станция="Москва-ВДНХ")
+    decoded = records_of(decode_frames(encode_readings(записи)))
+    assert sorted(_fields(decoded)) == sorted(_fields(записи))
+    # Идентификатор выводится из станции, типа и времени
+    assert decoded[0].идДанных == f"26850_temperature_{записи[0].времяИзмерения}"
+
+
+def test_columns_match_records():
+    записи = _readings(23) + _readings(9, станция="26851")
+    frames = decode_frames(encode_readings(записи[:20]) + encode_readings(записи[20:]))
+    колонки = columns_of(frames)
+    assert sorted(колонки) == sorted({(запись.идСтанции, запись.типИзмерения) for запись in записи})
+    assert sorted(_fields(readings_from_columns(колонки))) == sorted(_fields(records_of(frames)))
+    assert readings_from_columns(колонки)[0].идДанных == records_of(frames)[0].идДанных
+
+
+def test_large_batches_are_split_into_frames():
+    data = encode_readings(_readings(MAX_RECORDS + 10))
+    frames = decode_frames(data)
+    assert [len(frame) for frame in frames] == [MAX_RECORDS, 10]
+
+
+def test_reader_accepts_arbitrary_chunks():
+    data = encode_readings(_readings(50) + _readings(30, станция="26851"))
+    reader = FrameReader()
+    frames = []
+    for i in range(0, len(data), 7):
+        frames.extend(reader.feed(data[i:i + 7]))
+    reader.close()
+    assert [(frame.station, len(frame)) for frame in frames] == [("26850", 50), ("26851", 30)]
+
+
+def test_truncated_stream_and_bad_magic_are_errors():
+    data = encode_frame("26850", [1, 2], ["temperature", "humidity"], [1.0, 2.0])
+    reader = FrameReader()
+    assert reader.feed(data[:-RECORD.size]) == []
+    with pytest.raises(FrameError):
+        reader.close()
+    with pytest.raises(FrameError):
+        decode_frames(b"XX" + data[2:])
+    with pytest.raises(FrameError):
+        decode_frames(data[:-1])
+
+
+def test_unknown_type_code_is_kept_for_validation():
+    data = bytearray(encode_frame("26850", [1], ["temperature"], [1.0]))
+    data[-RECORD.size + 8] = 42  # код типа первой записи
+    assert records_of(decode_frames(bytes(data)))[0].типИзмерения == "unknown_42"
+    assert list(columns_of(decode_frames(bytes(data)))) == [("26850", "unknown_42")]
+
+
+def test_feed_columns_are_validated_and_saved_without_records():
+    async def run(repository):
+        controller = DataIngestionController(repository, pipeline=PipelinePolicy(flush_interval=0.01))
+        записи = _readings(10) + [ДанныеСенсора("", 1_700_000_100_000, 999.0, "temperature", "26850")]
+        await controller.принятьКолонки(columns_of(decode_frames(encode_readings(записи))))
+        следующие = [ДанныеСенсора("", запись.времяИзмерения + 200_000, запись.значение, запись.типИзмерения,
+                                   запись.идСтанции) for запись in _readings(10)]
+        await controller.принятьКолонки(columns_of(decode_frames(encode_readings(следующие))))
+        await controller.конвейер.stop()
+        return controller.конвейер.stats()
+
+    repository = ColumnarSensorDataRepository()
+
+    def no_records(entities):
+        raise AssertionError("новые показания пишутся колонками")
+
+    repository.сохранитьПакет = no_records
+    stats = asyncio.run(run(repository))
+    assert stats["submitted_records"] == stats["records_written"] == 21
+    assert stats["write_errors"] == 0
+    # Значение вне диапазона и давление ниже 600 отклонены
+    times, values = repository.получитьМассивыПоСтанции("26850", "temperature", 0, 2 ** 62)
+    assert list(times) == [1_700_000_000_000, 1_700_000_005_000, 1_700_000_200_000, 1_700_000_205_000]
+    assert list(values) == [0.5, 5.5, 0.5, 5.5]
+    assert len(repository.найтиВсе()) == 16
+
+
+class _BlockedController:
+    """Контроллер, который не успевает принимать данные"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.received = 0
+
+    async def принятьКолонки(self, колонки):
+        await self.release.wait()
+        self.received += columns_size(колонки)
+
+
+def test_udp_deliveries_are_bounded():
+    async def run():
+        controller = _BlockedController()
+        server = SensorFeedServer(controller, BinaryFeedPolicy(udp_max_in_flight=4))
+        datagram = encode_readings(_readings(3))
+        for _ in range(10):
+            server._datagram(datagram, ("127.0.0.1", 1))
+        stats = server.stats()
+        controller.release.set()
+        await server.stop()
+        return stats, controller.received
+
+    stats, received = asyncio.run(run())
+    assert stats["datagrams"] == 10
+    assert stats["datagrams_dropped"] == 6
+    assert received == 4 * 3
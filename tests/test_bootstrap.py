@@ -0,0 +1,16 @@
+"""Порядок завершения работы системы"""
+
+from infrastructure.bootstrap import Application_Bootstrap
+
+
+def test_signal_handler_only_stops_the_loop(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Application_Bootstrap, "_save_snapshot", staticmethod(lambda: calls.append("snapshot")))
+    monkeypatch.setattr(Application_Bootstrap, "_close_storage", staticmethod(lambda: calls.append("close")))
+    monkeypatch.setattr(Application_Bootstrap, "_running", True)
+
+    Application_Bootstrap._handle_shutdown(None, None)
+
+    # Снимок и закрытие хранилищ - в _run_system после остановки приема
+    assert Application_Bootstrap._running is False
+    assert calls == []
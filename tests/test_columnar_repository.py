@@ -0,0 +1,124 @@
+"""Колоночное хранилище: совпадение с построчным репозиторием, идентификаторы и перезапись"""
+
+import random
+
+from domain.columnar_repository import ColumnarSensorDataRepository
+from domain.models import ДанныеСенсора, readings_from_columns, reading_id
+from domain.repositories import SensorDataRepository
+
+STATIONS = ("26850", "radar_minsk")
+TYPES = ("temperature", "wind_speed")
+BASE = 1_700_000_000_000
+
+
+def _reading(i, explicit=False, value=None):
+    станция, тип = STATIONS[i % 2], TYPES[i // 2 % 2]
+    время = BASE + (i // 4) * 1000
+    ид = f"feed_{i}" if explicit else reading_id(станция, тип, время)
+    return ДанныеСенсора(ид, время, float(i) if value is None else value, тип, станция)
+
+
+def _rows(records):
+    return sorted((r.идДанных, r.времяИзмерения, r.значение, r.типИзмерения, r.идСтанции) for r in records)
+
+
+def test_column_save_matches_batch_save():
+    random.seed(5)
+    columnar, rows = ColumnarSensorDataRepository(), SensorDataRepository()
+    for _ in range(40):
+        # Новые ряды, продолжения, опоздавшие и повторно присланные показания
+        колонки = {}
+        for станция in STATIONS:
+            for тип in TYPES:
+                times = sorted(random.sample(range(BASE, BASE + 200_000, 1000), random.randrange(0, 8)))
+                колонки[(станция, тип)] = (times, [random.random() for _ in times])
+        columnar.сохранитьКолонки(колонки)
+        rows.сохранитьПакет(readings_from_columns(колонки))
+    assert _rows(columnar.найтиВсе()) == _rows(rows.найтиВсе())
+
+
+def test_matches_row_repository_under_random_writes():
+    random.seed(3)
+    columnar, rows = ColumnarSensorDataRepository(), SensorDataRepository()
+    for _ in range(60):
+        batch = [_reading(random.randrange(400), explicit=random.random() < 0.3, value=random.random())
+                 for _ in range(random.randrange(1, 40))]
+        for repo in (columnar, rows):
+            repo.сохранитьПакет(batch)
+        if random.random() < 0.3:
+            # Перенос записи с явным идентификатором на другое время
+            перенос = _reading(random.randrange(400), explicit=True)
+            перенос.времяИзмерения += 777
+            for repo in (columnar, rows):
+                repo.сохранить(перенос)
+
+    assert _rows(columnar.найтиВсе()) == _rows(rows.найтиВсе())
+    начало, конец = BASE + 10_000, BASE + 60_000
+    for станция in STATIONS:
+        for тип in TYPES:
+            assert _rows(columnar.получитьПоСтанции(станция, тип, начало, конец)) == \
+                _rows(rows.получитьПоСтанции(станция, тип, начало, конец))
+    for запись in random.sample(rows.найтиВсе(), 20):
+        assert columnar.найтиПоИд(запись.идДанных) == rows.найтиПоИд(запись.идДанных)
+    assert columnar.найтиПоИд("нет_такой") is None
+
+
+def test_default_ids_are_not_stored():
+    repo = ColumnarSensorDataRepository()
+    repo.сохранитьПакет([_reading(i) for i in range(100)])
+    assert all(колонка.ids is None and not колонка.aliases for колонка in repo._columns.values())
+    assert repo.найтиПоИд(_reading(5).идДанных) == _reading(5)
+
+    repo.сохранить(_reading(200, explicit=True))
+    assert repo.найтиПоИд("feed_200").идДанных == "feed_200"
+
+
+def test_overwrite_does_not_change_handed_out_views():
+    repo = ColumnarSensorDataRepository()
+    repo.сохранитьПакет([_reading(i) for i in range(0, 40, 4)])
+    times, values = repo.получитьМассивыПоСтанции("26850", "temperature", 0, 2 ** 62)
+    before = list(values)
+
+    repo.сохранить(_reading(8, value=-1.0))
+    assert list(values) == before
+    assert repo.найтиПоИд(_reading(8).идДанных).значение == -1.0
+
+
+def test_eviction_drops_explicit_ids():
+    from datetime import datetime
+    repo = ColumnarSensorDataRepository()
+    repo.сохранитьПакет([_reading(i, explicit=True) for i in range(40)])
+    records, _ = repo.evict_before(datetime.fromtimestamp((BASE + 5000) / 1000))
+    assert records == 20
+    assert repo.найтиПоИд("feed_0") is None and repo.найтиПоИд("feed_39") is not None
+    assert sum(len(колонка.aliases) for колонка in repo._columns.values()) == 20
+
+
+def test_small_chunks_match_row_repository_and_keep_snapshots(monkeypatch):
+    import domain.columnar_repository as columnar_module
+    import domain.repositories as repositories_module
+    monkeypatch.setattr(columnar_module, "COLUMN_CHUNK", 4)
+    monkeypatch.setattr(repositories_module, "SERIES_CHUNK", 4)
+    monkeypatch.setattr(repositories_module, "PARTITION_SHARDS", 4)
+
+    random.seed(5)
+    columnar, rows = ColumnarSensorDataRepository(), SensorDataRepository()
+    снимки = []
+    for шаг in range(80):
+        batch = [_reading(random.randrange(400), explicit=random.random() < 0.3, value=random.random())
+                 for _ in range(random.randrange(1, 12))]
+        for repo in (columnar, rows):
+            repo.сохранитьПакет(batch)
+        if шаг % 10 == 0:
+            снимки.append([(repo.snapshot(), _rows(repo.найтиВсе())) for repo in (columnar, rows)])
+
+    assert _rows(columnar.найтиВсе()) == _rows(rows.найтиВсе())
+    for станция in STATIONS:
+        for тип in TYPES:
+            assert _rows(columnar.получитьПоСтанции(станция, тип, BASE + 7000, BASE + 70_000)) == \
+                _rows(rows.получитьПоСтанции(станция, тип, BASE + 7000, BASE + 70_000))
+            times, _ = columnar.получитьМассивыПоСтанции(станция, тип, 0, 2 ** 62)
+            assert list(times) == sorted(times)
+    for снимок in снимки:
+        for view, записи in снимок:
+            assert _rows(view.найтиВсе()) == записи
@@ -0,0 +1,191 @@
+"""Согласованность снимков при параллельной записи из потоков и задач asyncio"""
+
+import asyncio
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+
+from domain.columnar_repository import ColumnarSensorDataRepository
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+
+BATCH = 40
+STATIONS = ("26850", "26851", "radar_minsk")
+TYPES = ("temperature", "humidity", "pressure")
+BATCHES_PER_WRITER = 30
+WRITERS = 3  # два потока и задача asyncio
+
+
+def _complete(coro):
+    """Корутина репозитория в памяти не ожидает - цикл событий не нужен"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("Корутина репозитория ожидает ввода-вывода")
+
+
+class _Stress:
+    def __init__(self):
+        self.sensor = SensorDataRepository()
+        self.columnar = ColumnarSensorDataRepository()
+        self.weather = WeatherDataRepository()
+        self.errors = []
+        self.reads = 0
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def write_batch(self) -> None:
+        with self._lock:
+            self._sequence += 1
+            n = self._sequence
+        # Пакеты пишутся вперемешку по времени: часть опаздывает
+        base = 1_700_000_000_000 + (n * 7919 % 1000) * 60_000
+        записи = [ДанныеСенсора(f"s{n}-{i}", base + i, float(i), TYPES[i % 3], STATIONS[i % 3])
+                  for i in range(BATCH)]
+        self.sensor.сохранитьПакет(записи)
+        self.columnar.сохранитьПакет(записи)
+        _complete(self.weather.save_many([
+            WeatherData(f"w{n}-{i}", STATIONS[i % 3], datetime.fromtimestamp((base + i) / 1000),
+                        20.0, 70.0, 1013.0, 3.0, "С", 0.0) for i in range(BATCH)
+        ]))
+
+    def _fail(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+
+    def check(self) -> None:
+        try:
+            self._check()
+        except Exception as e:
+            self._fail(f"{type(e).__name__}: {e}")
+        with self._lock:
+            self.reads += 1
+
+    def _check(self) -> None:
+        for name, repository in (("sensor", self.sensor), ("columnar", self.columnar)):
+            view = repository.snapshot()
+            все = view.получитьЗаПериод(0, 2 ** 62)
+            времена = [запись.времяИзмерения for запись in все]
+            if len(все) % BATCH:
+                self._fail(f"{name}: видна часть пакета ({len(все)} записей)")
+            if времена != sorted(времена):
+                self._fail(f"{name}: нарушен порядок по времени")
+            по_рядам = sum(len(view.получитьМассивыПоСтанции(станция, тип, 0, 2 ** 62)[0])
+                           for станция in STATIONS for тип in TYPES)
+            if по_рядам != len(все):
+                self._fail(f"{name}: индекс (станция, тип) расходится с выборкой")
+            # Снимок не меняется после последующих записей
+            if len(view.получитьЗаПериод(0, 2 ** 62)) != len(все):
+                self._fail(f"{name}: снимок изменился")
+
+        view = self.weather.snapshot()
+        ряды = view.observations_between(None, 0, 2 ** 62)
+        всего = sum(len(ряд) for ряд in ряды)
+        if всего % BATCH:
+            self._fail(f"weather: видна часть пакета ({всего} наблюдений)")
+        for ряд in ряды:
+            if [wd.timestamp for wd in ряд] != sorted(wd.timestamp for wd in ряд):
+                self._fail("weather: нарушен порядок ряда станции")
+        if len(_complete(view.get_all())) != всего:
+            self._fail("weather: ряды станций расходятся с партициями")
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-4)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_snapshots_stay_consistent_under_concurrent_writes(fast_switching):
+    stress = _Stress()
+    writers_done = threading.Event()
+    finished = []
+
+    def done() -> None:
+        finished.append(True)
+        if len(finished) == WRITERS:
+            writers_done.set()
+
+    def writer() -> None:
+        for _ in range(BATCHES_PER_WRITER):
+            stress.write_batch()
+        done()
+
+    def reader() -> None:
+        while not writers_done.is_set():
+            stress.check()
+
+    async def tasks() -> None:
+        async def write() -> None:
+            for _ in range(BATCHES_PER_WRITER):
+                stress.write_batch()
+                await asyncio.sleep(0)
+            done()
+
+        async def read() -> None:
+            while not writers_done.is_set():
+                stress.check()
+                await asyncio.sleep(0)
+
+        await asyncio.gather(write(), read())
+
+    threads = ([threading.Thread(target=writer) for _ in range(WRITERS - 1)]
+               + [threading.Thread(target=lambda: asyncio.run(tasks()))]
+               + [threading.Thread(target=reader) for _ in range(3)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stress.check()
+    assert stress.errors == []
+    assert stress.reads > 3
+    assert len(stress.sensor.snapshot().найтиВсе()) == WRITERS * BATCHES_PER_WRITER * BATCH
+    assert len(_complete(stress.weather.snapshot().get_all())) == WRITERS * BATCHES_PER_WRITER * BATCH
+
+
+def test_write_after_snapshot_copies_only_touched_chunks():
+    base = 1_700_000_000_000
+    sensor, columnar, weather = SensorDataRepository(), ColumnarSensorDataRepository(), WeatherDataRepository()
+    записи = [ДанныеСенсора(f"s{i}", base + i * 10, float(i), TYPES[i % 3], STATIONS[i % 3]) for i in range(30_000)]
+    sensor.сохранитьПакет(записи)
+    columnar.сохранитьПакет(записи)
+    _complete(weather.save_many([
+        WeatherData(f"w{i}", STATIONS[i % 3], datetime.fromtimestamp((base + i * 10) / 1000),
+                    20.0, 70.0, 1013.0, 3.0, "С", 0.0) for i in range(30_000)
+    ]))
+
+    sensor_view, columnar_view, weather_view = sensor.snapshot(), columnar.snapshot(), weather.snapshot()
+    sensor.сохранить(ДанныеСенсора("late", base + 5, -1.0, TYPES[0], STATIONS[0]))
+    columnar.сохранить(ДанныеСенсора("late", base + 5, -1.0, TYPES[0], STATIONS[0]))
+    _complete(weather.save(WeatherData("late", STATIONS[0], datetime.fromtimestamp((base + 5) / 1000),
+                                       -1.0, 70.0, 1013.0, 3.0, "С", 0.0)))
+
+    def shared(live, view):
+        """Сколько частей снимка разделено с живым репозиторием"""
+        return len(set(map(id, live)) & set(map(id, view))), len(view)
+
+    (key, live), = sensor._partitions.newest_first_keyed()
+    view = sensor_view._partitions.newest_first()[0]
+    same, total = shared(live.storage._shards, view.storage._shards)
+    assert same == total - 1
+    same, total = shared(live.time_index._times, view.time_index._times)
+    assert total > 20 and same == total - 1
+    same, total = shared(live.series[(STATIONS[0], TYPES[0])]._times, view.series[(STATIONS[0], TYPES[0])]._times)
+    assert same == total - 1
+    assert live.series[(STATIONS[1], TYPES[1])] is view.series[(STATIONS[1], TYPES[1])]
+
+    same, total = shared(columnar._columns[(STATIONS[0], TYPES[0])]._times,
+                         columnar_view._columns[(STATIONS[0], TYPES[0])]._times)
+    assert same == total - 1
+
+    same, total = shared(weather._partitions.newest_first()[0]._shards, weather_view._partitions.newest_first()[0]._shards)
+    assert same == total - 1
+
+    assert len(sensor_view.найтиВсе()) == len(columnar_view.найтиВсе()) == 30_000
+    assert len(sensor.найтиВсе()) == len(columnar.найтиВсе()) == 30_001
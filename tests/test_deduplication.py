@@ -0,0 +1,132 @@
+"""Подавление повторов показаний и наблюдений при приеме"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from controllers.data_controller import DataController
+from controllers.data_ingestion_controller import DataIngestionController
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from services.deduplication import ReadingDeduplicator
+
+
+def _reading(ид, время, станция="26850", тип="temperature"):
+    return ДанныеСенсора(ид, время, 10.0, тип, станция)
+
+
+def _weather(ид, moment, станция="26850"):
+    return WeatherData(ид, станция, moment, 10.0, 70.0, 1013.0, 3.0, "С", 0.0)
+
+
+class _FailingSensorRepository(SensorDataRepository):
+    def __init__(self):
+        super().__init__()
+        self.fail = True
+
+    def сохранитьПакет(self, entities):
+        if self.fail:
+            raise OSError("диск недоступен")
+        super().сохранитьПакет(entities)
+
+
+class _FailingWeatherRepository(WeatherDataRepository):
+    def __init__(self):
+        super().__init__()
+        self.fail = True
+
+    async def save_many(self, weather_data_list):
+        if self.fail:
+            raise OSError("диск недоступен")
+        await super().save_many(weather_data_list)
+
+
+def test_repeats_are_detected_by_key_not_id():
+    dedup = ReadingDeduplicator(capacity=100)
+    assert len(dedup.filter_readings([_reading("a", 1), _reading("b", 2)])) == 2
+    # Новые идентификаторы у тех же (станция, тип, время) и повтор внутри пакета
+    kept = dedup.filter_readings([_reading("c", 1), _reading("d", 3), _reading("e", 3)])
+    assert [запись.идДанных for запись in kept] == ["d"]
+    assert dedup.duplicates == 2
+
+
+def test_columns_share_keys_with_readings():
+    dedup = ReadingDeduplicator(capacity=100)
+    dedup.filter_readings([_reading("a", 1)])
+    kept = dedup.filter_columns({("26850", "temperature"): ([1, 2, 2], [10.0, 11.0, 12.0]),
+                                 ("26851", "temperature"): ([1], [10.0])})
+    assert kept == {("26850", "temperature"): ([2], [11.0]), ("26851", "temperature"): ([1], [10.0])}
+    assert dedup.duplicates == 2
+
+
+def test_capacity_zero_disables_filter():
+    dedup = ReadingDeduplicator(capacity=0)
+    записи = [_reading("a", 1), _reading("b", 1)]
+    assert dedup.filter_readings(записи) == записи
+
+
+def test_memory_is_bounded_by_two_generations():
+    dedup = ReadingDeduplicator(capacity=10)
+    for время in range(1000):
+        dedup.filter_readings([_reading(str(время), время)])
+    assert dedup.stats()["tracked_keys"] <= 10
+    # Недавний ключ помнится, давний - уже нет
+    assert not dedup.filter_readings([_reading("x", 999)])
+    assert dedup.filter_readings([_reading("y", 0)])
+
+
+def test_forget_returns_keys_after_generation_rotation():
+    dedup = ReadingDeduplicator(capacity=4)
+    kept = dedup.filter_readings([_reading(str(время), время) for время in range(3)])
+    dedup.forget_readings(kept)
+    assert len(dedup.filter_readings([_reading(str(время), время) for время in range(3)])) == 3
+
+
+def test_failed_sensor_save_does_not_mark_readings_seen():
+    repo = _FailingSensorRepository()
+    dedup = ReadingDeduplicator(capacity=100)
+    controller = DataIngestionController(repo, dedup=dedup)
+    записи = [_reading("a", 1_000), _reading("b", 2_000)]
+
+    asyncio.run(controller.обработатьДанные(записи))
+    assert repo.найтиВсе() == []
+
+    repo.fail = False
+    assert len(asyncio.run(controller.обработатьДанные(записи)).accepted) == 2
+    assert len(repo.найтиВсе()) == 2
+
+
+def test_failed_readings_ingest_is_retryable():
+    repo = _FailingSensorRepository()
+    controller = DataController(WeatherDataRepository(), repo, dedup=ReadingDeduplicator(capacity=100))
+    записи = [_reading("a", 1_000)]
+    with pytest.raises(OSError):
+        asyncio.run(controller.ingest_readings(записи))
+    repo.fail = False
+    assert len(asyncio.run(controller.ingest_readings(записи)).accepted) == 1
+
+
+def test_failed_columns_ingest_is_retryable():
+    repo = _FailingSensorRepository()
+    controller = DataController(WeatherDataRepository(), repo, dedup=ReadingDeduplicator(capacity=100))
+    колонки = {("26850", "temperature"): ([1_000, 2_000], [10.04, 10.0])}
+    with pytest.raises(OSError):
+        asyncio.run(controller.ingest_columns([колонки]))
+    repo.fail = False
+    assert asyncio.run(controller.ingest_columns([колонки])).accepted_count == 2
+    assert sorted((запись.идДанных, запись.значение) for запись in repo.найтиВсе()) == [
+        ("26850_temperature_1000", 10.0), ("26850_temperature_2000", 10.0)]
+    assert asyncio.run(controller.ingest_columns([колонки])).duplicates == 2
+
+
+def test_failed_weather_ingest_is_retryable():
+    repo = _FailingWeatherRepository()
+    controller = DataController(repo, SensorDataRepository(), dedup=ReadingDeduplicator(capacity=100))
+    наблюдения = [_weather("w1", datetime(2026, 1, 1, 12))]
+    with pytest.raises(OSError):
+        asyncio.run(controller.ingest_many(наблюдения))
+    repo.fail = False
+    assert asyncio.run(controller.ingest_many(наблюдения)) == 1
+    # Теперь наблюдение сохранено, и повтор отбрасывается
+    assert asyncio.run(controller.ingest_many([_weather("w2", datetime(2026, 1, 1, 12))])) == 0
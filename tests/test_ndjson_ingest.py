@@ -0,0 +1,100 @@
+"""Потоковый разбор NDJSON и пакетная запись принятых записей"""
+
+import asyncio
+import json
+from datetime import datetime
+
+from controllers.data_controller import DataController
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from services.deduplication import ReadingDeduplicator
+from web.ndjson_ingest import MAX_LINE_CHARS, NDJSONIngestor
+
+T0 = int(datetime(2026, 3, 1, 12).timestamp() * 1000)
+# Обязательные поля наблюдения кроме станции, времени и температуры
+REQUIRED = {"humidity": 70.0, "pressure": 750.0, "wind_speed": 3.0}
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _ingest(lines, chunk_size=7, batch_size=2000):
+    weather, sensors = WeatherDataRepository(), SensorDataRepository()
+    controller = DataController(weather, sensors, dedup=ReadingDeduplicator(capacity=1000))
+    body = "\n".join(lines).encode("utf-8")
+    result = asyncio.run(NDJSONIngestor(controller, batch_size).ingest(_chunks(body, chunk_size)))
+    return result, weather, sensors
+
+
+def test_observations_and_readings_are_parsed():
+    lines = [
+        json.dumps({"station_id": "Минск", "timestamp": T0, "temperature": -1.5, "wind_direction": "СЗ", **REQUIRED},
+                   ensure_ascii=False),
+        json.dumps({"station_id": 26850, "timestamp": "2026-03-01T12:30:00", "temperature": 2, **REQUIRED}),
+        "",
+        json.dumps({"station_id": "26850", "type": "humidity", "value": 55.56, "timestamp": T0}),
+    ]
+    result, weather, sensors = _ingest(lines)
+    assert (result["accepted"], result["rejected"]) == (3, 0)
+    observations = sorted(asyncio.run(weather.get_all()), key=lambda w: w.timestamp)
+    assert [(w.id, w.station_id, w.wind_direction) for w in observations] == \
+        [(f"Минск_{T0}", "Минск", "СЗ"), (f"26850_{T0 + 30 * 60_000}", "26850", "")]
+    [reading] = sensors.найтиВсе()
+    assert (reading.идДанных, reading.значение) == (f"26850_humidity_{T0}", 55.6)
+
+
+def test_bad_lines_are_rejected_with_reasons():
+    lines = [
+        "{не json",
+        "[1, 2]",
+        json.dumps({"station_id": "26850", "timestamp": T0}),
+        json.dumps({"station_id": "26850", "timestamp": True, "temperature": 1, **REQUIRED}),
+        json.dumps({"station_id": "26850", "type": "humidity", "value": 150, "timestamp": T0}),
+        "x" * (MAX_LINE_CHARS + 10),
+        json.dumps({"station_id": "26850", "timestamp": T0, "temperature": 1, **REQUIRED}),
+    ]
+    result, weather, _ = _ingest(lines, chunk_size=4096)
+    assert result["accepted"] == 1
+    assert result["rejected_by_reason"] == {"invalid_json": 2, "missing_field": 1, "invalid_value": 1,
+                                            "out_of_range": 1, "too_long": 1}
+    assert result["errors"][0].startswith("строка 1:")
+    assert len(asyncio.run(weather.get_all())) == 1
+
+
+def test_split_multibyte_characters_and_duplicates():
+    line = json.dumps({"station_id": "Гродно", "timestamp": T0, "temperature": 1.0, "phenomena": "ливень",
+                       **REQUIRED}, ensure_ascii=False)
+    # Фрагменты по 3 байта рвут двухбайтовые символы UTF-8; вторая строка - повтор
+    result, weather, _ = _ingest([line, line], chunk_size=3, batch_size=1)
+    assert (result["accepted"], result["duplicates"]) == (1, 1)
+    assert asyncio.run(weather.get_all())[0].phenomena == "ливень"
+
+
+def test_observation_fields_are_required_and_range_checked():
+    lines = [
+        json.dumps({"station_id": "26850", "timestamp": T0, "temperature": 1, "humidity": 70.0, "pressure": 750.0}),
+        json.dumps({"station_id": "26850", "timestamp": T0, "temperature": 1, **REQUIRED, "pressure": 0.0}),
+        json.dumps({"station_id": "26850", "timestamp": T0, "temperature": 99, **REQUIRED, "precipitation": -1}),
+        json.dumps({"station_id": "26850", "timestamp": T0 + 1, "temperature": 1, **REQUIRED}),
+    ]
+    result, weather, _ = _ingest(lines)
+    assert result["accepted"] == 1
+    assert result["rejected_by_reason"] == {"missing_field": 1, "out_of_range": 2}
+    assert result["errors"][1] == "строка 2: вне допустимого диапазона: pressure"
+    assert result["errors"][2] == "строка 3: вне допустимого диапазона: temperature, precipitation"
+    [observation] = asyncio.run(weather.get_all())
+    assert (observation.humidity, observation.pressure, observation.wind_speed) == (70.0, 750.0, 3.0)
+
+
+def test_long_line_is_rejected_once():
+    lines = [
+        "x" * (MAX_LINE_CHARS * 3),
+        json.dumps({"station_id": "26850", "timestamp": T0, "temperature": 1, **REQUIRED}),
+        "{не json",
+    ]
+    result, weather, _ = _ingest(lines, chunk_size=1000)
+    assert result["accepted"] == 1
+    assert result["rejected_by_reason"] == {"too_long": 1, "invalid_json": 1}
+    assert result["errors"][1].startswith("строка 3:")
+    assert len(asyncio.run(weather.get_all())) == 1
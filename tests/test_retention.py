@@ -0,0 +1,73 @@
+"""Сроки хранения и удаление устаревших партиций"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from controllers.data_controller import DataController
+from domain.models import Alert, AlertLevel, Forecast, WeatherData, ДанныеСенсора
+from domain.repositories import AlertRepository, ForecastRepository, SensorDataRepository, WeatherDataRepository
+from domain.retention import PARTITION_MS, RetentionPolicy, TimePartitions
+
+NOW = datetime.now()
+
+
+def _ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def test_policy_from_config_keeps_defaults():
+    policy = RetentionPolicy.from_config({"retention": {"sensor_days": 3, "unknown": 1}})
+    assert (policy.sensor_days, policy.weather_days) == (3, 30)
+
+
+def test_partitions_are_dropped_whole():
+    partitions = TimePartitions(dict)
+    for day in range(5):
+        partitions.for_time(day * PARTITION_MS + 5)[day] = day
+    dropped = partitions.drop_before(2 * PARTITION_MS + 10)
+    assert [partition for partition in dropped] == [{0: 0}, {1: 1}]
+    assert [partition for partition in partitions] == [{2: 2}, {3: 3}, {4: 4}]
+    assert partitions.start() == 2 * PARTITION_MS
+
+
+def test_snapshot_keeps_dropped_partitions():
+    partitions = TimePartitions(dict)
+    partitions.for_time(5)["a"] = 1
+    snapshot = partitions.snapshot()
+    partitions.drop_before(2 * PARTITION_MS)
+    partitions.for_time(PARTITION_MS * 3)["b"] = 2
+    assert list(snapshot) == [{"a": 1}]
+
+
+def test_cleanup_evicts_each_repository_by_its_policy():
+    weather, sensors = WeatherDataRepository(), SensorDataRepository()
+    forecasts, alerts = ForecastRepository(), AlertRepository()
+    controller = DataController(weather, sensors, forecasts, alerts,
+                                retention=RetentionPolicy(weather_days=10, sensor_days=5, forecast_days=5,
+                                                          alert_days=10))
+    for days in (1, 3, 7, 20):
+        moment = NOW - timedelta(days=days)
+        asyncio.run(weather.save(WeatherData(f"w{days}", "26850", moment, 1.0, 70.0, 1013.0, 3.0, "С", 0.0)))
+        sensors.сохранить(ДанныеСенсора(f"r{days}", _ms(moment), 1.0, "visibility", "26850"))
+        forecasts.сохранить(Forecast(f"f{days}", "WRF", moment, moment, moment + timedelta(hours=6), "Минск"))
+        alerts.сохранить(Alert(f"a{days}", AlertLevel.WARNING, "Ветер", "Минск", moment - timedelta(hours=1),
+                               moment, "тест"))
+
+    result = asyncio.run(controller.cleanup_old_data())
+
+    # Партиции суточные: удаляются только целиком старше срока хранения
+    assert sorted(w.id for w in asyncio.run(weather.get_all())) == ["w1", "w3", "w7"]
+    assert sorted(з.идДанных for з in sensors.найтиВсе()) == ["r1", "r3"]
+    assert sorted(f.id for f in forecasts.найтиВсе()) == ["f1", "f3"]
+    assert sorted(a.id for a in alerts.найтиВсе()) == ["a1", "a3", "a7"]
+    assert {name: counts["records"] for name, counts in result["repositories"].items()} == \
+        {"weather": 1, "sensor": 2, "forecast": 2, "alert": 1}
+
+
+def test_cleanup_days_override_applies_to_all_repositories():
+    sensors = SensorDataRepository()
+    controller = DataController(WeatherDataRepository(), sensors)
+    sensors.сохранить(ДанныеСенсора("old", _ms(NOW - timedelta(days=3)), 1.0, "visibility", "26850"))
+    sensors.сохранить(ДанныеСенсора("new", _ms(NOW), 1.0, "visibility", "26850"))
+    asyncio.run(controller.cleanup_old_data(days=1))
+    assert [з.идДанных for з in sensors.найтиВсе()] == ["new"]
@@ -0,0 +1,102 @@
+"""Многоуровневые агрегаты: вставка опоздавших данных и сводки за период"""
+
+import random
+from datetime import datetime
+
+from domain.models import ДанныеСенсора
+from domain.rollups import DAY_MS, HOUR_MS, MINUTE_MS, RollupStore
+
+BASE = int(datetime(2026, 3, 1).timestamp() * 1000)
+
+
+def _raw(записи):
+    """Чтение сырых данных за [начало, конец] как у репозитория"""
+    def reader(начало, конец):
+        результат = {}
+        for запись in записи:
+            if начало <= запись.времяИзмерения <= конец:
+                времена, значения = результат.setdefault(запись.типИзмерения, ([], []))
+                времена.append(запись.времяИзмерения)
+                значения.append(запись.значение)
+        return результат
+    return reader
+
+
+def _store():
+    store = RollupStore()
+    # Все данные тестов - в покрытом агрегатами периоде
+    store.cover(BASE - 30 * DAY_MS, BASE + 30 * DAY_MS)
+    return store
+
+
+def _expected(tier, записи):
+    buckets = {}
+    for запись in записи:
+        start = запись.времяИзмерения - запись.времяИзмерения % tier.bucket_ms
+        bucket = buckets.setdefault(start, [0, 0.0, float("inf"), float("-inf")])
+        bucket[0] += 1
+        bucket[1] += запись.значение
+        bucket[2] = min(bucket[2], запись.значение)
+        bucket[3] = max(bucket[3], запись.значение)
+    return sorted(buckets.items())
+
+
+def _actual(tier):
+    return [(start, [s.количество, s.сумма, s.минимум, s.максимум])
+            for start, s in tier.buckets("26850", "temperature", BASE - 30 * DAY_MS, BASE + 30 * DAY_MS)]
+
+
+def test_late_points_are_merged_in_order():
+    rng = random.Random(9)
+    store = _store()
+    записи = []
+    for пакет in range(20):
+        # Пакет свежих данных и опоздавшие точки за прошедшие сутки
+        свежие = [BASE + пакет * HOUR_MS + i * MINUTE_MS for i in range(60)]
+        опоздавшие = [BASE + rng.randrange(-DAY_MS, пакет * HOUR_MS + 1) for _ in range(30)]
+        batch = [ДанныеСенсора(f"{пакет}_{i}", t, float(rng.randrange(-300, 300)) / 10, "temperature", "26850")
+                 for i, t in enumerate(свежие + опоздавшие)]
+        store.add_many(batch)
+        записи.extend(batch)
+
+    for tier in store.tiers:
+        actual = _actual(tier)
+        expected = _expected(tier, записи)
+        assert [start for start, _ in actual] == [start for start, _ in expected]
+        for (_, got), (_, want) in zip(actual, expected):
+            assert got[0] == want[0] and got[2:] == want[2:]
+            assert abs(got[1] - want[1]) < 1e-6
+
+
+def test_single_add_is_visible_immediately():
+    store = _store()
+    store.add("26850", "temperature", BASE + HOUR_MS, 5.0)
+    store.add("26850", "temperature", BASE, 3.0)
+    assert [start for start, _ in store.tiers[0].buckets("26850", "temperature", BASE, BASE + DAY_MS)] \
+        == [BASE, BASE + HOUR_MS]
+
+
+def test_summarize_matches_raw_data():
+    rng = random.Random(3)
+    записи = [ДанныеСенсора(str(i), BASE + rng.randrange(0, 10 * DAY_MS), float(rng.randrange(0, 1000)) / 10,
+                            rng.choice(("temperature", "humidity")), "26850")
+              for i in range(5000)]
+    store = _store()
+    store.add_many(записи)
+    raw = _raw(записи)
+
+    # Невыровненный период: середина из суток и часов, края - из минут и сырых данных
+    начало, конец = BASE + 3 * HOUR_MS + 17 * MINUTE_MS + 1234, BASE + 8 * DAY_MS + 5 * MINUTE_MS + 999
+    сводка = store.summarize(начало, конец, raw)
+    for тип, (_, значения) in raw(начало, конец).items():
+        assert сводка[тип].количество == len(значения)
+        assert abs(сводка[тип].сумма - sum(значения)) < 1e-6
+        assert (сводка[тип].минимум, сводка[тип].максимум) == (min(значения), max(значения))
+
+
+def test_uncovered_part_is_read_from_raw_data():
+    store = RollupStore()
+    # Данные до создания хранилища в агрегаты не попали
+    записи = [ДанныеСенсора("old", BASE, 1.0, "temperature", "26850")]
+    сводка = store.summarize(BASE - DAY_MS, BASE + DAY_MS, _raw(записи))
+    assert сводка["temperature"].количество == 1
@@ -0,0 +1,74 @@
+"""Архивы сегментов под репозиториями в памяти"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from domain.models import WeatherData, ДанныеСенсора
+from domain.repositories import SensorDataRepository, WeatherDataRepository
+from infrastructure.segment_log import SensorSegmentArchive, WeatherSegmentArchive
+
+NOW = datetime.now().replace(microsecond=0)
+OLD = NOW - timedelta(days=30)
+
+
+def _ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def test_resaved_readings_are_read_back_once(tmp_path):
+    archive = SensorSegmentArchive(str(tmp_path / "sensors"), segment_records=4)
+    repo = SensorDataRepository(archive)
+    записи = [ДанныеСенсора(f"r{i}", _ms(OLD) + i * 1000, float(i), "temperature", "26850") for i in range(5)]
+    repo.сохранитьПакет(записи)
+    repo.сохранить(ДанныеСенсора("r1", _ms(OLD) + 1000, 10.0, "temperature", "26850"))
+    repo.сохранитьПакет(записи[3:])
+
+    # Старые данные вытеснены из памяти и читаются из архива
+    repo.evict_before(NOW - timedelta(days=1))
+    assert repo.найтиВсе() == []
+    найденные = repo.получитьПоСтанции("26850", "temperature", _ms(OLD), _ms(NOW))
+    assert [(запись.идДанных, запись.значение) for запись in найденные] == \
+        [("r0", 0.0), ("r1", 10.0), ("r2", 2.0), ("r3", 3.0), ("r4", 4.0)]
+    assert list(repo.получитьМассивыЗаПериод(_ms(OLD), _ms(NOW))["temperature"][1]) == [0.0, 10.0, 2.0, 3.0, 4.0]
+    archive.close()
+
+
+def test_resaved_observations_are_read_back_once(tmp_path):
+    archive = WeatherSegmentArchive(str(tmp_path / "weather"), segment_records=3)
+    repo = WeatherDataRepository(archive)
+
+    def observation(ид, hours, temperature):
+        return WeatherData(ид, "26850", OLD + timedelta(hours=hours), temperature, 70.0, 1013.0, 3.0, "С", 0.0)
+
+    asyncio.run(repo.save_many([observation(f"w{i}", i, float(i)) for i in range(4)]))
+    asyncio.run(repo.save(observation("w2", 2, 20.0)))
+    asyncio.run(repo.save_many([observation("w3", 3, 3.0)]))
+
+    assert [(w.id, w.temperature) for w in archive.scan(_ms(OLD), _ms(NOW))] == \
+        [("w0", 0.0), ("w1", 1.0), ("w2", 20.0), ("w3", 3.0)]
+    assert len(archive.scan_station("26850", _ms(OLD), _ms(NOW))) == 4
+    assert archive.latest("26850").id == "w3"
+    archive.close()
+
+
+def test_columnar_repository_reads_evicted_readings_from_archive(tmp_path):
+    from domain.columnar_repository import ColumnarSensorDataRepository
+
+    archive = SensorSegmentArchive(str(tmp_path / "sensors"), segment_records=4)
+    repo = ColumnarSensorDataRepository(archive)
+    времена = [_ms(OLD) + i * 1000 for i in range(5)]
+    repo.сохранитьКолонки({("26850", "temperature"): (времена[:3], [0.0, 1.0, 2.0])})
+    repo.сохранитьПакет([ДанныеСенсора("r3", времена[3], 3.0, "temperature", "26850")])
+    repo.сохранитьКолонки({("26850", "temperature"): ([времена[1], времена[4]], [10.0, 4.0])})
+    repo.сохранитьКолонки({("26850", "humidity"): ([_ms(NOW)], [70.0])})
+
+    # Вытесненный ряд читается из архива, свежий - из памяти
+    repo.evict_before(NOW - timedelta(days=1))
+    найденные = repo.получитьПоСтанции("26850", "temperature", _ms(OLD), _ms(NOW))
+    assert [запись.значение for запись in найденные] == [0.0, 10.0, 2.0, 3.0, 4.0]
+    assert list(repo.получитьМассивыПоСтанции("26850", "temperature", _ms(OLD), _ms(NOW))[1]) == \
+        [0.0, 10.0, 2.0, 3.0, 4.0]
+    массивы = repo.получитьМассивыЗаПериод(_ms(OLD), _ms(NOW))
+    assert list(массивы["temperature"][1]) == [0.0, 10.0, 2.0, 3.0, 4.0]
+    assert list(массивы["humidity"][1]) == [70.0]
+    archive.close()
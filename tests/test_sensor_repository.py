@@ -0,0 +1,81 @@
+"""Выборки SensorDataRepository по времени и по индексу (станция, тип)"""
+
+import random
+
+import pytest
+
+from domain.models import ДанныеСенсора
+from domain.repositories import SensorDataRepository
+
+TYPES = ("temperature", "humidity", "pressure")
+STATIONS = ("26850", "26851", "26852")
+DAY_MS = 24 * 3600 * 1000
+
+
+@pytest.fixture(scope="module")
+def filled():
+    rng = random.Random(1)
+    repo = SensorDataRepository()
+    записи = {}
+    for batch in range(20):
+        пакет = [ДанныеСенсора(f"r{rng.randrange(3000)}", rng.randrange(0, 5 * DAY_MS), float(rng.randrange(100)),
+                               rng.choice(TYPES), rng.choice(STATIONS))
+                 for _ in range(200)]
+        if batch % 2:
+            repo.сохранитьПакет(пакет)
+        else:
+            for запись in пакет:
+                repo.сохранить(запись)
+        записи.update((запись.идДанных, запись) for запись in пакет)
+    return repo, list(записи.values())
+
+
+def _key(записи):
+    return sorted((запись.времяИзмерения, запись.идДанных) for запись in записи)
+
+
+def _times(записи):
+    return [запись.времяИзмерения for запись in записи]
+
+
+def test_period_query_matches_scan(filled):
+    repo, записи = filled
+    for начало, конец in ((0, 5 * DAY_MS), (DAY_MS // 3, 2 * DAY_MS + 17), (3 * DAY_MS, 3 * DAY_MS)):
+        найденные = repo.получитьЗаПериод(начало, конец)
+        assert _times(найденные) == sorted(_times(найденные))
+        assert _key(найденные) == _key(з for з in записи if начало <= з.времяИзмерения <= конец)
+
+
+def test_type_query_matches_scan(filled):
+    repo, записи = filled
+    for тип in TYPES + ("visibility",):
+        assert _key(repo.получитьПоТипу(тип)) == _key(з for з in записи if з.типИзмерения == тип)
+
+
+@pytest.mark.parametrize("станция,тип", [("26850", "temperature"), ("26851", None), (None, "pressure"), (None, None)])
+def test_series_query_matches_scan(filled, станция, тип):
+    repo, записи = filled
+    начало, конец = DAY_MS // 2, 4 * DAY_MS
+    expected = [з for з in записи
+                if (станция is None or з.идСтанции == станция) and (тип is None or з.типИзмерения == тип)
+                and начало <= з.времяИзмерения <= конец]
+    найденные = repo.получитьПоСтанции(станция, тип, начало, конец)
+    assert _times(найденные) == sorted(_times(найденные))
+    assert _key(найденные) == _key(expected)
+
+
+def test_series_arrays_match_records(filled):
+    repo, _ = filled
+    times, values = repo.получитьМассивыПоСтанции("26852", "humidity", 0, 5 * DAY_MS)
+    записи = repo.получитьПоСтанции("26852", "humidity", 0, 5 * DAY_MS)
+    assert list(times) == _times(записи)
+    assert sorted(values) == sorted(запись.значение for запись in записи)
+
+
+def test_overwrite_moves_record_between_series():
+    repo = SensorDataRepository()
+    repo.сохранить(ДанныеСенсора("r1", 1000, 1.0, "temperature", "26850"))
+    repo.сохранить(ДанныеСенсора("r1", 3 * DAY_MS, 2.0, "humidity", "26851"))
+    assert repo.получитьПоСтанции("26850", "temperature", 0, 10 * DAY_MS) == []
+    assert [з.значение for з in repo.получитьПоСтанции("26851", "humidity", 0, 10 * DAY_MS)] == [2.0]
+    assert repo.получитьЗаПериод(0, DAY_MS) == []
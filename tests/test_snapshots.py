@@ -0,0 +1,75 @@
+"""Запись и загрузка снимков репозиториев"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from domain.models import Alert, AlertLevel, Forecast, WeatherData, ДанныеСенсора
+from domain.repositories import AlertRepository, ForecastRepository, SensorDataRepository, WeatherDataRepository
+from domain.rollups import RollupStore
+from infrastructure.snapshots import SnapshotManager
+
+NOW = datetime.now().replace(microsecond=123000)
+
+
+def _repositories():
+    return WeatherDataRepository(), SensorDataRepository(), ForecastRepository(), AlertRepository(), RollupStore()
+
+
+def _fill(weather, sensors, forecasts, alerts, rollups):
+    наблюдения = [WeatherData(f"w{i}", f"2685{i % 3}", NOW - timedelta(minutes=10 * i), 1.5 + i, 70.0,
+                              1013.0, 3.0, "СЗ", 0.2, "снег" if i % 2 else "")
+                  for i in range(50)]
+    asyncio.run(weather.save_many(наблюдения))
+    показания = [ДанныеСенсора(f"r{i}", int(NOW.timestamp() * 1000) - i * 1000, float(i), "visibility", "Минск-1")
+                 for i in range(30)]
+    sensors.сохранитьПакет(показания)
+    rollups.add_weather(наблюдения)
+    forecasts.сохранить(Forecast("f1", "WRF-ARW", NOW, NOW, NOW + timedelta(hours=6), "Минск",
+                                 [{"temperature": 2.0}]))
+    alerts.сохранить(Alert("a1", AlertLevel.DANGER, "Ветер", "Минск", NOW, NOW + timedelta(hours=3),
+                           "Шквал", is_active=False))
+    return наблюдения, показания
+
+
+def _restore(path):
+    repos = _repositories()
+    manager = SnapshotManager(*repos[:4], path=path, rollups=repos[4])
+    latest = asyncio.run(manager.load_latest())
+    asyncio.run(manager.load_remaining())
+    return repos, latest
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    source = _repositories()
+    наблюдения, показания = _fill(*source)
+    assert SnapshotManager(*source[:4], path=path, rollups=source[4]).save() > 0
+
+    (weather, sensors, forecasts, alerts, rollups), latest = _restore(path)
+    assert latest == 3
+    assert sorted(asyncio.run(weather.get_all()), key=lambda w: w.id) == sorted(наблюдения, key=lambda w: w.id)
+    assert sorted(sensors.найтиВсе(), key=lambda з: з.идДанных) == sorted(показания, key=lambda з: з.идДанных)
+    assert forecasts.найтиВсе() == source[2].найтиВсе()
+    assert alerts.найтиВсе() == source[3].найтиВсе()
+    начало = int((NOW - timedelta(days=1)).timestamp() * 1000)
+    конец = int((NOW + timedelta(minutes=1)).timestamp() * 1000)
+    assert rollups.tiers[0].buckets("26850", "temperature", начало, конец) == \
+        source[4].tiers[0].buckets("26850", "temperature", начало, конец)
+
+
+def test_async_snapshot_matches_sync(tmp_path):
+    source = _repositories()
+    _fill(*source)
+    sync_path, async_path = str(tmp_path / "sync.bin"), str(tmp_path / "async.bin")
+    SnapshotManager(*source[:4], path=sync_path, rollups=source[4]).save()
+    asyncio.run(SnapshotManager(*source[:4], path=async_path, rollups=source[4]).save_async())
+
+    restored_sync, _ = _restore(sync_path)
+    restored_async, _ = _restore(async_path)
+    assert sorted(asyncio.run(restored_sync[0].get_all()), key=lambda w: w.id) == \
+        sorted(asyncio.run(restored_async[0].get_all()), key=lambda w: w.id)
+
+
+def test_missing_snapshot_loads_nothing(tmp_path):
+    _, latest = _restore(str(tmp_path / "absent.bin"))
+    assert latest == 0
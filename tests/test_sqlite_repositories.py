@@ -0,0 +1,51 @@
+"""Буферизованная запись репозиториев SQLite"""
+
+import asyncio
+import sqlite3
+import time
+
+from domain.models import ДанныеСенсора
+from infrastructure.sqlite_repositories import SQLiteDatabase, SQLiteSensorDataRepository
+
+
+def _stored(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM sensor_data").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_buffer_is_flushed_by_size(tmp_path):
+    path = str(tmp_path / "weather.db")
+    database = SQLiteDatabase(path, batch_size=10, flush_interval=3600)
+    repo = SQLiteSensorDataRepository(database)
+    repo.сохранитьПакет([ДанныеСенсора(f"r{i}", i, 1.0, "temperature", "26850") for i in range(9)])
+    assert _stored(path) == 0
+    repo.сохранить(ДанныеСенсора("r9", 9, 1.0, "temperature", "26850"))
+    assert _stored(path) == 10
+    database.close()
+
+
+def test_idle_buffer_is_flushed_by_scheduled_task(tmp_path):
+    path = str(tmp_path / "weather.db")
+    database = SQLiteDatabase(path, batch_size=500, flush_interval=0.5)
+    repo = SQLiteSensorDataRepository(database)
+    repo.сохранить(ДанныеСенсора("r1", 1, 1.0, "temperature", "26850"))
+    assert _stored(path) == 0
+
+    # Новых записей нет: срок сбрасываемого буфера проверяет только периодическая задача
+    asyncio.run(database.flush_async())
+    assert _stored(path) == 0
+    time.sleep(0.6)
+    asyncio.run(database.flush_async())
+    assert _stored(path) == 1
+    database.close()
+
+
+def test_reads_see_buffered_records(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "weather.db"), batch_size=500, flush_interval=3600)
+    repo = SQLiteSensorDataRepository(database)
+    repo.сохранить(ДанныеСенсора("r1", 5, 1.0, "temperature", "26850"))
+    assert [запись.идДанных for запись in repo.получитьПоСтанции("26850", "temperature", 0, 10)] == ["r1"]
+    database.close()
@@ -0,0 +1,64 @@
+"""Сеть станций и пространственный индекс"""
+
+import random
+
+from domain.models import GeoPoint, Метеостанция
+from domain.stations import StationNetwork, distance_km
+
+
+def _network(count=500, seed=12):
+    rng = random.Random(seed)
+    network = StationNetwork("net", "Сеть")
+    for i in range(count):
+        network.add_station(Метеостанция(str(i), GeoPoint(rng.uniform(-89, 89), rng.uniform(-180, 180)), "активна"))
+    return network
+
+
+def test_nearest_and_radius_match_brute_force():
+    network = _network()
+    rng = random.Random(1)
+    for _ in range(50):
+        point = GeoPoint(rng.uniform(-90, 90), rng.uniform(-180, 180))
+        expected = sorted((distance_km(point, s.координаты), s.идСтанции) for s in network.stations)
+        nearest = network.find_nearest(point, 5)
+        assert [s.идСтанции for _, s in nearest] == [ид for _, ид in expected[:5]]
+        within = network.find_within_radius(point, 2000)
+        assert sorted(s.идСтанции for _, s in within) == sorted(ид for d, ид in expected if d <= 2000)
+
+
+def test_bbox_across_antimeridian():
+    network = StationNetwork("net", "Сеть")
+    for ид, lat, lon in (("a", 60, 179.5), ("b", 60, -179.5), ("c", 60, 0)):
+        network.add_station(Метеостанция(ид, GeoPoint(lat, lon)))
+    assert sorted(s.идСтанции for s in network.find_in_bbox(50, 170, 70, -170)) == ["a", "b"]
+
+
+def test_adding_existing_id_replaces_station():
+    network = _network(count=10)
+    moved = Метеостанция("3", GeoPoint(0.0, 0.0), "активна")
+    network.add_station(moved)
+
+    assert len(network.stations) == 10
+    assert network.stations[3] is moved
+    assert network.get_station_by_id("3") is moved
+    assert [s.идСтанции for _, s in network.find_nearest(GeoPoint(0.0, 0.0), 10)].count("3") == 1
+    assert network.find_nearest(GeoPoint(0.0, 0.0), 1)[0][1] is moved
+    assert network.calculate_coverage()["stations_count"] == 10
+
+
+def test_duplicate_ids_in_constructor_keep_last():
+    first = Метеостанция("1", GeoPoint(10, 10))
+    second = Метеостанция("1", GeoPoint(20, 20))
+    network = StationNetwork("net", "Сеть", stations=[first, second])
+    assert network.stations == [second]
+    assert network.find_in_bbox(5, 5, 15, 15) == []
+
+
+def test_readding_station_after_move_reindexes_it():
+    network = StationNetwork("net", "Сеть")
+    station = Метеостанция("1", GeoPoint(10, 10))
+    network.add_station(station)
+    station.координаты = GeoPoint(-40, 100)
+    network.add_station(station)
+    assert network.find_in_bbox(5, 5, 15, 15) == []
+    assert network.find_in_bbox(-45, 95, -35, 105) == [station]
@@ -0,0 +1,44 @@
+"""Запись трафика приема и чтение записи"""
+
+from datetime import datetime
+
+import pytest
+
+from domain.models import WeatherData, ДанныеСенсора
+from services.traffic_recorder import (KIND_READINGS, KIND_WEATHER, RecordingPolicy, TrafficRecorder,
+                                       read_recording)
+
+
+def test_recording_round_trip(tmp_path):
+    path = str(tmp_path / "traffic.ndjson.gz")
+    clock = [0.0]
+    recorder = TrafficRecorder(path, clock=lambda: clock[0])
+    наблюдение = WeatherData("w1", "26850", datetime(2026, 3, 1, 12), 1.5, 70.0, 1013.0, 3.0, "С", 0.0, "дождь")
+    recorder.record_weather([наблюдение])
+    clock[0] = 0.25
+    recorder.record_readings([ДанныеСенсора("r1", 1000, 2.5, "temperature", "26850")])
+    recorder.close()
+
+    entries = list(read_recording(path))
+    assert [(t, kind) for t, kind, _ in entries] == [(0.0, KIND_WEATHER), (0.25, KIND_READINGS)]
+    assert entries[0][2][0] == наблюдение
+    assert entries[1][2][0] == ДанныеСенсора("r1", 1000, 2.5, "temperature", "26850")
+
+
+def test_existing_recording_is_not_overwritten(tmp_path):
+    path = tmp_path / "traffic.ndjson"
+    path.write_text("прежняя запись", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        TrafficRecorder(str(path))
+    assert path.read_text(encoding="utf-8") == "прежняя запись"
+
+
+def test_each_run_gets_its_own_file(tmp_path):
+    policy = RecordingPolicy(enabled=True, path=str(tmp_path / "traffic.ndjson.gz"))
+    moment = datetime(2026, 3, 1, 12, 0, 5)
+    first = policy.run_path(moment)
+    assert first == str(tmp_path / "traffic-20260301-120005.ndjson.gz")
+    TrafficRecorder(first).close()
+    # Перезапуск в ту же секунду не затирает предыдущую запись
+    second = policy.run_path(moment)
+    assert second == str(tmp_path / "traffic-20260301-120005-1.ndjson.gz")
@@ -0,0 +1,77 @@
+"""Проверка диапазонов и нормализация точности пакета показаний"""
+
+import random
+
+import pytest
+
+from domain import validation
+from domain.models import ДанныеСенсора
+from domain.validation import SENSOR_PRECISION, normalized_value, validate_batch
+
+np = pytest.importorskip("numpy")
+
+# Половины последнего знака, значения чуть ниже и выше половины, границы диапазонов
+EDGE_VALUES = {
+    "temperature": [0.05, 0.15, 0.25, 0.35, -0.05, -0.15, 2.675, 1.005, 59.95, -59.95, 60.0, -60.0,
+                    0.1 + 0.2, 12.349999999999, 12.350000000001, 1e-9, -1e-9],
+    "pressure": [700.5, 701.5, 699.4999999, 760.5000001, 600.0, 800.0, 799.5],
+    "precipitation": [0.005, 0.015, 0.125, 0.135, 2.675, 1.005, 499.995, 0.285, 1.115],
+    "humidity": [0.05, 99.95, 50.25, 50.35, 100.0],
+    "wind_speed": [0.45, 0.55, 12.65, 99.95],
+}
+
+
+def _batch(values):
+    return [ДанныеСенсора(f"r{i}", i, значение, тип, "26850") for i, (тип, значение) in enumerate(values)]
+
+
+def _both_paths(values):
+    vectorized = validation._validate_vectorized(_batch(values))
+    rows = validation._validate_rows(_batch(values))
+    return vectorized, rows
+
+
+def _values(result):
+    return [(запись.идДанных, запись.значение) for запись in result.accepted]
+
+
+def test_edge_values_round_the_same_on_both_paths():
+    values = [(тип, значение) for тип, значения in EDGE_VALUES.items() for значение in значения]
+    vectorized, rows = _both_paths(values)
+    assert _values(vectorized) == _values(rows)
+    assert list(vectorized.rejected) == rows.rejected
+    for (тип, значение), запись in zip(values, vectorized.accepted):
+        assert запись.значение == round(значение, SENSOR_PRECISION[тип])
+
+
+def test_random_values_round_the_same_on_both_paths():
+    rng = random.Random(16)
+    типы = list(EDGE_VALUES) + ["visibility"]
+    values = []
+    for _ in range(20_000):
+        тип = rng.choice(типы)
+        знаков = SENSOR_PRECISION.get(тип, 2)
+        # Половина значений - ровно половина последнего знака
+        значение = rng.uniform(-100, 900)
+        if rng.random() < 0.5:
+            значение = (int(значение * 10 ** знаков) + 0.5) / 10 ** знаков
+        values.append((тип, значение))
+    vectorized, rows = _both_paths(values)
+    assert _values(vectorized) == _values(rows)
+    assert vectorized.rejected_by_type == rows.rejected_by_type
+
+
+def test_batch_is_normalized_in_place():
+    записи = _batch([("temperature", 21.349), ("temperature", 99.0), ("visibility", 3.0)])
+    result = validate_batch(записи)
+    assert result.accepted == [записи[0]]
+    assert записи[0].значение == normalized_value("temperature", 21.349) == 21.3
+    assert записи[1].значение == 99.0
+    assert result.rejected_by_type == {"temperature": 1, "visibility": 1}
+
+
+def test_non_numeric_value_falls_back_to_rows():
+    записи = _batch([("temperature", "n/a"), ("humidity", 55.55)])
+    result = validate_batch(записи)
+    assert [запись.идДанных for запись in result.accepted] == ["r1"]
+    assert list(result.rejected) == [True, False]
@@ -0,0 +1,47 @@
+"""Водяные знаки времени измерения по станциям"""
+
+from domain.models import ДанныеСенсора
+from domain.watermarks import WatermarkTracker
+
+MINUTE = 60_000
+
+
+def _readings(станция, *times):
+    return [ДанныеСенсора(f"{станция}_{t}", t, 1.0, "temperature", станция) for t in times]
+
+
+def test_readings_below_watermark_are_late():
+    tracker = WatermarkTracker(allowed_lateness=60)
+    assert tracker.observe_readings(_readings("a", 10 * MINUTE, 11 * MINUTE), arrival=11 * MINUTE) == 0
+    assert tracker.watermark("a") == 10 * MINUTE
+    # В пределах допустимого опоздания - обычный поток не по порядку
+    assert tracker.observe_readings(_readings("a", 10 * MINUTE + 1), arrival=11 * MINUTE) == 0
+    assert tracker.observe_readings(_readings("a", 5 * MINUTE, 9 * MINUTE), arrival=11 * MINUTE) == 2
+    assert tracker.is_late("a", 5 * MINUTE) and not tracker.is_late("a", 10 * MINUTE)
+    assert tracker.stats()["stations"]["a"]["max_lateness_ms"] == 6 * MINUTE
+
+
+def test_watermarks_are_per_station():
+    tracker = WatermarkTracker(allowed_lateness=60)
+    tracker.observe_readings(_readings("a", 100 * MINUTE))
+    assert tracker.observe_readings(_readings("b", 1 * MINUTE)) == 0
+    assert tracker.watermark("c") is None and not tracker.is_late("c", 0)
+
+
+def test_affected_windows_are_taken_once():
+    tracker = WatermarkTracker(allowed_lateness=0)
+    tracker.observe_readings(_readings("a", 10 * MINUTE))
+    tracker.observe_readings(_readings("a", 7 * MINUTE, 3 * MINUTE, 8 * MINUTE))
+    tracker.observe_readings(_readings("b", 10 * MINUTE))
+    assert tracker.take_affected() == {"a": 3 * MINUTE}
+    assert tracker.take_affected() == {}
+
+
+def test_arrival_delay_histogram():
+    tracker = WatermarkTracker()
+    arrival = 1_000 * MINUTE
+    tracker.observe_readings(_readings("a", arrival + 5, arrival - 500, arrival - 30_000, arrival - 2 * 86_400_000),
+                             arrival=arrival)
+    histogram = tracker.stats()["arrival_delay"]
+    assert (histogram["<1s"], histogram["<1m"], histogram[">=1d"]) == (2, 1, 1)
+    assert sum(histogram.values()) == 4
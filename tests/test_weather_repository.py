@@ -0,0 +1,98 @@
+"""Ряды станций WeatherDataRepository: выборки, опоздавшие записи и снимки"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from domain.models import WeatherData
+from domain.repositories import SERIES_CHUNK, WeatherDataRepository, _Snapshots
+
+START = datetime(2026, 1, 1)
+
+
+def _obs(station, minute, suffix=""):
+    return WeatherData(f"{station}_{minute}{suffix}", station, START + timedelta(minutes=minute),
+                       float(minute % 40), 70.0, 1013.0, 3.0, "С", 0.0)
+
+
+def _ms(minute):
+    return int((START + timedelta(minutes=minute)).timestamp() * 1000)
+
+
+def _ids(repo, station, lo, hi):
+    return [wd.id for series in repo.observations_between(station, _ms(lo), _ms(hi)) for wd in series]
+
+
+def test_random_writes_match_sorted_model():
+    random.seed(7)
+    repo = WeatherDataRepository()
+    model = {}
+    for step in range(40):
+        batch = [_obs("s1", random.randrange(5000)) for _ in range(random.randrange(1, 300))]
+        asyncio.run(repo.save_many(batch))
+        for wd in batch:
+            model[wd.id] = wd
+        if step % 5 == 0:
+            одно = _obs("s1", random.randrange(5000))
+            asyncio.run(repo.save(одно))
+            model[одно.id] = одно
+
+        lo, hi = sorted(random.sample(range(5000), 2))
+        expected = sorted((wd for wd in model.values()
+                           if START + timedelta(minutes=lo) <= wd.timestamp <= START + timedelta(minutes=hi)),
+                          key=lambda wd: wd.timestamp)
+        assert [wd.timestamp for wd in repo.observations_between("s1", _ms(lo), _ms(hi))[0]] == \
+            [wd.timestamp for wd in expected]
+    latest = max(model.values(), key=lambda wd: wd.timestamp)
+    assert asyncio.run(repo.get_latest_by_station("s1")).timestamp == latest.timestamp
+
+
+def test_snapshot_is_isolated_from_later_writes():
+    repo = WeatherDataRepository()
+    asyncio.run(repo.save_many([_obs("s1", m) for m in range(3 * SERIES_CHUNK)]))
+    view = repo.snapshot()
+
+    asyncio.run(repo.save_many([_obs("s1", m) for m in range(3 * SERIES_CHUNK, 3 * SERIES_CHUNK + 10)]))
+    asyncio.run(repo.save(_obs("s1", 5, "_late")))
+    repo.evict_before(START + timedelta(minutes=SERIES_CHUNK + 3))
+
+    assert len(_ids(view, "s1", 0, 10 * SERIES_CHUNK)) == 3 * SERIES_CHUNK
+    assert "s1_5_late" not in _ids(view, "s1", 0, 10)
+    assert "s1_5_late" in _ids(repo, "s1", 0, 10)
+
+
+def test_write_after_snapshot_copies_only_touched_chunks():
+    repo = WeatherDataRepository()
+    asyncio.run(repo.save_many([_obs("s1", m) for m in range(10 * SERIES_CHUNK)]))
+    repo.snapshot()
+    asyncio.run(repo.save(_obs("s1", 10 * SERIES_CHUNK)))
+
+    view = repo.snapshot()
+    asyncio.run(repo.save(_obs("s1", 10 * SERIES_CHUNK + 1)))
+
+    live = repo._station_data["s1"]
+    frozen = view._station_data["s1"]
+    # Скопирована только последняя порция, остальные разделены со снимком
+    assert sum(a is not b for a, b in zip(live._records, frozen._records)) == 1
+    assert len(frozen) == 10 * SERIES_CHUNK + 1
+
+
+def test_remove_and_overwrite_keep_order():
+    repo = WeatherDataRepository()
+    asyncio.run(repo.save_many([_obs("s1", m) for m in range(2 * SERIES_CHUNK + 5)]))
+    перезапись = WeatherData("s1_7", "s1", START + timedelta(minutes=3 * SERIES_CHUNK), 1.0, 70.0, 1013.0, 3.0, "С", 0.0)
+    asyncio.run(repo.save(перезапись))
+
+    ids = _ids(repo, "s1", 0, 4 * SERIES_CHUNK)
+    assert ids.count("s1_7") == 1 and ids[-1] == "s1_7"
+    assert len(ids) == 2 * SERIES_CHUNK + 5
+
+
+def test_snapshots_require_freeze():
+    class Incomplete(_Snapshots):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
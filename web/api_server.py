@@ -7,7 +7,7 @@ import logging
 from typing import Dict, Any
 from datetime import datetime, timedelta
 import uvicorn
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,6 +15,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from infrastructure.di_container import DI_Container
 from domain.models import WeatherData, ModelParameters
 from web.api_adapter import WebInterfaceAdapter
+from web.binary_protocol import FrameError, FrameReader, columns_of
+from web.ndjson_ingest import NDJSONIngestor
+
+# Размер пакета записи при приеме двоичных кадров через HTTP
+BINARY_BATCH_RECORDS = 5000
 
 
 class WeatherAPIServer:
@@ -62,11 +67,39 @@ class WeatherAPIServer:
                 "version": "1.0.0"
             }
 
+        @self.app.get("/api/scheduler")
+        async def get_scheduler_stats():
+            """Статистика периодических задач: длительности запусков и опоздания"""
+            from infrastructure.scheduler import Scheduler
+            scheduler = self.di_container.get_singleton_instances().get(Scheduler)
+            if scheduler is None:
+                raise HTTPException(status_code=404, detail="Планировщик не запущен")
+            return scheduler.stats()
+
+        @self.app.get("/api/feeds")
+        async def get_feed_stats():
+            """Статистика приемника двоичных потоков сенсоров (TCP/UDP)"""
+            from web.sensor_feed_server import SensorFeedServer
+            feed_server = self.di_container.get_singleton_instances().get(SensorFeedServer)
+            if feed_server is None:
+                raise HTTPException(status_code=404, detail="Приемник двоичных потоков не запущен")
+            return feed_server.stats()
+
+        @self.app.get("/api/watermarks")
+        async def get_watermarks():
+            """Водяные знаки станций и распределение задержек прихода данных"""
+            from domain.watermarks import WatermarkTracker
+            watermarks = self.di_container.get_singleton_instances().get(WatermarkTracker)
+            if watermarks is None:
+                raise HTTPException(status_code=404, detail="Учет опоздавших данных не настроен")
+            return watermarks.stats()
+
         @self.app.get("/api/current-weather")
         async def get_current_weather(station_id: str = "26850"):
             """Получение текущей погоды"""
             try:
                 from domain.repositories import WeatherDataRepository
+                # Последнее наблюдение - одна запись: снимок репозитория не нужен
                 repo = self.di_container.разрешить(WeatherDataRepository)
                 latest_data = await repo.get_latest_by_station(station_id)
 
@@ -82,7 +115,7 @@ class WeatherAPIServer:
             """Получение прогноза"""
             try:
                 from domain.repositories import ForecastRepository
-                repo = self.di_container.разрешить(ForecastRepository)
+                repo = self.di_container.разрешить(ForecastRepository).snapshot()
                 forecast = await repo.get_latest_for_region(region)
 
                 if forecast:
@@ -105,7 +138,7 @@ class WeatherAPIServer:
             """Получение оповещений"""
             try:
                 from domain.repositories import AlertRepository
-                repo = self.di_container.разрешить(AlertRepository)
+                repo = self.di_container.разрешить(AlertRepository).snapshot()
 
                 if active_only:
                     alerts = await repo.get_active_alerts()
@@ -118,11 +151,11 @@ class WeatherAPIServer:
 
         @self.app.get("/api/archive")
         async def get_archive(station_id: str = "26850", hours: int = 24):
-            """Получение архивных данных"""
+            """Получение архивных данных (длинные периоды - по агрегатам)"""
             try:
-                from domain.repositories import WeatherDataRepository
-                repo = self.di_container.разрешить(WeatherDataRepository)
-                data = await repo.get_station_history(station_id, hours)
+                from controllers.data_controller import DataController
+                data_controller = self.di_container.разрешить(DataController)
+                data = await data_controller.get_archive(station_id, hours)
 
                 return WebInterfaceAdapter.prepare_archive_data(data)
             except Exception as e:
@@ -185,6 +218,62 @@ class WeatherAPIServer:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.post("/api/ingest")
+        async def ingest_ndjson(request: Request):
+            """
+            Потоковый прием данных в формате NDJSON (application/x-ndjson):
+            одно наблюдение WeatherData или показание сенсора на строку.
+            Тело читается по фрагментам и записывается пакетами
+            """
+            try:
+                from controllers.data_controller import DataController
+                ingestor = NDJSONIngestor(self.di_container.разрешить(DataController))
+
+                return await ingestor.ingest(request.stream())
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+        @self.app.post("/api/ingest/binary")
+        async def ingest_binary(request: Request):
+            """
+            Прием показаний в двоичном формате (web.binary_protocol, application/octet-stream).
+            Кадры декодируются по мере поступления тела и записываются пакетами в колонках
+            """
+            from controllers.data_controller import DataController
+            data_controller = self.di_container.разрешить(DataController)
+            frames = FrameReader()
+            batch = []
+            batch_records = 0
+            result = {"frames": 0, "accepted": 0, "rejected": 0, "duplicates": 0, "rejected_by_type": {}}
+
+            async def flush():
+                nonlocal batch, batch_records
+                validation = await data_controller.ingest_columns([columns_of(batch)])
+                batch = []
+                batch_records = 0
+                result["accepted"] += validation.accepted_count
+                result["duplicates"] += validation.duplicates
+                for тип, count in validation.rejected_by_type.items():
+                    result["rejected"] += count
+                    result["rejected_by_type"][тип] = result["rejected_by_type"].get(тип, 0) + count
+
+            try:
+                async for chunk in request.stream():
+                    received = frames.feed(chunk)
+                    batch.extend(received)
+                    batch_records += sum(map(len, received))
+                    if batch_records >= BINARY_BATCH_RECORDS:
+                        await flush()
+                frames.close()
+            except FrameError as e:
+                raise HTTPException(status_code=400, detail=f"{e}; кадров принято: {frames.frames}")
+            finally:
+                if batch:
+                    await flush()
+
+            result["frames"] = frames.frames
+            return result
+
         # Статические файлы
         try:
             import os
@@ -0,0 +1,260 @@
+"""
+Компактный двоичный формат показаний сенсоров
+Кадр - показания одной станции:
+  заголовок <2sBBH: сигнатура b"WX", версия, длина идентификатора станции, число записей;
+  идентификатор станции в UTF-8;
+  записи <qBf по 13 байт: время (мс эпохи), код типа измерения, значение float32.
+Кадры идут подряд без разделителей (поток TCP, тело HTTP) или по одному
+и более в датаграмме UDP. Записи кадра декодируются сразу в колонки
+(время, код типа, значение) без разбора по полям; columns_of передает их
+приему рядами (станция, тип) - объекты ДанныеСенсора не создаются.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+from domain.models import SensorColumns, SeriesKey, ДанныеСенсора, reading_id
+
+MAGIC = b"WX"
+VERSION = 1
+HEADER = struct.Struct("<2sBBH")
+RECORD = struct.Struct("<qBf")
+MAX_RECORDS = 0xFFFF
+
+# Коды типов измерения в кадре; код 0 зарезервирован
+TYPE_CODES: Dict[str, int] = {
+    "temperature": 1,
+    "humidity": 2,
+    "pressure": 3,
+    "wind_speed": 4,
+    "precipitation": 5
+}
+TYPE_NAMES: Dict[int, str] = {код: тип for тип, код in TYPE_CODES.items()}
+
+# С какого числа записей кадр разбирается по типам средствами NumPy;
+# короткие кадры (поток 1 Гц - несколько показаний) быстрее разобрать в Python
+VECTOR_MIN_RECORDS = 64
+
+if np is not None:
+    _RECORD_DTYPE = np.dtype([("time", "<i8"), ("code", "u1"), ("value", "<f4")])
+
+
+class FrameError(ValueError):
+    """Поврежденный или неподдерживаемый кадр"""
+
+
+@dataclass(slots=True)
+class SensorFrame:
+    """Декодированный кадр: показания станции в колонках"""
+    station: str
+    times: Sequence[int]
+    codes: Sequence[int]
+    values: Sequence[float]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _series(self) -> Iterator[Tuple[str, Sequence[int], Sequence[float]]]:
+        """Колонки NumPy (тип, время, значение) по типам измерения; неизвестный код дает тип unknown_<код>"""
+        codes = self.codes
+        # Обычно длинный кадр несет показания одного типа - колонки отдаются без выборки по маске
+        if (codes == codes[0]).all():
+            коды = [(int(codes[0]), None)]
+        else:
+            коды = [(int(код), codes == код) for код in np.unique(codes)]
+        for код, mask in коды:
+            тип = TYPE_NAMES.get(код) or f"unknown_{код}"
+            if mask is None:
+                yield тип, self.times, self.values
+            else:
+                yield тип, self.times[mask], self.values[mask]
+
+    def records(self) -> List[ДанныеСенсора]:
+        """
+        Записи ДанныеСенсора для репозитория.
+        Неизвестный код типа дает тип unknown_<код>, такие записи отклоняет проверка пакета
+        """
+        times = self.times.tolist() if hasattr(self.times, "tolist") else self.times
+        codes = self.codes.tolist() if hasattr(self.codes, "tolist") else self.codes
+        values = self.values.tolist() if hasattr(self.values, "tolist") else self.values
+        types = [TYPE_NAMES.get(код) or f"unknown_{код}" for код in codes]
+        station = self.station
+        return [
+            ДанныеСенсора(reading_id(station, тип, время), время, значение, тип, station)
+            for время, тип, значение in zip(times, types, values)
+        ]
+
+
+def encode_frame(station: str, times: Sequence[int], types: Sequence[str],
+                 values: Sequence[float]) -> bytes:
+    """Кадр показаний одной станции (не более MAX_RECORDS записей)"""
+    station_bytes = station.encode("utf-8")
+    if len(station_bytes) > 0xFF:
+        raise FrameError(f"Слишком длинный идентификатор станции: {station}")
+    if len(times) > MAX_RECORDS:
+        raise FrameError(f"В кадре не более {MAX_RECORDS} записей")
+
+    codes = [TYPE_CODES[тип] for тип in types]
+    return b"".join([
+        HEADER.pack(MAGIC, VERSION, len(station_bytes), len(times)),
+        station_bytes,
+        *map(RECORD.pack, times, codes, values)
+    ])
+
+
+def encode_readings(readings: Iterable[ДанныеСенсора]) -> bytes:
+    """Кадры для произвольных показаний: по кадру на станцию и каждые MAX_RECORDS записей"""
+    по_станциям: Dict[str, List[ДанныеСенсора]] = {}
+    for запись in readings:
+        по_станциям.setdefault(запись.идСтанции, []).append(запись)
+
+    кадры = []
+    for station, записи in по_станциям.items():
+        for start in range(0, len(записи), MAX_RECORDS):
+            часть = записи[start:start + MAX_RECORDS]
+            кадры.append(encode_frame(station,
+                                      [запись.времяИзмерения for запись in часть],
+                                      [запись.типИзмерения for запись in часть],
+                                      [запись.значение for запись in часть]))
+    return b"".join(кадры)
+
+
+def _header(buffer, offset: int) -> Tuple[str, int, int]:
+    """Станция, число записей и смещение начала записей; FrameError для чужого кадра"""
+    magic, version, station_length, count = HEADER.unpack_from(buffer, offset)
+    if magic != MAGIC:
+        raise FrameError(f"Неверная сигнатура кадра: {bytes(magic)!r}")
+    if version != VERSION:
+        raise FrameError(f"Неподдерживаемая версия кадра: {version}")
+    start = offset + HEADER.size
+    try:
+        station = bytes(buffer[start:start + station_length]).decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise FrameError(f"Некорректный идентификатор станции: {e}")
+    return station, count, start + station_length
+
+
+def frame_size(buffer, offset: int = 0) -> int:
+    """Размер кадра, начинающегося с offset, или 0, если заголовок получен не полностью"""
+    if len(buffer) - offset < HEADER.size:
+        return 0
+    magic, version, station_length, count = HEADER.unpack_from(buffer, offset)
+    if magic != MAGIC:
+        raise FrameError(f"Неверная сигнатура кадра: {bytes(magic)!r}")
+    return HEADER.size + station_length + count * RECORD.size
+
+
+def decode_frame(buffer, offset: int = 0) -> Tuple[SensorFrame, int]:
+    """Декодирование полного кадра; возвращает кадр и смещение следующего"""
+    size = frame_size(buffer, offset)
+    if size == 0 or len(buffer) - offset < size:
+        raise FrameError("Кадр получен не полностью")
+
+    station, count, start = _header(buffer, offset)
+    if np is not None:
+        columns = np.frombuffer(buffer, dtype=_RECORD_DTYPE, count=count, offset=start)
+        frame = SensorFrame(station, columns["time"], columns["code"], columns["value"])
+    elif count:
+        times, codes, values = zip(*RECORD.iter_unpack(buffer[start:start + count * RECORD.size]))
+        frame = SensorFrame(station, times, codes, values)
+    else:
+        frame = SensorFrame(station, (), (), ())
+    return frame, offset + size
+
+
+def decode_frames(buffer) -> List[SensorFrame]:
+    """Все кадры буфера (датаграммы или тела запроса целиком)"""
+    frames = []
+    offset = 0
+    while offset < len(buffer):
+        frame, offset = decode_frame(buffer, offset)
+        frames.append(frame)
+    return frames
+
+
+class FrameReader:
+    """
+    Разбор потока кадров по фрагментам произвольного размера.
+    Неполный кадр ждет следующих фрагментов; после FrameError поток
+    продолжать нельзя - границы кадров потеряны
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = 0
+        self.records = 0
+
+    def feed(self, chunk: bytes) -> List[SensorFrame]:
+        self._buffer += chunk
+        frames = []
+        offset = 0
+        while True:
+            size = frame_size(self._buffer, offset)
+            if size == 0 or len(self._buffer) - offset < size:
+                break
+            # Кадр копируется: буфер читателя изменяется, а колонки NumPy ссылаются на память
+            frame, _ = decode_frame(bytes(self._buffer[offset:offset + size]))
+            frames.append(frame)
+            offset += size
+        del self._buffer[:offset]
+
+        self.frames += len(frames)
+        self.records += sum(map(len, frames))
+        return frames
+
+    def close(self) -> None:
+        """Конец потока: незавершенный кадр - ошибка"""
+        if self._buffer:
+            pending, self._buffer = len(self._buffer), bytearray()
+            raise FrameError(f"Поток оборвался внутри кадра ({pending} байт)")
+
+
+def records_of(frames: Iterable[SensorFrame]) -> List[ДанныеСенсора]:
+    """Записи всех кадров одним списком"""
+    записи: List[ДанныеСенсора] = []
+    for frame in frames:
+        записи.extend(frame.records())
+    return записи
+
+
+def columns_of(frames: Iterable[SensorFrame]) -> SensorColumns:
+    """Показания кадров в колонках по рядам (станция, тип); части ряда из разных кадров объединяются"""
+    колонки: Dict[SeriesKey, Tuple[List[int], List[float]]] = {}
+    массивы: Dict[SeriesKey, List[Tuple[Sequence[int], Sequence[float]]]] = {}
+    for frame in frames:
+        station = frame.station
+        if np is not None and isinstance(frame.codes, np.ndarray) and len(frame) >= VECTOR_MIN_RECORDS:
+            for тип, times, values in frame._series():
+                массивы.setdefault((station, тип), []).append((times, values))
+            continue
+        # Короткий кадр раскладывается по рядам в Python
+        times = frame.times.tolist() if hasattr(frame.times, "tolist") else frame.times
+        codes = frame.codes.tolist() if hasattr(frame.codes, "tolist") else frame.codes
+        values = frame.values.tolist() if hasattr(frame.values, "tolist") else frame.values
+        for время, код, значение in zip(times, codes, values):
+            key = (station, TYPE_NAMES.get(код) or f"unknown_{код}")
+            колонка = колонки.get(key)
+            if колонка is None:
+                колонки[key] = ([время], [значение])
+            else:
+                колонка[0].append(время)
+                колонка[1].append(значение)
+
+    if not массивы:
+        return колонки
+    результат: SensorColumns = dict(колонки)
+    for key, куски in массивы.items():
+        if key in колонки:
+            куски = [колонки[key], *куски]
+        if len(куски) == 1:
+            результат[key] = куски[0]
+        else:
+            результат[key] = (np.concatenate([np.asarray(times, dtype=np.int64) for times, _ in куски]),
+                              np.concatenate([np.asarray(values, dtype=np.float32) for _, values in куски]))
+    return результат
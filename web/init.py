@@ -4,8 +4,13 @@
 
 from .api_adapter import WebInterfaceAdapter
 from .api_server import WeatherAPIServer
+from .ndjson_ingest import NDJSONIngestor
+from .sensor_feed_server import BinaryFeedPolicy, SensorFeedServer
 
 __all__ = [
     'WebInterfaceAdapter',
-    'WeatherAPIServer'
+    'WeatherAPIServer',
+    'NDJSONIngestor',
+    'BinaryFeedPolicy',
+    'SensorFeedServer'
 ]
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Потоковый прием наблюдений в формате NDJSON
+Каждая строка тела запроса - JSON-объект: наблюдение WeatherData
+(station_id, timestamp, temperature, humidity, pressure, wind_speed, ...) или показание
+сенсора (station_id, type, value, timestamp). Значения проверяются по диапазонам SENSOR_RANGES.
+Тело разбирается по мере поступления фрагментов, записи сохраняются пакетами через DataController.
+"""
+
+import codecs
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterable, Dict, List
+
+from controllers.data_controller import DataController
+from domain.models import WeatherData, ДанныеСенсора, reading_id
+from domain.validation import weather_out_of_range
+
+# Строки длиннее этого числа символов отклоняются без разбора
+MAX_LINE_CHARS = 64 * 1024
+
+# Сколько сообщений об ошибках возвращается в ответе
+MAX_ERRORS_REPORTED = 20
+
+_decode = json.JSONDecoder().decode
+
+
+def _timestamp_ms(value: Any) -> int:
+    """Метка времени: миллисекунды эпохи или строка ISO 8601"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    raise ValueError(f"некорректная метка времени: {value!r}")
+
+
+def _weather(record: Dict[str, Any]) -> WeatherData:
+    station_id = str(record["station_id"])
+    timestamp = _timestamp_ms(record["timestamp"])
+    return WeatherData(
+        id=str(record.get("id") or f"{station_id}_{timestamp}"),
+        station_id=station_id,
+        timestamp=datetime.fromtimestamp(timestamp / 1000),
+        temperature=float(record["temperature"]),
+        humidity=float(record["humidity"]),
+        pressure=float(record["pressure"]),
+        wind_speed=float(record["wind_speed"]),
+        wind_direction=str(record.get("wind_direction", "")),
+        precipitation=float(record.get("precipitation", 0.0)),
+        phenomena=str(record.get("phenomena", ""))
+    )
+
+
+def _reading(record: Dict[str, Any]) -> ДанныеСенсора:
+    station_id = str(record["station_id"])
+    тип = str(record["type"])
+    timestamp = _timestamp_ms(record["timestamp"])
+    return ДанныеСенсора(
+        идДанных=str(record.get("id") or reading_id(station_id, тип, timestamp)),
+        времяИзмерения=timestamp,
+        значение=float(record["value"]),
+        типИзмерения=тип,
+        идСтанции=station_id
+    )
+
+
+class NDJSONIngestor:
+    """Разбор одного потока NDJSON с пакетной записью"""
+
+    def __init__(self, data_controller: DataController, batch_size: int = 2000):
+        self.data_controller = data_controller
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+        self._weather: List[WeatherData] = []
+        self._readings: List[ДанныеСенсора] = []
+        self._line = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.rejected_by_reason: Dict[str, int] = {}
+        self.errors: List[str] = []
+
+    async def ingest(self, chunks: AsyncIterable[bytes]) -> Dict[str, Any]:
+        """Прием потока фрагментов тела запроса; возвращает число принятых и отклоненных записей"""
+        # Инкрементальный декодер не разрывает многобайтовые символы UTF-8 на границе фрагментов
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        tail = ""
+        skipping = False  # остаток слишком длинной строки до следующего перевода строки
+        async for chunk in chunks:
+            text = decoder.decode(chunk)
+            if skipping:
+                # Остаток отклоненной строки отбрасывается, не накапливаясь в tail
+                newline = text.find("\n")
+                if newline < 0:
+                    continue
+                text = text[newline + 1:]
+                skipping = False
+            if not text:
+                continue
+            lines = (tail + text).split("\n") if tail else text.split("\n")
+            tail = lines.pop()
+
+            for line in lines:
+                self._parse(line)
+
+            if len(tail) > MAX_LINE_CHARS:
+                self._parse(tail)
+                tail = ""
+                skipping = True
+
+            if len(self._weather) + len(self._readings) >= self.batch_size:
+                await self._flush()
+
+        tail += decoder.decode(b"", final=True)
+        if tail and not skipping:
+            self._parse(tail)
+        await self._flush()
+
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "rejected_by_reason": self.rejected_by_reason,
+            "errors": self.errors
+        }
+
+    def _reject(self, reason: str, message: str) -> None:
+        self.rejected += 1
+        self.rejected_by_reason[reason] = self.rejected_by_reason.get(reason, 0) + 1
+        if len(self.errors) < MAX_ERRORS_REPORTED:
+            self.errors.append(f"строка {self._line}: {message}")
+
+    def _parse(self, line: str) -> None:
+        self._line += 1
+        if len(line) > MAX_LINE_CHARS:
+            self._reject("too_long", f"строка длиннее {MAX_LINE_CHARS} символов")
+            return
+        if not line.strip():
+            self._line -= 1  # пустые строки не нумеруются и не считаются
+            return
+
+        try:
+            record = _decode(line)
+        except ValueError as e:
+            self._reject("invalid_json", str(e))
+            return
+        if not isinstance(record, dict):
+            self._reject("invalid_json", "ожидается JSON-объект")
+            return
+
+        try:
+            if "value" in record:
+                self._readings.append(_reading(record))
+            else:
+                наблюдение = _weather(record)
+                вне_диапазона = weather_out_of_range(наблюдение)
+                if вне_диапазона:
+                    self._reject("out_of_range", f"вне допустимого диапазона: {', '.join(вне_диапазона)}")
+                else:
+                    self._weather.append(наблюдение)
+        except KeyError as e:
+            self._reject("missing_field", f"нет поля {e}")
+        except (TypeError, ValueError) as e:
+            self._reject("invalid_value", str(e))
+
+    async def _flush(self) -> None:
+        if self._weather:
+            batch, self._weather = self._weather, []
+            saved = await self.data_controller.ingest_many(batch)
+            self.accepted += saved
+            self.duplicates += len(batch) - saved
+
+        if self._readings:
+            batch, self._readings = self._readings, []
+            result = await self.data_controller.ingest_readings(batch)
+            self.accepted += len(result.accepted)
+            self.duplicates += result.duplicates
+            for тип, count in result.rejected_by_type.items():
+                self.rejected += count
+                self.rejected_by_reason["out_of_range"] = self.rejected_by_reason.get("out_of_range", 0) + count
+                if len(self.errors) < MAX_ERRORS_REPORTED:
+                    self.errors.append(f"{тип}: вне допустимого диапазона или неизвестный тип - {count}")
@@ -0,0 +1,169 @@
+"""
+Прием потоков показаний сенсоров в двоичном формате (web.binary_protocol)
+по TCP (поток кадров на соединение) и UDP (один или несколько кадров в датаграмме).
+Показания передаются в DataIngestionController.принятьКолонки колонками рядов
+(станция, тип) без объектов ДанныеСенсора - при включенном конвейере приема
+они пакетируются и записываются вне цикла событий.
+"""
+
+import asyncio
+import logging
+import socket
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Set
+
+from controllers.data_ingestion_controller import DataIngestionController
+from domain.models import SensorColumns, columns_size
+from web.binary_protocol import FrameError, FrameReader, columns_of, decode_frames
+
+READ_BYTES = 64 * 1024
+
+
+@dataclass
+class BinaryFeedPolicy:
+    """Параметры приемника двоичных потоков (секция ingestion.binary_feed)"""
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    tcp_port: int = 9100  # 0 - без TCP
+    udp_port: int = 9101  # 0 - без UDP
+    # Буфер приема UDP: датаграммы, пришедшие пока цикл событий занят, иначе сбрасывает ядро.
+    # Фактический размер ограничен net.core.rmem_max
+    udp_receive_buffer: int = 4 * 1024 * 1024
+    # Датаграммы, одновременно передаваемые контроллеру; сверх этого датаграммы
+    # отбрасываются (UDP не ждет приемника) и считаются в datagrams_dropped
+    udp_max_in_flight: int = 256
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'BinaryFeedPolicy':
+        section = config.get("ingestion", {}).get("binary_feed", {})
+        return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+class _FeedDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: 'SensorFeedServer'):
+        self.server = server
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.server._datagram(data, addr)
+
+
+class SensorFeedServer:
+    """Приемник двоичных потоков сенсоров по TCP и UDP"""
+
+    def __init__(self, controller: DataIngestionController, policy: BinaryFeedPolicy = None):
+        self.controller = controller
+        self.policy = policy or BinaryFeedPolicy()
+        self.logger = logging.getLogger(__name__)
+
+        self._tcp: Optional[asyncio.AbstractServer] = None
+        self._udp: Optional[asyncio.DatagramTransport] = None
+        self._deliveries: Set[asyncio.Task] = set()
+
+        # Метрики
+        self.connections = 0
+        self.active_connections = 0
+        self.datagrams = 0
+        self.datagrams_dropped = 0
+        self.frames = 0
+        self.records = 0
+        self.frame_errors = 0
+        self.last_error: Optional[str] = None
+
+    async def start(self) -> None:
+        if self.policy.tcp_port:
+            self._tcp = await asyncio.start_server(self._connection, self.policy.host, self.policy.tcp_port)
+            self.logger.info(f"Прием двоичных потоков по TCP: {self.policy.host}:{self.tcp_port}")
+        if self.policy.udp_port:
+            loop = asyncio.get_running_loop()
+            self._udp, _ = await loop.create_datagram_endpoint(
+                lambda: _FeedDatagramProtocol(self), local_addr=(self.policy.host, self.policy.udp_port)
+            )
+            if self.policy.udp_receive_buffer:
+                self._udp.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                                              self.policy.udp_receive_buffer)
+            self.logger.info(f"Прием двоичных потоков по UDP: {self.policy.host}:{self.udp_port}")
+
+    async def stop(self) -> None:
+        """Закрытие приемников; уже принятые данные передаются контроллеру"""
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+            self._tcp = None
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+    @property
+    def tcp_port(self) -> Optional[int]:
+        """Фактический порт TCP"""
+        return self._tcp.sockets[0].getsockname()[1] if self._tcp is not None else None
+
+    @property
+    def udp_port(self) -> Optional[int]:
+        return self._udp.get_extra_info("sockname")[1] if self._udp is not None else None
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        self.connections += 1
+        self.active_connections += 1
+        frames = FrameReader()
+        try:
+            while chunk := await reader.read(READ_BYTES):
+                received = frames.feed(chunk)
+                if received:
+                    # Ожидание здесь (заполненный конвейер) останавливает чтение из сокета
+                    await self._deliver(columns_of(received), len(received))
+            frames.close()
+        except FrameError as e:
+            self._error(f"{peer}: {e}")
+        except ConnectionError as e:
+            self.logger.info(f"Соединение {peer} разорвано: {e}")
+        finally:
+            self.active_connections -= 1
+            writer.close()
+
+    def _datagram(self, data: bytes, addr) -> None:
+        self.datagrams += 1
+        try:
+            frames = decode_frames(data)
+        except FrameError as e:
+            self._error(f"{addr}: {e}")
+            return
+        if frames:
+            if len(self._deliveries) >= self.policy.udp_max_in_flight:
+                # Конвейер не успевает: задачи доставки не копятся без ограничения
+                self.datagrams_dropped += 1
+                return
+            task = asyncio.create_task(self._deliver(columns_of(frames), len(frames)))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, колонки: SensorColumns, frames: int) -> None:
+        records = columns_size(колонки)
+        self.frames += frames
+        self.records += records
+        try:
+            await self.controller.принятьКолонки(колонки)
+        except Exception as e:
+            self.logger.error(f"Ошибка приема {records} записей: {e}")
+
+    def _error(self, message: str) -> None:
+        self.frame_errors += 1
+        self.last_error = message
+        self.logger.warning(f"Поврежденный поток: {message}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tcp_port": self.tcp_port,
+            "udp_port": self.udp_port,
+            "connections": self.connections,
+            "active_connections": self.active_connections,
+            "datagrams": self.datagrams,
+            "datagrams_dropped": self.datagrams_dropped,
+            "frames": self.frames,
+            "records": self.records,
+            "frame_errors": self.frame_errors,
+            "last_error": self.last_error
+        }